@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Shared helpers for CoPaw benchmarks.
+
+Benchmarks must call :func:`isolated_working_dir` *before* importing
+anything from ``copaw`` so that ``copaw.constant`` resolves
+``WORKING_DIR`` / ``SECRET_DIR`` to a throwaway directory.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+
+def isolated_working_dir(prefix: str = "copaw-bench-") -> Path:
+    """Point CoPaw at a fresh temporary working/secret dir."""
+    root = Path(tempfile.mkdtemp(prefix=prefix))
+    os.environ["COPAW_WORKING_DIR"] = str(root / "working")
+    os.environ["COPAW_SECRET_DIR"] = str(root / "secret")
+    (root / "working").mkdir(parents=True, exist_ok=True)
+    (root / "secret").mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of *samples* (pct in [0, 100])."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Return n/mean/p50/p99 in milliseconds for samples in seconds."""
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def print_report(title: str, rows: dict[str, dict[str, float]]) -> None:
+    """Print one line per scenario with its summary stats."""
+    print(f"== {title}")
+    for name, stats in rows.items():
+        cells = "  ".join(
+            f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+            for k, v in stats.items()
+        )
+        print(f"  {name:<24} {cells}")
+
+
+def run_metadata() -> dict[str, Any]:
+    """Commit, interpreter and host of this run, for comparing results."""
+    repo = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=10,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def write_json(path: str, results: dict[str, Any], **config: Any) -> None:
+    """Write *results* with run metadata and *config* as JSON."""
+    data = {"meta": run_metadata(), "config": config, "results": results}
+    Path(path).write_text(
+        json.dumps(data, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""In-process channel for benchmarks.
+
+``FakeChannel`` is a ``BaseChannel`` whose transport is a dict: messages
+go in through ``ChannelManager.enqueue`` (the same path a webhook or
+polling thread uses) and every reply the channel would send is recorded
+with its timestamp instead. Each injected message carries an id in its
+meta; when the manager merges queued messages of one session into a
+single turn, the ids are merged too, so every message gets its own
+enqueue, first-reply and done times.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from agentscope_runtime.engine.schemas.agent_schemas import (
+    ContentType,
+    TextContent,
+)
+
+from copaw.app.channels.base import BaseChannel
+
+
+@dataclass
+class Delivery:
+    """Timeline of one injected message (``time.monotonic`` seconds)."""
+
+    enqueued: float
+    first_reply: Optional[float] = None
+    done: Optional[float] = None
+    replies: List[str] = field(default_factory=list)
+    turn_size: int = 1
+
+
+class FakeChannel(BaseChannel):
+    """Records replies instead of sending them."""
+
+    def __init__(self, process, channel: str = "bench") -> None:
+        super().__init__(process)
+        self.channel = channel
+        self.deliveries: Dict[int, Delivery] = {}
+        self.turns = 0
+        self._ids = itertools.count()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @classmethod
+    def from_config(cls, process, config, on_reply_sent=None, **_kwargs):
+        return cls(process, getattr(config, "channel", "bench"))
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    # ----- inject -----
+
+    def inject(self, manager, sender_id: str, text: str) -> int:
+        """Enqueue one user message through *manager*; return its id."""
+        msg_id = next(self._ids)
+        self.deliveries[msg_id] = Delivery(enqueued=time.monotonic())
+        self._idle.clear()
+        manager.enqueue(
+            self.channel,
+            {
+                "channel_id": self.channel,
+                "sender_id": sender_id,
+                "content_parts": [
+                    TextContent(type=ContentType.TEXT, text=text),
+                ],
+                "meta": {"ids": [msg_id]},
+            },
+        )
+        return msg_id
+
+    async def wait_idle(self) -> None:
+        """Wait until every injected message has been answered."""
+        await self._idle.wait()
+
+    # ----- BaseChannel -----
+
+    def build_agent_request_from_native(self, native_payload: Any):
+        payload = native_payload if isinstance(native_payload, dict) else {}
+        sender_id = payload.get("sender_id") or ""
+        request = self.build_agent_request_from_user_content(
+            channel_id=self.channel,
+            sender_id=sender_id,
+            session_id=self.resolve_session_id(sender_id),
+            content_parts=payload.get("content_parts") or [],
+        )
+        setattr(request, "channel_meta", payload.get("meta") or {})
+        return request
+
+    def merge_native_items(self, items: List[Any]) -> Any:
+        merged = super().merge_native_items(items)
+        if merged is not None:
+            merged["meta"]["ids"] = [
+                i for item in items for i in item["meta"]["ids"]
+            ]
+        return merged
+
+    async def _run_process_loop(self, request, to_handle, send_meta) -> None:
+        ids = send_meta.get("ids") or []
+        for msg_id in ids:
+            self.deliveries[msg_id].turn_size = len(ids)
+        try:
+            await super()._run_process_loop(request, to_handle, send_meta)
+        finally:
+            now = time.monotonic()
+            self.turns += 1
+            for msg_id in ids:
+                self.deliveries[msg_id].done = now
+            if all(d.done for d in self.deliveries.values()):
+                self._idle.set()
+
+    async def send(
+        self,
+        to_handle: str,
+        text: str,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        now = time.monotonic()
+        for msg_id in (meta or {}).get("ids") or []:
+            delivery = self.deliveries[msg_id]
+            if delivery.first_reply is None:
+                delivery.first_reply = now
+            delivery.replies.append(text)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Fake stdio MCP server for benchmarks.
+
+Usage:
+    python benchmarks/_fake_mcp_server.py [--delay 0.5] [--fail]
+
+Sleeps ``--delay`` seconds before speaking MCP (a slow-starting server),
+or exits immediately with ``--fail`` (a broken command). Exposes one
+``echo`` tool.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--fail", action="store_true")
+    args = parser.parse_args()
+    if args.fail:
+        sys.exit(1)
+    time.sleep(args.delay)
+
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP("fake")
+
+    @server.tool()
+    def echo(text: str) -> str:
+        """Return *text* unchanged."""
+        return text
+
+    server.run("stdio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""Minimal OpenAI-compatible HTTP server for benchmarks.
+
+Serves ``POST /v1/chat/completions`` (streamed as SSE or as one JSON
+body) and ``GET /v1/models`` over HTTP/1.1 keep-alive, on a background
+thread with its own event loop. Counts accepted TCP connections and
+requests so benchmarks can show connection reuse.
+
+Replies are deterministic. With ``ttft_s`` or ``tokens_per_s`` set, the
+stream is paced like a real model: one chunk per word, the first after
+``ttft_s`` and the rest at ``tokens_per_s``, sent with chunked transfer
+encoding as they are produced. With ``tool_rounds`` set, each turn
+calls ``tool_name`` until that many tool results follow the last user
+message, then gives the text reply.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import threading
+import time
+from typing import AsyncIterator
+
+
+class FakeOpenAIServer:
+    """Usage::
+
+    with FakeOpenAIServer(reply="hello") as server:
+        base_url = server.base_url  # http://127.0.0.1:<port>/v1
+    """
+
+    def __init__(
+        self,
+        reply: str = "ok",
+        chunks: int = 4,
+        latency_s: float = 0.0,
+        model: str = "fake-model",
+        ttft_s: float = 0.0,
+        tokens_per_s: float = 0.0,
+        tool_rounds: int = 0,
+        tool_name: str = "echo",
+    ) -> None:
+        self.reply = reply
+        self.chunks = max(1, chunks)
+        self.latency_s = latency_s
+        self.model = model
+        self.ttft_s = ttft_s
+        self.tokens_per_s = tokens_per_s
+        self.tool_rounds = tool_rounds
+        self.tool_name = tool_name
+        self.connections = 0
+        self.requests = 0
+        self.tool_calls = 0
+        self.last_request_bytes = 0
+        self.port = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    @property
+    def paced(self) -> bool:
+        return bool(self.ttft_s or self.tokens_per_s)
+
+    def reset_counters(self) -> None:
+        self.connections = 0
+        self.requests = 0
+        self.tool_calls = 0
+        self.last_request_bytes = 0
+
+    # ----- lifecycle -----
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0),
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*pending, return_exceptions=True),
+            )
+            self._loop.close()
+
+    # ----- HTTP -----
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0"))
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+                status, content_type, payload = await self._route(
+                    method,
+                    path,
+                    body,
+                )
+                if isinstance(payload, bytes):
+                    writer.write(
+                        (
+                            f"HTTP/1.1 {status}\r\n"
+                            f"Content-Type: {content_type}\r\n"
+                            f"Content-Length: {len(payload)}\r\n"
+                            "Connection: keep-alive\r\n\r\n"
+                        ).encode()
+                        + payload,
+                    )
+                    await writer.drain()
+                    continue
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status}\r\n"
+                        f"Content-Type: {content_type}\r\n"
+                        "Transfer-Encoding: chunked\r\n"
+                        "Connection: keep-alive\r\n\r\n"
+                    ).encode(),
+                )
+                async for part in payload:
+                    writer.write(b"%x\r\n%s\r\n" % (len(part), part))
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes):
+        if method == "GET" and path.endswith("/models"):
+            data = {"object": "list", "data": [{"id": self.model}]}
+            return "200 OK", "application/json", json.dumps(data).encode()
+        if method == "POST" and path.endswith("/chat/completions"):
+            if self.latency_s:
+                await asyncio.sleep(self.latency_s)
+            self.last_request_bytes = len(body)
+            request = json.loads(body or b"{}")
+            if request.get("stream") and self.paced:
+                return "200 OK", "text/event-stream", self._paced(request)
+            if request.get("stream"):
+                return "200 OK", "text/event-stream", self._sse(request)
+            return (
+                "200 OK",
+                "application/json",
+                json.dumps(self._completion(request)).encode(),
+            )
+        return "404 Not Found", "application/json", b"{}"
+
+    @staticmethod
+    def _rounds_done(request: dict) -> int:
+        """Tool results since the last user message (this turn's loop)."""
+        rounds = 0
+        for message in request.get("messages", []):
+            if message.get("role") == "user":
+                rounds = 0
+            elif message.get("role") == "tool":
+                rounds += 1
+        return rounds
+
+    def _wants_tool_call(self, request: dict) -> bool:
+        return self._rounds_done(request) < self.tool_rounds
+
+    def _tool_call(self, request: dict) -> dict:
+        self.tool_calls += 1
+        rounds = self._rounds_done(request)
+        return {
+            "index": 0,
+            "id": f"call_{rounds}",
+            "type": "function",
+            "function": {
+                "name": self.tool_name,
+                "arguments": json.dumps({"text": f"round {rounds}"}),
+            },
+        }
+
+    def _pieces(self) -> list[str]:
+        if self.paced:
+            return re.findall(r"\S+\s*", self.reply) or [""]
+        step = max(1, len(self.reply) // self.chunks)
+        return [
+            self.reply[i : i + step] for i in range(0, len(self.reply), step)
+        ] or [""]
+
+    def _usage(self, completion_tokens: int | None = None) -> dict:
+        if completion_tokens is None:
+            completion_tokens = self.chunks
+        return {
+            "prompt_tokens": 10,
+            "completion_tokens": completion_tokens,
+            "total_tokens": 10 + completion_tokens,
+        }
+
+    def _completion(self, request: dict) -> dict:
+        message: dict = {"role": "assistant", "content": self.reply}
+        finish_reason = "stop"
+        if self._wants_tool_call(request):
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [self._tool_call(request)],
+            }
+            finish_reason = "tool_calls"
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", self.model),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": finish_reason,
+                },
+            ],
+            "usage": self._usage(),
+        }
+
+    def _events(self, request: dict) -> list[bytes]:
+        if self._wants_tool_call(request):
+            call = self._tool_call(request)
+            deltas = [{"role": "assistant", "tool_calls": [call]}]
+            finish_reason = "tool_calls"
+        else:
+            deltas = [
+                {"role": "assistant", "content": piece}
+                for piece in self._pieces()
+            ]
+            finish_reason = "stop"
+        events = []
+        for i, delta in enumerate(deltas):
+            last = i == len(deltas) - 1
+            event = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", self.model),
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": delta,
+                        "finish_reason": finish_reason if last else None,
+                    },
+                ],
+                "usage": self._usage(len(deltas)) if last else None,
+            }
+            events.append(f"data: {json.dumps(event)}\n\n".encode())
+        events.append(b"data: [DONE]\n\n")
+        return events
+
+    def _sse(self, request: dict) -> bytes:
+        return b"".join(self._events(request))
+
+    async def _paced(self, request: dict) -> AsyncIterator[bytes]:
+        """Yield SSE events at ``ttft_s`` then ``tokens_per_s``."""
+        events = self._events(request)
+        interval = 1 / self.tokens_per_s if self.tokens_per_s else 0.0
+        start = time.monotonic() + self.ttft_s
+        for i, event in enumerate(events):
+            # Sleep to absolute deadlines so pacing does not drift;
+            # [DONE] follows the last token at once.
+            tokens = min(i, len(events) - 2)
+            delay = start + tokens * interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield event
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Time-to-first-event of AgentRunner.query_handler, pool on vs off.
+
+Usage:
+    python benchmarks/bench_agent_pool.py [--requests 200]
+
+The chat model is replaced by an instant in-process fake so the numbers
+measure agent construction / checkout rather than LLM latency.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+isolated_working_dir()
+os.environ["ENABLE_MEMORY_MANAGER"] = "false"
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from agentscope.formatter import OpenAIChatFormatter  # noqa: E402
+from agentscope.message import Msg, TextBlock  # noqa: E402
+from agentscope.model import ChatModelBase, ChatResponse  # noqa: E402
+
+from copaw.agents import react_agent  # noqa: E402
+from copaw.app.runner.agent_pool import AgentPool  # noqa: E402
+from copaw.app.runner.runner import AgentRunner  # noqa: E402
+from copaw.app.runner.session import SafeJSONSession  # noqa: E402
+from copaw.constant import WORKING_DIR  # noqa: E402
+
+
+class _InstantModel(ChatModelBase):
+    """Chat model that answers immediately without any I/O."""
+
+    def __init__(self) -> None:
+        super().__init__("bench-instant", stream=False)
+
+    async def __call__(self, *args, **kwargs) -> ChatResponse:
+        return ChatResponse(content=[TextBlock(type="text", text="ok")])
+
+
+def _fake_model_and_formatter():
+    return _InstantModel(), OpenAIChatFormatter()
+
+
+async def _time_to_first_event(runner: AgentRunner, i: int) -> float:
+    request = SimpleNamespace(
+        session_id=f"bench:{i % 16}",
+        user_id="bench",
+        channel="console",
+    )
+    msgs = [Msg(name="user", role="user", content=f"hello {i}")]
+    start = time.perf_counter()
+    first = None
+    async for _msg, _last in runner.query_handler(msgs, request):
+        if first is None:
+            first = time.perf_counter() - start
+    return first if first is not None else time.perf_counter() - start
+
+
+async def _run(pool_enabled: bool, requests: int) -> list[float]:
+    runner = AgentRunner()
+    runner.session = SafeJSONSession(save_dir=str(WORKING_DIR / "sessions"))
+    runner.agent_pool = AgentPool(enabled=pool_enabled)
+    # Warm-up request so both modes pay imports/lazy init once.
+    await _time_to_first_event(runner, -1)
+    return [await _time_to_first_event(runner, i) for i in range(requests)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    react_agent.create_model_and_formatter = _fake_model_and_formatter
+    rows = {}
+    for enabled in (False, True):
+        samples = asyncio.run(_run(enabled, args.requests))
+        rows[f"pool={'on' if enabled else 'off'}"] = summarize(samples)
+    print_report("query_handler time-to-first-event", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""browser_use under concurrent sessions: action latency and browser RSS.
+
+Usage:
+    python benchmarks/bench_browser_pool.py [--sessions 20] [--rounds 5]
+        [--max-contexts 8] [--warm 2] [--max-pages 4]
+
+Serves a few static HTML pages from a temp dir over ``http.server``,
+starts one headless browser through ``browser_use`` and runs
+``--sessions`` agent sessions at once. Each session, bound with
+:func:`browser_session` as the agent does per reply, repeatedly opens
+a page, snapshots it, clicks a link, navigates and opens a second tab.
+Reports latency per action and the resident memory of the browser
+process tree (sampled after every round, needs ``psutil``), plus the
+pool's counters: with fewer ``--max-contexts`` than sessions, idle
+sessions lose their context and their next action gets a fresh one.
+
+Needs Playwright and a Chromium build (``playwright install
+chromium``).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import http.server
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+root = isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.agents.tools import browser_control  # noqa: E402
+from copaw.agents.tools.browser_control import browser_use  # noqa: E402
+from copaw.agents.tools.browser_pool import (  # noqa: E402
+    BrowserContextPool,
+    browser_session,
+)
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - optional
+    psutil = None
+
+_PAGE = """<!doctype html>
+<html><head><title>Page {n}</title></head>
+<body>
+<h1>Page {n}</h1>
+<nav><a id="next" href="/page{next}.html">Next</a></nav>
+<form><label>Name <input name="q"></label><button>Go</button></form>
+<ul>{items}</ul>
+</body></html>
+"""
+
+
+def _write_fixtures(directory: Path, count: int = 5) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for n in range(count):
+        items = "".join(f"<li>Item {n}.{i}</li>" for i in range(50))
+        (directory / f"page{n}.html").write_text(
+            _PAGE.format(n=n, next=(n + 1) % count, items=items),
+        )
+
+
+def _serve(directory: Path) -> str:
+    handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler,
+        directory=str(directory),
+    )
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _browser_rss_mb() -> float:
+    if psutil is None:
+        return 0.0
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+async def _session(
+    name: str,
+    base: str,
+    i: int,
+    samples: dict[str, list[float]],
+) -> None:
+    async def timed(action: str, **kwargs) -> None:
+        start = time.perf_counter()
+        response = await browser_use(action, **kwargs)
+        samples[action].append(time.perf_counter() - start)
+        text = response.content[0]["text"]
+        if '"ok": false' in text:
+            raise RuntimeError(f"{name} {action}: {text}")
+
+    with browser_session(name):
+        await timed("open", url=f"{base}/page{i % 5}.html")
+        await timed("snapshot")
+        await timed("click", selector="#next")
+        await timed("navigate", url=f"{base}/page{(i + 2) % 5}.html")
+        await timed(
+            "open",
+            url=f"{base}/page{(i + 3) % 5}.html",
+            page_id=f"tab{i}",
+        )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    fixtures = root / "fixtures"
+    _write_fixtures(fixtures)
+    base = _serve(fixtures)
+    browser_control.BROWSER_MAX_PAGES_PER_CONTEXT = args.max_pages
+    browser_control._pool = (  # pylint: disable=protected-access
+        BrowserContextPool(
+            max_contexts=args.max_contexts,
+            warm_spares=args.warm,
+        )
+    )
+
+    response = await browser_use("start")
+    if '"ok": false' in response.content[0]["text"]:
+        sys.exit(response.content[0]["text"])
+    baseline = _browser_rss_mb()
+    samples: dict[str, list[float]] = {
+        action: [] for action in ("open", "snapshot", "click", "navigate")
+    }
+    rss = []
+    started = time.perf_counter()
+    try:
+        for i in range(args.rounds):
+            await asyncio.gather(
+                *(
+                    _session(f"s{n}", base, i, samples)
+                    for n in range(args.sessions)
+                ),
+            )
+            rss.append(_browser_rss_mb())
+        elapsed = time.perf_counter() - started
+        stats = browser_control._pool.stats()  # pylint: disable=W0212
+    finally:
+        await browser_use("stop")
+
+    print(
+        f"{args.sessions} sessions x {args.rounds} rounds in {elapsed:.1f}s; "
+        f"max_contexts={args.max_contexts} warm={args.warm} "
+        f"max_pages={args.max_pages}; pool {stats}",
+    )
+    print_report(
+        "browser_use latency per action",
+        {action: summarize(values) for action, values in samples.items()},
+    )
+    if psutil is not None:
+        print(
+            f"browser RSS: idle {baseline:.0f} MB, "
+            f"peak {max(rss):.0f} MB, final {rss[-1]:.0f} MB",
+        )
+    else:
+        print("browser RSS: install psutil to measure")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-contexts", type=int, default=8)
+    parser.add_argument("--warm", type=int, default=2)
+    parser.add_argument("--max-pages", type=int, default=4)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
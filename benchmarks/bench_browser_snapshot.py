@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""browser_use snapshot size per step: full tree vs diff.
+
+Usage:
+    python benchmarks/bench_browser_snapshot.py [--products 200]
+        [--fields 40]
+
+Writes two fixture pages to a temp dir (a product listing with a cart
+and "load more", a long form that reveals fields and shows validation
+errors) and drives each through the usual agent loop: act (click or
+type), then snapshot. After every step it takes a diff snapshot
+(``snapshot_mode="diff"``, against the previous one) and, for
+comparison, a full one, and reports bytes and tokens per step of each
+tool result plus the snapshot latency.
+
+Needs Playwright and a Chromium build (``playwright install
+chromium``).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+root = isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.agents.tools.browser_control import browser_use  # noqa: E402
+from copaw.agents.utils import safe_count_str_tokens  # noqa: E402
+
+_SHOP = """<!doctype html>
+<html><head><title>Shop</title></head>
+<body>
+<header>
+  <h1>Shop</h1>
+  <nav><a href="#home">Home</a> <a href="#deals">Deals</a>
+  <a href="#account">Account</a></nav>
+  <input id="q" aria-label="Search products">
+  <p role="status" id="cart">Cart: 0 items</p>
+</header>
+<main>
+  <ul id="items"></ul>
+  <button id="more">Load more</button>
+</main>
+<script>
+let shown = 0, cart = 0;
+function load(count) {
+  const list = document.getElementById("items");
+  for (let i = 0; i < count; i++, shown++) {
+    const li = document.createElement("li");
+    li.innerHTML = `<h2>Product ${shown}</h2>
+      <p>${(shown * 7.3 % 100).toFixed(2)} EUR, ships in ${shown % 5} days</p>
+      <a href="#p${shown}">Details of product ${shown}</a>
+      <button id="add-${shown}">Add product ${shown} to cart</button>`;
+    list.appendChild(li);
+  }
+}
+document.addEventListener("click", (e) => {
+  const t = e.target;
+  if (t.id === "more") load(20);
+  if (t.id && t.id.startsWith("add-")) {
+    t.textContent = "In cart";
+    t.disabled = true;
+    document.getElementById("cart").textContent = `Cart: ${++cart} items`;
+  }
+});
+load(__PRODUCTS__);
+</script>
+</body></html>
+"""
+
+_FORM = """<!doctype html>
+<html><head><title>Sign up</title></head>
+<body>
+<h1>Sign up</h1>
+<div id="errors" role="alert"></div>
+<form id="form" onsubmit="return false">
+  <fieldset id="fields"><legend>Details</legend></fieldset>
+  <label><input type="checkbox" id="subscribe"> Subscribe</label>
+  <fieldset id="extra" hidden><legend>Newsletter</legend>
+    <label>Topics <input id="topics"></label>
+    <label>Frequency <select id="freq"><option>Daily</option>
+      <option>Weekly</option></select></label>
+  </fieldset>
+  <button id="submit">Create account</button>
+</form>
+<script>
+const fields = document.getElementById("fields");
+for (let i = 0; i < __FIELDS__; i++) {
+  fields.insertAdjacentHTML("beforeend",
+    `<p><label>Field ${i} <input id="f${i}" required></label></p>`);
+}
+document.getElementById("subscribe").onchange = (e) => {
+  document.getElementById("extra").hidden = !e.target.checked;
+};
+document.getElementById("submit").onclick = () => {
+  const missing = [...fields.querySelectorAll("input")]
+    .filter((el) => !el.value).slice(0, 5);
+  document.getElementById("errors").innerHTML = missing
+    .map((el) => `<p>${el.parentNode.textContent.trim()} is required</p>`)
+    .join("");
+};
+</script>
+</body></html>
+"""
+
+_STEPS = {
+    "shop.html": [
+        ("type", {"selector": "#q", "text": "lamp"}),
+        ("click", {"selector": "#add-3"}),
+        ("click", {"selector": "#add-10"}),
+        ("click", {"selector": "#more"}),
+        ("click", {"selector": "#add-42"}),
+        ("click", {"selector": "#add-0"}),
+    ],
+    "form.html": [
+        ("type", {"selector": "#f0", "text": "Ada"}),
+        ("type", {"selector": "#f1", "text": "ada@example.com"}),
+        ("click", {"selector": "#subscribe"}),
+        ("type", {"selector": "#topics", "text": "python, browsers"}),
+        ("click", {"selector": "#submit"}),
+        ("type", {"selector": "#f2", "text": "Lovelace"}),
+        ("click", {"selector": "#submit"}),
+    ],
+}
+
+
+def _write_fixtures(directory: Path, products: int, fields: int) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "shop.html").write_text(
+        _SHOP.replace("__PRODUCTS__", str(products)),
+    )
+    (directory / "form.html").write_text(
+        _FORM.replace("__FIELDS__", str(fields)),
+    )
+
+
+async def _call(action: str, **kwargs) -> tuple[str, float]:
+    start = time.perf_counter()
+    response = await browser_use(action, **kwargs)
+    elapsed = time.perf_counter() - start
+    text = response.content[0]["text"]
+    if not json.loads(text).get("ok"):
+        raise RuntimeError(f"{action} {kwargs}: {text}")
+    return text, elapsed
+
+
+async def _run(args: argparse.Namespace) -> None:
+    fixtures = root / "fixtures"
+    _write_fixtures(fixtures, args.products, args.fields)
+    response = await browser_use("start")
+    if '"ok": false' in response.content[0]["text"]:
+        sys.exit(response.content[0]["text"])
+
+    sizes: dict[str, dict[str, list[int]]] = {}
+    latency: dict[str, list[float]] = {"full": [], "diff": []}
+    fallbacks = 0
+    try:
+        for page, steps in _STEPS.items():
+            url = (fixtures / page).as_uri()
+            await _call("open", url=url, page_id=page)
+            await _call("snapshot", page_id=page)
+            rows = sizes[page] = {
+                "full_bytes": [],
+                "full_tokens": [],
+                "diff_bytes": [],
+                "diff_tokens": [],
+            }
+            for action, kwargs in steps:
+                await _call(action, page_id=page, **kwargs)
+                diff, diff_s = await _call(
+                    "snapshot",
+                    page_id=page,
+                    snapshot_mode="diff",
+                )
+                full, full_s = await _call(
+                    "snapshot",
+                    page_id=page,
+                    snapshot_mode="full",
+                )
+                fallbacks += '"mode": "diff"' not in diff
+                latency["diff"].append(diff_s)
+                latency["full"].append(full_s)
+                for mode, text in (("full", full), ("diff", diff)):
+                    rows[f"{mode}_bytes"].append(len(text.encode("utf-8")))
+                    rows[f"{mode}_tokens"].append(safe_count_str_tokens(text))
+    finally:
+        await browser_use("stop")
+
+    steps = sum(len(s) for s in _STEPS.values())
+    print(
+        f"{steps} steps on {len(_STEPS)} pages "
+        f"({args.products} products, {args.fields} form fields); "
+        f"{fallbacks} diff snapshots fell back to the full tree",
+    )
+    print_report(
+        "snapshot tool result per step (mean)",
+        {
+            f"{page} {mode}": {
+                "bytes": statistics.fmean(rows[f"{mode}_bytes"]),
+                "tokens": statistics.fmean(rows[f"{mode}_tokens"]),
+            }
+            for page, rows in sizes.items()
+            for mode in ("full", "diff")
+        },
+    )
+    print_report(
+        "snapshot latency",
+        {mode: summarize(values) for mode, values in latency.items()},
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--fields", type=int, default=40)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
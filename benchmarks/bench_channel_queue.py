@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Channel queue dequeue cost: drain-and-requeue vs KeyedQueue.
+
+Usage:
+    python benchmarks/bench_channel_queue.py [--messages 10000] [--keys 1000]
+
+Queues ``--messages`` payloads spread over ``--keys`` sessions and
+measures taking same-session batches until the queue is empty, both
+with everything queued up front and with bursty interleaved arrivals.
+"drain" is the previous ChannelManager algorithm (pop the whole
+asyncio.Queue, keep one key, re-enqueue the rest). The batch sequence
+of both implementations is checked to be identical.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    print_report,
+)
+
+# pylint: disable=wrong-import-position
+from copaw.app.channels.keyed_queue import KeyedQueue  # noqa: E402
+
+
+class _DrainQueue:
+    """The pre-KeyedQueue algorithm, kept here as the reference."""
+
+    def __init__(self) -> None:
+        self._q: asyncio.Queue = asyncio.Queue()
+
+    def put_nowait(self, key: str, item: Any) -> None:
+        self._q.put_nowait((key, item))
+
+    def get_batch_nowait(self) -> tuple[str, List[Any]]:
+        key, first = self._q.get_nowait()
+        batch = [first]
+        put_back = []
+        while True:
+            try:
+                p = self._q.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if p[0] == key:
+                batch.append(p[1])
+            else:
+                put_back.append(p)
+        for p in put_back:
+            self._q.put_nowait(p)
+        return key, batch
+
+
+def _arrivals(messages: int, keys: int) -> list[tuple[str, int]]:
+    rng = random.Random(0)
+    # Skewed like group chats: a few busy sessions, a long tail.
+    weights = [1.0 / (i + 1) for i in range(keys)]
+    picks = rng.choices(range(keys), weights=weights, k=messages)
+    return [(f"session-{k}", seq) for seq, k in enumerate(picks)]
+
+
+def _run(queue, arrivals, burst: int, gets_per_burst: int):
+    batches = []
+    start = time.perf_counter()
+    for i in range(0, len(arrivals), burst):
+        for key, seq in arrivals[i : i + burst]:
+            queue.put_nowait(key, seq)
+        for _ in range(gets_per_burst):
+            try:
+                batches.append(queue.get_batch_nowait())
+            except asyncio.QueueEmpty:
+                break
+    while True:
+        try:
+            batches.append(queue.get_batch_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return time.perf_counter() - start, batches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--keys", type=int, default=1_000)
+    args = parser.parse_args()
+
+    arrivals = _arrivals(args.messages, args.keys)
+    scenarios = {
+        "all queued": (len(arrivals), 0),
+        "bursty": (100, 20),
+    }
+    rows = {}
+    for name, (burst, gets) in scenarios.items():
+        drain_s, drain_batches = _run(_DrainQueue(), arrivals, burst, gets)
+        keyed_s, keyed_batches = _run(KeyedQueue(), arrivals, burst, gets)
+        assert keyed_batches == drain_batches, f"{name}: ordering differs"
+        rows[f"drain {name}"] = {
+            "batches": len(drain_batches),
+            "total_ms": drain_s * 1000,
+        }
+        rows[f"keyed {name}"] = {
+            "batches": len(keyed_batches),
+            "total_ms": keyed_s * 1000,
+        }
+    print_report(
+        f"{args.messages} messages over {args.keys} keys "
+        "(batch order identical)",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
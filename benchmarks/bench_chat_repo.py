@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""ChatManager throughput on JsonChatRepository vs IndexedChatRepository.
+
+Usage:
+    python benchmarks/bench_chat_repo.py [--sizes 10000 100000] [--ops 200]
+
+For each repository size, pre-populates chats.json, then measures
+get_or_create_chat (existing chat, the per-message hot path),
+update_chat and get_chat latencies, plus concurrent get_or_create
+throughput.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+ROOT = isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.app.runner.manager import ChatManager  # noqa: E402
+from copaw.app.runner.models import ChatSpec, ChatsFile  # noqa: E402
+from copaw.app.runner.repo import (  # noqa: E402
+    IndexedChatRepository,
+    JsonChatRepository,
+)
+
+
+def _specs(n: int) -> list[ChatSpec]:
+    return [
+        ChatSpec(
+            session_id=f"console:user{i}",
+            user_id=f"user{i}",
+            channel="console",
+            name=f"chat {i}",
+        )
+        for i in range(n)
+    ]
+
+
+async def _measure(repo_cls, size: int, ops: int) -> dict:
+    path = ROOT / f"{repo_cls.__name__}-{size}" / "chats.json"
+    specs = _specs(size)
+    await JsonChatRepository(path).save(ChatsFile(chats=specs))
+
+    manager = ChatManager(repo=repo_cls(path))
+    await manager.get_chat(specs[0].id)  # load outside the timings
+
+    rng = random.Random(0)
+    picks = [rng.choice(specs) for _ in range(ops)]
+    rows = {}
+
+    samples = []
+    for spec in picks:
+        start = time.perf_counter()
+        await manager.get_or_create_chat(
+            spec.session_id,
+            spec.user_id,
+            spec.channel,
+        )
+        samples.append(time.perf_counter() - start)
+    rows["get_or_create"] = summarize(samples)
+
+    samples = []
+    for spec in picks:
+        chat = await manager.get_chat(spec.id)
+        start = time.perf_counter()
+        await manager.update_chat(chat)
+        samples.append(time.perf_counter() - start)
+    rows["update_chat"] = summarize(samples)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            manager.get_or_create_chat(s.session_id, s.user_id, s.channel)
+            for s in picks
+        ),
+    )
+    elapsed = time.perf_counter() - start
+    rows["concurrent"] = {"ops_per_s": ops / elapsed if elapsed else 0.0}
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+    )
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        for repo_cls in (JsonChatRepository, IndexedChatRepository):
+            # The whole-file repo is O(n) per call; keep its run short.
+            ops = args.ops if repo_cls is IndexedChatRepository else 20
+            rows = asyncio.run(_measure(repo_cls, size, ops))
+            print_report(f"{repo_cls.__name__} chats={size}", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Per-request config cost: load_config() vs get_config_snapshot().
+
+Usage:
+    python benchmarks/bench_config_cache.py [--requests 2000] [--calls 8]
+
+One agent request reads the config several times (runner, toolkit,
+hooks, compaction hook, tool guard, ...). ``--calls`` is how many reads
+a request makes.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.config import (  # noqa: E402
+    Config,
+    get_config_snapshot,
+    load_config,
+    save_config,
+)
+
+
+def _per_request(read, requests: int, calls: int) -> list[float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        for _ in range(calls):
+            read()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=8)
+    args = parser.parse_args()
+
+    save_config(Config())
+    rows = {
+        "load_config": summarize(
+            _per_request(load_config, args.requests, args.calls),
+        ),
+        "get_config_snapshot": summarize(
+            _per_request(get_config_snapshot, args.requests, args.calls),
+        ),
+    }
+    print_report(f"config reads, {args.calls} per request", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+"""End-to-end message benchmarks against fake LLM, channel and MCP.
+
+Usage:
+    python benchmarks/bench_e2e.py [--scenarios latency,throughput,...]
+        [--json results.json] [--baseline old.json]
+        [--ttft 0.2] [--tokens-per-s 50] [--reply-words 40]
+
+Runs the real stack the app lifespan builds (``AgentRunner`` with its
+session store, ``ChannelManager`` queues and workers, ``MCPClientManager``)
+with every external party replaced by a deterministic stand-in:
+
+* the model is ``_fake_openai.FakeOpenAIServer`` behind a custom
+  OpenAI-compatible provider, streaming ``--reply-words`` words after
+  ``--ttft`` seconds at ``--tokens-per-s``;
+* messages come from ``_fake_channel.FakeChannel``, injected through
+  ``ChannelManager.enqueue``; replies are recorded, not sent;
+* tools are served by ``_fake_mcp_server.py`` over stdio.
+
+Scenarios:
+
+* ``latency``: sequential messages; enqueue to first reply and to done,
+  and the overhead on top of the scripted model time.
+* ``throughput``: ``--channels`` channels, each flooded with
+  ``--messages`` messages from ``--users`` senders at once.
+* ``tool_loop``: each reply takes ``--tool-rounds`` MCP tool calls.
+* ``session_growth``: ``--turns`` turns in one session; latency, prompt
+  size and session store size as history grows.
+* ``cold_start``: ``--cold-runs`` fresh processes, each timed from
+  spawn to its first answered message.
+
+``--json`` writes the results with commit and host metadata;
+``--baseline`` prints the change of every latency and rate against an
+earlier ``--json`` file.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+_T0 = time.perf_counter()
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position
+from _common import (  # noqa: E402
+    isolated_working_dir,
+    print_report,
+    summarize,
+    write_json,
+)
+from _fake_openai import FakeOpenAIServer  # noqa: E402
+
+isolated_working_dir()
+os.environ["ENABLE_MEMORY_MANAGER"] = "false"
+os.environ.setdefault("COPAW_LOG_LEVEL", "warning")
+# Runner start loads a tokenizer for the memory manager; keep that off
+# the network so results do not depend on connectivity.
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+# pylint: disable=wrong-import-order
+from _fake_channel import FakeChannel  # noqa: E402
+import copaw.providers.provider_manager as pm_module  # noqa: E402
+from copaw.app.channels.manager import ChannelManager  # noqa: E402
+from copaw.app.mcp.manager import MCPClientManager  # noqa: E402
+from copaw.app.runner.runner import AgentRunner  # noqa: E402
+from copaw.config.config import MCPClientConfig, MCPConfig  # noqa: E402
+from copaw.constant import WORKING_DIR  # noqa: E402
+from copaw.providers.provider import ProviderInfo  # noqa: E402
+from copaw.providers.provider_manager import ProviderManager  # noqa: E402
+
+_IMPORTED = time.perf_counter()
+
+_MCP_SERVER = str(Path(__file__).resolve().parent / "_fake_mcp_server.py")
+_SCENARIOS = (
+    "latency",
+    "throughput",
+    "tool_loop",
+    "session_growth",
+    "cold_start",
+)
+
+
+def _reply(words: int) -> str:
+    return " ".join(f"word{i}" for i in range(words))
+
+
+def _model_s(args: argparse.Namespace, calls: int = 1) -> float:
+    """Scripted model time of one text reply after *calls* - 1 tool calls."""
+    stream = (args.reply_words - 1) / args.tokens_per_s
+    return calls * args.ttft + stream
+
+
+def _store_bytes() -> int:
+    return sum(
+        p.stat().st_size
+        for p in Path(WORKING_DIR).glob("sessions*")
+        if p.is_file()
+    ) + sum(
+        p.stat().st_size
+        for p in Path(WORKING_DIR).glob("sessions/**/*")
+        if p.is_file()
+    )
+
+
+async def _setup_provider(base_url: str) -> None:
+    manager = ProviderManager.get_instance()
+    info = await manager.add_custom_provider(
+        ProviderInfo(
+            id="bench",
+            name="Bench",
+            base_url=base_url,
+            api_key="sk-bench",
+        ),
+    )
+    await manager.add_model_to_provider(
+        info.id,
+        pm_module.ModelInfo(id="fake-model", name="fake-model"),
+    )
+    await manager.activate_model(info.id, "fake-model")
+
+
+class _Stack:
+    """Runner, channels and optional MCP wired like the app lifespan."""
+
+    def __init__(self, channels: int = 1, mcp: bool = False) -> None:
+        self.runner = AgentRunner()
+        self.mcp = MCPClientManager() if mcp else None
+        self.channels = [
+            FakeChannel(self.runner.stream_query, f"bench-{i}")
+            for i in range(channels)
+        ]
+        self.manager = ChannelManager(self.channels)
+
+    async def __aenter__(self) -> "_Stack":
+        await self.runner.start()
+        if self.mcp is not None:
+            self.mcp.start_from_config(
+                MCPConfig(
+                    clients={
+                        "fake": MCPClientConfig(
+                            name="fake",
+                            command=sys.executable,
+                            args=[_MCP_SERVER],
+                        ),
+                    },
+                ),
+            )
+            await self.mcp.wait_ready()
+            if not await self.mcp.get_clients():
+                raise RuntimeError("fake MCP server did not start")
+            self.runner.set_mcp_manager(self.mcp)
+        await self.manager.start_all()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.manager.stop_all()
+        if self.mcp is not None:
+            await self.mcp.close_all()
+        await self.runner.stop()
+
+    async def ask(self, sender_id: str, text: str, channel: int = 0):
+        """Inject one message and wait for its reply; return its timeline."""
+        ch = self.channels[channel]
+        msg_id = ch.inject(self.manager, sender_id, text)
+        await ch.wait_idle()
+        return ch.deliveries[msg_id]
+
+
+def _timeline_rows(deliveries, model_s: float) -> dict:
+    first = [d.first_reply - d.enqueued for d in deliveries if d.first_reply]
+    done = [d.done - d.enqueued for d in deliveries]
+    return {
+        "first_reply": summarize(first),
+        "done": summarize(done),
+        "overhead": summarize([max(0.0, s - model_s) for s in done]),
+    }
+
+
+async def _latency(args, server: FakeOpenAIServer) -> dict:
+    async with _Stack() as stack:
+        await stack.ask("warmup", "hello")
+        deliveries = [
+            await stack.ask(f"latency-{i % args.users}", f"message {i}")
+            for i in range(args.messages)
+        ]
+    rows = _timeline_rows(deliveries, _model_s(args))
+    rows["model"] = {"scripted_ms": _model_s(args) * 1000}
+    rows["server"] = {"requests": server.requests}
+    return rows
+
+
+async def _throughput(args, server: FakeOpenAIServer) -> dict:
+    async with _Stack(channels=args.channels) as stack:
+        for ch in stack.channels:
+            await stack.ask("warmup", "hello", stack.channels.index(ch))
+            ch.deliveries.clear()
+            ch.turns = 0
+        server.reset_counters()
+        start = time.monotonic()
+        for i in range(args.messages):
+            for ch in stack.channels:
+                ch.inject(stack.manager, f"flood-{i % args.users}", f"m{i}")
+        await asyncio.gather(*(ch.wait_idle() for ch in stack.channels))
+        elapsed = time.monotonic() - start
+
+    rows = {}
+    for ch in stack.channels:
+        ends = [d.done for d in ch.deliveries.values()]
+        span = max(ends) - start
+        rows[ch.channel] = {
+            "messages": len(ch.deliveries),
+            "turns": ch.turns,
+            "msgs_per_s": len(ch.deliveries) / span,
+            "done_p50_ms": summarize(
+                [d.done - d.enqueued for d in ch.deliveries.values()],
+            )["p50_ms"],
+        }
+    total = sum(len(ch.deliveries) for ch in stack.channels)
+    rows["all"] = {
+        "messages": total,
+        "turns": sum(ch.turns for ch in stack.channels),
+        "msgs_per_s": total / elapsed,
+        "llm_requests": server.requests,
+    }
+    return rows
+
+
+async def _tool_loop(args, server: FakeOpenAIServer) -> dict:
+    server.tool_rounds = args.tool_rounds
+    try:
+        async with _Stack(mcp=True) as stack:
+            await stack.ask("warmup", "hello")
+            server.reset_counters()
+            deliveries = [
+                await stack.ask(f"tools-{i % args.users}", f"use tools {i}")
+                for i in range(args.messages)
+            ]
+    finally:
+        server.tool_rounds = 0
+    model_s = _model_s(args, args.tool_rounds + 1)
+    rows = _timeline_rows(deliveries, model_s)
+    per_round = [
+        max(0.0, d.done - d.enqueued - _model_s(args)) / args.tool_rounds
+        for d in deliveries
+    ]
+    rows["per_tool_round"] = summarize(per_round)
+    rows["server"] = {
+        "tool_calls": server.tool_calls,
+        "expected": args.tool_rounds * args.messages,
+        "requests": server.requests,
+    }
+    return rows
+
+
+async def _session_growth(args, server: FakeOpenAIServer) -> dict:
+    done, prompt_bytes, store_bytes = [], [], []
+    async with _Stack() as stack:
+        await stack.ask("warmup", "hello")
+        base = _store_bytes()
+        for i in range(args.turns):
+            delivery = await stack.ask("growth", f"turn {i}")
+            done.append(delivery.done - delivery.enqueued)
+            prompt_bytes.append(server.last_request_bytes)
+            store_bytes.append(_store_bytes() - base)
+
+    tenth = max(1, args.turns // 10)
+    rows = {}
+    for name, window in (
+        ("first 10%", slice(0, tenth)),
+        ("last 10%", slice(-tenth, None)),
+    ):
+        rows[name] = {
+            **summarize(done[window]),
+            "prompt_bytes": statistics.fmean(prompt_bytes[window]),
+        }
+    rows["store"] = {
+        "turns": args.turns,
+        "bytes": store_bytes[-1],
+        "bytes_per_turn": store_bytes[-1] / args.turns,
+        "latency_growth_ms_per_turn": (
+            (statistics.fmean(done[-tenth:]) - statistics.fmean(done[:tenth]))
+            / max(1, args.turns - tenth)
+            * 1000
+        ),
+    }
+    return rows
+
+
+async def _cold_start_child(base_url: str) -> dict:
+    imported = _IMPORTED - _T0
+    start = time.perf_counter()
+    await _setup_provider(base_url)
+    async with _Stack() as stack:
+        ready = time.perf_counter()
+        delivery = await stack.ask("cold", "hello")
+    return {
+        "import_ms": imported * 1000,
+        "stack_start_ms": (ready - start) * 1000,
+        "first_message_ms": (delivery.done - delivery.enqueued) * 1000,
+    }
+
+
+def _cold_start(args, server: FakeOpenAIServer) -> dict:
+    runs = []
+    for _ in range(args.cold_runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, __file__, "--cold-child", server.base_url],
+            capture_output=True,
+            text=True,
+            timeout=300,
+            check=True,
+        )
+        wall = time.perf_counter() - start
+        child = json.loads(proc.stdout.strip().splitlines()[-1])
+        runs.append({**child, "process_ms": wall * 1000})
+    return {
+        key: {
+            "mean_ms": statistics.fmean(run[key] for run in runs),
+            "min_ms": min(run[key] for run in runs),
+        }
+        for key in runs[0]
+    }
+
+
+def _print_baseline(results: dict, config: dict, path: str) -> None:
+    """Print the relative change of every *_ms and *_per_s value."""
+    old = json.loads(Path(path).read_text(encoding="utf-8"))
+    print(f"== change vs {path} ({(old['meta'].get('commit') or '?')[:12]})")
+    differs = sorted(
+        key
+        for key, value in config.items()
+        if key not in ("json", "baseline", "scenarios")
+        and old["config"].get(key) != value
+    )
+    if differs:
+        print(f"  note: run config differs in {', '.join(differs)}")
+    for scenario, rows in results.items():
+        for row, stats in rows.items():
+            before = old["results"].get(scenario, {}).get(row, {})
+            for key, value in stats.items():
+                if key not in before or not before[key]:
+                    continue
+                if not (key.endswith("_ms") or key.endswith("_per_s")):
+                    continue
+                change = (value - before[key]) / before[key] * 100
+                name = f"{scenario}/{row}/{key}"
+                print(
+                    f"  {name:<40} "
+                    f"{before[key]:10.3f} -> {value:10.3f}  {change:+6.1f}%",
+                )
+
+
+async def _run_async(args, server: FakeOpenAIServer, names) -> dict:
+    await _setup_provider(server.base_url)
+    results = {}
+    for name in names:
+        server.reset_counters()
+        results[name] = await globals()[f"_{name}"](args, server)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--scenarios", default=",".join(_SCENARIOS))
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier --json file")
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--tokens-per-s", type=float, default=50.0)
+    parser.add_argument("--reply-words", type=int, default=40)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--tool-rounds", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--cold-child", metavar="BASE_URL", help="internal")
+    args = parser.parse_args()
+
+    if args.cold_child:
+        print(json.dumps(asyncio.run(_cold_start_child(args.cold_child))))
+        return
+
+    names = [n for n in args.scenarios.split(",") if n]
+    unknown = set(names) - set(_SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with FakeOpenAIServer(
+        reply=_reply(args.reply_words),
+        ttft_s=args.ttft,
+        tokens_per_s=args.tokens_per_s,
+    ) as server:
+        results = asyncio.run(
+            _run_async(args, server, [n for n in names if n != "cold_start"]),
+        )
+        if "cold_start" in names:
+            server.reset_counters()
+            results["cold_start"] = _cold_start(args, server)
+
+    for name in names:
+        print_report(name, results[name])
+    if args.json:
+        write_json(args.json, results, **vars(args))
+    if args.baseline:
+        _print_baseline(results, vars(args), args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""grep_search / glob_search on a generated tree: full scan vs index.
+
+Usage:
+    python benchmarks/bench_grep_search.py [--files 200000]
+        [--per-dir 100] [--queries 5]
+
+Generates ``--files`` small source-like files (~0.6 KB), a handful of
+which contain rare identifiers, then times:
+
+* "scan": the previous implementation (``rglob``, sort, read and split
+  every text file until 200 matches), run inline;
+* "index cold": the first indexed grep, which walks the tree and scans
+  every file (signatures are not built yet);
+* "index signing": the background signature build that follows;
+* "index warm": later greps for other rare identifiers (stat walk,
+  signature filter, scan of the few candidates);
+* a common word, where both stop early at 200 matches;
+* ``**/*.py`` globs through :meth:`Path.glob` and through the index.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+_ROOT = isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.agents.tools import file_search  # noqa: E402
+from copaw.agents.tools.search_index import get_search_index  # noqa: E402
+
+_WORDS = (
+    "value result config handler request session agent model token "
+    "buffer stream channel message client server index cache update"
+).split()
+
+
+def _generate(root: Path, files: int, per_dir: int, needles: int) -> list:
+    rng = random.Random(7)
+    needle_names = [f"needle_{i:04d}_marker" for i in range(needles)]
+    needle_at = dict(
+        zip(rng.sample(range(files), needles), needle_names),
+    )
+    for i in range(files):
+        directory = root / f"d{i // per_dir // 100:03d}" / f"s{i // per_dir}"
+        if i % per_dir == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        lines = [f"# module {i}"]
+        for j in range(20):
+            a, b = rng.choice(_WORDS), rng.choice(_WORDS)
+            lines.append(f"def {a}_{j}({b}): return {b}.{a}({j})")
+        if i in needle_at:
+            lines.append(f"{needle_at[i]} = True")
+        suffix = ".py" if i % 3 else ".txt"
+        (directory / f"f{i}{suffix}").write_text("\n".join(lines) + "\n")
+    return needle_names
+
+
+def _scan_grep(root: Path, pattern: str) -> int:
+    """The previous grep_search loop, minus formatting."""
+    regex = re.compile(re.escape(pattern))
+    files = sorted(
+        f
+        for f in root.rglob("*")
+        if f.is_file() and f.stat().st_size <= 2 * 1024 * 1024
+    )
+    matches = 0
+    for file_path in files:
+        lines = file_path.read_text(
+            encoding="utf-8",
+            errors="ignore",
+        ).splitlines()
+        for line in lines:
+            if regex.search(line):
+                matches += 1
+                if matches > 200:
+                    return matches
+    return matches
+
+
+def _time(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def _grep(root: Path, pattern: str) -> None:
+    asyncio.run(file_search.grep_search(pattern, str(root)))
+
+
+def _wait_signed(root: Path) -> None:
+    get_search_index(root)[0].wait_signed()
+
+
+def _glob(root: Path, pattern: str) -> None:
+    asyncio.run(file_search.glob_search(pattern, str(root)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=200_000)
+    parser.add_argument("--per-dir", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+
+    tree = _ROOT / "tree"
+    start = time.perf_counter()
+    needles = _generate(tree, args.files, args.per_dir, args.queries + 1)
+    elapsed = time.perf_counter() - start
+    print(f"generated {args.files} files in {elapsed:.1f}s")
+
+    rows = {
+        "scan rare": summarize(
+            [_time(_scan_grep, tree, n) for n in needles[1:2]],
+        ),
+        "index cold rare": summarize([_time(_grep, tree, needles[0])]),
+        "index signing": summarize([_time(_wait_signed, tree)]),
+        "index warm rare": summarize(
+            [_time(_grep, tree, n) for n in needles[1:]],
+        ),
+        "scan common": summarize([_time(_scan_grep, tree, "handler")]),
+        "index common": summarize([_time(_grep, tree, "handler")]),
+        "pathlib **/*.py": summarize(
+            [_time(lambda: sorted(tree.glob("**/*.py")))],
+        ),
+        "index **/*.py": summarize(
+            [_time(_glob, tree, "**/*.py") for _ in range(args.queries)],
+        ),
+    }
+    print_report(f"grep/glob over {args.files} files", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Time-to-first-token per conversation turn, prefix cache on vs off.
+
+Usage:
+    python benchmarks/bench_llamacpp_prefix_cache.py --model tiny.gguf
+        [--turns 8] [--sessions 2] [--system-kb 16] [--cache-mb 1024]
+
+Needs llama-cpp-python and a small GGUF model (e.g. a Qwen2.5-0.5B
+Q4 quant). ``--sessions`` conversations are interleaved turn by turn,
+as concurrent chats are, so llama.cpp's own reuse of the previous
+prompt does not apply. Each turn streams one token; the time to that
+token is reported for turns 2..N ("turn N" is the last).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.local_models.backends.llamacpp_backend import (  # noqa: E402
+    LlamaCppBackend,
+)
+
+
+def _system_prompt(kb: int) -> str:
+    line = "- Answer concisely and cite the files you changed.\n"
+    return "You are a helpful assistant.\n" + line * (kb * 1024 // len(line))
+
+
+def _run(args: argparse.Namespace, cache_mb: int) -> dict[str, list[float]]:
+    backend = LlamaCppBackend(
+        model_path=args.model,
+        n_ctx=args.n_ctx,
+        n_gpu_layers=0,
+        prefix_cache_mb=cache_mb,
+    )
+    system = _system_prompt(args.system_kb)
+    histories = [
+        [
+            {"role": "system", "content": system},
+            {"role": "user", "content": f"Session {s}: summarize the rules."},
+        ]
+        for s in range(args.sessions)
+    ]
+    later, last = [], []
+    for turn in range(1, args.turns + 1):
+        for history in histories:
+            start = time.perf_counter()
+            chunks = backend.chat_completion_stream(
+                history,
+                max_tokens=args.reply_tokens,
+                temperature=0.0,
+            )
+            reply = ""
+            ttft = None
+            for chunk in chunks:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                delta = chunk["choices"][0].get("delta", {})
+                reply += delta.get("content") or ""
+            if turn > 1:
+                later.append(ttft)
+            if turn == args.turns:
+                last.append(ttft)
+            history.append({"role": "assistant", "content": reply})
+            history.append(
+                {"role": "user", "content": f"Turn {turn + 1}: go on."},
+            )
+    backend.unload()
+    return {"turns 2..N": later, "turn N": last}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=2)
+    parser.add_argument("--system-kb", type=int, default=16)
+    parser.add_argument("--reply-tokens", type=int, default=32)
+    parser.add_argument("--n-ctx", type=int, default=16384)
+    parser.add_argument("--cache-mb", type=int, default=1024)
+    args = parser.parse_args()
+
+    rows = {}
+    for label, cache_mb in (("off", 0), ("on", args.cache_mb)):
+        for name, samples in _run(args, cache_mb).items():
+            rows[f"{label} {name}"] = summarize(samples)
+    print_report(
+        f"TTFT, {args.sessions} interleaved sessions x {args.turns} turns",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
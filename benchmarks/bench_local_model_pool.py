@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Alternating requests across two local models: one vs many resident.
+
+Usage:
+    python benchmarks/bench_local_model_pool.py [--requests 40]
+        [--load-ms 200]
+
+Backends are fakes whose load sleeps ``--load-ms`` (real GGUF loads take
+seconds). "single" is a 0 budget, which keeps one model resident like
+the old factory; "pool" has room for both models.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.local_models import factory  # noqa: E402
+from copaw.local_models.backends.base import LocalBackend  # noqa: E402
+from copaw.local_models.schema import (  # noqa: E402
+    BackendType,
+    LocalModelInfo,
+)
+
+_MODELS = ("chat-small", "coder")
+
+
+class _SlowLoadBackend(LocalBackend):
+    load_seconds = 0.2
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, model_path: str, **kwargs: Any) -> None:
+        time.sleep(self.load_seconds)
+        self._loaded = True
+
+    def chat_completion(self, messages, **kwargs: Any) -> dict:
+        return {"choices": []}
+
+    def chat_completion_stream(self, messages, **kwargs: Any):
+        yield {"choices": []}
+
+    def unload(self) -> None:
+        self._loaded = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+
+def _run(budget_bytes: int, requests: int) -> list[float]:
+    pool = factory.ResidentModelPool(lambda: budget_bytes)
+    samples = []
+    for i in range(requests):
+        backend = factory._PooledBackend(  # pylint: disable=protected-access
+            "",
+            pool=pool,
+            model_id=_MODELS[i % len(_MODELS)],
+        )
+        start = time.perf_counter()
+        backend.chat_completion([])
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--load-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    _SlowLoadBackend.load_seconds = args.load_ms / 1000
+    infos = {
+        name: LocalModelInfo(
+            id=name,
+            repo_id="bench",
+            filename=name,
+            backend=BackendType.LLAMACPP,
+            file_size=1024,
+            local_path=f"/nonexistent/{name}",
+        )
+        for name in _MODELS
+    }
+    factory.get_local_model = infos.get
+    factory._create_backend = (  # pylint: disable=protected-access
+        lambda info, kwargs: _SlowLoadBackend(info.local_path)
+    )
+
+    rows = {
+        "single": summarize(_run(0, args.requests)),
+        "pool": summarize(_run(4096, args.requests)),
+    }
+    print_report(f"alternating 2 models, load {args.load_ms:.0f} ms", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""MCP startup: sequential connects vs background, concurrent connects.
+
+Usage:
+    python benchmarks/bench_mcp_startup.py [--servers 8] [--timeout 3]
+
+Configures ``--servers`` stdio MCP servers (benchmarks/_fake_mcp_server.py)
+with staggered start-up delays; every fourth one exits at once and the
+last one never answers within ``--timeout``. "sequential" is the old
+lifespan (await each client in turn before channels and the HTTP server
+start); "background" is ``MCPClientManager.start_from_config``. Reports
+when the app could start serving, when every client had settled, and
+each client's time-to-ready.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position
+from _common import isolated_working_dir, print_report  # noqa: E402
+
+isolated_working_dir()
+
+from copaw.app.mcp.manager import MCPClientManager  # noqa: E402
+from copaw.config.config import MCPClientConfig, MCPConfig  # noqa: E402
+
+_SERVER = str(Path(__file__).resolve().parent / "_fake_mcp_server.py")
+
+
+def _config(servers: int, timeout: float) -> MCPConfig:
+    clients = {}
+    for i in range(servers):
+        if i == servers - 1:
+            args = ["--delay", str(timeout * 10)]
+        elif i % 4 == 3:
+            args = ["--fail"]
+        else:
+            args = ["--delay", f"{0.25 * (i % 4):.2f}"]
+        clients[f"mcp-{i}"] = MCPClientConfig(
+            name=f"mcp-{i}",
+            command=sys.executable,
+            args=[_SERVER, *args],
+        )
+    return MCPConfig(clients=clients)
+
+
+async def _sequential(manager: MCPClientManager, config: MCPConfig) -> None:
+    # pylint: disable=protected-access
+    for key, client_config in config.clients.items():
+        try:
+            await manager._add_client(key, client_config)
+        except Exception:
+            pass
+
+
+async def _scenario(name: str, config: MCPConfig, timeout: float) -> dict:
+    manager = MCPClientManager(connect_timeout=timeout)
+    start = time.monotonic()
+    if name == "sequential":
+        await _sequential(manager, config)
+    else:
+        manager.start_from_config(config)
+    app_ready = time.monotonic() - start
+    await manager.wait_ready()
+    settled = time.monotonic() - start
+
+    rows = {
+        name: {
+            "app_ready_ms": app_ready * 1000,
+            "all_settled_ms": settled * 1000,
+            "ready_clients": len(await manager.get_clients()),
+        },
+    }
+    # pylint: disable=protected-access
+    for key, slot in manager._clients.items():
+        end = slot.ready_at or time.monotonic()
+        rows[f"  {key}"] = {
+            "status": slot.status,
+            "since_start_ms": (end - start) * 1000,
+        }
+    await manager.close_all()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--servers", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=3.0)
+    args = parser.parse_args()
+
+    config = _config(args.servers, args.timeout)
+    rows = {}
+    for name in ("sequential", "background"):
+        rows.update(asyncio.run(_scenario(name, config, args.timeout)))
+    print_report(
+        f"{args.servers} stdio MCP servers, {args.timeout}s timeout",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
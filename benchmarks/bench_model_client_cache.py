@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Per-request model client cost: fresh client vs ProviderManager cache.
+
+Usage:
+    python benchmarks/bench_model_client_cache.py [--requests 200]
+
+Points a custom OpenAI-compatible provider at a local fake server and
+runs ``--requests`` sequential calls, each resolving the model through
+``ProviderManager.get_active_chat_model()`` the way every agent build
+does. Reports per-call latency and how many TCP connections the server
+accepted, with the client cache off (old behaviour) and on.
+
+Note: the openai SDK stops reading a stream at ``[DONE]`` and closes the
+response before the body's end, so httpx never returns streamed sockets
+to the pool and the connection count stays one per call either way.
+The saving for streamed calls is client construction; non-streamed
+calls on a cached client also reuse one keep-alive connection.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position
+from _common import (  # noqa: E402
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+from _fake_openai import FakeOpenAIServer  # noqa: E402
+
+isolated_working_dir()
+
+import copaw.providers.provider_manager as pm_module  # noqa: E402
+from copaw.providers.provider import ProviderInfo  # noqa: E402
+from copaw.providers.provider_manager import ProviderManager  # noqa: E402
+
+
+async def _setup(base_url: str) -> None:
+    manager = ProviderManager.get_instance()
+    info = await manager.add_custom_provider(
+        ProviderInfo(
+            id="bench",
+            name="Bench",
+            base_url=base_url,
+            api_key="sk-bench",
+        ),
+    )
+    await manager.add_model_to_provider(
+        info.id,
+        pm_module.ModelInfo(id="fake-model", name="fake-model"),
+    )
+    await manager.activate_model(info.id, "fake-model")
+
+
+async def _run(requests: int) -> list[float]:
+    samples = []
+    messages = [{"role": "user", "content": "hi"}]
+    for _ in range(requests):
+        start = time.perf_counter()
+        model = ProviderManager.get_active_chat_model()
+        async for _ in await model(messages):
+            pass
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = {}
+    with FakeOpenAIServer(reply="hello from the fake server") as server:
+
+        async def scenario(enabled: bool) -> list[float]:
+            pm_module.MODEL_CLIENT_CACHE_ENABLED = enabled
+            ProviderManager.get_instance().clear_chat_model_cache()
+            server.reset_counters()
+            return await _run(args.requests)
+
+        async def bench() -> None:
+            await _setup(server.base_url)
+            for name, enabled in (("fresh client", False), ("cached", True)):
+                samples = await scenario(enabled)
+                rows[name] = {
+                    **summarize(samples),
+                    "connections": server.connections,
+                    "requests": server.requests,
+                }
+
+        asyncio.run(bench())
+    print_report(f"model client, {args.requests} sequential calls", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""System prompt build cost per request, cold vs warm prompt cache.
+
+Usage:
+    python benchmarks/bench_prompt_cache.py [--requests 2000] [--kb 8]
+
+Writes AGENTS.md, SOUL.md and PROFILE.md (``--kb`` KiB each, with YAML
+frontmatter) to a throwaway working dir. A request builds the prompt
+twice, like the runner does (agent rebind + ``rebuild_sys_prompt``).
+"cold" clears the cache at the start of every request; "warm" is the
+steady state; "edit" touches one file per request so only its fragment
+is re-read.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.agents.prompt import (  # noqa: E402
+    build_system_prompt_from_working_dir,
+    clear_prompt_cache,
+)
+from copaw.constant import WORKING_DIR  # noqa: E402
+
+_FILES = ("AGENTS.md", "SOUL.md", "PROFILE.md")
+
+
+def _write_files(kb: int) -> None:
+    line = "- Keep answers short and cite the files you touched.\n"
+    body = line * max(1, kb * 1024 // len(line))
+    for name in _FILES:
+        (Path(WORKING_DIR) / name).write_text(
+            f"---\nsummary: {name}\n---\n\n{body}",
+            encoding="utf-8",
+        )
+
+
+def _run(requests: int, before_request) -> list[float]:
+    samples = []
+    for i in range(requests):
+        before_request(i)
+        start = time.perf_counter()
+        build_system_prompt_from_working_dir()
+        build_system_prompt_from_working_dir()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _touch(i: int) -> None:
+    path = Path(WORKING_DIR) / _FILES[i % len(_FILES)]
+    stamp = time.time_ns() + i
+    os.utime(path, ns=(stamp, stamp))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--kb", type=int, default=8)
+    args = parser.parse_args()
+
+    _write_files(args.kb)
+    rows = {
+        "cold": summarize(
+            _run(args.requests, lambda _i: clear_prompt_cache()),
+        ),
+        "warm": summarize(_run(args.requests, lambda _i: None)),
+        "edit": summarize(_run(args.requests, _touch)),
+    }
+    print_report(
+        f"sys-prompt builds, 2 per request, {len(_FILES)}x{args.kb} KiB",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Session store read/write throughput: SafeJSONSession vs SQLiteSession.
+
+Usage:
+    python benchmarks/bench_session_store.py [--turns 500] [--msg-bytes 2048]
+
+Simulates one long conversation: every turn appends a user and an
+assistant message to memory, saves the session, and loads it back.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+ROOT = isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.app.runner.session import SafeJSONSession  # noqa: E402
+from copaw.app.runner.sqlite_session import SQLiteSession  # noqa: E402
+
+
+class _FakeAgentState:
+    """Minimal state module shaped like a CoPawAgent state dict."""
+
+    def __init__(self) -> None:
+        self.content: list = []
+
+    def state_dict(self) -> dict:
+        return {
+            "name": "Friday",
+            "_sys_prompt": "system prompt",
+            "memory": {"content": self.content, "_compressed_summary": ""},
+        }
+
+    def load_state_dict(self, state: dict) -> None:
+        self.content = state["memory"]["content"]
+
+
+def _message(role: str, size: int) -> list:
+    return [
+        {
+            "id": uuid.uuid4().hex,
+            "name": role,
+            "role": role,
+            "content": [{"type": "text", "text": "x" * size}],
+            "metadata": None,
+            "timestamp": "2026-01-01 00:00:00.000",
+        },
+        [],
+    ]
+
+
+async def _run(session, turns: int, msg_bytes: int) -> dict:
+    writer = _FakeAgentState()
+    saves, loads = [], []
+    for _ in range(turns):
+        writer.content.append(_message("user", msg_bytes))
+        writer.content.append(_message("assistant", msg_bytes))
+
+        start = time.perf_counter()
+        await session.save_session_state("bench", "user", agent=writer)
+        saves.append(time.perf_counter() - start)
+
+        reader = _FakeAgentState()
+        start = time.perf_counter()
+        await session.load_session_state("bench", "user", agent=reader)
+        loads.append(time.perf_counter() - start)
+        assert len(reader.content) == len(writer.content)
+    return {"save": summarize(saves), "load": summarize(loads)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--msg-bytes", type=int, default=2048)
+    args = parser.parse_args()
+
+    stores = {
+        "json": SafeJSONSession(save_dir=str(ROOT / "json")),
+        "sqlite": SQLiteSession(db_path=str(ROOT / "sqlite" / "s.db")),
+    }
+    rows = {}
+    for name, store in stores.items():
+        result = asyncio.run(_run(store, args.turns, args.msg_bytes))
+        rows[f"{name} save"] = result["save"]
+        rows[f"{name} load"] = result["load"]
+    print_report(
+        f"session store, {args.turns} turns x 2 msgs x {args.msg_bytes}B",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Per-agent-build skill discovery: directory scan vs skill index.
+
+Usage:
+    python benchmarks/bench_skill_index.py [--skills 60] [--requests 500]
+
+Creates ``--skills`` skill directories under active_skills. "scan" is
+the old path (list the directory, then read and parse every SKILL.md
+frontmatter as ``Toolkit.register_agent_skill`` does); "index" is
+``get_skill_index(...).entries()``, which stats the root and each skill.
+"compare" times builtin-vs-active tree comparison with the index, the
+check ``sync_skills_from_active_to_customized`` runs per skill.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+import frontmatter  # noqa: E402
+
+from copaw.agents.skill_index import (  # noqa: E402
+    get_skill_index,
+    save_skill_indexes,
+)
+from copaw.agents.skills_manager import (  # noqa: E402
+    _is_directory_same,
+    get_active_skills_dir,
+    get_customized_skills_dir,
+)
+
+
+def _make_skills(root: Path, count: int) -> None:
+    body = "Step by step instructions.\n" * 200
+    for i in range(count):
+        skill_dir = root / f"skill_{i:03d}"
+        (skill_dir / "scripts").mkdir(parents=True, exist_ok=True)
+        (skill_dir / "SKILL.md").write_text(
+            f"---\nname: skill_{i:03d}\n"
+            f"description: Benchmark skill number {i}\n---\n\n{body}",
+            encoding="utf-8",
+        )
+        (skill_dir / "scripts" / "run.py").write_text(
+            "print('hello')\n" * 50,
+            encoding="utf-8",
+        )
+
+
+def _scan(root: Path) -> None:
+    names = [
+        d.name
+        for d in root.iterdir()
+        if d.is_dir() and (d / "SKILL.md").exists()
+    ]
+    for name in names:
+        with open(root / name / "SKILL.md", encoding="utf-8") as file:
+            post = frontmatter.load(file)
+        _ = (post.get("name"), post.get("description"))
+
+
+def _time(fn, requests: int) -> list[float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--skills", type=int, default=60)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    active = get_active_skills_dir()
+    customized = get_customized_skills_dir()
+    _make_skills(active, args.skills)
+    _make_skills(customized, args.skills)
+    index = get_skill_index(active)
+    index.entries()
+    names = index.names()
+
+    def _compare() -> None:
+        for name in names:
+            _is_directory_same(active / name, customized / name)
+        save_skill_indexes()
+
+    rows = {
+        "scan": summarize(_time(lambda: _scan(active), args.requests)),
+        "index": summarize(_time(index.entries, args.requests)),
+        "compare": summarize(_time(_compare, max(1, args.requests // 10))),
+    }
+    print_report(f"skill discovery, {args.skills} skills", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Per-chunk tag parsing cost for LocalChatModel streaming.
+
+Usage:
+    python benchmarks/bench_tag_parser.py [--tokens 8000 16000 32000]
+
+Streams a response of N one-token chunks (a <think> block, prose, then
+a <tool_call>) and times the work done per chunk: "regex" re-runs
+extract_thinking_from_text / parse_tool_calls_from_text over the whole
+accumulated text (the old behaviour), "streaming" feeds the delta to
+StreamingTagParser. Reported latencies are for the last 500 chunks.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    print_report,
+    summarize,
+)
+
+# pylint: disable=wrong-import-position
+from copaw.local_models.tag_parser import (  # noqa: E402
+    StreamingTagParser,
+    extract_thinking_from_text,
+    parse_tool_calls_from_text,
+    text_contains_think_tag,
+    text_contains_tool_call_tag,
+)
+
+_TAIL = 500
+
+
+def _chunks(tokens: int) -> list[str]:
+    words = ["alpha ", "beta ", "gamma ", "delta\n"]
+    think = tokens // 4
+    chunks = ["<think>"]
+    chunks += [words[i % 4] for i in range(think)]
+    chunks.append("</think>")
+    chunks += [words[i % 4] for i in range(tokens - think - 8)]
+    chunks += [
+        "<tool_call>",
+        '{"name": "read_file", ',
+        '"arguments": {"file_path": "a.py"}}',
+        "</tool_call>",
+    ]
+    return chunks
+
+
+def _regex(chunks: list[str]) -> list[float]:
+    samples = []
+    text = ""
+    for piece in chunks:
+        text += piece
+        start = time.perf_counter()
+        effective = text
+        if text_contains_think_tag(text):
+            parsed = extract_thinking_from_text(text)
+            effective = "" if parsed.has_open_tag else parsed.remaining_text
+        if effective and text_contains_tool_call_tag(effective):
+            parse_tool_calls_from_text(effective)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _streaming(chunks: list[str]) -> list[float]:
+    samples = []
+    parser = StreamingTagParser()
+    for piece in chunks:
+        start = time.perf_counter()
+        parser.feed(piece)
+        _ = parser.thinking
+        if parser.text and parser.has_tool_call_tag:
+            parser.split_tool_calls()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--tokens",
+        type=int,
+        nargs="+",
+        default=[8000, 16000, 32000],
+    )
+    args = parser.parse_args()
+
+    rows = {}
+    for tokens in args.tokens:
+        chunks = _chunks(tokens)
+        rows[f"regex {tokens}"] = summarize(_regex(chunks)[-_TAIL:])
+        rows[f"streaming {tokens}"] = summarize(_streaming(chunks)[-_TAIL:])
+    print_report(f"per-chunk parse cost, last {_TAIL} chunks", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Pre-reasoning context check cost: full re-encode vs MessageTokenCache.
+
+Usage:
+    python benchmarks/bench_token_cache.py [--messages 200] [--iters 50]
+
+Simulates the MemoryCompactionHook running once per reasoning step on a
+session that starts with ``--messages`` messages and grows by one tool
+call + tool result per step. "full" re-encodes the system prompt and
+every message (what check_context does); "cached" uses the memoized
+string count and the per-message cache.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from agentscope.message import (  # noqa: E402
+    Msg,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+)
+from reme.memory.file_based.utils import AsMsgHandler  # noqa: E402
+
+from copaw.agents.utils import (  # noqa: E402
+    MessageTokenCache,
+    _get_token_counter,
+    safe_count_str_tokens,
+)
+
+_SYS_PROMPT = "You are a helpful assistant. " * 400
+_PARAGRAPH = (
+    "The quick brown fox jumps over the lazy dog while the build runs. "
+) * 12
+
+
+def _tool_round(i: int) -> list[Msg]:
+    call_id = f"call_{i}"
+    return [
+        Msg(
+            "Friday",
+            [
+                ToolUseBlock(
+                    type="tool_use",
+                    id=call_id,
+                    name="read_file",
+                    input={"file_path": f"/tmp/file_{i}.py"},
+                ),
+            ],
+            "assistant",
+        ),
+        Msg(
+            "system",
+            [
+                ToolResultBlock(
+                    type="tool_result",
+                    id=call_id,
+                    name="read_file",
+                    output=[TextBlock(type="text", text=_PARAGRAPH * 2)],
+                ),
+            ],
+            "system",
+        ),
+    ]
+
+
+def _session(n: int) -> list[Msg]:
+    messages = []
+    for i in range(n // 2):
+        messages.append(Msg("user", f"{i}: {_PARAGRAPH}", "user"))
+        messages.append(Msg("Friday", f"{i}: {_PARAGRAPH}", "assistant"))
+    return messages
+
+
+def _full(counter, messages: list[Msg]) -> int:
+    handler = AsMsgHandler(token_counter=counter)
+    prompt_tokens = len(counter.tokenizer.encode(_SYS_PROMPT))
+    return prompt_tokens + handler.count_msgs_token(messages)
+
+
+def _cached(cache: MessageTokenCache, messages: list[Msg]) -> int:
+    return safe_count_str_tokens(_SYS_PROMPT) + cache.total(messages)
+
+
+def _run(check, messages: list[Msg], iters: int) -> tuple[list, list]:
+    samples, totals = [], []
+    for i in range(iters):
+        messages.extend(_tool_round(i))
+        start = time.perf_counter()
+        totals.append(check(messages))
+        samples.append(time.perf_counter() - start)
+    return samples, totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--iters", type=int, default=50)
+    args = parser.parse_args()
+
+    counter = _get_token_counter()
+    base = _session(args.messages)
+    cache = MessageTokenCache(token_counter=counter)
+
+    full_samples, full_totals = _run(
+        lambda msgs: _full(counter, msgs),
+        list(base),
+        args.iters,
+    )
+    cached_samples, cached_totals = _run(
+        lambda msgs: _cached(cache, msgs),
+        list(base),
+        args.iters,
+    )
+    assert full_totals == cached_totals, "cached totals diverged"
+
+    print_report(
+        f"context check, {args.messages} msgs + 2/step, {args.iters} steps",
+        {
+            "full": summarize(full_samples),
+            "cached": summarize(cached_samples),
+            "cache": {"hits": cache.hits, "misses": cache.misses},
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
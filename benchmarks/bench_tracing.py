@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Overhead of hot-path tracing: off vs on vs on with the OTLP file.
+
+Usage:
+    python benchmarks/bench_tracing.py [--messages 300] [--tools 2]
+
+Sends ``--messages`` sequential messages through ``ChannelManager`` and
+``AgentRunner`` (fake channel, instant fake OpenAI server whose every
+reply makes ``--tools`` tool calls). Every message starts a new session
+so history does not grow, and each round runs the three tracer modes
+in a shuffled order so drift hits all modes alike. With an instant
+model the per-reply cost is nearly all CoPaw's own code, so this is
+the worst case for relative overhead; the target is under 2% (compared
+on the median). Also reports the raw cost of one span.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position
+from _common import (  # noqa: E402
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+from _fake_openai import FakeOpenAIServer  # noqa: E402
+
+root = isolated_working_dir()
+os.environ["ENABLE_MEMORY_MANAGER"] = "false"
+os.environ.setdefault("COPAW_LOG_LEVEL", "warning")
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+# pylint: disable=wrong-import-order
+from _fake_channel import FakeChannel  # noqa: E402
+
+import copaw.providers.provider_manager as pm_module  # noqa: E402
+from copaw.app.channels.manager import ChannelManager  # noqa: E402
+from copaw.app.runner.runner import AgentRunner  # noqa: E402
+from copaw.providers.provider import ProviderInfo  # noqa: E402
+from copaw.providers.provider_manager import ProviderManager  # noqa: E402
+from copaw.utils.tracing import (  # noqa: E402
+    OtlpFileExporter,
+    Tracer,
+    get_tracer,
+)
+
+_MODES = ("off", "on", "on+otlp")
+
+
+async def _setup_provider(base_url: str) -> None:
+    manager = ProviderManager.get_instance()
+    info = await manager.add_custom_provider(
+        ProviderInfo(
+            id="bench",
+            name="Bench",
+            base_url=base_url,
+            api_key="sk-bench",
+        ),
+    )
+    await manager.add_model_to_provider(
+        info.id,
+        pm_module.ModelInfo(id="fake-model", name="fake-model"),
+    )
+    await manager.activate_model(info.id, "fake-model")
+
+
+def _set_mode(tracer: Tracer, mode: str, exporter: OtlpFileExporter) -> None:
+    tracer.enabled = mode != "off"
+    tracer.exporter = exporter if mode == "on+otlp" else None
+
+
+async def _messages(args, server: FakeOpenAIServer) -> dict:
+    await _setup_provider(server.base_url)
+    tracer = get_tracer()
+    exporter = OtlpFileExporter(root / "spans.jsonl")
+    runner = AgentRunner()
+    channel = FakeChannel(runner.stream_query)
+    manager = ChannelManager([channel])
+    await runner.start()
+    await manager.start_all()
+    samples: dict[str, list[float]] = {mode: [] for mode in _MODES}
+    rng = random.Random(0)
+    try:
+        # The first round warms up every mode and is not recorded.
+        for round_index in range(args.messages // len(_MODES) + 1):
+            for mode in rng.sample(_MODES, len(_MODES)):
+                _set_mode(tracer, mode, exporter)
+                msg_id = channel.inject(
+                    manager,
+                    f"user-{round_index}-{mode}",
+                    "hi",
+                )
+                await channel.wait_idle()
+                delivery = channel.deliveries[msg_id]
+                if round_index:
+                    samples[mode].append(delivery.done - delivery.enqueued)
+    finally:
+        await manager.stop_all()
+        await runner.stop()
+        exporter.flush()
+
+    base = summarize(samples["off"])["p50_ms"]
+    rows = {}
+    for mode, values in samples.items():
+        stats = summarize(values)
+        rows[mode] = {
+            **stats,
+            "overhead_pct": (stats["p50_ms"] / base - 1) * 100,
+        }
+    # pylint: disable=protected-access
+    histograms = tracer._histograms
+    rows["per reply"] = {
+        "records": sum(h.count for h in histograms.values())
+        / histograms["channel.message"].count,
+    }
+    return rows
+
+
+def _span_cost(count: int) -> dict:
+    rows = {}
+    for mode in _MODES:
+        tracer = Tracer(enabled=mode != "off", otlp_file="")
+        if mode == "on+otlp":
+            tracer.exporter = OtlpFileExporter(root / "micro.jsonl")
+        with tracer.span("channel.message"):
+            start = time.perf_counter()
+            for _ in range(count):
+                with tracer.span("tool.execute", tool="echo"):
+                    pass
+            elapsed = time.perf_counter() - start
+        rows[mode] = {"ns_per_span": elapsed / count * 1e9}
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--tools", type=int, default=2)
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(
+        reply="done",
+        tool_rounds=args.tools,
+        tool_name="get_current_time",
+    ) as server:
+        rows = asyncio.run(_messages(args, server))
+    print_report(
+        f"enqueue to done, {args.messages} messages, {args.tools} tool "
+        "calls each, instant model",
+        rows,
+    )
+    print_report("one span", _span_cost(100_000))
+
+
+if __name__ == "__main__":
+    main()
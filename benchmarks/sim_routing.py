@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Replay a request trace against local/cloud routing policies offline.
+
+Usage:
+    python benchmarks/sim_routing.py [--trace routing_trace.jsonl]
+        [--requests 2000] [--local-max-prompt-tokens 0] [--local-only]
+
+``--trace`` takes a file recorded with ``COPAW_LLM_ROUTING_TRACE_FILE``.
+Without it, a synthetic trace alternates idle and busy minutes so the
+local backend is sometimes free and sometimes saturated.
+
+Each request is replayed at its recorded arrival time through
+``RoutingPolicy``. A request's service time on a route is its recorded
+latency there; for the route it did not take, the latency of the most
+similar-sized recorded call on that route (unqueued local calls only).
+The local backend serves one call at a time; the cloud serves calls
+concurrently. Reports end-to-end latency per policy.
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import heapq
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _common import (  # noqa: E402  pylint: disable=wrong-import-position
+    isolated_working_dir,
+    print_report,
+    summarize,
+)
+
+isolated_working_dir()
+
+# pylint: disable=wrong-import-position
+from copaw.agents.routing_chat_model import (  # noqa: E402
+    EndpointStats,
+    RoutingPolicy,
+)
+from copaw.config.config import AgentsLLMRoutingConfig  # noqa: E402
+
+_TOKEN_FLOOR = 256
+
+
+def _synthetic_trace(requests: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    trace, now = [], 0.0
+    for _ in range(requests):
+        busy = int(now // 60) % 2 == 1
+        now += rng.expovariate(1.5 if busy else 0.1)
+        tokens = int(rng.lognormvariate(7.5, 0.8))
+        local = (0.2 + tokens * 0.0006) * rng.uniform(0.8, 1.3)
+        cloud = (1.0 + tokens * 0.0004) * rng.uniform(0.8, 1.3)
+        if rng.random() < 0.02:
+            cloud *= 4  # tail latency spike
+        for route, latency in (("local", local), ("cloud", cloud)):
+            trace.append(
+                {
+                    "ts": now,
+                    "route": route,
+                    "prompt_tokens": tokens,
+                    "tools": rng.random() < 0.5,
+                    "local_queue": 0,
+                    "latency": latency,
+                    "ok": True,
+                },
+            )
+    return trace
+
+
+def _load_trace(path: Path) -> list[dict]:
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def _service_samples(trace: list[dict]) -> dict[str, list[tuple]]:
+    """Per route, sorted (prompt tokens, latency) of usable calls."""
+    samples: dict[str, list[tuple]] = {"local": [], "cloud": []}
+    for record in trace:
+        if not record.get("ok", True):
+            continue
+        if record["route"] == "local" and record.get("local_queue"):
+            continue
+        samples[record["route"]].append(
+            (record["prompt_tokens"], record["latency"]),
+        )
+    for route_samples in samples.values():
+        route_samples.sort()
+    return samples
+
+
+def _requests(trace: list[dict]) -> list[dict]:
+    """Unique requests by arrival, with recorded latency per route."""
+    requests: dict[tuple, dict] = {}
+    for record in sorted(trace, key=lambda r: r["ts"]):
+        key = (record["ts"], record["prompt_tokens"])
+        request = requests.setdefault(key, {**record, "latencies": {}})
+        if record.get("ok", True) and not (
+            record["route"] == "local" and record.get("local_queue")
+        ):
+            request["latencies"][record["route"]] = record["latency"]
+    return list(requests.values())
+
+
+def _service_time(
+    request: dict,
+    route: str,
+    samples: dict[str, list[tuple]],
+) -> float:
+    recorded = request["latencies"].get(route)
+    if recorded is not None:
+        return recorded
+    route_samples = samples[route]
+    i = bisect.bisect_left(route_samples, (request["prompt_tokens"],))
+    tokens, latency = route_samples[min(i, len(route_samples) - 1)]
+    scale = max(request["prompt_tokens"], _TOKEN_FLOOR)
+    return latency * scale / max(tokens, _TOKEN_FLOOR)
+
+
+def simulate(
+    requests: list[dict],
+    samples: dict[str, list[tuple]],
+    cfg: AgentsLLMRoutingConfig,
+) -> tuple[list[float], int]:
+    """Replay *requests*; return latencies and the local call count."""
+    clock = [0.0]
+    stats = {"local": EndpointStats(), "cloud": EndpointStats()}
+    policy = RoutingPolicy(
+        cfg,
+        local_stats=stats["local"],
+        cloud_stats=stats["cloud"],
+        clock=lambda: clock[0],
+    )
+    start_ts = requests[0]["ts"] if requests else 0.0
+    completions: list[tuple[float, int, str, float | None, int]] = []
+    local_free_at = 0.0
+    latencies, local_calls = [], 0
+
+    for seq, request in enumerate(requests):
+        now = request["ts"] - start_ts
+        while completions and completions[0][0] <= now:
+            end, _, route, seconds, tokens = heapq.heappop(completions)
+            clock[0] = end
+            stats[route].end(seconds, tokens)
+        clock[0] = now
+
+        tokens = request["prompt_tokens"]
+        queue = stats["local"].in_flight
+        route = policy.decide(
+            tools_available=request.get("tools", False),
+            prompt_tokens=tokens,
+        ).route
+        service = _service_time(request, route, samples)
+        if route == "local":
+            local_calls += 1
+            begin = max(now, local_free_at)
+            local_free_at = end = begin + service
+            sample = service if queue == 0 else None
+        else:
+            end = now + service
+            sample = service
+        stats[route].begin()
+        heapq.heappush(completions, (end, seq, route, sample, tokens))
+        latencies.append(end - now)
+    return latencies, local_calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trace", type=Path, default=None)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--local-max-prompt-tokens", type=int, default=0)
+    parser.add_argument("--local-only", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    trace = (
+        _load_trace(args.trace)
+        if args.trace
+        else _synthetic_trace(args.requests, args.seed)
+    )
+    samples = _service_samples(trace)
+    requests = _requests(trace)
+    if not samples["local"] or not samples["cloud"]:
+        sys.exit("trace needs successful calls on both routes")
+
+    rows = {}
+    for mode in ("local_first", "cloud_first", "adaptive"):
+        cfg = AgentsLLMRoutingConfig(
+            mode=mode,
+            cloud_allowed=not args.local_only,
+            local_max_prompt_tokens=args.local_max_prompt_tokens,
+        )
+        latencies, local_calls = simulate(requests, samples, cfg)
+        rows[mode] = {
+            **summarize(latencies),
+            "local_pct": 100.0 * local_calls / max(1, len(requests)),
+        }
+    print_report(f"routing replay, {len(requests)} requests", rows)
+
+
+if __name__ == "__main__":
+    main()
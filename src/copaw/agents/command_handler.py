@@ -9,7 +9,7 @@ from typing import TYPE_CHECKING
 from agentscope.agent._react_agent import _MemoryMark
 from agentscope.message import Msg, TextBlock
 
-from copaw.config import load_config
+from copaw.config import get_config_snapshot
 
 if TYPE_CHECKING:
     from .memory import MemoryManager
@@ -199,7 +199,7 @@ class CommandHandler(ConversationCommandHandlerMixin):
         _args: str = "",
     ) -> Msg:
         """Process /history command."""
-        config = load_config()
+        config = get_config_snapshot()
         max_input_length = config.agents.running.max_input_length
         history_str = await self.memory.get_history_str(
             max_input_length=max_input_length,
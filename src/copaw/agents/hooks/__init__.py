@@ -27,9 +27,10 @@ Example:
 """
 
 from .bootstrap import BootstrapHook
-from .memory_compaction import MemoryCompactionHook
+from .memory_compaction import MemoryCompactionHook, get_compaction_stats
 
 __all__ = [
     "BootstrapHook",
     "MemoryCompactionHook",
+    "get_compaction_stats",
 ]
@@ -4,25 +4,119 @@
 This hook monitors token usage and automatically compacts older messages
 when the context window approaches its limit, preserving recent messages
 and the system prompt.
+
+Compaction is speculative: once usage passes a watermark below the
+compaction threshold, the summary is computed by a background task and
+swapped in at the next reasoning step where it is ready. A reasoning
+step only waits for compaction when the context would otherwise
+overflow; :func:`get_compaction_stats` reports how often and how long
+that happens.
 """
+import asyncio
 import logging
+import time
+from collections import OrderedDict
 from typing import TYPE_CHECKING, Any
 
 from agentscope.agent._react_agent import _MemoryMark, ReActAgent
 
-from copaw.config import load_config
-from copaw.constant import MEMORY_COMPACT_KEEP_RECENT
+from copaw.config import get_config_snapshot
+from copaw.utils.tracing import span
+from copaw.constant import (
+    MEMORY_COMPACT_BACKGROUND,
+    MEMORY_COMPACT_KEEP_RECENT,
+    MEMORY_COMPACT_WATERMARK,
+)
 from ..utils import (
     check_valid_messages,
+    get_message_token_cache,
     safe_count_str_tokens,
 )
 
 if TYPE_CHECKING:
+    from agentscope.message import Msg
     from ..memory import MemoryManager
     from reme.memory.file_based import ReMeInMemoryMemory
 
 logger = logging.getLogger(__name__)
 
+# Pending background compactions are few (one per active conversation);
+# the bound only protects long-running servers.
+_MAX_PENDING_COMPACTIONS = 256
+
+
+class CompactionStats:
+    """Counters for compaction work and the time replies spent on it."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.background_started = 0
+        self.background_applied = 0
+        self.background_discarded = 0
+        self.background_failed = 0
+        self.blocking_count = 0
+        self.blocking_seconds = 0.0
+        self.blocking_max_seconds = 0.0
+
+    def record_blocking(self, seconds: float) -> None:
+        self.blocking_count += 1
+        self.blocking_seconds += seconds
+        self.blocking_max_seconds = max(self.blocking_max_seconds, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "background_started": self.background_started,
+            "background_applied": self.background_applied,
+            "background_discarded": self.background_discarded,
+            "background_failed": self.background_failed,
+            "blocking_count": self.blocking_count,
+            "blocking_seconds": round(self.blocking_seconds, 3),
+            "blocking_max_seconds": round(self.blocking_max_seconds, 3),
+        }
+
+
+_stats = CompactionStats()
+
+
+def get_compaction_stats() -> dict[str, Any]:
+    """Return process-wide compaction counters.
+
+    ``blocking_*`` count reasoning steps that waited for a compaction
+    (the synchronous fallback, or a background summary that was not
+    ready when the context was about to overflow).
+    """
+    return _stats.snapshot()
+
+
+class _PendingCompaction:
+    """A summary being computed in the background for one conversation."""
+
+    def __init__(
+        self,
+        messages: list["Msg"],
+        previous_summary: str,
+        task: asyncio.Task,
+    ) -> None:
+        self.messages = messages
+        self.msg_ids = [msg.id for msg in messages]
+        self.previous_summary = previous_summary
+        self.task = task
+
+
+# conversation key -> pending compaction. Module level because the next
+# request of a conversation may run on another pooled agent.
+_pending: "OrderedDict[tuple, _PendingCompaction]" = OrderedDict()
+
+
+def _conversation_key(agent: ReActAgent, memory: Any) -> tuple:
+    request_context = getattr(agent, "_request_context", None) or {}
+    session_id = request_context.get("session_id")
+    if session_id:
+        return ("session", request_context.get("user_id"), session_id)
+    return ("memory", id(memory))
+
 
 class MemoryCompactionHook:
     """Hook for automatic memory compaction when context is full.
@@ -48,13 +142,19 @@ class MemoryCompactionHook:
         """Pre-reasoning hook to check and compact memory if needed.
 
         This hook extracts system prompt messages and recent messages,
-        builds an estimated full context prompt, and triggers compaction
-        when the total estimated token count exceeds the threshold.
+        builds an estimated full context prompt, and compacts when the
+        total estimated token count approaches the threshold.
 
         Memory structure:
             [System Prompt (preserved)] + [Compactable (counted)] +
             [Recent (preserved)]
 
+        Steps:
+            1. Swap in a background summary that finished meanwhile.
+            2. Above the watermark, start a background summary.
+            3. Only if the context would overflow, wait for the
+               background summary or compact synchronously.
+
         Args:
             agent: The agent instance
             kwargs: Input arguments to the _reasoning method
@@ -62,21 +162,31 @@ class MemoryCompactionHook:
         Returns:
             None (hook doesn't modify kwargs)
         """
+        with span("memory.compaction"):
+            return await self._check(agent)
+
+    # pylint: disable-next=too-many-branches
+    async def _check(self, agent: ReActAgent) -> None:
+        """Body of :meth:`__call__`, timed as one compaction stage."""
         try:
             memory: "ReMeInMemoryMemory" = agent.memory
-            token_counter = self.memory_manager.token_counter
 
-            system_prompt = agent.sys_prompt
+            # The system prompt count is cached with the prompt (it only
+            # changes when a prompt file does); the summary is counted
+            # separately so summary updates do not re-encode the prompt.
+            sys_prompt_tokens = getattr(agent, "sys_prompt_token_count", None)
+            if sys_prompt_tokens is None:
+                sys_prompt_tokens = safe_count_str_tokens(agent.sys_prompt)
             compressed_summary = memory.get_compressed_summary()
-            str_token_count = safe_count_str_tokens(
-                system_prompt + compressed_summary,
-            )
+            str_token_count = sys_prompt_tokens
+            if compressed_summary:
+                str_token_count += safe_count_str_tokens(compressed_summary)
 
-            config = load_config()
-            memory_compact_threshold = (
-                config.agents.running.memory_compact_threshold
+            config = get_config_snapshot()
+            running = config.agents.running
+            left_compact_threshold = (
+                running.memory_compact_threshold - str_token_count
             )
-            left_compact_threshold = memory_compact_threshold - str_token_count
 
             if left_compact_threshold <= 0:
                 logger.warning(
@@ -91,72 +201,62 @@ class MemoryCompactionHook:
 
             messages = await memory.get_memory(prepend_summary=False)
 
-            enable_tool_result_compact = (
-                config.agents.running.enable_tool_result_compact
-            )
-            tool_result_compact_keep_n = (
-                config.agents.running.tool_result_compact_keep_n
-            )
-            if enable_tool_result_compact and tool_result_compact_keep_n > 0:
-                compact_msgs = messages[:-tool_result_compact_keep_n]
+            if (
+                running.enable_tool_result_compact
+                and running.tool_result_compact_keep_n > 0
+            ):
+                compact_msgs = messages[: -running.tool_result_compact_keep_n]
                 await self.memory_manager.compact_tool_result(compact_msgs)
 
-            memory_compact_reserve = (
-                config.agents.running.memory_compact_reserve
-            )
-            (
-                messages_to_compact,
-                _,
-                is_valid,
-            ) = await self.memory_manager.check_context(
-                messages=messages,
-                memory_compact_threshold=left_compact_threshold,
-                memory_compact_reserve=memory_compact_reserve,
-                token_counter=token_counter,
-            )
-
-            if not messages_to_compact:
+            key = _conversation_key(agent, memory)
+            if await self._apply_finished(key, memory, messages):
                 return None
 
-            if not is_valid:
-                logger.warning(
-                    "Please include the output of the /history command when "
-                    "reporting the bug to the community. Invalid "
-                    "messages=%s",
-                    messages,
+            if MEMORY_COMPACT_BACKGROUND:
+                start_at = int(
+                    left_compact_threshold * MEMORY_COMPACT_WATERMARK,
                 )
-                keep_length: int = MEMORY_COMPACT_KEEP_RECENT
-                messages_length = len(messages)
-                while keep_length > 0 and not check_valid_messages(
-                    messages[max(messages_length - keep_length, 0) :],
-                ):
-                    keep_length -= 1
-
-                if keep_length > 0:
-                    messages_to_compact = messages[
-                        : max(messages_length - keep_length, 0)
-                    ]
-                else:
-                    messages_to_compact = messages
-
-            if not messages_to_compact:
-                return None
+                overflow_at = max(
+                    left_compact_threshold,
+                    running.max_input_length
+                    - running.memory_compact_reserve
+                    - str_token_count,
+                )
+            else:
+                start_at = overflow_at = left_compact_threshold
 
-            self.memory_manager.add_async_summary_task(
-                messages=messages_to_compact,
-            )
+            # Cached per-message counts make the common "still fits"
+            # case a sum; only new or edited messages are re-encoded.
+            total = get_message_token_cache().total(messages)
+            if total < start_at:
+                return None
 
-            compact_content = await self.memory_manager.compact_memory(
-                messages=messages_to_compact,
-                previous_summary=memory.get_compressed_summary(),
-            )
+            if total < overflow_at:
+                if key not in _pending:
+                    await self._start_background(
+                        key,
+                        memory,
+                        messages,
+                        start_at,
+                    )
+                return None
 
-            await agent.memory.update_compressed_summary(compact_content)
-            updated_count = await memory.update_messages_mark(
-                new_mark=_MemoryMark.COMPRESSED,
-                msg_ids=[msg.id for msg in messages_to_compact],
-            )
-            logger.info(f"Marked {updated_count} messages as compacted")
+            started = time.monotonic()
+            pending = _pending.get(key)
+            if pending is not None:
+                await asyncio.wait([pending.task])
+                applied = await self._apply_finished(key, memory, messages)
+            else:
+                applied = False
+            if not applied:
+                await self._compact_now(
+                    memory,
+                    messages,
+                    left_compact_threshold,
+                )
+            waited = time.monotonic() - started
+            _stats.record_blocking(waited)
+            logger.info("Reply blocked %.2fs on memory compaction", waited)
 
         except Exception as e:
             logger.error(
@@ -166,3 +266,149 @@ class MemoryCompactionHook:
             )
 
         return None
+
+    async def _select_messages(
+        self,
+        messages: list["Msg"],
+        threshold: int,
+    ) -> list["Msg"]:
+        """Pick the older messages to summarize, keeping recent ones."""
+        running = get_config_snapshot().agents.running
+        (
+            messages_to_compact,
+            _,
+            is_valid,
+        ) = await self.memory_manager.check_context(
+            messages=messages,
+            memory_compact_threshold=threshold,
+            memory_compact_reserve=running.memory_compact_reserve,
+            token_counter=self.memory_manager.token_counter,
+        )
+
+        if messages_to_compact and not is_valid:
+            logger.warning(
+                "Please include the output of the /history command when "
+                "reporting the bug to the community. Invalid "
+                "messages=%s",
+                messages,
+            )
+            keep_length: int = MEMORY_COMPACT_KEEP_RECENT
+            messages_length = len(messages)
+            while keep_length > 0 and not check_valid_messages(
+                messages[max(messages_length - keep_length, 0) :],
+            ):
+                keep_length -= 1
+
+            if keep_length > 0:
+                messages_to_compact = messages[
+                    : max(messages_length - keep_length, 0)
+                ]
+            else:
+                messages_to_compact = messages
+
+        return messages_to_compact
+
+    async def _start_background(
+        self,
+        key: tuple,
+        memory: "ReMeInMemoryMemory",
+        messages: list["Msg"],
+        threshold: int,
+    ) -> None:
+        """Start summarizing the older messages in a background task."""
+        messages_to_compact = await self._select_messages(messages, threshold)
+        if not messages_to_compact:
+            return
+
+        previous_summary = memory.get_compressed_summary()
+        task = asyncio.create_task(
+            self.memory_manager.compact_memory(
+                messages=messages_to_compact,
+                previous_summary=previous_summary,
+            ),
+            name="memory-compaction",
+        )
+        _pending[key] = _PendingCompaction(
+            messages_to_compact,
+            previous_summary,
+            task,
+        )
+        while len(_pending) > _MAX_PENDING_COMPACTIONS:
+            _, evicted = _pending.popitem(last=False)
+            evicted.task.cancel()
+        _stats.background_started += 1
+        logger.debug(
+            "Started background compaction of %d messages",
+            len(messages_to_compact),
+        )
+
+    async def _apply_finished(
+        self,
+        key: tuple,
+        memory: "ReMeInMemoryMemory",
+        messages: list["Msg"],
+    ) -> bool:
+        """Swap in a finished background summary if it still applies.
+
+        Returns:
+            True if messages were marked as compacted.
+        """
+        pending = _pending.get(key)
+        if pending is None or not pending.task.done():
+            return False
+        del _pending[key]
+
+        if pending.task.cancelled():
+            return False
+        error = pending.task.exception()
+        if error is not None:
+            _stats.background_failed += 1
+            logger.warning("Background memory compaction failed: %s", error)
+            return False
+
+        # The summary is only valid for the memory it was computed from:
+        # same previous summary and all summarized messages still there.
+        current_ids = {msg.id for msg in messages}
+        if memory.get_compressed_summary() != pending.previous_summary or (
+            not current_ids.issuperset(pending.msg_ids)
+        ):
+            _stats.background_discarded += 1
+            logger.debug("Discarded stale background compaction")
+            return False
+
+        self.memory_manager.add_async_summary_task(messages=pending.messages)
+        await memory.update_compressed_summary(pending.task.result())
+        updated_count = await memory.update_messages_mark(
+            new_mark=_MemoryMark.COMPRESSED,
+            msg_ids=pending.msg_ids,
+        )
+        _stats.background_applied += 1
+        logger.info(f"Marked {updated_count} messages as compacted")
+        return True
+
+    async def _compact_now(
+        self,
+        memory: "ReMeInMemoryMemory",
+        messages: list["Msg"],
+        threshold: int,
+    ) -> None:
+        """Compact synchronously (the context is about to overflow)."""
+        messages_to_compact = await self._select_messages(messages, threshold)
+        if not messages_to_compact:
+            return
+
+        self.memory_manager.add_async_summary_task(
+            messages=messages_to_compact,
+        )
+
+        compact_content = await self.memory_manager.compact_memory(
+            messages=messages_to_compact,
+            previous_summary=memory.get_compressed_summary(),
+        )
+
+        await memory.update_compressed_summary(compact_content)
+        updated_count = await memory.update_messages_mark(
+            new_mark=_MemoryMark.COMPRESSED,
+            msg_ids=[msg.id for msg in messages_to_compact],
+        )
+        logger.info(f"Marked {updated_count} messages as compacted")
@@ -19,7 +19,7 @@ from agentscope.tool import Toolkit
 from copaw.agents.model_factory import create_model_and_formatter
 from copaw.agents.tools import read_file, write_file, edit_file
 from copaw.agents.utils import _get_token_counter
-from copaw.config import load_config
+from copaw.config import get_config_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -234,7 +234,7 @@ class MemoryManager(ReMeLight):
         """
         self.prepare_model_formatter()
 
-        config = load_config()
+        config = get_config_snapshot()
         max_input_length = config.agents.running.max_input_length
         memory_compact_ratio = config.agents.running.memory_compact_ratio
         language = config.agents.language
@@ -263,7 +263,7 @@ class MemoryManager(ReMeLight):
         Returns:
             str: Comprehensive summary of the messages
         """
-        config = load_config()
+        config = get_config_snapshot()
         max_input_length = config.agents.running.max_input_length
         memory_compact_ratio = config.agents.running.memory_compact_ratio
         language = config.agents.language
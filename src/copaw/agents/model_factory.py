@@ -298,7 +298,7 @@ def create_model_and_formatter() -> Tuple[ChatModelBase, FormatterBase]:
     # Wrap with retry logic for transient LLM API errors
     provider_id = ProviderManager.get_instance().get_active_model().provider_id
     wrapped_model = TokenRecordingModelWrapper(provider_id, model)
-    wrapped_model = RetryChatModel(wrapped_model)
+    wrapped_model = RetryChatModel(wrapped_model, provider_id=provider_id)
 
     return wrapped_model, formatter
 
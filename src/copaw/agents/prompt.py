@@ -6,7 +6,11 @@ This module provides utilities for building system prompts from
 markdown configuration files in the working directory.
 """
 import logging
+import os
+import stat
+import threading
 from pathlib import Path
+from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +35,53 @@ class PromptConfig:
     ]
 
 
+# (inode, mtime_ns, size) of a prompt file, or None if it is missing
+_FileSignature = Optional[Tuple[int, int, int]]
+
+# file path -> (signature, content with frontmatter stripped)
+_fragment_cache: dict[Path, Tuple[_FileSignature, str]] = {}
+# (working dir, file names) -> (signatures, assembled prompt, loaded count)
+_prompt_cache: dict[
+    Tuple[Path, Tuple[str, ...]],
+    Tuple[Tuple[_FileSignature, ...], str, int],
+] = {}
+_prompt_cache_lock = threading.Lock()
+
+
+def _file_signature(file_path: Path) -> _FileSignature:
+    """Return (inode, mtime_ns, size) of a file, None if absent."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _strip_frontmatter(content: str) -> str:
+    """Remove YAML frontmatter if present."""
+    if content.startswith("---"):
+        parts = content.split("---", 2)
+        if len(parts) >= 3:
+            content = parts[2].strip()
+    return content
+
+
+def clear_prompt_cache() -> None:
+    """Drop all cached prompt fragments and assembled prompts."""
+    with _prompt_cache_lock:
+        _fragment_cache.clear()
+        _prompt_cache.clear()
+
+
 class PromptBuilder:
-    """Builder for constructing system prompts from markdown files."""
+    """Builder for constructing system prompts from markdown files.
+
+    File contents are cached by (inode, mtime, size) and the assembled
+    prompt is memoized until one of its source files changes, so an
+    unchanged prompt costs one ``stat`` per file.
+    """
 
     def __init__(
         self,
@@ -49,8 +98,13 @@ class PromptBuilder:
         self.enabled_files = enabled_files
         self.prompt_parts = []
         self.loaded_count = 0
+        self._failed_count = 0
 
-    def _load_file(self, filename: str) -> None:
+    def _load_file(
+        self,
+        filename: str,
+        signature: _FileSignature = None,
+    ) -> None:
         """Load a single markdown file.
 
         All files are optional - if they don't exist or can't be read,
@@ -58,21 +112,27 @@ class PromptBuilder:
 
         Args:
             filename: Name of the file to load
+            signature: Stat signature of the file taken by the caller
         """
         file_path = self.working_dir / filename
 
-        if not file_path.exists():
+        if signature is None:
+            signature = _file_signature(file_path)
+        if signature is None:
             logger.debug("File %s not found, skipping", filename)
             return
 
         try:
-            content = file_path.read_text(encoding="utf-8").strip()
-
-            # Remove YAML frontmatter if present
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    content = parts[2].strip()
+            with _prompt_cache_lock:
+                cached = _fragment_cache.get(file_path)
+            if cached is not None and cached[0] == signature:
+                content = cached[1]
+            else:
+                content = _strip_frontmatter(
+                    file_path.read_text(encoding="utf-8").strip(),
+                )
+                with _prompt_cache_lock:
+                    _fragment_cache[file_path] = (signature, content)
 
             if content:
                 if self.prompt_parts:  # Add separator if not first section
@@ -87,6 +147,7 @@ class PromptBuilder:
                 logger.debug("Skipped empty file: %s", filename)
 
         except Exception as e:
+            self._failed_count += 1
             logger.warning(
                 "Failed to read file %s: %s, skipping",
                 filename,
@@ -102,18 +163,34 @@ class PromptBuilder:
             Constructed system prompt string
         """
         # Determine which files to load
-        files_to_load = (
+        files_to_load = tuple(
             PromptConfig.DEFAULT_FILES
             if self.enabled_files is None
             else self.enabled_files
         )
 
+        # Reuse the last prompt while none of its files changed
+        cache_key = (Path(self.working_dir), files_to_load)
+        signatures = tuple(
+            _file_signature(self.working_dir / filename)
+            for filename in files_to_load
+        )
+        with _prompt_cache_lock:
+            cached = _prompt_cache.get(cache_key)
+        if cached is not None and cached[0] == signatures:
+            self.loaded_count = cached[2]
+            return cached[1]
+
         # Load all files (all are optional)
-        for filename in files_to_load:
-            self._load_file(filename)
+        self.prompt_parts = []
+        self.loaded_count = 0
+        self._failed_count = 0
+        for filename, signature in zip(files_to_load, signatures):
+            self._load_file(filename, signature)
 
         if not self.prompt_parts:
             logger.warning("No content loaded from working directory")
+            self._store(cache_key, signatures, DEFAULT_SYS_PROMPT)
             return DEFAULT_SYS_PROMPT
 
         # Join all parts with double newlines
@@ -125,8 +202,21 @@ class PromptBuilder:
             len(final_prompt),
         )
 
+        self._store(cache_key, signatures, final_prompt)
         return final_prompt
 
+    def _store(
+        self,
+        cache_key: Tuple[Path, Tuple[str, ...]],
+        signatures: Tuple[_FileSignature, ...],
+        prompt: str,
+    ) -> None:
+        """Memoize a built prompt unless a file failed to read."""
+        if self._failed_count:
+            return
+        with _prompt_cache_lock:
+            _prompt_cache[cache_key] = (signatures, prompt, self.loaded_count)
+
 
 def build_system_prompt_from_working_dir() -> str:
     """
@@ -154,10 +244,10 @@ def build_system_prompt_from_working_dir() -> str:
         "# AGENTS.md\\n\\n...\\n\\n# SOUL.md\\n\\n...\\n\\n# PROFILE.md\\n\\n..."
     """
     from ..constant import WORKING_DIR
-    from ..config import load_config
+    from ..config import get_config_snapshot
 
     # Load enabled files from config
-    config = load_config()
+    config = get_config_snapshot()
     enabled_files = (
         config.agents.system_prompt_files
         if config.agents.system_prompt_files is not None
@@ -226,6 +316,7 @@ def build_bootstrap_guidance(
 __all__ = [
     "build_system_prompt_from_working_dir",
     "build_bootstrap_guidance",
+    "clear_prompt_cache",
     "PromptBuilder",
     "PromptConfig",
     "DEFAULT_SYS_PROMPT",
@@ -22,10 +22,10 @@ from .hooks import BootstrapHook, MemoryCompactionHook
 from .model_factory import create_model_and_formatter
 from .prompt import build_system_prompt_from_working_dir
 from .tool_guard_mixin import ToolGuardMixin
+from .skill_index import SkillIndexEntry, get_skill_index
 from .skills_manager import (
     ensure_skills_initialized,
     get_working_skills_dir,
-    list_available_skills,
 )
 from .tools import (
     browser_use,
@@ -39,9 +39,13 @@ from .tools import (
     write_file,
     create_memory_search_tool,
 )
-from .utils import process_file_and_media_blocks_in_message
+from .tools.browser_pool import browser_session
+from .utils import (
+    process_file_and_media_blocks_in_message,
+    safe_count_str_tokens,
+)
 from ..agents.memory import MemoryManager
-from ..config import load_config
+from ..config import get_config_snapshot
 from ..constant import (
     MEMORY_COMPACT_RATIO,
     WORKING_DIR,
@@ -53,6 +57,35 @@ logger = logging.getLogger(__name__)
 NamesakeStrategy = Literal["override", "skip", "raise", "rename"]
 
 
+def _register_indexed_skill(toolkit: Toolkit, entry: SkillIndexEntry) -> None:
+    """Register a skill from its index entry without re-reading SKILL.md.
+
+    Mirrors ``Toolkit.register_agent_skill`` (same validation and the
+    same ``toolkit.skills`` record, pinned against the installed
+    agentscope by tests/unit/agents/test_skill_index.py); falls back to
+    it if the toolkit does not keep skills in a dict.
+    """
+    skills = getattr(toolkit, "skills", None)
+    if not isinstance(skills, dict):
+        toolkit.register_agent_skill(entry.path)
+        return
+    if not entry.name or not entry.description:
+        raise ValueError(
+            f"The SKILL.md file in '{entry.path}' must have a YAML Front "
+            "Matter including `name` and `description` fields.",
+        )
+    if entry.name in skills:
+        raise ValueError(
+            f"An agent skill with name '{entry.name}' is already registered "
+            "in the toolkit.",
+        )
+    skills[entry.name] = {
+        "name": entry.name,
+        "description": entry.description,
+        "dir": entry.path,
+    }
+
+
 class CoPawAgent(ToolGuardMixin, ReActAgent):
     """CoPaw Agent with integrated tools, skills, and memory management.
 
@@ -120,6 +153,7 @@ class CoPawAgent(ToolGuardMixin, ReActAgent):
 
         # Build system prompt
         sys_prompt = self._build_sys_prompt()
+        self._sys_prompt_tokens: Optional[tuple[str, int]] = None
 
         # Create model and formatter using factory method
         model, formatter = create_model_and_formatter()
@@ -170,7 +204,7 @@ class CoPawAgent(ToolGuardMixin, ReActAgent):
         toolkit = Toolkit()
 
         # Load config to check which tools are enabled
-        config = load_config()
+        config = get_config_snapshot()
         enabled_tools = {}
         if hasattr(config, "tools") and hasattr(config.tools, "builtin_tools"):
             enabled_tools = {
@@ -214,21 +248,19 @@ class CoPawAgent(ToolGuardMixin, ReActAgent):
         # Check skills initialization
         ensure_skills_initialized()
 
-        working_skills_dir = get_working_skills_dir()
-        available_skills = list_available_skills()
-
-        for skill_name in available_skills:
-            skill_dir = working_skills_dir / skill_name
-            if skill_dir.exists():
-                try:
-                    toolkit.register_agent_skill(str(skill_dir))
-                    logger.debug("Registered skill: %s", skill_name)
-                except Exception as e:
-                    logger.error(
-                        "Failed to register skill '%s': %s",
-                        skill_name,
-                        e,
-                    )
+        # Metadata comes from the skill index, which only re-parses a
+        # SKILL.md when it changed on disk
+        skill_index = get_skill_index(get_working_skills_dir())
+        for skill_name, entry in skill_index.entries().items():
+            try:
+                _register_indexed_skill(toolkit, entry)
+                logger.debug("Registered skill: %s", skill_name)
+            except Exception as e:
+                logger.error(
+                    "Failed to register skill '%s': %s",
+                    skill_name,
+                    e,
+                )
 
     def _build_sys_prompt(self) -> str:
         """Build system prompt from working dir files and env context.
@@ -241,6 +273,27 @@ class CoPawAgent(ToolGuardMixin, ReActAgent):
             sys_prompt = self._env_context + "\n\n" + sys_prompt
         return sys_prompt
 
+    def _set_sys_prompt(self, sys_prompt: str) -> None:
+        """Replace the system prompt, keeping the old object if equal.
+
+        Keeping the identical string lets ``sys_prompt_token_count``
+        reuse its cached count across requests.
+        """
+        if sys_prompt != getattr(self, "_sys_prompt", None):
+            self._sys_prompt = sys_prompt
+
+    @property
+    def sys_prompt_token_count(self) -> int:
+        """Token count of the current system prompt, cached with it."""
+        cached = self._sys_prompt_tokens
+        if cached is None or cached[0] is not self._sys_prompt:
+            cached = (
+                self._sys_prompt,
+                safe_count_str_tokens(self._sys_prompt),
+            )
+            self._sys_prompt_tokens = cached
+        return cached[1]
+
     def _setup_memory_manager(
         self,
         enable_memory_manager: bool,
@@ -279,7 +332,7 @@ class CoPawAgent(ToolGuardMixin, ReActAgent):
     def _register_hooks(self) -> None:
         """Register pre-reasoning and pre-acting hooks."""
         # Bootstrap hook - checks BOOTSTRAP.md on first interaction
-        config = load_config()
+        config = get_config_snapshot()
         bootstrap_hook = BootstrapHook(
             working_dir=WORKING_DIR,
             language=config.agents.language,
@@ -312,13 +365,49 @@ class CoPawAgent(ToolGuardMixin, ReActAgent):
         Updates both self._sys_prompt and the first system-role
         message stored in self.memory.content (if one exists).
         """
-        self._sys_prompt = self._build_sys_prompt()
+        self._set_sys_prompt(self._build_sys_prompt())
 
         for msg, _marks in self.memory.content:
             if msg.role == "system":
                 msg.content = self.sys_prompt
             break
 
+    def rebind_request(
+        self,
+        env_context: Optional[str] = None,
+        request_context: Optional[dict[str, str]] = None,
+        max_iters: Optional[int] = None,
+    ) -> None:
+        """Rebind a pooled agent to a new request.
+
+        Toolkit, skills, model and hooks are kept; everything that is
+        specific to a session (memory, request context, env context and
+        pending tool-guard state) is reset so no state leaks between
+        conversations.
+
+        Args:
+            env_context: Environment context to prepend to system prompt
+            request_context: Session/user/channel of the new request
+            max_iters: Maximum number of reasoning-acting iterations
+        """
+        self._env_context = env_context
+        self._request_context = dict(request_context or {})
+        if max_iters is not None:
+            self.max_iters = max_iters
+
+        if self._enable_memory_manager and self.memory_manager is not None:
+            self.memory = self.memory_manager.get_in_memory_memory()
+            self.memory_manager.chat_model = self.model
+            self.memory_manager.formatter = self.formatter
+        else:
+            self.memory = InMemoryMemory()
+        self.command_handler.memory = self.memory
+
+        if hasattr(self, "_tool_guard_pending_info"):
+            self._tool_guard_pending_info = None
+
+        self._set_sys_prompt(self._build_sys_prompt())
+
     async def register_mcp_clients(
         self,
         namesake_strategy: NamesakeStrategy = "skip",
@@ -525,8 +614,13 @@ class CoPawAgent(ToolGuardMixin, ReActAgent):
             await self.print(msg)
             return msg
 
-        # Normal message processing
-        return await super().reply(msg=msg, structured_model=structured_model)
+        # Normal message processing; browser_use calls made while
+        # replying get this session's own browser context.
+        with browser_session(self._request_context.get("session_id", "")):
+            return await super().reply(
+                msg=msg,
+                structured_model=structured_model,
+            )
 
     async def interrupt(self, msg: Msg | list[Msg] | None = None) -> None:
         """Interrupt the current reply process and wait for cleanup."""
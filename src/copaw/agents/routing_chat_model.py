@@ -3,9 +3,15 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import json
 import logging
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, AsyncGenerator, Literal, Type
+from typing import Any, AsyncGenerator, Callable, Literal, Optional, Type
 
 from agentscope.formatter import FormatterBase
 from agentscope.model import ChatModelBase
@@ -13,24 +19,145 @@ from agentscope.model._model_response import ChatResponse
 from pydantic import BaseModel
 
 from ..config.config import AgentsLLMRoutingConfig
+from ..constant import LLM_ROUTING_TRACE_FILE, WORKING_DIR
 
 logger = logging.getLogger(__name__)
 
 
 Route = Literal["local", "cloud"]
 
+# Rolling window of latency samples kept per endpoint.
+_LATENCY_WINDOW = 200
+# Samples needed before an endpoint's latency estimate is trusted.
+_MIN_SAMPLES = 5
+# Prompts are billed at least this many tokens, standing in for the
+# fixed per-request overhead (connection, scheduling, first token).
+_TOKEN_FLOOR = 256
+# A side that lost every decision for this long is probed once so its
+# latency estimate does not go stale.
+_STALE_SECONDS = 300.0
+
+_CHARS_PER_TOKEN = 4
+
 
 @dataclass
 class RoutingDecision:
     route: Route
     reasons: list[str] = field(default_factory=list)
+    prompt_tokens: int = 0
+    # Estimated seconds per route (adaptive mode only).
+    estimates: dict[str, float] = field(default_factory=dict)
+
+
+class EndpointStats:
+    """Rolling latency samples and live load of one routing endpoint."""
+
+    def __init__(self, window: int = _LATENCY_WINDOW) -> None:
+        # (prompt tokens, seconds)
+        self._samples: deque[tuple[int, float]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.last_used = 0.0
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._samples)
+
+    def begin(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def end(
+        self,
+        seconds: Optional[float] = None,
+        prompt_tokens: int = 0,
+    ) -> None:
+        """Finish a call; ``seconds`` is None if it is not a sample."""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if seconds is not None:
+                self._samples.append((prompt_tokens, seconds))
+
+    def p95_latency(self, prompt_tokens: int) -> Optional[float]:
+        """Rolling p95 latency for a prompt of ``prompt_tokens``.
+
+        Uses samples of similar size (within 2x) when there are enough,
+        each scaled linearly to ``prompt_tokens``. Returns None until
+        ``_MIN_SAMPLES`` calls were measured.
+        """
+        with self._lock:
+            samples = list(self._samples)
+        if len(samples) < _MIN_SAMPLES:
+            return None
+        size = max(prompt_tokens, _TOKEN_FLOOR)
+        similar = [
+            (tokens, seconds)
+            for tokens, seconds in samples
+            if size / 2 <= max(tokens, _TOKEN_FLOOR) <= size * 2
+        ]
+        if len(similar) >= _MIN_SAMPLES:
+            samples = similar
+        ordered = sorted(
+            seconds * size / max(tokens, _TOKEN_FLOOR)
+            for tokens, seconds in samples
+        )
+        return ordered[max(0, round(0.95 * len(ordered)) - 1)]
+
+
+_endpoint_stats: dict[tuple[str, str], EndpointStats] = {}
+_endpoint_stats_lock = threading.Lock()
+
+
+def get_endpoint_stats(provider_id: str, model_name: str) -> EndpointStats:
+    """Get the process-wide stats of an endpoint (shared by all agents)."""
+    key = (provider_id, model_name)
+    with _endpoint_stats_lock:
+        stats = _endpoint_stats.get(key)
+        if stats is None:
+            stats = EndpointStats()
+            _endpoint_stats[key] = stats
+        return stats
+
+
+def estimate_prompt_tokens(messages: list[dict]) -> int:
+    """Cheap prompt size estimate (characters / 4) of text content."""
+    chars = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and isinstance(
+                    block.get("text"),
+                    str,
+                ):
+                    chars += len(block["text"])
+    return chars // _CHARS_PER_TOKEN
 
 
 class RoutingPolicy:
-    """Select a route using the configured default mode."""
+    """Select a route for each call.
 
-    def __init__(self, cfg: AgentsLLMRoutingConfig):
+    ``local_first`` and ``cloud_first`` always pick the configured side.
+    ``adaptive`` first applies hard constraints (``cloud_allowed``,
+    ``local_tools``, ``local_max_prompt_tokens``) and otherwise picks the
+    side with the lower estimated latency: its rolling p95 scaled to the
+    prompt size, multiplied for the local backend by the number of calls
+    it is already serving plus one, since it serves them one at a time.
+    """
+
+    def __init__(
+        self,
+        cfg: AgentsLLMRoutingConfig,
+        local_stats: Optional[EndpointStats] = None,
+        cloud_stats: Optional[EndpointStats] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.cfg = cfg
+        self.local_stats = local_stats or EndpointStats()
+        self.cloud_stats = cloud_stats or EndpointStats()
+        self._clock = clock
 
     def decide(
         self,
@@ -38,19 +165,128 @@ class RoutingPolicy:
         text: str = "",
         channel: str = "",
         tools_available: bool = True,
+        prompt_tokens: Optional[int] = None,
     ) -> RoutingDecision:
-        del text, channel, tools_available
+        del channel
+        if prompt_tokens is None:
+            prompt_tokens = len(text) // _CHARS_PER_TOKEN
 
-        if getattr(self.cfg, "mode", "local_first") == "cloud_first":
+        mode = getattr(self.cfg, "mode", "local_first")
+        if mode == "cloud_first":
             return RoutingDecision(
                 route="cloud",
                 reasons=["mode:cloud_first"],
+                prompt_tokens=prompt_tokens,
+            )
+        if mode != "adaptive":
+            return RoutingDecision(
+                route="local",
+                reasons=["mode:local_first"],
+                prompt_tokens=prompt_tokens,
             )
 
-        return RoutingDecision(
-            route="local",
-            reasons=["mode:local_first"],
+        decision = self._decide_adaptive(prompt_tokens, tools_available)
+        decision.prompt_tokens = prompt_tokens
+        stats = (
+            self.local_stats if decision.route == "local" else self.cloud_stats
         )
+        stats.last_used = self._clock()
+        return decision
+
+    def _decide_adaptive(  # pylint: disable=R0911
+        self,
+        prompt_tokens: int,
+        tools_available: bool,
+    ) -> RoutingDecision:
+        cfg = self.cfg
+        if not cfg.cloud_allowed:
+            return RoutingDecision("local", ["privacy:local_only"])
+        if tools_available and not cfg.local_tools:
+            return RoutingDecision("cloud", ["tools:local_unsupported"])
+        limit = cfg.local_max_prompt_tokens
+        if limit and prompt_tokens > limit:
+            return RoutingDecision(
+                "cloud",
+                [f"prompt_tokens:{prompt_tokens}>{limit}"],
+            )
+
+        queue = self.local_stats.in_flight
+        local_p95 = self.local_stats.p95_latency(prompt_tokens)
+        cloud_p95 = self.cloud_stats.p95_latency(prompt_tokens)
+        # Cold start: measure each side before comparing them.
+        if local_p95 is None and queue == 0:
+            return RoutingDecision("local", ["explore:local"])
+        if cloud_p95 is None:
+            return RoutingDecision("cloud", ["explore:cloud"])
+        if local_p95 is None:
+            return RoutingDecision("cloud", [f"local_queue:{queue}"])
+
+        local_est = local_p95 * (queue + 1)
+        estimates = {"local": local_est, "cloud": cloud_p95}
+        route: Route = "local" if local_est <= cloud_p95 else "cloud"
+        reasons = [
+            f"local_est:{local_est:.2f}s",
+            f"cloud_est:{cloud_p95:.2f}s",
+            f"local_queue:{queue}",
+        ]
+        loser = self.cloud_stats if route == "local" else self.local_stats
+        if self._clock() - loser.last_used > _STALE_SECONDS and (
+            route == "local" or queue == 0
+        ):
+            route = "cloud" if route == "local" else "local"
+            reasons.append("probe:stale")
+        return RoutingDecision(route, reasons, estimates=estimates)
+
+
+# Trace lines waiting to be written, and whether a writer is running;
+# _trace_file_lock serializes writes so that a flush (at exit) returns
+# only once everything queued before it is on disk.
+_trace_lock = threading.Lock()
+_trace_file_lock = threading.Lock()
+_trace_pending: list[str] = []
+_trace_writing = False
+
+
+def _append_trace(record: dict[str, Any]) -> None:
+    """Queue one routing record for LLM_ROUTING_TRACE_FILE.
+
+    The file is appended to from a worker thread, so a call on the event
+    loop never waits for disk; records queued meanwhile share a write.
+    """
+    global _trace_writing
+    with _trace_lock:
+        _trace_pending.append(json.dumps(record) + "\n")
+        if _trace_writing:
+            return
+        _trace_writing = True
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _write_trace()
+    else:
+        loop.run_in_executor(None, _write_trace)
+
+
+def _write_trace() -> None:
+    """Write queued trace records until none are left (best effort)."""
+    global _trace_writing
+    path = WORKING_DIR / LLM_ROUTING_TRACE_FILE
+    while True:
+        with _trace_file_lock:
+            with _trace_lock:
+                lines = _trace_pending[:]
+                del _trace_pending[:]
+                if not lines:
+                    _trace_writing = False
+                    return
+            try:
+                with open(path, "a", encoding="utf-8") as file:
+                    file.write("".join(lines))
+            except OSError as e:
+                logger.debug("Failed to write routing trace: %s", e)
+
+
+atexit.register(_write_trace)
 
 
 @dataclass(frozen=True)
@@ -79,7 +315,17 @@ class RoutingChatModel(ChatModelBase):
         self.local_endpoint = local_endpoint
         self.cloud_endpoint = cloud_endpoint
         self.routing_cfg = routing_cfg
-        self.policy = RoutingPolicy(routing_cfg)
+        self.policy = RoutingPolicy(
+            routing_cfg,
+            local_stats=get_endpoint_stats(
+                local_endpoint.provider_id,
+                local_endpoint.model_name,
+            ),
+            cloud_stats=get_endpoint_stats(
+                cloud_endpoint.provider_id,
+                cloud_endpoint.model_name,
+            ),
+        )
 
     async def __call__(
         self,
@@ -89,34 +335,91 @@ class RoutingChatModel(ChatModelBase):
         structured_model: Type[BaseModel] | None = None,
         **kwargs: Any,
     ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
-        text = " ".join(
-            message["content"]
-            for message in messages
-            if message.get("role") == "user"
-            and isinstance(message.get("content"), str)
-        )
+        prompt_tokens = estimate_prompt_tokens(messages)
         decision = self.policy.decide(
-            text=text,
             tools_available=tools is not None,
+            prompt_tokens=prompt_tokens,
         )
-        endpoint = (
-            self.local_endpoint
-            if decision.route == "local"
-            else self.cloud_endpoint
-        )
+        if decision.route == "local":
+            endpoint, stats = self.local_endpoint, self.policy.local_stats
+        else:
+            endpoint, stats = self.cloud_endpoint, self.policy.cloud_stats
 
-        logger.debug(
-            "LLM routing decision: route=%s provider=%s model=%s reasons=%s",
+        # Only adaptive mode decides anything; the fixed modes would
+        # log the same line on every call.
+        adaptive = getattr(self.routing_cfg, "mode", "") == "adaptive"
+        logger.log(
+            logging.INFO if adaptive else logging.DEBUG,
+            "LLM routing decision: route=%s provider=%s model=%s "
+            "prompt_tokens=%d reasons=%s",
             decision.route,
             endpoint.provider_id,
             endpoint.model_name,
+            prompt_tokens,
             ",".join(decision.reasons),
         )
 
-        return await endpoint.model(
-            messages=messages,
-            tools=tools,
-            tool_choice=tool_choice,
-            structured_model=structured_model,
-            **kwargs,
+        record = {
+            "route": decision.route,
+            "prompt_tokens": prompt_tokens,
+            "tools": tools is not None,
+            "local_queue": self.policy.local_stats.in_flight,
+            "reasons": decision.reasons,
+        }
+        stats.begin()
+        started = time.monotonic()
+        try:
+            result = await endpoint.model(
+                messages=messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                structured_model=structured_model,
+                **kwargs,
+            )
+        except Exception:
+            self._finish(stats, record, started, False)
+            raise
+        if isinstance(result, AsyncGenerator):
+            return self._track_stream(result, stats, record, started)
+        self._finish(stats, record, started, True)
+        return result
+
+    async def _track_stream(
+        self,
+        stream: AsyncGenerator[ChatResponse, None],
+        stats: EndpointStats,
+        record: dict[str, Any],
+        started: float,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        ok = False
+        try:
+            async for chunk in stream:
+                yield chunk
+            ok = True
+        finally:
+            self._finish(stats, record, started, ok)
+
+    def _finish(
+        self,
+        stats: EndpointStats,
+        record: dict[str, Any],
+        started: float,
+        ok: bool,
+    ) -> None:
+        """Record a finished call's latency (and trace it if enabled)."""
+        seconds = time.monotonic() - started
+        # A queued local call measures the queue too, which the policy
+        # already accounts for; only unqueued calls are latency samples.
+        sample = ok and not (
+            record["route"] == "local" and record["local_queue"]
         )
+        stats.end(seconds if sample else None, record["prompt_tokens"])
+        if LLM_ROUTING_TRACE_FILE:
+            _append_trace(
+                {
+                    "ts": round(time.time() - seconds, 4),
+                    **record,
+                    "latency": round(seconds, 4),
+                    "ok": ok,
+                },
+            )
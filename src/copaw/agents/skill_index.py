@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""Persistent index of skill directories.
+
+Listing skills used to mean scanning the skills directory and parsing
+every SKILL.md frontmatter, on every agent build. A :class:`SkillIndex`
+keeps, per skills root, one entry per skill directory with the stat
+signature of the directory and its SKILL.md plus the parsed ``name`` and
+``description``. Checking that the index is current costs one ``stat``
+of the root and two per skill; only skills whose signature changed are
+re-parsed.
+
+Content digests of whole skill trees (used to compare an active skill
+with its builtin copy) are computed on demand and cached per file by
+(mtime, size), replacing ``filecmp`` tree walks that re-read every file.
+
+Indexes are persisted to ``SKILL_INDEX_FILE`` in the working dir so a
+restarted process does not re-parse unchanged skills.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import stat
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import frontmatter
+from pydantic import BaseModel
+
+from ..constant import SKILL_INDEX_FILE, WORKING_DIR
+
+logger = logging.getLogger(__name__)
+
+_INDEX_VERSION = 1
+
+# (mtime_ns, size)
+_StatSignature = tuple[int, int]
+
+
+class SkillIndexEntry(BaseModel):
+    """Cached metadata of one skill directory."""
+
+    dir_name: str
+    path: str
+    dir_mtime_ns: int
+    skill_md: _StatSignature
+    # ``name`` / ``description`` from SKILL.md frontmatter, as strings
+    # (None when missing or unparsable).
+    name: Optional[str] = None
+    description: Optional[str] = None
+    # Relative file path -> [mtime_ns, size, blake2b digest]
+    files: dict[str, tuple[int, int, str]] = {}
+
+
+def _stat(path: "str | Path") -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _parse_skill_md(skill_md: Path) -> tuple[Optional[str], Optional[str]]:
+    """Return (name, description) from SKILL.md frontmatter."""
+    try:
+        post = frontmatter.loads(skill_md.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(
+            "Failed to parse SKILL.md frontmatter for skill '%s': %s",
+            skill_md.parent.name,
+            e,
+        )
+        return None, None
+    name = post.get("name", None)
+    description = post.get("description", None)
+    return (
+        str(name) if name else None,
+        str(description) if description else None,
+    )
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SkillIndex:
+    """Index of the skill directories directly under one root."""
+
+    def __init__(
+        self,
+        root: Path,
+        entries: Optional[dict[str, SkillIndexEntry]] = None,
+        candidates: Optional[dict[str, int]] = None,
+        root_mtime_ns: Optional[int] = None,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            root: Skills directory (builtin, customized or active)
+            entries: Entries restored from disk, validated before use
+            candidates: Restored subdirectories without a SKILL.md
+            root_mtime_ns: Root mtime the restored state was taken at
+        """
+        self.root = root
+        self._entries: dict[str, SkillIndexEntry] = entries or {}
+        # Subdirectories without a SKILL.md, by dir mtime, so creating
+        # one there is noticed without listing the root again.
+        self._candidates: dict[str, int] = candidates or {}
+        self._root_mtime_ns = root_mtime_ns
+        self._lock = threading.RLock()
+        self._dirty = False
+
+    # ----- freshness -----
+
+    def _is_current(self, root_st: os.stat_result) -> bool:
+        if self._root_mtime_ns != root_st.st_mtime_ns:
+            return False
+        for entry in self._entries.values():
+            dir_st = _stat(entry.path)
+            md_st = _stat(os.path.join(entry.path, "SKILL.md"))
+            if (
+                dir_st is None
+                or md_st is None
+                or dir_st.st_mtime_ns != entry.dir_mtime_ns
+                or (md_st.st_mtime_ns, md_st.st_size) != entry.skill_md
+            ):
+                return False
+        root = str(self.root)
+        for dir_name, mtime_ns in self._candidates.items():
+            dir_st = _stat(os.path.join(root, dir_name))
+            if dir_st is None or dir_st.st_mtime_ns != mtime_ns:
+                return False
+        return True
+
+    def refresh(self) -> bool:
+        """Bring the index up to date with the directory.
+
+        Returns:
+            True if any entry was added, removed or re-parsed.
+        """
+        with self._lock:
+            root_st = _stat(self.root)
+            if root_st is None:
+                changed = bool(self._entries)
+                self._entries = {}
+                self._candidates = {}
+                self._root_mtime_ns = None
+                self._dirty = self._dirty or changed
+                return changed
+            if self._is_current(root_st):
+                return False
+
+            entries: dict[str, SkillIndexEntry] = {}
+            candidates: dict[str, int] = {}
+            changed = False
+            for skill_dir in self.root.iterdir():
+                dir_st = _stat(skill_dir)
+                if dir_st is None or not stat.S_ISDIR(dir_st.st_mode):
+                    continue
+                md_st = _stat(skill_dir / "SKILL.md")
+                if md_st is None:
+                    candidates[skill_dir.name] = dir_st.st_mtime_ns
+                    continue
+                signature = (md_st.st_mtime_ns, md_st.st_size)
+                old = self._entries.get(skill_dir.name)
+                if old is not None and old.skill_md == signature:
+                    if old.dir_mtime_ns != dir_st.st_mtime_ns:
+                        old.dir_mtime_ns = dir_st.st_mtime_ns
+                        changed = True
+                    entries[skill_dir.name] = old
+                    continue
+                name, description = _parse_skill_md(skill_dir / "SKILL.md")
+                entries[skill_dir.name] = SkillIndexEntry(
+                    dir_name=skill_dir.name,
+                    path=str(skill_dir),
+                    dir_mtime_ns=dir_st.st_mtime_ns,
+                    skill_md=signature,
+                    name=name,
+                    description=description,
+                    files=old.files if old is not None else {},
+                )
+                changed = True
+
+            changed = changed or entries.keys() != self._entries.keys()
+            self._entries = entries
+            self._candidates = candidates
+            self._root_mtime_ns = root_st.st_mtime_ns
+            self._dirty = self._dirty or changed
+            return changed
+
+    # ----- queries -----
+
+    def entries(self) -> dict[str, SkillIndexEntry]:
+        """Return current entries keyed by skill directory name."""
+        with self._lock:
+            changed = self.refresh()
+            entries = dict(self._entries)
+        if changed:
+            save_skill_indexes()
+        return entries
+
+    def names(self) -> list[str]:
+        """Return the names of the skill directories."""
+        return list(self.entries())
+
+    def signature(self) -> list[tuple[str, int, int]]:
+        """Return sorted (dir name, SKILL.md mtime_ns, size) tuples."""
+        return sorted(
+            (name, *entry.skill_md) for name, entry in self.entries().items()
+        )
+
+    def tree_digest(self, dir_name: str) -> Optional[str]:
+        """Return a digest of every file (path and content) of a skill.
+
+        Files whose (mtime, size) match the index are not re-read. New
+        file digests are kept in memory; call :func:`save_skill_indexes`
+        after a batch of comparisons to persist them.
+        Returns None if the skill is not in the index.
+        """
+        with self._lock:
+            entry = self._entries.get(dir_name)
+            if entry is None or not (self.root / dir_name).is_dir():
+                self.refresh()
+                entry = self._entries.get(dir_name)
+            if entry is None:
+                return None
+            skill_dir = Path(entry.path)
+            files: dict[str, tuple[int, int, str]] = {}
+            for dirpath, dirnames, filenames in os.walk(skill_dir):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    path = Path(dirpath) / filename
+                    st = _stat(path)
+                    if st is None:
+                        continue
+                    rel = path.relative_to(skill_dir).as_posix()
+                    cached = entry.files.get(rel)
+                    if cached is not None and tuple(cached[:2]) == (
+                        st.st_mtime_ns,
+                        st.st_size,
+                    ):
+                        files[rel] = tuple(cached)
+                    else:
+                        files[rel] = (
+                            st.st_mtime_ns,
+                            st.st_size,
+                            _file_digest(path),
+                        )
+            if files != entry.files:
+                entry.files = files
+                self._dirty = True
+            digest = hashlib.blake2b(digest_size=16)
+            for rel, (_, _, file_digest) in sorted(files.items()):
+                digest.update(rel.encode("utf-8"))
+                digest.update(b"\0")
+                digest.update(file_digest.encode("ascii"))
+        return digest.hexdigest()
+
+    # ----- persistence -----
+
+    def to_json(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "root_mtime_ns": self._root_mtime_ns,
+                "candidates": dict(self._candidates),
+                "entries": {
+                    name: entry.model_dump(mode="json")
+                    for name, entry in self._entries.items()
+                },
+            }
+
+    @classmethod
+    def from_json(cls, root: Path, data: dict[str, Any]) -> "SkillIndex":
+        entries = {
+            name: SkillIndexEntry.model_validate(raw)
+            for name, raw in data.get("entries", {}).items()
+        }
+        return cls(
+            root,
+            entries,
+            data.get("candidates", {}),
+            data.get("root_mtime_ns"),
+        )
+
+
+_indexes: dict[Path, SkillIndex] = {}
+_indexes_lock = threading.Lock()
+_loaded_from_disk = False
+
+
+def _index_path() -> Path:
+    return WORKING_DIR / SKILL_INDEX_FILE
+
+
+def _load_from_disk() -> None:
+    global _loaded_from_disk
+    if _loaded_from_disk:
+        return
+    _loaded_from_disk = True
+    try:
+        with open(_index_path(), "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != _INDEX_VERSION:
+            return
+        for root, raw in data.get("roots", {}).items():
+            _indexes[Path(root)] = SkillIndex.from_json(Path(root), raw)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.warning("Ignoring unreadable skill index: %s", e)
+
+
+def get_skill_index(root: Path) -> SkillIndex:
+    """Get the shared :class:`SkillIndex` for a skills directory."""
+    root = Path(root)
+    with _indexes_lock:
+        _load_from_disk()
+        index = _indexes.get(root)
+        if index is None:
+            index = SkillIndex(root)
+            _indexes[root] = index
+        return index
+
+
+def save_skill_indexes() -> None:
+    """Persist indexes with unsaved changes (best effort).
+
+    Nothing is written until the working dir exists (``copaw init``).
+    """
+    # pylint: disable=protected-access
+    with _indexes_lock:
+        indexes = list(_indexes.items())
+        if not any(index._dirty for _, index in indexes):
+            return
+        payload = {
+            "version": _INDEX_VERSION,
+            "roots": {str(root): index.to_json() for root, index in indexes},
+        }
+        path = _index_path()
+        if not path.parent.is_dir():
+            return
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(payload, file, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug("Failed to save skill index: %s", e)
+            return
+        for _, index in indexes:
+            index._dirty = False
+
+
+__all__ = [
+    "SkillIndex",
+    "SkillIndexEntry",
+    "get_skill_index",
+    "save_skill_indexes",
+]
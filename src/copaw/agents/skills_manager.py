@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """Skills management: sync skills from code to working_dir."""
 
-import filecmp
 import logging
 import shutil
 from pathlib import Path
@@ -10,6 +9,7 @@ from pydantic import BaseModel
 import frontmatter
 
 from ..constant import ACTIVE_SKILLS_DIR, CUSTOMIZED_SKILLS_DIR
+from .skill_index import get_skill_index, save_skill_indexes
 
 logger = logging.getLogger(__name__)
 
@@ -120,12 +120,10 @@ def _collect_skills_from_dir(directory: Path) -> dict[str, Path]:
     Returns:
         Dictionary mapping skill names to their paths.
     """
-    skills: dict[str, Path] = {}
-    if directory.exists():
-        for skill_dir in directory.iterdir():
-            if skill_dir.is_dir() and (skill_dir / "SKILL.md").exists():
-                skills[skill_dir.name] = skill_dir
-    return skills
+    return {
+        name: Path(entry.path)
+        for name, entry in get_skill_index(directory).entries().items()
+    }
 
 
 def sync_skills_to_working_dir(
@@ -189,6 +187,12 @@ def sync_skills_to_working_dir(
             skipped_count += 1
             continue
 
+        # Already identical: nothing to copy
+        if target_dir.exists() and _is_directory_same(skill_dir, target_dir):
+            logger.debug("Skill '%s' is already up to date.", skill_name)
+            synced_count += 1
+            continue
+
         # Copy skill directory
         try:
             if target_dir.exists():
@@ -203,16 +207,20 @@ def sync_skills_to_working_dir(
                 e,
             )
 
+    save_skill_indexes()
     return synced_count, skipped_count
 
 
 def _is_directory_same(dir1: Path, dir2: Path) -> bool:
     """
-    Check if two directories have the same content.
+    Check if two skill directories have the same content.
+
+    Compares tree digests from the skill index, so files unchanged since
+    they were last hashed are not re-read.
 
     Args:
-        dir1: First directory path.
-        dir2: Second directory path.
+        dir1: First skill directory path.
+        dir2: Second skill directory path.
 
     Returns:
         True if directories have the same structure and file contents.
@@ -220,37 +228,10 @@ def _is_directory_same(dir1: Path, dir2: Path) -> bool:
     if not dir1.exists() or not dir2.exists():
         return False
 
-    dcmp = filecmp.dircmp(dir1, dir2)
-
-    if dcmp.left_only or dcmp.right_only or dcmp.funny_files:
-        return False
-
-    if dcmp.diff_files:
-        return False
-
-    for sub_dcmp in dcmp.subdirs.values():
-        if not _compare_dircmp(sub_dcmp):
-            return False
-
-    return True
-
-
-def _compare_dircmp(dcmp: "filecmp.dircmp") -> bool:
-    """Helper to recursively compare dircmp objects."""
-    has_diff = any(
-        [
-            dcmp.left_only,
-            dcmp.right_only,
-            dcmp.funny_files,
-            dcmp.diff_files,
-        ],
-    )
-    if has_diff:
+    digest1 = get_skill_index(dir1.parent).tree_digest(dir1.name)
+    if digest1 is None:
         return False
-    for sub_dcmp in dcmp.subdirs.values():
-        if not _compare_dircmp(sub_dcmp):
-            return False
-    return True
+    return digest1 == get_skill_index(dir2.parent).tree_digest(dir2.name)
 
 
 def sync_skills_from_active_to_customized(
@@ -309,6 +290,7 @@ def sync_skills_from_active_to_customized(
                 e,
             )
 
+    save_skill_indexes()
     return synced_count, skipped_count
 
 
@@ -319,16 +301,7 @@ def list_available_skills() -> list[str]:
     Returns:
         List of skill names.
     """
-    active_skills = get_active_skills_dir()
-
-    if not active_skills.exists():
-        return []
-
-    return [
-        d.name
-        for d in active_skills.iterdir()
-        if d.is_dir() and (d / "SKILL.md").exists()
-    ]
+    return get_skill_index(get_active_skills_dir()).names()
 
 
 def ensure_skills_initialized() -> None:
@@ -372,35 +345,14 @@ def _read_skills_from_dir(
     """
     skills: list[SkillInfo] = []
 
-    if not directory.exists():
-        return skills
-
-    for skill_dir in directory.iterdir():
-        if not skill_dir.is_dir():
-            continue
-
+    for entry in get_skill_index(directory).entries().values():
+        skill_dir = Path(entry.path)
         skill_md = skill_dir / "SKILL.md"
-        if not skill_md.exists():
-            continue
 
         try:
             content = skill_md.read_text(encoding="utf-8")
-            description = ""
-            try:
-                post = frontmatter.loads(content)
-                description = str(post.get("description", "") or "")
-            except Exception as e:
-                logger.warning(
-                    "Failed to parse SKILL.md frontmatter for skill '%s': %s",
-                    skill_dir.name,
-                    e,
-                )
-                logger.debug(
-                    "Invalid SKILL.md frontmatter/content in '%s': %r",
-                    skill_md,
-                    e,
-                )
-                description = ""
+            # Parsed once per SKILL.md change by the skill index
+            description = entry.description or ""
 
             # Build references directory tree
             references = {}
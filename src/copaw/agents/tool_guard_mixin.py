@@ -17,6 +17,7 @@ from typing import Any, Literal
 from agentscope.message import Msg
 
 from ..security.tool_guard.models import TOOL_GUARD_DENIED_MARK
+from ..utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +124,8 @@ class ToolGuardMixin:
                         "set, auto-denying",
                         tool_name,
                     )
-                    result = engine.guard(tool_name, tool_input)
+                    with span("tool.guard", tool=tool_name):
+                        result = engine.guard(tool_name, tool_input)
                     return await self._acting_auto_denied(
                         tool_call,
                         tool_name,
@@ -153,11 +155,13 @@ class ToolGuardMixin:
                             await cleanup(
                                 include_denial_response=True,
                             )
-                            return await super()._acting(  # type: ignore[misc]
-                                tool_call,
-                            )
+                            with span("tool.execute", tool=tool_name):
+                                return await super()._acting(  # type: ignore
+                                    tool_call,
+                                )
 
-                    result = engine.guard(tool_name, tool_input)
+                    with span("tool.guard", tool=tool_name):
+                        result = engine.guard(tool_name, tool_input)
                     if result is not None and result.findings:
                         from copaw.security.tool_guard.utils import (
                             log_findings,
@@ -178,7 +182,8 @@ class ToolGuardMixin:
                 exc_info=True,
             )
 
-        return await super()._acting(tool_call)  # type: ignore[misc]
+        with span("tool.execute", tool=tool_name):
+            return await super()._acting(tool_call)  # type: ignore[misc]
 
     # ------------------------------------------------------------------
     # Denied / Approval responses
@@ -346,6 +351,7 @@ class ToolGuardMixin:
         if tool_choice is None and self.toolkit.get_json_schemas():
             tool_choice = "auto"
 
-        return await super()._reasoning(  # type: ignore[misc]
-            tool_choice=tool_choice,
-        )
+        with span("agent.reasoning"):
+            return await super()._reasoning(  # type: ignore[misc]
+                tool_choice=tool_choice,
+            )
@@ -28,8 +28,26 @@ from ...config import (
     get_system_default_browser,
     is_running_in_container,
 )
+from ...constant import (
+    BROWSER_CONTEXT_IDLE_TIMEOUT,
+    BROWSER_CONTEXT_MEMORY_MB,
+    BROWSER_IDLE_TIMEOUT,
+    BROWSER_MAX_PAGES_PER_CONTEXT,
+    BROWSER_SNAPSHOT_DIFF_MAX_RATIO,
+    BROWSER_SNAPSHOT_MODE,
+)
 
-from .browser_snapshot import build_role_snapshot_from_aria
+from .browser_pool import (
+    BrowserContextPool,
+    BrowserSession,
+    current_session_key,
+    new_page_state,
+)
+from .browser_snapshot import (
+    build_role_snapshot_from_aria,
+    diff_role_snapshot,
+    snapshot_digest,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -67,36 +85,43 @@ else:
         return await func(*args, **kwargs)
 
 
-# Process-global browser state (one browser, multiple pages by page_id)
+# Process-global browser state (one browser shared by all sessions)
 _state: dict[str, Any] = {
     "playwright": None,
     "browser": None,
-    "context": None,
-    "pages": {},
-    "refs": {},  # page_id -> ref -> {role, name?, nth?}
-    "refs_frame": {},  # page_id -> frame for last snapshot
-    "console_logs": {},  # page_id -> list of {level, text}
-    "network_requests": {},  # page_id -> list of request dicts
-    "pending_dialogs": {},  # page_id -> dialog handlers
-    "pending_file_choosers": {},  # page_id -> FileChooser list
     "headless": True,
-    "current_page_id": None,
-    "page_counter": 0,  # monotonic counter for page_N ids, avoids reuse after close
     "last_activity_time": 0.0,  # monotonic timestamp of last browser activity
     "_idle_task": None,  # background asyncio.Task for idle watchdog
     "_last_browser_error": None,  # message when launch failed (for user-facing error)
     "_sync_browser": None,  # sync browser handle for hybrid mode
-    "_sync_context": None,  # sync context handle for hybrid mode
     "_sync_playwright": None,  # sync playwright handle for hybrid mode
 }
 
-# Stop the browser after this many seconds of inactivity (default 30 minutes).
-_BROWSER_IDLE_TIMEOUT = 1800.0
+# Per-session browser contexts; pages, refs, logs etc. live in each
+# session's state (see browser_pool.new_page_state).
+_pool = BrowserContextPool()
+# Serializes launching the browser, so sessions that find it stopped
+# start one browser (and attach the pool once) between them.
+_LAUNCH_LOCK = asyncio.Lock()
+
+
+def _current_session() -> Optional[BrowserSession]:
+    """Context checked out to the session of the running action, if any."""
+    return _pool.get(current_session_key())
+
+
+def _session() -> dict[str, Any]:
+    """Page state of the current session (empty if it has no context)."""
+    session = _current_session()
+    return session.state if session is not None else new_page_state()
 
 
 def _touch_activity() -> None:
     """Record the current time as the last browser activity timestamp."""
     _state["last_activity_time"] = time.monotonic()
+    session = _current_session()
+    if session is not None:
+        session.touch()
 
 
 def _is_browser_running() -> bool:
@@ -111,43 +136,46 @@ def _reset_browser_state() -> None:
     # Clear sync/async specific state
     _state["playwright"] = None
     _state["browser"] = None
-    _state["context"] = None
     _state["_sync_playwright"] = None
     _state["_sync_browser"] = None
-    _state["_sync_context"] = None
-    # Clear shared state
-    _state["pages"].clear()
-    _state["refs"].clear()
-    _state["refs_frame"].clear()
-    _state["console_logs"].clear()
-    _state["network_requests"].clear()
-    _state["pending_dialogs"].clear()
-    _state["pending_file_choosers"].clear()
-    _state["current_page_id"] = None
-    _state["page_counter"] = 0
+    # Contexts (and their pages) went away with the browser
+    _pool.clear()
     _state["last_activity_time"] = 0.0
     _state["headless"] = True
 
 
-async def _idle_watchdog(idle_seconds: float = _BROWSER_IDLE_TIMEOUT) -> None:
-    """Background task: stop the browser after it has been idle for *idle_seconds*.
+async def _idle_watchdog(
+    context_idle_seconds: float = BROWSER_CONTEXT_IDLE_TIMEOUT,
+    browser_idle_seconds: float = BROWSER_IDLE_TIMEOUT,
+) -> None:
+    """Background task: recycle contexts idle for *context_idle_seconds*.
 
     This reclaims Chrome renderer processes that accumulate when pages are
-    opened during agent tasks but never explicitly closed.
+    opened during agent tasks but never explicitly closed, while keeping
+    the browser (and its warm contexts) up for the next session. The
+    browser itself is only stopped after *browser_idle_seconds* (0 =
+    never) without any activity.
     """
     try:
         while True:
             await asyncio.sleep(60)  # check every minute
             if not _is_browser_running():
                 return
+            recycled = await _pool.recycle_idle(context_idle_seconds)
+            if recycled:
+                logger.info(
+                    "Recycled %d browser context(s) idle for %.0fs",
+                    recycled,
+                    context_idle_seconds,
+                )
             idle = time.monotonic() - _state.get("last_activity_time", 0.0)
-            if idle >= idle_seconds:
+            if browser_idle_seconds and idle >= browser_idle_seconds:
                 logger.info(
                     "Browser idle for %.0fs (limit %.0fs), stopping to release resources",
                     idle,
-                    idle_seconds,
+                    browser_idle_seconds,
                 )
-                await _action_stop()
+                await _action_stop(all_sessions=True)
                 return
     except asyncio.CancelledError:
         pass
@@ -166,7 +194,7 @@ def _atexit_cleanup() -> None:
     try:
         loop = asyncio.get_event_loop()
         if not loop.is_running() and not loop.is_closed():
-            loop.run_until_complete(_action_stop())
+            loop.run_until_complete(_action_stop(all_sessions=True))
     except Exception:
         pass
 
@@ -263,10 +291,7 @@ def _sync_browser_launch(headless: bool):
         if extra_args:
             launch_kwargs["args"] = extra_args
         browser = pw.chromium.launch(**launch_kwargs)
-
-    context = browser.new_context()
-    _attach_context_listeners(context)
-    return pw, browser, context
+    return pw, browser
 
 
 def _sync_browser_close():
@@ -340,6 +365,7 @@ async def browser_use(  # pylint: disable=R0911,R0912
     text_gone: str = "",
     frame_selector: str = "",
     headed: bool = False,
+    snapshot_mode: str = "",
 ) -> ToolResponse:
     """Control browser (Playwright). Default is headless. Use headed=True with
     action=start to open a visible browser window. Flow: start, open(url),
@@ -451,6 +477,12 @@ async def browser_use(  # pylint: disable=R0911,R0912
         headed (bool):
             When True with action=start, launch a visible browser window
             (non-headless). User can see the real browser. Default False.
+        snapshot_mode (str):
+            "full" or "diff". Used with action=snapshot. "full" (default)
+            returns the whole tree; "diff" returns only the nodes added,
+            removed or changed since the page's previous snapshot, with
+            refs kept stable. Only use "diff" while that previous
+            snapshot is still in your context.
     """
     action = (action or "").strip().lower()
     if not action:
@@ -463,158 +495,173 @@ async def browser_use(  # pylint: disable=R0911,R0912
         )
 
     page_id = (page_id or "default").strip() or "default"
-    current = _state.get("current_page_id")
-    pages = _state.get("pages") or {}
+    current = _session().get("current_page_id")
+    pages = _session().get("pages") or {}
     if page_id == "default" and current and current in pages:
         page_id = current
+    session = _current_session()
+    if session is not None:
+        session.touch(page_id)
 
-    try:
-        if action == "start":
-            return await _action_start(headed=headed)
-        if action == "stop":
-            return await _action_stop()
-        if action == "open":
-            return await _action_open(url, page_id)
-        if action == "navigate":
-            return await _action_navigate(url, page_id)
-        if action == "navigate_back":
-            return await _action_navigate_back(page_id)
-        if action in ("screenshot", "take_screenshot"):
-            return await _action_screenshot(
-                page_id,
-                path or filename,
-                full_page,
-                screenshot_type,
-                ref,
-                element,
-                frame_selector,
-            )
-        if action == "snapshot":
-            return await _action_snapshot(
-                page_id,
-                snapshot_filename or filename,
-                frame_selector,
-            )
-        if action == "click":
-            return await _action_click(
-                page_id,
-                selector,
-                ref,
-                element,
-                wait,
-                double_click,
-                button,
-                modifiers_json,
-                frame_selector,
-            )
-        if action == "type":
-            return await _action_type(
-                page_id,
-                selector,
-                ref,
-                element,
-                text,
-                submit,
-                slowly,
-                frame_selector,
-            )
-        if action == "eval":
-            return await _action_eval(page_id, code)
-        if action == "evaluate":
-            return await _action_evaluate(
-                page_id,
-                code,
-                ref,
-                element,
-                frame_selector,
-            )
-        if action == "resize":
-            return await _action_resize(page_id, width, height)
-        if action == "console_messages":
-            return await _action_console_messages(
-                page_id,
-                level,
-                filename or path,
-            )
-        if action == "handle_dialog":
-            return await _action_handle_dialog(page_id, accept, prompt_text)
-        if action == "file_upload":
-            return await _action_file_upload(page_id, paths_json)
-        if action == "fill_form":
-            return await _action_fill_form(page_id, fields_json)
-        if action == "install":
-            return await _action_install()
-        if action == "press_key":
-            return await _action_press_key(page_id, key)
-        if action == "network_requests":
-            return await _action_network_requests(
-                page_id,
-                include_static,
-                filename or path,
-            )
-        if action == "run_code":
-            return await _action_run_code(page_id, code)
-        if action == "drag":
-            return await _action_drag(
-                page_id,
-                start_ref,
-                end_ref,
-                start_selector,
-                end_selector,
-                start_element,
-                end_element,
-                frame_selector,
-            )
-        if action == "hover":
-            return await _action_hover(
-                page_id,
-                ref,
-                element,
-                selector,
-                frame_selector,
+    # Keep this session's context from being recycled mid-action.
+    with _pool.using(current_session_key()):
+        try:
+            if action == "start":
+                return await _action_start(headed=headed)
+            if action == "stop":
+                return await _action_stop()
+            if action == "open":
+                return await _action_open(url, page_id)
+            if action == "navigate":
+                return await _action_navigate(url, page_id)
+            if action == "navigate_back":
+                return await _action_navigate_back(page_id)
+            if action in ("screenshot", "take_screenshot"):
+                return await _action_screenshot(
+                    page_id,
+                    path or filename,
+                    full_page,
+                    screenshot_type,
+                    ref,
+                    element,
+                    frame_selector,
+                )
+            if action == "snapshot":
+                return await _action_snapshot(
+                    page_id,
+                    snapshot_filename or filename,
+                    frame_selector,
+                    snapshot_mode,
+                )
+            if action == "click":
+                return await _action_click(
+                    page_id,
+                    selector,
+                    ref,
+                    element,
+                    wait,
+                    double_click,
+                    button,
+                    modifiers_json,
+                    frame_selector,
+                )
+            if action == "type":
+                return await _action_type(
+                    page_id,
+                    selector,
+                    ref,
+                    element,
+                    text,
+                    submit,
+                    slowly,
+                    frame_selector,
+                )
+            if action == "eval":
+                return await _action_eval(page_id, code)
+            if action == "evaluate":
+                return await _action_evaluate(
+                    page_id,
+                    code,
+                    ref,
+                    element,
+                    frame_selector,
+                )
+            if action == "resize":
+                return await _action_resize(page_id, width, height)
+            if action == "console_messages":
+                return await _action_console_messages(
+                    page_id,
+                    level,
+                    filename or path,
+                )
+            if action == "handle_dialog":
+                return await _action_handle_dialog(
+                    page_id,
+                    accept,
+                    prompt_text,
+                )
+            if action == "file_upload":
+                return await _action_file_upload(page_id, paths_json)
+            if action == "fill_form":
+                return await _action_fill_form(page_id, fields_json)
+            if action == "install":
+                return await _action_install()
+            if action == "press_key":
+                return await _action_press_key(page_id, key)
+            if action == "network_requests":
+                return await _action_network_requests(
+                    page_id,
+                    include_static,
+                    filename or path,
+                )
+            if action == "run_code":
+                return await _action_run_code(page_id, code)
+            if action == "drag":
+                return await _action_drag(
+                    page_id,
+                    start_ref,
+                    end_ref,
+                    start_selector,
+                    end_selector,
+                    start_element,
+                    end_element,
+                    frame_selector,
+                )
+            if action == "hover":
+                return await _action_hover(
+                    page_id,
+                    ref,
+                    element,
+                    selector,
+                    frame_selector,
+                )
+            if action == "select_option":
+                return await _action_select_option(
+                    page_id,
+                    ref,
+                    element,
+                    values_json,
+                    frame_selector,
+                )
+            if action == "tabs":
+                return await _action_tabs(page_id, tab_action, index)
+            if action == "wait_for":
+                return await _action_wait_for(
+                    page_id,
+                    wait_time,
+                    text,
+                    text_gone,
+                )
+            if action == "pdf":
+                return await _action_pdf(page_id, path)
+            if action == "close":
+                return await _action_close(page_id)
+            return _tool_response(
+                json.dumps(
+                    {"ok": False, "error": f"Unknown action: {action}"},
+                    ensure_ascii=False,
+                    indent=2,
+                ),
             )
-        if action == "select_option":
-            return await _action_select_option(
-                page_id,
-                ref,
-                element,
-                values_json,
-                frame_selector,
+        except Exception as e:
+            logger.error("Browser tool error: %s", e, exc_info=True)
+            return _tool_response(
+                json.dumps(
+                    {"ok": False, "error": str(e)},
+                    ensure_ascii=False,
+                    indent=2,
+                ),
             )
-        if action == "tabs":
-            return await _action_tabs(page_id, tab_action, index)
-        if action == "wait_for":
-            return await _action_wait_for(page_id, wait_time, text, text_gone)
-        if action == "pdf":
-            return await _action_pdf(page_id, path)
-        if action == "close":
-            return await _action_close(page_id)
-        return _tool_response(
-            json.dumps(
-                {"ok": False, "error": f"Unknown action: {action}"},
-                ensure_ascii=False,
-                indent=2,
-            ),
-        )
-    except Exception as e:
-        logger.error("Browser tool error: %s", e, exc_info=True)
-        return _tool_response(
-            json.dumps(
-                {"ok": False, "error": str(e)},
-                ensure_ascii=False,
-                indent=2,
-            ),
-        )
 
 
 def _get_page(page_id: str):
     """Return page for page_id or None if not found."""
-    return _state["pages"].get(page_id)
+    return _session()["pages"].get(page_id)
 
 
 def _get_refs(page_id: str) -> dict[str, dict]:
     """Return refs map for page_id (ref -> {role, name?, nth?})."""
-    return _state["refs"].setdefault(page_id, {})
+    return _session()["refs"].setdefault(page_id, {})
 
 
 def _get_root(page, _page_id: str, frame_selector: str = ""):
@@ -645,15 +692,21 @@ def _get_locator_by_ref(
     return locator
 
 
-def _attach_page_listeners(page, page_id: str) -> None:
+def _attach_page_listeners(
+    page,
+    page_id: str,
+    state: Optional[dict[str, Any]] = None,
+) -> None:
     """Attach console and request listeners for a page."""
-    logs = _state["console_logs"].setdefault(page_id, [])
+    if state is None:
+        state = _session()
+    logs = state["console_logs"].setdefault(page_id, [])
 
     def on_console(msg):
         logs.append({"level": msg.type, "text": msg.text})
 
     page.on("console", on_console)
-    requests_list = _state["network_requests"].setdefault(page_id, [])
+    requests_list = state["network_requests"].setdefault(page_id, [])
 
     def on_request(req):
         requests_list.append(
@@ -672,13 +725,13 @@ def _attach_page_listeners(page, page_id: str) -> None:
 
     page.on("request", on_request)
     page.on("response", on_response)
-    dialogs = _state["pending_dialogs"].setdefault(page_id, [])
+    dialogs = state["pending_dialogs"].setdefault(page_id, [])
 
     def on_dialog(dialog):
         dialogs.append(dialog)
 
     page.on("dialog", on_dialog)
-    choosers = _state["pending_file_choosers"].setdefault(page_id, [])
+    choosers = state["pending_file_choosers"].setdefault(page_id, [])
 
     def on_filechooser(chooser):
         choosers.append(chooser)
@@ -686,11 +739,13 @@ def _attach_page_listeners(page, page_id: str) -> None:
     page.on("filechooser", on_filechooser)
 
 
-def _next_page_id() -> str:
+def _next_page_id(state: Optional[dict[str, Any]] = None) -> str:
     """Return a unique page_id (page_N).
     Uses monotonic counter so IDs are not reused after close."""
-    _state["page_counter"] = _state.get("page_counter", 0) + 1
-    return f"page_{_state['page_counter']}"
+    if state is None:
+        state = _session()
+    state["page_counter"] = state.get("page_counter", 0) + 1
+    return f"page_{state['page_counter']}"
 
 
 def _attach_context_listeners(context) -> None:
@@ -698,15 +753,24 @@ def _attach_context_listeners(context) -> None:
     register it and set as current."""
 
     def on_page(page):
-        new_id = _next_page_id()
-        _state["refs"][new_id] = {}
-        _state["console_logs"][new_id] = []
-        _state["network_requests"][new_id] = []
-        _state["pending_dialogs"][new_id] = []
-        _state["pending_file_choosers"][new_id] = []
-        _attach_page_listeners(page, new_id)
-        _state["pages"][new_id] = page
-        _state["current_page_id"] = new_id
+        # Events fire outside the action that caused them: find the
+        # session by its context.
+        session = _pool.owner(context)
+        if session is None or session.opening_pages:
+            # A warm spare, or a page created by open / tabs new, which
+            # registers it under its own page_id.
+            return
+        state = session.state
+        new_id = _next_page_id(state)
+        state["refs"][new_id] = {}
+        state["console_logs"][new_id] = []
+        state["network_requests"][new_id] = []
+        state["pending_dialogs"][new_id] = []
+        state["pending_file_choosers"][new_id] = []
+        _attach_page_listeners(page, new_id, state)
+        state["pages"][new_id] = page
+        state["current_page_id"] = new_id
+        session.touch(new_id)
         logger.debug(
             "New tab opened by page, registered as page_id=%s",
             new_id,
@@ -715,83 +779,198 @@ def _attach_context_listeners(context) -> None:
     context.on("page", on_page)
 
 
-async def _ensure_browser() -> bool:  # pylint: disable=too-many-branches
-    """Start browser if not running. Return True if ready, False on failure."""
-    # Check browser state based on mode
+async def _new_context():
+    """Create a browser context in the running browser (for the pool)."""
     if _USE_SYNC_PLAYWRIGHT:
-        if (
-            _state["_sync_browser"] is not None
-            and _state["_sync_context"] is not None
-        ):
-            _touch_activity()
-            return True
+        context = await _run_sync(_state["_sync_browser"].new_context)
     else:
-        if _state["browser"] is not None and _state["context"] is not None:
-            _touch_activity()
-            return True
+        context = await _state["browser"].new_context()
+    _attach_context_listeners(context)
+    return context
 
+
+async def _close_context(context) -> None:
+    await _run_sync(context.close)
+
+
+async def _new_page(session: BrowserSession):
+    """Open a page in *session*'s context, within its page limit."""
+    await _enforce_page_limit(session)
+    session.opening_pages += 1
     try:
-        if _USE_SYNC_PLAYWRIGHT:
-            # Hybrid mode: use sync Playwright in thread pool
-            loop = asyncio.get_event_loop()
-            pw, browser, context = await loop.run_in_executor(
-                _get_executor(),
-                lambda: _sync_browser_launch(_state["headless"]),
+        return await _run_sync(session.context.new_page)
+    finally:
+        session.opening_pages -= 1
+
+
+def _register_page(session: BrowserSession, page_id: str, page) -> None:
+    """Track *page* as *page_id* of *session* and make it current."""
+    state = session.state
+    state["refs"][page_id] = {}
+    state["console_logs"][page_id] = []
+    state["network_requests"][page_id] = []
+    state["pending_dialogs"][page_id] = []
+    state["pending_file_choosers"][page_id] = []
+    _attach_page_listeners(page, page_id, state)
+    state["pages"][page_id] = page
+    state["current_page_id"] = page_id
+    session.touch(page_id)
+
+
+async def _close_page(session: BrowserSession, page_id: str) -> None:
+    """Close *page_id* of *session* and drop its bookkeeping."""
+    state = session.state
+    page = state["pages"].pop(page_id, None)
+    session.page_used.pop(page_id, None)
+    for key in (
+        "refs",
+        "refs_frame",
+        "snapshots",
+        "console_logs",
+        "network_requests",
+        "pending_dialogs",
+        "pending_file_choosers",
+    ):
+        state[key].pop(page_id, None)
+    if state.get("current_page_id") == page_id:
+        remaining = list(state["pages"].keys())
+        state["current_page_id"] = remaining[0] if remaining else None
+    if page is not None:
+        await _run_sync(page.close)
+
+
+async def _enforce_page_limit(session: BrowserSession) -> None:
+    """Close least recently used pages to make room for one more."""
+    current = session.state.get("current_page_id")
+    excess = len(session.state["pages"]) + 1 - BROWSER_MAX_PAGES_PER_CONTEXT
+    for page_id in session.lru_pages(keep=current)[: max(0, excess)]:
+        logger.info(
+            "Browser page limit (%d) reached, closing %s",
+            BROWSER_MAX_PAGES_PER_CONTEXT,
+            page_id,
+        )
+        try:
+            await _close_page(session, page_id)
+        except Exception as e:
+            logger.debug("Closing page %s failed: %s", page_id, e)
+
+
+# performance.memory is Chromium-only; elsewhere this reports 0.
+_JS_HEAP_USED = (
+    "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+)
+
+
+async def _enforce_memory_limit(session: BrowserSession, keep: str) -> None:
+    """Close least recently used pages while the context's JS heap is
+    over BROWSER_CONTEXT_MEMORY_MB (checked at most every 10 seconds)."""
+    now = time.monotonic()
+    if (
+        not BROWSER_CONTEXT_MEMORY_MB
+        or len(session.state["pages"]) < 2
+        or now - session.memory_checked < 10.0
+    ):
+        return
+    session.memory_checked = now
+    heap: dict[str, int] = {}
+    for page_id, page in list(session.state["pages"].items()):
+        try:
+            heap[page_id] = int(await _run_sync(page.evaluate, _JS_HEAP_USED))
+        except Exception:
+            heap[page_id] = 0
+    total = sum(heap.values())
+    limit = BROWSER_CONTEXT_MEMORY_MB * 1024 * 1024
+    for page_id in session.lru_pages(keep=keep):
+        if total <= limit:
+            break
+        logger.info(
+            "Browser context over %d MB of JS heap, closing %s",
+            BROWSER_CONTEXT_MEMORY_MB,
+            page_id,
+        )
+        total -= heap.get(page_id, 0)
+        try:
+            await _close_page(session, page_id)
+        except Exception as e:
+            logger.debug("Closing page %s failed: %s", page_id, e)
+
+
+async def _launch_browser() -> None:
+    """Launch the browser (headless per ``_state``) and attach the context
+    pool. Call with ``_LAUNCH_LOCK`` held; raises on failure."""
+    if _USE_SYNC_PLAYWRIGHT:
+        # Hybrid mode: use sync Playwright in thread pool
+        loop = asyncio.get_event_loop()
+        pw, browser = await loop.run_in_executor(
+            _get_executor(),
+            lambda: _sync_browser_launch(_state["headless"]),
+        )
+        _state["_sync_playwright"] = pw
+        _state["_sync_browser"] = browser
+    else:
+        # Standard mode: use async Playwright
+        async_playwright = _ensure_playwright_async()
+        pw = await async_playwright().start()
+        # Prefer OS default browser when available (e.g. user's default Chrome/Safari).
+        use_default = not is_running_in_container() and os.environ.get(
+            "COPAW_BROWSER_USE_DEFAULT",
+            "1",
+        ).strip().lower() in ("1", "true", "yes")
+        default_kind, default_path = (
+            get_system_default_browser() if use_default else (None, None)
+        )
+        exe: Optional[str] = None
+        if default_kind == "chromium" and default_path:
+            exe = default_path
+        elif default_kind != "webkit":
+            exe = _chromium_executable_path()
+        if exe:
+            # System Chrome/Edge/Chromium (default or discovered)
+            launch_kwargs: dict[str, Any] = {
+                "headless": _state["headless"],
+            }
+            extra_args = _chromium_launch_args()
+            if extra_args:
+                launch_kwargs["args"] = extra_args
+            launch_kwargs["executable_path"] = exe
+            pw_browser = await pw.chromium.launch(**launch_kwargs)
+        elif default_kind == "webkit" or sys.platform == "darwin":
+            # macOS: default Safari or no Chromium → use WebKit (Safari)
+            pw_browser = await pw.webkit.launch(
+                headless=_state["headless"],
             )
-            _state["_sync_playwright"] = pw
-            _state["_sync_browser"] = browser
-            _state["_sync_context"] = context
         else:
-            # Standard mode: use async Playwright
-            async_playwright = _ensure_playwright_async()
-            pw = await async_playwright().start()
-            # Prefer OS default browser when available (e.g. user's default Chrome/Safari).
-            use_default = not is_running_in_container() and os.environ.get(
-                "COPAW_BROWSER_USE_DEFAULT",
-                "1",
-            ).strip().lower() in ("1", "true", "yes")
-            default_kind, default_path = (
-                get_system_default_browser() if use_default else (None, None)
-            )
-            exe: Optional[str] = None
-            if default_kind == "chromium" and default_path:
-                exe = default_path
-            elif default_kind != "webkit":
-                exe = _chromium_executable_path()
-            if exe:
-                # System Chrome/Edge/Chromium (default or discovered)
-                launch_kwargs: dict[str, Any] = {
-                    "headless": _state["headless"],
-                }
-                extra_args = _chromium_launch_args()
-                if extra_args:
-                    launch_kwargs["args"] = extra_args
-                launch_kwargs["executable_path"] = exe
-                pw_browser = await pw.chromium.launch(**launch_kwargs)
-            elif default_kind == "webkit" or sys.platform == "darwin":
-                # macOS: default Safari or no Chromium → use WebKit (Safari)
-                pw_browser = await pw.webkit.launch(
-                    headless=_state["headless"],
-                )
-            else:
-                # Windows/Linux without system Chromium → Playwright's Chromium
-                launch_kwargs = {"headless": _state["headless"]}
-                extra_args = _chromium_launch_args()
-                if extra_args:
-                    launch_kwargs["args"] = extra_args
-                pw_browser = await pw.chromium.launch(**launch_kwargs)
-            context = await pw_browser.new_context()
-            _attach_context_listeners(context)
-            _state["playwright"] = pw
-            _state["browser"] = pw_browser
-            _state["context"] = context
-        _state["_last_browser_error"] = None
-        _touch_activity()
-        _start_idle_watchdog()
-        return True
+            # Windows/Linux without system Chromium → Playwright's Chromium
+            launch_kwargs = {"headless": _state["headless"]}
+            extra_args = _chromium_launch_args()
+            if extra_args:
+                launch_kwargs["args"] = extra_args
+            pw_browser = await pw.chromium.launch(**launch_kwargs)
+        _state["playwright"] = pw
+        _state["browser"] = pw_browser
+    # Contexts are checked out per session; start warming spares now.
+    _pool.attach(_new_context, _close_context)
+    _start_idle_watchdog()
+
+
+async def _ensure_browser() -> bool:
+    """Start browser if not running and check out the current session's
+    context. Return True if ready, False on failure."""
+    try:
+        if not _is_browser_running():
+            async with _LAUNCH_LOCK:
+                # Another session may have launched it meanwhile.
+                if not _is_browser_running():
+                    await _launch_browser()
+        if not _pool.attached:
+            _pool.attach(_new_context, _close_context)
+        await _pool.checkout(current_session_key())
     except Exception as e:
         _state["_last_browser_error"] = str(e)
         return False
+    _state["_last_browser_error"] = None
+    _touch_activity()
+    return True
 
 
 def _start_idle_watchdog() -> None:
@@ -814,107 +993,100 @@ def _cancel_idle_watchdog() -> None:
 async def _action_start(
     headed: bool = False,
 ) -> ToolResponse:
-    # Check browser state based on mode
-    if _USE_SYNC_PLAYWRIGHT:
-        browser_exists = _state["_sync_browser"] is not None
-        current_headless = not _state.get("_sync_headless", True)
-    else:
-        browser_exists = _state["browser"] is not None
-        current_headless = _state["headless"]
+    async with _LAUNCH_LOCK:
+        # Check browser state based on mode
+        if _USE_SYNC_PLAYWRIGHT:
+            browser_exists = _state["_sync_browser"] is not None
+            current_headless = not _state.get("_sync_headless", True)
+        else:
+            browser_exists = _state["browser"] is not None
+            current_headless = _state["headless"]
 
-    # If user asks for visible window (headed=True)
-    # but browser is already running headless, restart with headed
-    if browser_exists:
-        if headed and current_headless:
+        # If user asks for visible window (headed=True)
+        # but browser is already running headless, restart with headed
+        if browser_exists:
+            if not (headed and current_headless):
+                return _tool_response(
+                    json.dumps(
+                        {"ok": True, "message": "Browser already running"},
+                        ensure_ascii=False,
+                        indent=2,
+                    ),
+                )
+            # A restart would close every other session's context.
+            others = [k for k in _pool.keys() if k != current_session_key()]
+            if others:
+                return _tool_response(
+                    json.dumps(
+                        {
+                            "ok": False,
+                            "error": (
+                                "Browser is running headless for "
+                                f"{len(others)} other session(s); cannot "
+                                "restart it with a visible window"
+                            ),
+                        },
+                        ensure_ascii=False,
+                        indent=2,
+                    ),
+                )
             _cancel_idle_watchdog()
             try:
-                await _action_stop()
+                await _action_stop(all_sessions=True)
             except Exception:
                 pass
-        else:
+        # Default: headless (background). Only headed=True (e.g.
+        # browser_visible skill) shows window.
+        _state["headless"] = not headed
+
+        try:
+            await _launch_browser()
+            if _USE_SYNC_PLAYWRIGHT:
+                _state["_sync_headless"] = not headed
+            _touch_activity()
+        except Exception as e:
             return _tool_response(
                 json.dumps(
-                    {"ok": True, "message": "Browser already running"},
+                    {"ok": False, "error": f"Browser start failed: {e!s}"},
                     ensure_ascii=False,
                     indent=2,
                 ),
             )
-    # Default: headless (background). Only headed=True (e.g. browser_visible skill) shows window.
-    _state["headless"] = not headed
+    msg = (
+        "Browser started (visible window)"
+        if not _state["headless"]
+        else "Browser started"
+    )
+    return _tool_response(
+        json.dumps(
+            {"ok": True, "message": msg},
+            ensure_ascii=False,
+            indent=2,
+        ),
+    )
 
-    try:
-        if _USE_SYNC_PLAYWRIGHT:
-            loop = asyncio.get_event_loop()
-            pw, browser, context = await loop.run_in_executor(
-                _get_executor(),
-                lambda: _sync_browser_launch(_state["headless"]),
-            )
-            _state["_sync_playwright"] = pw
-            _state["_sync_browser"] = browser
-            _state["_sync_context"] = context
-            _state["_sync_headless"] = not headed
-        else:
-            async_playwright = _ensure_playwright_async()
-            pw = await async_playwright().start()
-            use_default = not is_running_in_container() and os.environ.get(
-                "COPAW_BROWSER_USE_DEFAULT",
-                "1",
-            ).strip().lower() in ("1", "true", "yes")
-            default_kind, default_path = (
-                get_system_default_browser() if use_default else (None, None)
-            )
-            exe: Optional[str] = None
-            if default_kind == "chromium" and default_path:
-                exe = default_path
-            elif default_kind != "webkit":
-                exe = _chromium_executable_path()
-            if exe:
-                launch_kwargs = {"headless": _state["headless"]}
-                extra_args = _chromium_launch_args()
-                if extra_args:
-                    launch_kwargs["args"] = extra_args
-                launch_kwargs["executable_path"] = exe
-                pw_browser = await pw.chromium.launch(**launch_kwargs)
-            elif default_kind == "webkit" or sys.platform == "darwin":
-                pw_browser = await pw.webkit.launch(
-                    headless=_state["headless"],
-                )
-            else:
-                launch_kwargs = {"headless": _state["headless"]}
-                extra_args = _chromium_launch_args()
-                if extra_args:
-                    launch_kwargs["args"] = extra_args
-                pw_browser = await pw.chromium.launch(**launch_kwargs)
-            context = await pw_browser.new_context()
-            _attach_context_listeners(context)
-            _state["playwright"] = pw
-            _state["browser"] = pw_browser
-            _state["context"] = context
-        _touch_activity()
-        _start_idle_watchdog()
-        msg = (
-            "Browser started (visible window)"
-            if not _state["headless"]
-            else "Browser started"
-        )
-        return _tool_response(
-            json.dumps(
-                {"ok": True, "message": msg},
-                ensure_ascii=False,
-                indent=2,
-            ),
-        )
-    except Exception as e:
+
+async def _action_stop(all_sessions: bool = False) -> ToolResponse:
+    """Close the current session's context; stop the browser once no
+    other session holds one (or right away with *all_sessions*)."""
+    key = current_session_key()
+    others = [k for k in _pool.keys() if k != key]
+    if not all_sessions and others and _is_browser_running():
+        await _pool.release(key)
         return _tool_response(
             json.dumps(
-                {"ok": False, "error": f"Browser start failed: {e!s}"},
+                {
+                    "ok": True,
+                    "message": (
+                        "Browser session closed; browser kept running for "
+                        f"{len(others)} other session(s)"
+                    ),
+                },
                 ensure_ascii=False,
                 indent=2,
             ),
         )
 
-
-async def _action_stop() -> ToolResponse:
     _cancel_idle_watchdog()
 
     # Check browser state based on mode
@@ -990,37 +1162,26 @@ async def _action_open(url: str, page_id: str) -> ToolResponse:
                 indent=2,
             ),
         )
+    session = _current_session()
     try:
-        if _USE_SYNC_PLAYWRIGHT:
-            # Hybrid mode: create page in thread pool
-            loop = asyncio.get_event_loop()
-            # pylint: disable=unnecessary-lambda
-            page = await loop.run_in_executor(
-                _get_executor(),
-                lambda: _state["_sync_context"].new_page(),
-            )
-        else:
-            # Standard async mode
-            page = await _state["context"].new_page()
-
-        _state["refs"][page_id] = {}
-        _state["console_logs"][page_id] = []
-        _state["network_requests"][page_id] = []
-        _state["pending_dialogs"][page_id] = []
-        _state["pending_file_choosers"][page_id] = []
-        _attach_page_listeners(page, page_id)
-
-        if _USE_SYNC_PLAYWRIGHT:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                _get_executor(),
-                lambda: page.goto(url),
-            )
-        else:
-            await page.goto(url)
-
-        _state["pages"][page_id] = page
-        _state["current_page_id"] = page_id
+        if page_id in session.state["pages"]:
+            # Reopening a page_id replaces its page instead of leaking it.
+            await _close_page(session, page_id)
+        page = await _new_page(session)
+        _register_page(session, page_id, page)
+        try:
+            if _USE_SYNC_PLAYWRIGHT:
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(
+                    _get_executor(),
+                    lambda: page.goto(url),
+                )
+            else:
+                await page.goto(url)
+        except Exception:
+            await _close_page(session, page_id)
+            raise
+        await _enforce_memory_limit(session, keep=page_id)
         return _tool_response(
             json.dumps(
                 {
@@ -1071,7 +1232,10 @@ async def _action_navigate(url: str, page_id: str) -> ToolResponse:
             )
         else:
             await page.goto(url)
-        _state["current_page_id"] = page_id
+        _session()["current_page_id"] = page_id
+        session = _current_session()
+        if session is not None:
+            await _enforce_memory_limit(session, keep=page_id)
         return _tool_response(
             json.dumps(
                 {
@@ -1546,23 +1710,7 @@ async def _action_close(page_id: str) -> ToolResponse:
             ),
         )
     try:
-        if _USE_SYNC_PLAYWRIGHT:
-            await _run_sync(page.close)
-        else:
-            await page.close()
-        del _state["pages"][page_id]
-        for key in (
-            "refs",
-            "refs_frame",
-            "console_logs",
-            "network_requests",
-            "pending_dialogs",
-            "pending_file_choosers",
-        ):
-            _state[key].pop(page_id, None)
-        if _state.get("current_page_id") == page_id:
-            remaining = list(_state["pages"].keys())
-            _state["current_page_id"] = remaining[0] if remaining else None
+        await _close_page(_current_session(), page_id)
         return _tool_response(
             json.dumps(
                 {"ok": True, "message": f"Closed page '{page_id}'"},
@@ -1584,6 +1732,7 @@ async def _action_snapshot(
     page_id: str,
     filename: str,
     frame_selector: str = "",
+    snapshot_mode: str = "",
 ) -> ToolResponse:
     page = _get_page(page_id)
     if not page:
@@ -1615,18 +1764,60 @@ async def _action_snapshot(
             interactive=False,
             compact=False,
         )
-        _state["refs"][page_id] = refs
-        _state["refs_frame"][page_id] = (
-            frame_selector.strip() if frame_selector else ""
-        )
-        out = {
-            "ok": True,
+        state = _session()
+        frame = frame_selector.strip() if frame_selector else ""
+        previous = state["snapshots"].get(page_id)
+        diff = None
+        if (
+            previous is not None
+            and previous["url"] == page.url
+            and previous["frame"] == frame
+        ):
+            snapshot, refs, diff = diff_role_snapshot(
+                previous["snapshot"],
+                snapshot,
+                refs,
+            )
+        digest = snapshot_digest(snapshot)
+        state["refs"][page_id] = refs
+        state["refs_frame"][page_id] = frame
+        state["snapshots"][page_id] = {
             "snapshot": snapshot,
-            "refs": list(refs.keys()),
+            "digest": digest,
             "url": page.url,
+            "frame": frame,
         }
-        if frame_selector and frame_selector.strip():
-            out["frame_selector"] = frame_selector.strip()
+        mode = (snapshot_mode or BROWSER_SNAPSHOT_MODE).strip().lower()
+        if (
+            mode == "diff"
+            and diff is not None
+            and diff["ratio"] <= BROWSER_SNAPSHOT_DIFF_MAX_RATIO
+        ):
+            out = {
+                "ok": True,
+                "mode": "diff",
+                "note": (
+                    "Changes since the previous snapshot (base_digest); "
+                    "refs not listed are unchanged. Use "
+                    "snapshot_mode=full for the whole tree."
+                ),
+                "base_digest": previous["digest"],
+                "digest": digest,
+                "url": page.url,
+            }
+            for key in ("added", "changed", "removed"):
+                if diff[key]:
+                    out[key] = diff[key]
+        else:
+            out = {
+                "ok": True,
+                "snapshot": snapshot,
+                "refs": list(refs.keys()),
+                "digest": digest,
+                "url": page.url,
+            }
+        if frame:
+            out["frame_selector"] = frame
         if filename and filename.strip():
             with open(filename.strip(), "w", encoding="utf-8") as f:
                 f.write(snapshot)
@@ -1824,7 +2015,7 @@ async def _action_console_messages(
                 indent=2,
             ),
         )
-    logs = _state["console_logs"].get(page_id, [])
+    logs = _session()["console_logs"].get(page_id, [])
     filtered = (
         [m for m in logs if order.index(m["level"]) <= idx]
         if level in order
@@ -1869,7 +2060,7 @@ async def _action_handle_dialog(
                 indent=2,
             ),
         )
-    dialogs = _state["pending_dialogs"].get(page_id, [])
+    dialogs = _session()["pending_dialogs"].get(page_id, [])
     if not dialogs:
         return _tool_response(
             json.dumps(
@@ -1927,7 +2118,7 @@ async def _action_file_upload(page_id: str, paths_json: str) -> ToolResponse:
     if not isinstance(paths, list):
         paths = []
     try:
-        choosers = _state["pending_file_choosers"].get(page_id, [])
+        choosers = _session()["pending_file_choosers"].get(page_id, [])
         if not choosers:
             return _tool_response(
                 json.dumps(
@@ -1994,7 +2185,7 @@ async def _action_fill_form(page_id: str, fields_json: str) -> ToolResponse:
         )
     refs = _get_refs(page_id)
     # Use last snapshot's frame so fill_form works after iframe snapshot
-    frame = _state["refs_frame"].get(page_id, "")
+    frame = _session()["refs_frame"].get(page_id, "")
     try:
         for f in fields:
             ref = (f.get("ref") or "").strip()
@@ -2189,7 +2380,7 @@ async def _action_network_requests(
                 indent=2,
             ),
         )
-    requests = _state["network_requests"].get(page_id, [])
+    requests = _session()["network_requests"].get(page_id, [])
     if not include_static:
         static = ("image", "stylesheet", "font", "media")
         requests = [r for r in requests if r.get("resourceType") not in static]
@@ -2511,7 +2702,7 @@ async def _action_tabs(  # pylint: disable=too-many-return-statements
                 indent=2,
             ),
         )
-    pages = _state["pages"]
+    pages = _session()["pages"]
     page_ids = list(pages.keys())
     if tab_action == "list":
         return _tool_response(
@@ -2522,55 +2713,26 @@ async def _action_tabs(  # pylint: disable=too-many-return-statements
             ),
         )
     if tab_action == "new":
-        if _USE_SYNC_PLAYWRIGHT:
-            if not _state["_sync_context"]:
-                ok = await _ensure_browser()
-                if not ok:
-                    err = (
-                        _state.get("_last_browser_error")
-                        or "Browser not started"
-                    )
-                    return _tool_response(
-                        json.dumps(
-                            {"ok": False, "error": err},
-                            ensure_ascii=False,
-                            indent=2,
-                        ),
-                    )
-        else:
-            if not _state["context"]:
-                ok = await _ensure_browser()
-                if not ok:
-                    err = (
-                        _state.get("_last_browser_error")
-                        or "Browser not started"
-                    )
-                    return _tool_response(
-                        json.dumps(
-                            {"ok": False, "error": err},
-                            ensure_ascii=False,
-                            indent=2,
-                        ),
-                    )
+        if not await _ensure_browser():
+            err = _state.get("_last_browser_error") or "Browser not started"
+            return _tool_response(
+                json.dumps(
+                    {"ok": False, "error": err},
+                    ensure_ascii=False,
+                    indent=2,
+                ),
+            )
         try:
-            if _USE_SYNC_PLAYWRIGHT:
-                page = await _run_sync(_state["_sync_context"].new_page)
-            else:
-                page = await _state["context"].new_page()
-            new_id = _next_page_id()
-            _state["refs"][new_id] = {}
-            _state["console_logs"][new_id] = []
-            _state["network_requests"][new_id] = []
-            _state["pending_dialogs"][new_id] = []
-            _attach_page_listeners(page, new_id)
-            _state["pages"][new_id] = page
-            _state["current_page_id"] = new_id
+            session = _current_session()
+            page = await _new_page(session)
+            new_id = _next_page_id(session.state)
+            _register_page(session, new_id, page)
             return _tool_response(
                 json.dumps(
                     {
                         "ok": True,
                         "page_id": new_id,
-                        "tabs": list(_state["pages"].keys()),
+                        "tabs": list(session.state["pages"].keys()),
                     },
                     ensure_ascii=False,
                     indent=2,
@@ -2589,7 +2751,7 @@ async def _action_tabs(  # pylint: disable=too-many-return-statements
         return await _action_close(target_id)
     if tab_action == "select":
         target_id = page_ids[index] if 0 <= index < len(page_ids) else page_id
-        _state["current_page_id"] = target_id
+        _session()["current_page_id"] = target_id
         return _tool_response(
             json.dumps(
                 {
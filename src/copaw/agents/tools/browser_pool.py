@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""Per-session browser contexts for ``browser_use``.
+
+One browser process is shared, and each session gets its own browser
+context (cookies, storage and tabs) from a :class:`BrowserContextPool`:
+
+* a few spare contexts are created ahead of time, so a new session
+  does not wait for one;
+* when more than ``max_contexts`` sessions hold a context, the least
+  recently used one that is not in the middle of an action is closed;
+* contexts idle for too long are closed, while the browser stays up.
+
+The session is taken from :func:`browser_session`, which the agent binds
+around each reply; calls outside of one share the ``"default"``
+session. The pool knows nothing about Playwright: it is handed
+coroutines that create and close a context.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from ...constant import BROWSER_MAX_CONTEXTS, BROWSER_WARM_CONTEXTS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "default"
+
+_current_session: ContextVar[str] = ContextVar(
+    "copaw_browser_session",
+    default="",
+)
+
+
+@contextmanager
+def browser_session(session_id: str) -> Iterator[None]:
+    """Run browser actions within this block as *session_id*."""
+    token = _current_session.set(session_id or "")
+    try:
+        yield
+    finally:
+        _current_session.reset(token)
+
+
+def current_session_key() -> str:
+    """Session the running browser action belongs to."""
+    return _current_session.get() or DEFAULT_SESSION
+
+
+def new_page_state() -> dict[str, Any]:
+    """Empty page bookkeeping for one context."""
+    return {
+        "pages": {},
+        "refs": {},  # page_id -> ref -> {role, name?, nth?}
+        "refs_frame": {},  # page_id -> frame for last snapshot
+        "snapshots": {},  # page_id -> last snapshot, for diffs
+        "console_logs": {},  # page_id -> list of {level, text}
+        "network_requests": {},  # page_id -> list of request dicts
+        "pending_dialogs": {},  # page_id -> dialog handlers
+        "pending_file_choosers": {},  # page_id -> FileChooser list
+        "current_page_id": None,
+        "page_counter": 0,  # monotonic counter for page_N ids
+    }
+
+
+class BrowserSession:
+    """A browser context leased to one session, with its pages."""
+
+    def __init__(self, key: str, context: Any) -> None:
+        self.key = key
+        self.context = context
+        self.state = new_page_state()
+        self.page_used: dict[str, float] = {}
+        self.last_used = time.monotonic()
+        self.memory_checked = 0.0
+        # new_page() calls in flight, whose "page" events are not tabs
+        # opened by a page.
+        self.opening_pages = 0
+
+    def touch(self, page_id: Optional[str] = None) -> None:
+        """Mark the session (and *page_id*) as just used."""
+        self.last_used = time.monotonic()
+        if page_id is not None and page_id in self.state["pages"]:
+            self.page_used[page_id] = self.last_used
+
+    def lru_pages(self, keep: Optional[str] = None) -> list[str]:
+        """Page ids, least recently used first, without *keep*."""
+        return sorted(
+            (pid for pid in self.state["pages"] if pid != keep),
+            key=lambda pid: self.page_used.get(pid, 0.0),
+        )
+
+
+class BrowserContextPool:
+    """Browser contexts checked out per session, LRU-recycled.
+
+    Parameters
+    ----------
+    max_contexts:
+        Sessions holding a context at once; beyond it the least
+        recently used idle session loses its context.
+    warm_spares:
+        Contexts kept created but unassigned.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_contexts: int = BROWSER_MAX_CONTEXTS,
+        warm_spares: int = BROWSER_WARM_CONTEXTS,
+    ) -> None:
+        self.max_contexts = max(1, max_contexts)
+        self.warm_spares = max(0, warm_spares)
+        self._new_context: Optional[Callable[[], Awaitable[Any]]] = None
+        self._close_context: Optional[Callable[[Any], Awaitable[Any]]] = None
+        self._sessions: OrderedDict[str, BrowserSession] = OrderedDict()
+        self._by_context: dict[int, BrowserSession] = {}
+        self._spares: list[Any] = []
+        self._opening: dict[str, asyncio.Future] = {}
+        self._refill_task: Optional[asyncio.Task] = None
+        self._in_use: Counter[str] = Counter()
+        self.recycled = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def attached(self) -> bool:
+        """Whether a browser is there to create contexts in."""
+        return self._new_context is not None
+
+    def attach(
+        self,
+        new_context: Callable[[], Awaitable[Any]],
+        close_context: Callable[[Any], Awaitable[Any]],
+    ) -> None:
+        """Create contexts with *new_context* from now on."""
+        self.clear()
+        self._new_context = new_context
+        self._close_context = close_context
+        self.refill()
+
+    def clear(self) -> None:
+        """Forget all contexts, e.g. once the browser is gone."""
+        if self._refill_task is not None and not self._refill_task.done():
+            self._refill_task.cancel()
+        self._refill_task = None
+        self._new_context = None
+        self._close_context = None
+        self._sessions.clear()
+        self._by_context.clear()
+        self._spares.clear()
+        self._opening.clear()
+
+    def get(self, key: str) -> Optional[BrowserSession]:
+        return self._sessions.get(key)
+
+    def owner(self, context: Any) -> Optional[BrowserSession]:
+        """Session *context* is checked out to, if any."""
+        return self._by_context.get(id(context))
+
+    def keys(self) -> list[str]:
+        """Sessions holding a context, least recently used first."""
+        return list(self._sessions)
+
+    @contextmanager
+    def using(self, key: str) -> Iterator[None]:
+        """Keep *key*'s context from being recycled within the block."""
+        self._in_use[key] += 1
+        try:
+            yield
+        finally:
+            self._in_use[key] -= 1
+            if self._in_use[key] <= 0:
+                del self._in_use[key]
+
+    async def checkout(self, key: str) -> BrowserSession:
+        """The context of session *key*, assigning one if needed."""
+        session = self._sessions.get(key)
+        if session is not None:
+            self._sessions.move_to_end(key)
+            session.touch()
+            return session
+        if self._new_context is None:
+            raise RuntimeError("Browser not started")
+        opening = self._opening.get(key)
+        if opening is None:
+            opening = asyncio.ensure_future(self._open(key))
+            self._opening[key] = opening
+            opening.add_done_callback(
+                lambda _: self._opening.pop(key, None),
+            )
+        return await asyncio.shield(opening)
+
+    async def _open(self, key: str) -> BrowserSession:
+        if self._spares:
+            context = self._spares.pop()
+        else:
+            new_context = self._new_context
+            if new_context is None:
+                raise RuntimeError("Browser not started")
+            context = await new_context()
+            if new_context is not self._new_context:
+                # The browser was stopped or replaced meanwhile.
+                raise RuntimeError("Browser stopped")
+        session = BrowserSession(key, context)
+        self._sessions[key] = session
+        self._by_context[id(context)] = session
+        self.refill()
+        await self._recycle(self._over_cap(keep=key))
+        return session
+
+    def _over_cap(self, keep: str) -> list[BrowserSession]:
+        excess = len(self._sessions) - self.max_contexts
+        victims = []
+        for key, session in self._sessions.items():
+            if excess <= 0:
+                break
+            if key == keep or self._in_use[key]:
+                continue
+            victims.append(session)
+            excess -= 1
+        return victims
+
+    async def _recycle(self, sessions: list[BrowserSession]) -> None:
+        for session in sessions:
+            if await self._drop(session):
+                self.recycled += 1
+                logger.debug("Recycled browser context of %s", session.key)
+
+    async def _drop(self, session: BrowserSession) -> bool:
+        if self._sessions.get(session.key) is not session:
+            return False
+        del self._sessions[session.key]
+        self._by_context.pop(id(session.context), None)
+        await self._close(session.context)
+        return True
+
+    async def _close(self, context: Any) -> None:
+        close_context = self._close_context
+        if close_context is None:
+            return
+        try:
+            await close_context(context)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.debug("Closing browser context failed: %s", exc)
+
+    async def release(self, key: str) -> bool:
+        """Close the context of session *key*; False if it had none."""
+        session = self._sessions.get(key)
+        return session is not None and await self._drop(session)
+
+    async def recycle_idle(self, idle_seconds: float) -> int:
+        """Close contexts unused for *idle_seconds*; return how many."""
+        cutoff = time.monotonic() - idle_seconds
+        idle = [
+            session
+            for key, session in self._sessions.items()
+            if session.last_used <= cutoff and not self._in_use[key]
+        ]
+        await self._recycle(idle)
+        return len(idle)
+
+    def refill(self) -> None:
+        """Top up the warm spares in the background."""
+        if (
+            self._new_context is None
+            or len(self._spares) >= self.warm_spares
+            or (self._refill_task is not None and not self._refill_task.done())
+        ):
+            return
+        self._refill_task = asyncio.ensure_future(self._fill())
+
+    async def _fill(self) -> None:
+        new_context = self._new_context
+        while new_context is not None and len(self._spares) < (
+            self.warm_spares
+        ):
+            try:
+                context = await new_context()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.debug("Warming a browser context failed: %s", exc)
+                return
+            if new_context is not self._new_context:
+                # The browser was stopped or replaced meanwhile.
+                return
+            self._spares.append(context)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "spares": len(self._spares),
+            "in_use": sum(1 for n in self._in_use.values() if n > 0),
+            "recycled": self.recycled,
+        }
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """Build role snapshot + refs from Playwright aria_snapshot."""
 
+import difflib
+import hashlib
 import re
 from typing import Any
 
@@ -246,3 +248,114 @@ def build_role_snapshot_from_aria(
     tree = "\n".join(result_lines) or "(empty)"
     snapshot = _compact_tree(tree) if options.get("compact") else tree
     return snapshot, refs
+
+
+_NODE_RE = re.compile(r'^(\s*)-\s*(\w+)(?:\s+"([^"]*)")?')
+_REF_MARK_RE = re.compile(r" \[ref=(e\d+)\]")
+_NTH_MARK_RE = re.compile(r" \[nth=\d+\]")
+
+
+def snapshot_digest(snapshot: str) -> str:
+    """Short content hash telling snapshots apart."""
+    return hashlib.sha1(snapshot.encode("utf-8")).hexdigest()[:12]
+
+
+def _ref_match(line: str) -> re.Match | None:
+    # The marker follows role and name; a name may contain one too.
+    head = _NODE_RE.match(line)
+    return _REF_MARK_RE.search(line, head.end() if head else 0)
+
+
+def _line_key(line: str) -> str:
+    # nth is positional: it shifts when an equal node appears earlier.
+    return _NTH_MARK_RE.sub("", _REF_MARK_RE.sub("", line))
+
+
+def _node_head(key: str) -> Any:
+    m = _NODE_RE.match(key)
+    return m.groups() if m else key
+
+
+def diff_role_snapshot(
+    previous: str,
+    snapshot: str,
+    refs: dict[str, dict],
+) -> tuple[str, dict[str, dict], dict[str, Any]]:
+    """Carry refs over from *previous* into *snapshot* and diff the two.
+
+    *snapshot* and *refs* come from build_role_snapshot_from_aria, which
+    numbers refs from e1 on every call; *previous* is the snapshot handed
+    out last time for the same page. Unchanged nodes, and nodes changed
+    in place (same depth, role and name; e.g. a new textbox value or
+    ``[checked]``), keep their ref; other nodes get refs not used in
+    *previous*.
+
+    Returns the snapshot with those refs, its refs map and the diff:
+    ``added`` / ``changed`` lines of the new snapshot, ``removed`` lines
+    of *previous*, and ``ratio``, the share of lines involved.
+    """
+    old_lines = previous.split("\n")
+    new_lines = snapshot.split("\n")
+    old_keys = [_line_key(line) for line in old_lines]
+    new_keys = [_line_key(line) for line in new_lines]
+    carried: dict[int, str] = {}  # new line -> ref it had in previous
+    added: list[int] = []
+    changed: list[int] = []
+    removed: list[int] = []
+
+    def carry(i: int, j: int) -> None:
+        m = _ref_match(old_lines[i])
+        if m:
+            carried[j] = m.group(1)
+
+    matcher = difflib.SequenceMatcher(
+        None,
+        old_keys,
+        new_keys,
+        autojunk=False,
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                carry(i, j)
+            continue
+        unmatched: dict[Any, list[int]] = {}
+        for i in range(i1, i2):
+            unmatched.setdefault(_node_head(old_keys[i]), []).append(i)
+        for j in range(j1, j2):
+            olds = unmatched.get(_node_head(new_keys[j]))
+            if not olds:
+                added.append(j)
+                continue
+            i = olds.pop(0)
+            carry(i, j)
+            if old_keys[i] != new_keys[j]:
+                changed.append(j)
+        removed.extend(i for olds in unmatched.values() for i in olds)
+
+    next_id = max(
+        (int(ref[1:]) for ref in _REF_MARK_RE.findall(previous)),
+        default=0,
+    )
+    stable_refs: dict[str, dict] = {}
+    lines = []
+    for j, line in enumerate(new_lines):
+        m = _ref_match(line)
+        if m is None or m.group(1) not in refs:
+            lines.append(line)
+            continue
+        ref = carried.get(j)
+        if ref is None:
+            next_id += 1
+            ref = f"e{next_id}"
+        stable_refs[ref] = refs[m.group(1)]
+        lines.append(f"{line[: m.start()]} [ref={ref}]{line[m.end():]}")
+
+    involved = len(added) + len(changed) + len(removed)
+    diff = {
+        "added": [lines[j] for j in added],
+        "changed": [lines[j] for j in changed],
+        "removed": [old_lines[i] for i in sorted(removed)],
+        "ratio": involved / max(len(old_lines), len(new_lines), 1),
+    }
+    return "\n".join(lines), stable_refs, diff
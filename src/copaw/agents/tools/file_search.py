@@ -3,6 +3,8 @@
 # pylint: disable=line-too-long
 """File search tools: grep (content search) and glob (file discovery)."""
 
+import asyncio
+import os
 import re
 from pathlib import Path
 from typing import Optional
@@ -12,71 +14,125 @@ from agentscope.tool import ToolResponse
 
 from ...constant import WORKING_DIR
 from .file_io import _resolve_file_path
-
-# Skip binary / large files
-_BINARY_EXTENSIONS = frozenset(
-    {
-        ".png",
-        ".jpg",
-        ".jpeg",
-        ".gif",
-        ".bmp",
-        ".ico",
-        ".webp",
-        ".svg",
-        ".mp3",
-        ".mp4",
-        ".avi",
-        ".mov",
-        ".mkv",
-        ".flac",
-        ".wav",
-        ".zip",
-        ".tar",
-        ".gz",
-        ".bz2",
-        ".7z",
-        ".rar",
-        ".pdf",
-        ".doc",
-        ".docx",
-        ".xls",
-        ".xlsx",
-        ".ppt",
-        ".pptx",
-        ".exe",
-        ".dll",
-        ".so",
-        ".dylib",
-        ".bin",
-        ".dat",
-        ".woff",
-        ".woff2",
-        ".ttf",
-        ".eot",
-        ".otf",
-        ".pyc",
-        ".pyo",
-        ".class",
-        ".o",
-        ".a",
-    },
+from .search_index import (
+    compile_recursive_glob,
+    get_search_index,
+    path_sort_key,
+    read_file,
+    required_trigrams,
+    scan_ordered,
 )
 
 _MAX_MATCHES = 200
-_MAX_FILE_SIZE = 2 * 1024 * 1024  # 2 MB
 
 
-def _is_text_file(path: Path) -> bool:
-    """Heuristic check: skip known binary extensions and large files."""
-    if path.suffix.lower() in _BINARY_EXTENSIONS:
-        return False
+def _scan_file(
+    file_path: str,
+    display: str,
+    regex: re.Pattern,
+    literal: Optional[bytes],
+    context_lines: int,
+) -> list[list[str]]:
+    """Matches of ``regex`` in one file, grouped per matching line.
+
+    ``literal`` (a case-sensitive plain pattern) rejects files that do
+    not contain it before decoding. Returns at most ``_MAX_MATCHES + 1``
+    groups.
+    """
+    data = read_file(file_path, literal)
+    if not data:
+        return []
+    lines = data.decode("utf-8", errors="ignore").splitlines()
+    groups: list[list[str]] = []
+    for line_no, line in enumerate(lines, start=1):
+        if regex.search(line):
+            # Context window
+            start = max(0, line_no - 1 - context_lines)
+            end = min(len(lines), line_no + context_lines)
+            group = []
+            for ctx_idx in range(start, end):
+                prefix = ">" if ctx_idx == line_no - 1 else " "
+                group.append(
+                    f"{display}:{ctx_idx + 1}:{prefix} {lines[ctx_idx]}",
+                )
+            if context_lines > 0:
+                group.append("---")
+            groups.append(group)
+            if len(groups) > _MAX_MATCHES:
+                break
+    return groups
+
+
+def _grep(
+    search_root: Path,
+    pattern: str,
+    regex: re.Pattern,
+    is_regex: bool,
+    context_lines: int,
+) -> tuple[list[str], bool]:
+    """Blocking part of :func:`grep_search`, run off the event loop."""
+    ignore_case = bool(regex.flags & re.IGNORECASE)
+    literal = (
+        pattern.encode("utf-8") if not is_regex and not ignore_case else None
+    )
+    if search_root.is_file():
+        # For single-file search show the filename, not '.'
+        jobs = [(str(search_root), search_root.name)]
+    else:
+        index, subdir = get_search_index(search_root)
+        index.refresh(subdir)
+        trigrams = required_trigrams(pattern, is_regex, ignore_case)
+        jobs = [
+            (os.path.join(search_root, rel), rel.replace("/", os.sep))
+            for rel in index.candidates(subdir, trigrams)
+        ]
+        index.save()
+
+    def _scan(job: tuple[str, str]) -> list[list[str]]:
+        return _scan_file(*job, regex, literal, context_lines)
+
+    matches: list[str] = []
+    truncated = False
+    results = scan_ordered(_scan, jobs)
     try:
-        if path.stat().st_size > _MAX_FILE_SIZE:
-            return False
-    except OSError:
-        return False
-    return True
+        for groups in results:
+            for group in groups:
+                if len(matches) >= _MAX_MATCHES:
+                    truncated = True
+                    break
+                matches.extend(group)
+            if truncated:
+                break
+    finally:
+        results.close()
+    return matches, truncated
+
+
+def _glob(search_root: Path, pattern: str) -> list[tuple[str, bool]]:
+    """Blocking part of :func:`glob_search`: ``(display, is_dir)``.
+
+    Recursive (``**``) patterns are matched against the search index;
+    others only list the directories they name, so :meth:`Path.glob` is
+    used as is.
+    """
+    matcher = compile_recursive_glob(pattern)
+    if matcher is None:
+        return [
+            (_relative_display(entry, search_root), entry.is_dir())
+            for entry in sorted(search_root.glob(pattern))
+        ]
+    index, subdir = get_search_index(search_root)
+    index.refresh(subdir)
+    index.save()
+    found = sorted(
+        (
+            (rel, is_dir)
+            for rel, is_dir in index.entries(subdir)
+            if matcher.fullmatch(rel)
+        ),
+        key=lambda item: path_sort_key(item[0]),
+    )
+    return [(rel.replace("/", os.sep), is_dir) for rel, is_dir in found]
 
 
 async def grep_search(  # pylint: disable=too-many-branches
@@ -141,53 +197,14 @@ async def grep_search(  # pylint: disable=too-many-branches
             ],
         )
 
-    matches: list[str] = []
-    truncated = False
-
-    # Collect files to search
-    single_file = search_root.is_file()
-    if single_file:
-        files = [search_root]
-    else:
-        files = sorted(
-            f
-            for f in search_root.rglob("*")
-            if f.is_file() and _is_text_file(f)
-        )
-
-    for file_path in files:
-        if truncated:
-            break
-        try:
-            lines = file_path.read_text(
-                encoding="utf-8",
-                errors="ignore",
-            ).splitlines()
-        except OSError:
-            continue
-
-        for line_no, line in enumerate(lines, start=1):
-            if regex.search(line):
-                if len(matches) >= _MAX_MATCHES:
-                    truncated = True
-                    break
-
-                # Context window
-                start = max(0, line_no - 1 - context_lines)
-                end = min(len(lines), line_no + context_lines)
-
-                # For single-file search show the filename, not '.'
-                if single_file:
-                    rel = file_path.name
-                else:
-                    rel = _relative_display(file_path, search_root)
-                for ctx_idx in range(start, end):
-                    prefix = ">" if ctx_idx == line_no - 1 else " "
-                    matches.append(
-                        f"{rel}:{ctx_idx + 1}:{prefix} {lines[ctx_idx]}",
-                    )
-                if context_lines > 0:
-                    matches.append("---")
+    matches, truncated = await asyncio.to_thread(
+        _grep,
+        search_root,
+        pattern,
+        regex,
+        is_regex,
+        context_lines,
+    )
 
     if not matches:
         return ToolResponse(
@@ -261,9 +278,9 @@ async def glob_search(
     try:
         results: list[str] = []
         truncated = False
-        for entry in sorted(search_root.glob(pattern)):
-            rel = _relative_display(entry, search_root)
-            suffix = "/" if entry.is_dir() else ""
+        entries = await asyncio.to_thread(_glob, search_root, pattern)
+        for rel, is_dir in entries:
+            suffix = "/" if is_dir else ""
             results.append(f"{rel}{suffix}")
             if len(results) >= _MAX_MATCHES:
                 truncated = True
@@ -0,0 +1,715 @@
+# -*- coding: utf-8 -*-
+"""Persistent trigram index of a workspace for grep and glob search.
+
+``grep_search`` used to walk the whole tree, sort it and read every text
+file on the event loop until it had 200 matches. A :class:`SearchIndex`
+keeps, per search root, every file and directory with its stat
+signature (mtime_ns, size) and, for text files, a trigram signature: a
+Bloom-style bitmap with one bit per distinct byte trigram of the
+(ASCII-lowercased) content. Refreshing is one ``scandir`` walk with a
+``stat`` per file; a file whose stat signature changed has its trigram
+signature marked stale, and stale signatures are recomputed on a
+background thread (building signatures costs more than one plain scan,
+so the first grep over a new tree does not wait for it).
+
+A grep pattern is reduced to the trigrams every match must contain (the
+literal itself, or the literal runs of a regex). Files whose bitmap
+lacks one of them are skipped without being opened; bitmaps give false
+positives, never false negatives, so candidates (and files whose
+signature is stale) are still scanned.
+Candidates are scanned in path order on a worker pool (mmap, so literal
+misses are rejected without decoding) and the scan stops as soon as the
+caller has enough matches.
+
+Indexes are persisted under ``SEARCH_INDEX_DIR`` in the working dir, one
+binary file per root, and saved at most every ``_SAVE_INTERVAL`` seconds
+(and at exit).
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+from ...constant import SEARCH_INDEX_DIR, SEARCH_WORKERS, WORKING_DIR
+from ...utils.regex_parser import sre_parse
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Skip binary / large files
+_BINARY_EXTENSIONS = frozenset(
+    {
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".bmp",
+        ".ico",
+        ".webp",
+        ".svg",
+        ".mp3",
+        ".mp4",
+        ".avi",
+        ".mov",
+        ".mkv",
+        ".flac",
+        ".wav",
+        ".zip",
+        ".tar",
+        ".gz",
+        ".bz2",
+        ".7z",
+        ".rar",
+        ".pdf",
+        ".doc",
+        ".docx",
+        ".xls",
+        ".xlsx",
+        ".ppt",
+        ".pptx",
+        ".exe",
+        ".dll",
+        ".so",
+        ".dylib",
+        ".bin",
+        ".dat",
+        ".woff",
+        ".woff2",
+        ".ttf",
+        ".eot",
+        ".otf",
+        ".pyc",
+        ".pyo",
+        ".class",
+        ".o",
+        ".a",
+    },
+)
+
+_MAX_FILE_SIZE = 2 * 1024 * 1024  # 2 MB
+
+_MAGIC = b"COPAW-SEARCH-INDEX 1\n"
+# mtime_ns, size, path length, signature bits
+_RECORD = struct.Struct("<qqIi")
+# Signature bits: 0 = not a text file, -1 = stale (not computed yet).
+_NOT_TEXT = 0
+_STALE = -1
+_MIN_SIGNATURE_BITS = 64
+_MAX_SIGNATURE_BITS = 1 << 17
+_SAVE_INTERVAL = 30.0
+_MAX_INDEXES = 8
+# Smaller files are read rather than mapped.
+_MMAP_MIN_SIZE = 64 * 1024
+# Files per scan task and scan tasks in flight per worker.
+_SCAN_BATCH = 32
+_SCAN_WINDOW_PER_WORKER = 2
+# Stale signatures computed between two yields of the signing thread.
+_SIGN_BATCH = 64
+
+# (bits, bitmap)
+Signature = tuple[int, int]
+
+
+def is_text_name(name: str, size: int) -> bool:
+    """Heuristic check: skip known binary extensions and large files."""
+    return (
+        os.path.splitext(name)[1].lower() not in _BINARY_EXTENSIONS
+        and size <= _MAX_FILE_SIZE
+    )
+
+
+_BIT_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def _trigram_bit(trigram: int, bits: int) -> int:
+    return ((trigram * 2654435761) >> 8) & (bits - 1)
+
+
+# (a, b, c) byte tuple -> unmasked bit position; the set of trigrams
+# seen in a workspace is small, and a lookup is far cheaper than hashing.
+_trigram_hashes: dict[tuple[int, int, int], int] = {}
+_MAX_CACHED_TRIGRAMS = 1 << 20
+
+
+def content_signature(data: bytes) -> Signature:
+    """Trigram bitmap of ``data``, about two bits per distinct trigram."""
+    data = data.lower()
+    trigrams = set(zip(data, data[1:], data[2:]))
+    new = trigrams.difference(_trigram_hashes)
+    if new:
+        if len(_trigram_hashes) + len(new) > _MAX_CACHED_TRIGRAMS:
+            _trigram_hashes.clear()
+            new = trigrams
+        for a, b, c in new:
+            _trigram_hashes[(a, b, c)] = _trigram_bit(
+                (a << 16) | (b << 8) | c,
+                _MAX_SIGNATURE_BITS,
+            )
+    bits = _MIN_SIGNATURE_BITS
+    while bits < 2 * len(trigrams) and bits < _MAX_SIGNATURE_BITS:
+        bits <<= 1
+    # One byte per bit, turned into an int by a single base-2 parse.
+    flags = bytearray(bits)
+    for bit in set(
+        map((bits - 1).__and__, map(_trigram_hashes.__getitem__, trigrams)),
+    ):
+        flags[bit] = 1
+    return bits, int(flags.translate(_BIT_DIGITS)[::-1], 2)
+
+
+# ASCII letters that ``re.IGNORECASE`` also matches to non-ASCII ones.
+_UNICODE_FOLDED = frozenset(b"iks")
+
+
+def _regex_literals(pattern: str) -> list[str]:
+    """Literal runs of the top-level sequence of a regex.
+
+    Every match contains each run; alternations, classes and repeats
+    end a run, so ``foo(bar|baz)qu+x`` yields ``["foo", "q"]``.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:  # pylint: disable=broad-except
+        return []
+    runs: list[str] = []
+    current: list[str] = []
+    for op, arg in parsed:
+        if op == sre_parse.LITERAL:
+            current.append(chr(arg))
+            continue
+        if current:
+            runs.append("".join(current))
+            current = []
+    if current:
+        runs.append("".join(current))
+    return runs
+
+
+def required_trigrams(
+    pattern: str,
+    is_regex: bool,
+    ignore_case: bool,
+) -> frozenset[int]:
+    """Trigrams every line matching ``pattern`` must contain.
+
+    Trigrams are taken from the ASCII-lowercased UTF-8 bytes, like the
+    index. Under case-insensitive matching, trigrams with non-ASCII
+    bytes are dropped since their case variants differ in bytes, and
+    so are those with ``i``, ``k`` or ``s``, which ``IGNORECASE`` also
+    matches to non-ASCII letters (``İ``, ``ı``, the Kelvin sign, ``ſ``).
+    """
+    literals = _regex_literals(pattern) if is_regex else [pattern]
+    trigrams = set()
+    for literal in literals:
+        data = literal.encode("utf-8").lower()
+        for a, b, c in zip(data, data[1:], data[2:]):
+            if ignore_case and (
+                max(a, b, c) >= 0x80 or _UNICODE_FOLDED & {a, b, c}
+            ):
+                continue
+            trigrams.add((a << 16) | (b << 8) | c)
+    return frozenset(trigrams)
+
+
+def _mask(trigrams: Iterable[int], bits: int) -> int:
+    mask = 0
+    for trigram in trigrams:
+        mask |= 1 << _trigram_bit(trigram, bits)
+    return mask
+
+
+def path_sort_key(rel: str) -> list[str]:
+    """Sort key matching ``sorted()`` of :class:`Path` objects."""
+    return rel.split("/")
+
+
+def read_file(path: str, literal: Optional[bytes] = None) -> Optional[bytes]:
+    """Read a file, through mmap when it is large.
+
+    Returns None when it cannot be read or, if ``literal`` is given,
+    when it does not contain ``literal`` (checked on the mapping, before
+    copying, for large files).
+    """
+    try:
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _MMAP_MIN_SIZE:
+                data = file.read()
+            else:
+                with mmap.mmap(
+                    file.fileno(),
+                    0,
+                    access=mmap.ACCESS_READ,
+                ) as mm:
+                    if literal and mm.find(literal) < 0:
+                        return None
+                    return mm[:]
+    except (OSError, ValueError):
+        return None
+    if literal and literal not in data:
+        return None
+    return data
+
+
+class SearchIndex:
+    """Files, directories and trigram signatures under one root."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._lock = threading.RLock()
+        # Relative POSIX path -> [mtime_ns, size, bits, bitmap]
+        self._files: dict[str, list[int]] = {}
+        self._dirs: set[str] = set()
+        self._dirty = False
+        self._saved_at = 0.0
+        self._signer: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _prefix(subdir: str) -> str:
+        return f"{subdir}/" if subdir else ""
+
+    def refresh(self, subdir: str = "") -> int:
+        """Re-walk ``subdir`` (relative to the root); return changes."""
+        excluded = os.path.abspath(WORKING_DIR / SEARCH_INDEX_DIR)
+        prefix = self._prefix(subdir)
+        seen_files: set[str] = set()
+        seen_dirs: set[str] = set()
+        changed = 0
+        stack = [(os.path.join(self.root, subdir), prefix)]
+        with self._lock:
+            while stack:
+                abs_dir, rel_dir = stack.pop()
+                try:
+                    with os.scandir(abs_dir) as it:
+                        entries = list(it)
+                except OSError:
+                    continue
+                for entry in entries:
+                    rel = rel_dir + entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.path != excluded:
+                                seen_dirs.add(rel)
+                                stack.append((entry.path, rel + "/"))
+                            continue
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    seen_files.add(rel)
+                    old = self._files.get(rel)
+                    if (
+                        old is not None
+                        and old[0] == st.st_mtime_ns
+                        and old[1] == st.st_size
+                    ):
+                        continue
+                    bits = (
+                        _STALE
+                        if is_text_name(entry.name, st.st_size)
+                        else _NOT_TEXT
+                    )
+                    self._files[rel] = [st.st_mtime_ns, st.st_size, bits, 0]
+                    changed += 1
+            removed = [
+                rel
+                for rel in self._files
+                if rel.startswith(prefix) and rel not in seen_files
+            ]
+            for rel in removed:
+                del self._files[rel]
+            stale_dirs = {
+                d for d in self._dirs if d.startswith(prefix)
+            } - seen_dirs
+            self._dirs -= stale_dirs
+            self._dirs |= seen_dirs
+            changed += len(removed) + len(stale_dirs)
+            if changed:
+                self._dirty = True
+                self._start_signing()
+        return changed
+
+    def _start_signing(self) -> None:
+        if self._signer is not None and self._signer.is_alive():
+            return
+        self._signer = threading.Thread(
+            target=self._sign_stale,
+            name="copaw-search-index",
+            daemon=True,
+        )
+        self._signer.start()
+
+    def _sign_stale(self) -> None:
+        while True:
+            with self._lock:
+                stale = [
+                    (rel, (entry[0], entry[1]))
+                    for rel, entry in self._files.items()
+                    if entry[2] == _STALE
+                ]
+            if not stale:
+                break
+            for i, (rel, stat_signature) in enumerate(stale, start=1):
+                data = read_file(os.path.join(self.root, rel))
+                # Unreadable files get an empty signature; grep skips
+                # them anyway.
+                self.set_signature(
+                    rel,
+                    stat_signature,
+                    content_signature(data or b""),
+                )
+                if i % _SIGN_BATCH == 0:
+                    # Let request handling threads run.
+                    time.sleep(0)
+        self.save(force=True)
+
+    def wait_signed(self, timeout: Optional[float] = None) -> bool:
+        """Wait for stale signatures to be computed (tests, benchmarks)."""
+        signer = self._signer
+        if signer is not None:
+            signer.join(timeout)
+            return not signer.is_alive()
+        return True
+
+    def candidates(
+        self,
+        subdir: str,
+        trigrams: frozenset[int],
+    ) -> list[str]:
+        """Text files under ``subdir`` that may contain all ``trigrams``.
+
+        Paths are relative to ``subdir``, in path order. Files with a
+        stale signature are always candidates.
+        """
+        prefix = self._prefix(subdir)
+        cut = len(prefix)
+        masks: dict[int, int] = {}
+        out = []
+        with self._lock:
+            for rel, (_, _, bits, bitmap) in self._files.items():
+                if bits == _NOT_TEXT or not rel.startswith(prefix):
+                    continue
+                if bits != _STALE and trigrams:
+                    mask = masks.get(bits)
+                    if mask is None:
+                        mask = masks[bits] = _mask(trigrams, bits)
+                    if bitmap & mask != mask:
+                        continue
+                out.append(rel[cut:])
+        out.sort(key=path_sort_key)
+        return out
+
+    def set_signature(
+        self,
+        rel: str,
+        stat_signature: tuple[int, int],
+        signature: Signature,
+    ) -> None:
+        """Store a signature computed from the file's content.
+
+        Ignored if the file changed since ``stat_signature`` was taken.
+        """
+        with self._lock:
+            entry = self._files.get(rel)
+            if entry is None or tuple(entry[:2]) != stat_signature:
+                return
+            entry[2], entry[3] = signature
+            self._dirty = True
+
+    def entries(self, subdir: str = "") -> list[tuple[str, bool]]:
+        """All ``(path relative to subdir, is_dir)`` under ``subdir``."""
+        prefix = self._prefix(subdir)
+        cut = len(prefix)
+        with self._lock:
+            files = [
+                (rel[cut:], False)
+                for rel in self._files
+                if rel.startswith(prefix)
+            ]
+            dirs = [
+                (d[cut:], True) for d in self._dirs if d.startswith(prefix)
+            ]
+        return files + dirs
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    # Persistence
+
+    def to_bytes(self) -> bytes:
+        with self._lock:
+            header = json.dumps(
+                {"root": str(self.root), "dirs": sorted(self._dirs)},
+                ensure_ascii=False,
+            ).encode("utf-8")
+            parts = [_MAGIC, struct.pack("<I", len(header)), header]
+            for rel, (mtime_ns, size, bits, bitmap) in self._files.items():
+                path = rel.encode("utf-8", errors="surrogateescape")
+                parts.append(_RECORD.pack(mtime_ns, size, len(path), bits))
+                parts.append(path)
+                if bits > 0:
+                    parts.append(bitmap.to_bytes(bits // 8, "little"))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, root: Path, data: bytes) -> "SearchIndex":
+        if not data.startswith(_MAGIC):
+            raise ValueError("not a search index")
+        view = memoryview(data)
+        offset = len(_MAGIC)
+        (header_len,) = struct.unpack_from("<I", view, offset)
+        offset += 4
+        header = json.loads(bytes(view[offset : offset + header_len]))
+        offset += header_len
+        if header.get("root") != str(root):
+            raise ValueError("search index belongs to another root")
+        index = cls(root)
+        index._dirs = set(header.get("dirs", []))
+        files = index._files
+        unpack = _RECORD.unpack_from
+        record_size = _RECORD.size
+        while offset < len(data):
+            mtime_ns, size, path_len, bits = unpack(view, offset)
+            offset += record_size
+            rel = bytes(view[offset : offset + path_len]).decode(
+                "utf-8",
+                errors="surrogateescape",
+            )
+            offset += path_len
+            bitmap = 0
+            if bits > 0:
+                end = offset + bits // 8
+                bitmap = int.from_bytes(view[offset:end], "little")
+                offset = end
+            files[rel] = [mtime_ns, size, bits, bitmap]
+        return index
+
+    def save(self, force: bool = False) -> None:
+        """Persist unsaved changes, at most every ``_SAVE_INTERVAL``.
+
+        Nothing is written until the working dir exists (``copaw init``).
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not self._dirty:
+                return
+            if not force and now - self._saved_at < _SAVE_INTERVAL:
+                return
+            if not WORKING_DIR.is_dir():
+                return
+            path = _index_file(self.root)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "wb") as file:
+                    file.write(self.to_bytes())
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.debug("Failed to save search index: %s", e)
+                return
+            self._dirty = False
+            self._saved_at = now
+
+
+def _index_file(root: Path) -> Path:
+    digest = hashlib.blake2b(
+        str(root).encode("utf-8", errors="surrogateescape"),
+        digest_size=8,
+    ).hexdigest()
+    return WORKING_DIR / SEARCH_INDEX_DIR / f"{digest}.idx"
+
+
+def _load(root: Path) -> Optional[SearchIndex]:
+    try:
+        data = _index_file(root).read_bytes()
+    except OSError:
+        return None
+    try:
+        index = SearchIndex.from_bytes(root, data)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning("Ignoring unreadable search index: %s", e)
+        return None
+    index._saved_at = time.monotonic()  # pylint: disable=protected-access
+    return index
+
+
+_indexes: OrderedDict[Path, SearchIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(root: Path) -> tuple[SearchIndex, str]:
+    """Get the index covering ``root`` and ``root`` relative to it.
+
+    An index already kept for an ancestor of ``root`` (in memory or on
+    disk) is reused, so searching a subdirectory refreshes and filters
+    that part of the ancestor's index.
+    """
+    root = Path(os.path.abspath(root))
+    with _indexes_lock:
+        for base in (root, *root.parents):
+            index = _indexes.get(base)
+            if index is None:
+                index = _load(base)
+                if index is None:
+                    continue
+                _indexes[base] = index
+            _indexes.move_to_end(base)
+            break
+        else:
+            index = SearchIndex(root)
+            _indexes[root] = index
+        while len(_indexes) > _MAX_INDEXES:
+            _, evicted = _indexes.popitem(last=False)
+            evicted.save(force=True)
+    subdir = root.relative_to(index.root).as_posix()
+    return index, "" if subdir == "." else subdir
+
+
+def save_search_indexes() -> None:
+    """Persist all indexes with unsaved changes (best effort)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.save(force=True)
+
+
+def reset_search_indexes() -> None:
+    """Forget in-memory indexes once they are signed (tests)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+        _indexes.clear()
+    for index in indexes:
+        index.wait_signed()
+
+
+atexit.register(save_search_indexes)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=SEARCH_WORKERS,
+                thread_name_prefix="copaw-search",
+            )
+        return _executor
+
+
+def _map_batch(fn: Callable[[T], R], batch: list[T]) -> list[R]:
+    return [fn(item) for item in batch]
+
+
+def scan_ordered(fn: Callable[[T], R], items: list[T]) -> Iterator[R]:
+    """Map ``fn`` over ``items`` on the worker pool, yielding in order.
+
+    Items are handed out in batches and only a bounded window of batches
+    is in flight; when the consumer stops iterating, batches not yet
+    started are cancelled.
+    """
+    executor = _get_executor()
+    window = SEARCH_WORKERS * _SCAN_WINDOW_PER_WORKER
+    batches = iter(
+        [
+            items[i : i + _SCAN_BATCH]
+            for i in range(0, len(items), _SCAN_BATCH)
+        ],
+    )
+    pending: deque[Future] = deque()
+    try:
+        for batch in batches:
+            pending.append(executor.submit(_map_batch, fn, batch))
+            if len(pending) >= window:
+                break
+        while pending:
+            results = pending.popleft().result()
+            for batch in batches:
+                pending.append(executor.submit(_map_batch, fn, batch))
+                break
+            yield from results
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+_GLOB_SPECIAL = re.compile(r"(\*\*|\*|\?|\[!?\]?[^\]]*\])")
+
+
+def _glob_segment(segment: str) -> str:
+    out = []
+    for part in _GLOB_SPECIAL.split(segment):
+        if not part:
+            continue
+        if part in ("*", "**"):
+            out.append("[^/]*")
+        elif part == "?":
+            out.append("[^/]")
+        elif part.startswith("[") and part.endswith("]") and len(part) > 2:
+            body = part[1:-1]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+        else:
+            out.append(re.escape(part))
+    return "".join(out)
+
+
+def compile_recursive_glob(pattern: str) -> Optional[re.Pattern]:
+    """Regex over relative POSIX paths equivalent to ``Path.glob``.
+
+    Only patterns with a ``**`` component and a final component that is
+    not ``**`` are handled; returns None for anything else, which is left
+    to :meth:`Path.glob`.
+    """
+    segments = pattern.split("/")
+    if (
+        "**" not in segments
+        or segments[-1] == "**"
+        or os.path.isabs(pattern)
+        or any(s in ("", ".", "..") for s in segments)
+        or any("**" in s and s != "**" for s in segments)
+    ):
+        return None
+    out = []
+    for segment in segments[:-1]:
+        if segment == "**":
+            out.append("(?:[^/]+/)*")
+        else:
+            out.append(_glob_segment(segment) + "/")
+    out.append(_glob_segment(segments[-1]))
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return re.compile("".join(out), flags | re.DOTALL)
+
+
+__all__ = [
+    "SearchIndex",
+    "compile_recursive_glob",
+    "content_signature",
+    "get_search_index",
+    "is_text_name",
+    "path_sort_key",
+    "read_file",
+    "required_trigrams",
+    "reset_search_indexes",
+    "save_search_indexes",
+    "scan_ordered",
+]
@@ -6,16 +6,22 @@
 import asyncio
 import locale
 import os
+import signal
 import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import AsyncGenerator, BinaryIO, Optional
 
 from agentscope.message import TextBlock
 from agentscope.tool import ToolResponse
 
-from copaw.constant import WORKING_DIR
-from .utils import truncate_shell_output
+from copaw.constant import SHELL_PROGRESS_INTERVAL, WORKING_DIR
+from .utils import HeadTailBuffer
+
+# Bytes read from a pipe at a time
+_READ_CHUNK = 256 * 1024
 
 
 def _kill_process_tree_win32(pid: int) -> None:
@@ -35,12 +41,26 @@ def _kill_process_tree_win32(pid: int) -> None:
         pass
 
 
+def _drain_pipe(pipe: BinaryIO, buffer: HeadTailBuffer) -> None:
+    """Copy a pipe into ``buffer`` until EOF (reader thread)."""
+    try:
+        while True:
+            data = pipe.read1(_READ_CHUNK)  # type: ignore[attr-defined]
+            if not data:
+                return
+            buffer.feed(data)
+    except (OSError, ValueError):
+        return
+
+
 def _execute_subprocess_sync(
     cmd: str,
     cwd: str,
     timeout: int,
-    env: dict | None = None,
-) -> tuple[int, str, str]:
+    env: dict | None,
+    stdout_buffer: HeadTailBuffer,
+    stderr_buffer: HeadTailBuffer,
+) -> tuple[int, str]:
     """Execute subprocess synchronously in a thread.
 
     This function runs in a separate thread to avoid Windows asyncio
@@ -50,6 +70,8 @@ def _execute_subprocess_sync(
     latter's internal cleanup after a timeout calls ``communicate()``
     **without** a timeout, which hangs when descendant processes still
     hold the pipe handles open (e.g. ``notepad.exe``, ``cmd /k pause``).
+    Output is copied into the buffers by two reader threads as it is
+    produced, so the caller can report progress.
 
     Args:
         cmd (`str`):
@@ -60,12 +82,16 @@ def _execute_subprocess_sync(
             The maximum time (in seconds) allowed for the command to run.
         env (`dict | None`):
             Environment variables for the subprocess.
+        stdout_buffer (`HeadTailBuffer`):
+            Receives standard output.
+        stderr_buffer (`HeadTailBuffer`):
+            Receives standard error.
 
     Returns:
-        `tuple[int, str, str]`:
-            A tuple containing the return code, standard output, and
-            standard error of the executed command. If timeout occurs, the
-            return code will be -1 and stderr will contain timeout information.
+        `tuple[int, str]`:
+            The return code and an error message to append to stderr. If
+            timeout occurs, the return code will be -1 and the message
+            will contain timeout information.
     """
     try:
         with subprocess.Popen(
@@ -78,47 +104,172 @@ def _execute_subprocess_sync(
             env=env,
             creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
         ) as proc:
-            try:
-                stdout, stderr = proc.communicate(timeout=timeout)
-                return (
-                    proc.returncode,
-                    smart_decode(stdout),
-                    smart_decode(stderr),
+            readers = [
+                threading.Thread(
+                    target=_drain_pipe,
+                    args=(pipe, buffer),
+                    daemon=True,
                 )
-            except subprocess.TimeoutExpired:
-                _kill_process_tree_win32(proc.pid)
+                for pipe, buffer in (
+                    (proc.stdout, stdout_buffer),
+                    (proc.stderr, stderr_buffer),
+                )
+            ]
+            for reader in readers:
+                reader.start()
 
-                # Try to drain remaining output after the tree has been killed.
-                # The second communicate() should return quickly now that all
-                # writers are dead.  Guard with a timeout just in case.
+            # The timeout covers both the process and EOF on its pipes,
+            # which descendants may keep open after it exits.
+            deadline = time.monotonic() + timeout
+            try:
+                proc.wait(timeout=timeout)
+                for reader in readers:
+                    reader.join(max(0.0, deadline - time.monotonic()))
+                if not any(reader.is_alive() for reader in readers):
+                    return proc.returncode, ""
+            except subprocess.TimeoutExpired:
+                pass
+
+            _kill_process_tree_win32(proc.pid)
+
+            # Try to drain remaining output after the tree has been killed.
+            # The readers should hit EOF quickly now that all writers are
+            # dead.  Guard with a timeout just in case.
+            for reader in readers:
+                reader.join(5)
+            if any(reader.is_alive() for reader in readers):
+                # Force-close pipes to unblock any lingering reader threads.
+                for pipe in (proc.stdout, proc.stderr, proc.stdin):
+                    if pipe:
+                        try:
+                            pipe.close()
+                        except OSError:
+                            pass
                 try:
-                    stdout, stderr = proc.communicate(timeout=5)
-                    stdout_str = smart_decode(stdout)
-                    stderr_str = smart_decode(stderr)
-                except (subprocess.TimeoutExpired, OSError, ValueError):
-                    stdout_str, stderr_str = "", ""
-                    # Force-close pipes to unblock any lingering reader threads
-                    # spawned by the first communicate() call.
-                    for pipe in (proc.stdout, proc.stderr, proc.stdin):
-                        if pipe:
-                            try:
-                                pipe.close()
-                            except OSError:
-                                pass
-                    try:
-                        proc.wait(timeout=3)
-                    except subprocess.TimeoutExpired:
-                        pass
-
-                timeout_msg = f"Command execution exceeded the timeout of {timeout} seconds."
-                if stderr_str:
-                    stderr_str = f"{stderr_str}\n{timeout_msg}"
-                else:
-                    stderr_str = timeout_msg
-                return -1, stdout_str, stderr_str
+                    proc.wait(timeout=3)
+                except subprocess.TimeoutExpired:
+                    pass
+
+            return (
+                -1,
+                f"Command execution exceeded the timeout of {timeout} seconds.",
+            )
 
     except Exception as e:
-        return -1, "", str(e)
+        return -1, str(e)
+
+
+def _signal_process_group(pid: int, sig: int) -> None:
+    try:
+        os.killpg(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _pump(stream: asyncio.StreamReader, buffer: HeadTailBuffer) -> None:
+    while True:
+        data = await stream.read(_READ_CHUNK)
+        if not data:
+            return
+        buffer.feed(data)
+
+
+async def _execute_subprocess_async(
+    cmd: str,
+    cwd: str,
+    timeout: int,
+    env: dict,
+    stdout_buffer: HeadTailBuffer,
+    stderr_buffer: HeadTailBuffer,
+) -> tuple[int, str]:
+    """POSIX counterpart of :func:`_execute_subprocess_sync`."""
+    proc = await asyncio.create_subprocess_shell(
+        cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        bufsize=0,
+        cwd=cwd,
+        env=env,
+        # Own process group, so the whole tree can be signalled.
+        start_new_session=True,
+    )
+    # Apply the timeout to reading the pipes too; wait() alone can return
+    # while descendants keep stdout/stderr open.
+    done_reading = asyncio.ensure_future(
+        asyncio.gather(
+            _pump(proc.stdout, stdout_buffer),
+            _pump(proc.stderr, stderr_buffer),
+            proc.wait(),
+        ),
+    )
+    try:
+        done, _ = await asyncio.wait({done_reading}, timeout=timeout)
+    except asyncio.CancelledError:
+        done_reading.cancel()
+        _signal_process_group(proc.pid, signal.SIGKILL)
+        raise
+    if done:
+        done_reading.result()
+        return proc.returncode, ""
+
+    # Handle timeout: signal the whole tree, since descendants holding
+    # the pipes would otherwise outlive the shell.
+    _signal_process_group(proc.pid, signal.SIGTERM)
+    # Wait a bit for graceful termination
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=1)
+    except asyncio.TimeoutError:
+        # Force kill if graceful termination fails
+        _signal_process_group(proc.pid, signal.SIGKILL)
+        await proc.wait()
+
+    # Avoid hanging forever while draining pipes after timeout.
+    done, _ = await asyncio.wait({done_reading}, timeout=1)
+    if not done:
+        done_reading.cancel()
+    return -1, (
+        f"⚠️ TimeoutError: The command execution exceeded "
+        f"the timeout of {timeout} seconds. "
+        f"Please consider increasing the timeout value if this command "
+        f"requires more time to complete."
+    )
+
+
+def _format_result(returncode: int, stdout_str: str, stderr_str: str) -> str:
+    """Format the response in a human-friendly way."""
+    if returncode == 0:
+        # Success case: just show the output
+        if stdout_str:
+            return stdout_str
+        return "Command executed successfully (no output)."
+    # Error case: show detailed information
+    response_parts = [f"Command failed with exit code {returncode}."]
+    if stdout_str:
+        response_parts.append(f"\n[stdout]\n{stdout_str}")
+    if stderr_str:
+        response_parts.append(f"\n[stderr]\n{stderr_str}")
+    return "".join(response_parts)
+
+
+def _format_progress(
+    elapsed: float,
+    stdout_buffer: HeadTailBuffer,
+    stderr_buffer: HeadTailBuffer,
+) -> str:
+    response_parts = [
+        f"Command still running ({elapsed:.0f}s, "
+        f"{stdout_buffer.total_bytes + stderr_buffer.total_bytes} bytes "
+        "of output so far).",
+    ]
+    if stdout_buffer.total_bytes:
+        response_parts.append(
+            f"\n[stdout]\n{stdout_buffer.render(smart_decode)}",
+        )
+    if stderr_buffer.total_bytes:
+        response_parts.append(
+            f"\n[stderr]\n{stderr_buffer.render(smart_decode)}",
+        )
+    return "".join(response_parts)
 
 
 # pylint: disable=too-many-branches, too-many-statements
@@ -126,7 +277,7 @@ async def execute_shell_command(
     command: str,
     timeout: int = 60,
     cwd: Optional[Path] = None,
-) -> ToolResponse:
+) -> AsyncGenerator[ToolResponse, None]:
     """Execute given command and return the return code, standard output and
     error within <returncode></returncode>, <stdout></stdout> and
     <stderr></stderr> tags.
@@ -142,10 +293,13 @@ async def execute_shell_command(
             If None, defaults to WORKING_DIR.
 
     Returns:
-        `ToolResponse`:
-            The tool response containing the return code, standard output, and
-            standard error of the executed command. If timeout occurs, the
-            return code will be -1 and stderr will contain timeout information.
+        `AsyncGenerator[ToolResponse, None]`:
+            While the command runs, progress responses with the output so
+            far; then the final response containing the return code,
+            standard output, and standard error of the executed command.
+            If timeout occurs, the return code will be -1 and stderr will
+            contain timeout information. Output is kept bounded: only its
+            head and tail are shown.
     """
 
     cmd = (command or "").strip()
@@ -162,112 +316,83 @@ async def execute_shell_command(
     else:
         env["PATH"] = python_bin_dir
 
+    stdout_buffer = HeadTailBuffer()
+    stderr_buffer = HeadTailBuffer()
+    if sys.platform == "win32":
+        # Windows: use thread pool to avoid asyncio subprocess limitations
+        execution = asyncio.to_thread(
+            _execute_subprocess_sync,
+            cmd,
+            str(working_dir),
+            timeout,
+            env,
+            stdout_buffer,
+            stderr_buffer,
+        )
+    else:
+        execution = _execute_subprocess_async(
+            cmd,
+            str(working_dir),
+            timeout,
+            env,
+            stdout_buffer,
+            stderr_buffer,
+        )
+    task = asyncio.ensure_future(execution)
+
     try:
-        if sys.platform == "win32":
-            # Windows: use thread pool to avoid asyncio subprocess limitations
-            returncode, stdout_str, stderr_str = await asyncio.to_thread(
-                _execute_subprocess_sync,
-                cmd,
-                str(working_dir),
-                timeout,
-                env,
+        # Stream progress while the command runs and produces output.
+        started = time.monotonic()
+        reported = 0
+        while True:
+            done, _ = await asyncio.wait(
+                {task},
+                timeout=SHELL_PROGRESS_INTERVAL or None,
             )
-        else:
-            proc = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                bufsize=0,
-                cwd=str(working_dir),
-                env=env,
+            if done:
+                break
+            produced = stdout_buffer.total_bytes + stderr_buffer.total_bytes
+            if produced == reported:
+                continue
+            reported = produced
+            yield ToolResponse(
+                content=[
+                    TextBlock(
+                        type="text",
+                        text=_format_progress(
+                            time.monotonic() - started,
+                            stdout_buffer,
+                            stderr_buffer,
+                        ),
+                    ),
+                ],
+                stream=True,
+                is_last=False,
             )
 
-            try:
-                # Apply timeout to communicate directly; wait()+communicate()
-                # can hang if descendants keep stdout/stderr pipes open.
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(),
-                    timeout=timeout,
-                )
-                stdout_str = smart_decode(stdout)
-                stderr_str = smart_decode(stderr)
-                returncode = proc.returncode
-
-            except asyncio.TimeoutError:
-                # Handle timeout
-                stderr_suffix = (
-                    f"⚠️ TimeoutError: The command execution exceeded "
-                    f"the timeout of {timeout} seconds. "
-                    f"Please consider increasing the timeout value if this command "
-                    f"requires more time to complete."
-                )
-                returncode = -1
-                try:
-                    proc.terminate()
-                    # Wait a bit for graceful termination
-                    try:
-                        await asyncio.wait_for(proc.wait(), timeout=1)
-                    except asyncio.TimeoutError:
-                        # Force kill if graceful termination fails
-                        proc.kill()
-                        await proc.wait()
-
-                    # Avoid hanging forever while draining pipes after timeout.
-                    try:
-                        stdout, stderr = await asyncio.wait_for(
-                            proc.communicate(),
-                            timeout=1,
-                        )
-                    except asyncio.TimeoutError:
-                        stdout, stderr = b"", b""
-                    stdout_str = smart_decode(stdout)
-                    stderr_str = smart_decode(stderr)
-                    if stderr_str:
-                        stderr_str += f"\n{stderr_suffix}"
-                    else:
-                        stderr_str = stderr_suffix
-                except ProcessLookupError:
-                    stdout_str = ""
-                    stderr_str = stderr_suffix
-
-        # Apply output truncation
-        stdout_str = truncate_shell_output(stdout_str)
-        stderr_str = truncate_shell_output(stderr_str)
-
-        # Format the response in a human-friendly way
-        if returncode == 0:
-            # Success case: just show the output
-            if stdout_str:
-                response_text = stdout_str
-            else:
-                response_text = "Command executed successfully (no output)."
-        else:
-            # Error case: show detailed information
-            response_parts = [f"Command failed with exit code {returncode}."]
-            if stdout_str:
-                response_parts.append(f"\n[stdout]\n{stdout_str}")
-            if stderr_str:
-                response_parts.append(f"\n[stderr]\n{stderr_str}")
-            response_text = "".join(response_parts)
-
-        return ToolResponse(
-            content=[
-                TextBlock(
-                    type="text",
-                    text=response_text,
-                ),
-            ],
-        )
+        returncode, error = task.result()
+        stdout_str = stdout_buffer.render(smart_decode)
+        stderr_str = stderr_buffer.render(smart_decode)
+        if error:
+            stderr_str = f"{stderr_str}\n{error}" if stderr_str else error
+        response_text = _format_result(returncode, stdout_str, stderr_str)
 
     except Exception as e:
-        return ToolResponse(
-            content=[
-                TextBlock(
-                    type="text",
-                    text=f"Error: Shell command execution failed due to \n{e}",
-                ),
-            ],
-        )
+        response_text = f"Error: Shell command execution failed due to \n{e}"
+    finally:
+        if not task.done():
+            task.cancel()
+
+    yield ToolResponse(
+        content=[
+            TextBlock(
+                type="text",
+                text=response_text,
+            ),
+        ],
+        stream=True,
+        is_last=True,
+    )
 
 
 def smart_decode(data: bytes) -> str:
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 """Shared utilities for file and shell tools."""
 
+import threading
+from typing import Callable
+
 # Default truncation limits
 DEFAULT_MAX_LINES = 1000
 DEFAULT_MAX_BYTES = 30 * 1024  # 30KB
+# Share of the limits kept from the head of streamed output
+_HEAD_SHARE = 4
 
 
 # pylint: disable=too-many-branches
@@ -181,46 +186,111 @@ def truncate_file_output(
         return text
 
 
-def truncate_shell_output(text: str) -> str:
-    """Truncate shell output to last N lines or M bytes.
+def _trim_partial_utf8(head: bytes, tail: bytes) -> tuple[bytes, bytes]:
+    """Drop UTF-8 sequences cut at the end of head / start of tail."""
+    skip = 0
+    while skip < min(3, len(tail)) and tail[skip] & 0xC0 == 0x80:
+        skip += 1
+    tail = tail[skip:]
+    for back in range(1, min(4, len(head)) + 1):
+        byte = head[-back]
+        if byte & 0xC0 != 0x80:
+            if byte >= 0xC0:
+                need = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+                if need > back:
+                    head = head[:-back]
+            break
+    return head, tail
 
-    Includes a truncation notice when applied.
 
-    Args:
-        text: The output text to truncate.
+class HeadTailBuffer:
+    """Bounded capture of a byte stream: its first and last bytes.
 
-    Returns:
-        Truncated text with notice if truncated.
-    """
-    if not text:
-        return text
+    Memory stays under ``head_bytes + 2 * tail_bytes`` whatever the
+    size of the stream. One thread may :meth:`feed` while another
+    calls :meth:`render`.
 
-    try:
-        total_lines = len(text.split("\n"))
-        truncated, was_truncated, output_lines, reason = truncate_output(
-            text,
-            keep="tail",
-        )
-
-        if not was_truncated:
-            return text
+    Args:
+        head_bytes: Bytes kept from the start of the stream.
+        tail_bytes: Bytes kept from the end of the stream.
+    """
 
-        start_line = total_lines - output_lines + 1
-        if reason == "lines":
-            notice = (
-                "\n\n[Output truncated: showing lines "
-                f"{start_line}-{total_lines} of {total_lines} total]"
-            )
+    def __init__(
+        self,
+        head_bytes: int = DEFAULT_MAX_BYTES // _HEAD_SHARE,
+        tail_bytes: int = DEFAULT_MAX_BYTES - DEFAULT_MAX_BYTES // _HEAD_SHARE,
+    ) -> None:
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.total_bytes = 0
+        self.newlines = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._ends_with_newline = False
+        self._lock = threading.Lock()
+
+    def feed(self, data: bytes) -> None:
+        """Append a chunk of the stream."""
+        if not data:
+            return
+        with self._lock:
+            self.total_bytes += len(data)
+            self.newlines += data.count(b"\n")
+            self._ends_with_newline = data.endswith(b"\n")
+            room = self.head_bytes - len(self._head)
+            if room > 0:
+                self._head += data[:room]
+                data = data[room:]
+            if data:
+                self._tail += data
+                # Trim in bulk so appends stay amortized O(1).
+                if len(self._tail) > 2 * self.tail_bytes:
+                    del self._tail[: -self.tail_bytes]
+
+    def render(
+        self,
+        decode: Callable[[bytes], str],
+        max_lines: int = DEFAULT_MAX_LINES,
+    ) -> str:
+        """Decode the kept bytes, with a notice if anything was dropped.
+
+        At most ``max_lines`` lines are shown, split between head and
+        tail like the bytes.
+        """
+        with self._lock:
+            head = bytes(self._head)
+            tail = bytes(self._tail[-self.tail_bytes :])
+            total_bytes = self.total_bytes
+            total_lines = self.newlines + (not self._ends_with_newline)
+        omitted = total_bytes - len(head) - len(tail)
+        head_max = max_lines // _HEAD_SHARE
+        if omitted == 0:
+            lines = decode(head + tail).split("\n")
+            if len(lines) <= max_lines:
+                return "\n".join(lines)
+            head_lines = lines[:head_max]
+            tail_lines = lines[head_max - max_lines :]
+            total_lines = len(lines)
         else:
-            notice = (
-                "\n\n[Output truncated: showing lines "
-                f"{start_line}-{total_lines} of {total_lines} "
-                f"({DEFAULT_MAX_BYTES // 1024}KB limit)]"
-            )
-
-        return truncated + notice
-    except Exception:
-        return text
+            head, tail = _trim_partial_utf8(head, tail)
+            head_lines = decode(head).split("\n")[:head_max]
+            tail_lines = decode(tail).split("\n")
+            # The first tail line starts mid-line.
+            if len(tail_lines) > 1:
+                tail_lines = tail_lines[1:]
+            tail_lines = tail_lines[head_max - max_lines :]
+        start_line = max(
+            len(head_lines) + 1,
+            total_lines - len(tail_lines) + 1,
+        )
+        notice = (
+            "[Output truncated: showing lines "
+            f"1-{len(head_lines)} and {start_line}-{total_lines} "
+            f"of {total_lines} total ({total_bytes} bytes)]"
+        )
+        return "\n".join(
+            ["\n".join(head_lines), "", notice, "", "\n".join(tail_lines)],
+        )
 
 
 def read_file_safe(file_path: str) -> str:
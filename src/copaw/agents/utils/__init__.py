@@ -4,6 +4,7 @@ Agent utilities package.
 
 This package provides utilities for agent operations:
 - file_handling: File download and management
+- media_store: Content-addressed store for downloaded media
 - message_processing: Message content manipulation and validation
 - tool_message_utils: Tool message validation and sanitization
 - token_counting: Token counting for context window management
@@ -16,6 +17,9 @@ from .file_handling import (
     download_file_from_url,
 )
 
+# Media store
+from .media_store import MediaStore, MediaTooLargeError, get_media_store
+
 # Message processing
 from .message_processing import (
     is_first_user_interaction,
@@ -28,8 +32,10 @@ from .setup_utils import copy_md_files
 
 # Token counting
 from .token_counting import (
+    MessageTokenCache,
     _get_token_counter,
     count_message_tokens,
+    get_message_token_cache,
     safe_count_message_tokens,
     safe_count_str_tokens,
 )
@@ -48,6 +54,10 @@ __all__ = [
     # File handling
     "download_file_from_base64",
     "download_file_from_url",
+    # Media store
+    "MediaStore",
+    "MediaTooLargeError",
+    "get_media_store",
     # Message processing
     "process_file_and_media_blocks_in_message",
     "is_first_user_interaction",
@@ -55,8 +65,10 @@ __all__ = [
     # Setup utilities
     "copy_md_files",
     # Token counting
+    "MessageTokenCache",
     "_get_token_counter",
     "count_message_tokens",
+    "get_message_token_cache",
     "safe_count_message_tokens",
     "safe_count_str_tokens",
     # Tool message utilities
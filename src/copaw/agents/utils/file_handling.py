@@ -5,18 +5,19 @@ This module provides utilities for:
 - Downloading files from base64 encoded data
 - Downloading files from URLs
 - Managing download directories
+
+Content goes through the shared :mod:`.media_store`, which downloads
+asynchronously and keeps each distinct file once.
 """
 import os
-import mimetypes
-import base64
-import hashlib
 import logging
-import subprocess
 import urllib.parse
 import urllib.request
 from pathlib import Path
 from typing import Optional
 
+from .media_store import copy_out, get_media_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,129 +54,27 @@ def _resolve_local_path(
     return None
 
 
-def _download_remote_to_path(url: str, local_file_path: Path) -> None:
-    """
-    Download url to local_file_path via wget, curl, or urllib. Raises on fail.
-    """
-    try:
-        subprocess.run(
-            ["wget", "-q", "-O", str(local_file_path), url],
-            capture_output=True,
-            timeout=60,
-            check=True,
-        )
-        logger.debug("Downloaded file via wget to: %s", local_file_path)
-        return
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        logger.debug("wget failed, trying curl: %s", e)
-    try:
-        subprocess.run(
-            ["curl", "-s", "-L", "-o", str(local_file_path), url],
-            capture_output=True,
-            timeout=60,
-            check=True,
-        )
-        logger.debug("Downloaded file via curl to: %s", local_file_path)
-        return
-    except (subprocess.CalledProcessError, FileNotFoundError) as curl_err:
-        logger.debug("curl failed, trying urllib: %s", curl_err)
-    try:
-        urllib.request.urlretrieve(url, str(local_file_path))
-        logger.debug("Downloaded file via urllib to: %s", local_file_path)
-    except Exception as urllib_err:
-        logger.error(
-            "wget, curl and urllib all failed for URL %s: %s",
-            url,
-            urllib_err,
-        )
-        raise RuntimeError(
-            "Failed to download file: wget, curl and urllib all failed",
-        ) from urllib_err
-
-
-def _guess_suffix_from_url_headers(url: str) -> Optional[str]:
-    """
-    HEAD request to get Content-Type and return a suffix like '.pdf'.
-    Used to fix DingTalk download URLs that always return .file extension.
-    Returns None on any failure (e.g. OSS forbids HEAD or returns no type).
-    """
-    try:
-        req = urllib.request.Request(url, method="HEAD")
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            raw = (
-                (resp.headers.get("Content-Type") or "").split(";")[0].strip()
-            )
-            if not raw:
-                return None
-            suffix = mimetypes.guess_extension(raw)
-            return suffix if suffix else None
-    except Exception:
-        return None
-
-
-# Magic bytes (prefix) -> suffix for .file fallback when HEAD fails (e.g. OSS).
-_MAGIC_SUFFIX: list[tuple[bytes, str]] = [
-    (b"%PDF", ".pdf"),
-    (b"PK\x03\x04", ".zip"),
-    (b"PK\x05\x06", ".zip"),
-    (b"\x89PNG\r\n\x1a\n", ".png"),
-    (b"\xff\xd8\xff", ".jpg"),
-    (b"GIF87a", ".gif"),
-    (b"GIF89a", ".gif"),
-    (b"\xd0\xcf\x11\xe0", ".doc"),  # MS Office (doc, xls, ppt)
-    (b"RIFF", ".webp"),  # or .wav; webp has RIFF....WEBP
-]
-
-
-def _guess_suffix_from_file_content(path: Path) -> Optional[str]:
-    """
-    Guess file extension from magic bytes. Used when URL HEAD fails (e.g. OSS).
-    Returns suffix like '.pdf' or None.
-    """
-    try:
-        with open(path, "rb") as f:
-            head = f.read(32)
-        for magic, suffix in _MAGIC_SUFFIX:
-            if head.startswith(magic):
-                return suffix
-        return None
-    except Exception:
-        return None
-
-
 async def download_file_from_base64(
     base64_data: str,
     filename: Optional[str] = None,
-    download_dir: str = "downloads",
+    download_dir: Optional[str] = None,
 ) -> str:
     """
-    Save base64-encoded file data to local download directory.
+    Save base64-encoded file data to local storage.
 
     Args:
         base64_data: Base64-encoded file content.
-        filename: The filename to save. If not provided, will generate one.
-        download_dir: The directory to save files. Defaults to "downloads".
+        filename: The filename to save. If not provided, one is derived
+            from the content type.
+        download_dir: Directory to place the file in. Defaults to the
+            media store, which keeps each distinct file once.
 
     Returns:
         The local file path.
     """
     try:
-        file_content = base64.b64decode(base64_data)
-
-        download_path = Path(download_dir)
-        download_path.mkdir(parents=True, exist_ok=True)
-
-        if not filename:
-            file_hash = hashlib.md5(file_content).hexdigest()
-            filename = f"file_{file_hash}"
-
-        local_file_path = download_path / filename
-        with open(local_file_path, "wb") as f:
-            f.write(file_content)
-
-        logger.debug("Downloaded file to: %s", local_file_path)
-        return str(local_file_path.absolute())
-
+        stored = await get_media_store().ingest_base64(base64_data, filename)
+        return _place(stored, download_dir)
     except Exception as e:
         logger.error("Failed to download file from base64: %s", e)
         raise
@@ -184,19 +83,23 @@ async def download_file_from_base64(
 async def download_file_from_url(
     url: str,
     filename: Optional[str] = None,
-    download_dir: str = "downloads",
+    download_dir: Optional[str] = None,
 ) -> str:
     """
-    Download a file from URL to local download directory using wget or curl.
+    Download a file from URL to local storage.
+
+    Local paths and file:// URLs are returned as they are. Remote files
+    are streamed into the media store, which reuses an earlier download
+    of the same URL while the server reports it unchanged.
 
     Args:
         url (`str`):
             The URL of the file to download.
         filename (`str`, optional):
-            The filename to save. If not provided, will extract from URL or
-            generate a hash-based name.
-        download_dir (`str`):
-            The directory to save files. Defaults to "downloads".
+            The filename to save. If not provided, will extract from URL
+            (with a suffix from Content-Type or the content if missing).
+        download_dir (`str`, optional):
+            Directory to place the file in. Defaults to the media store.
 
     Returns:
         `str`:
@@ -207,41 +110,18 @@ async def download_file_from_url(
         local = _resolve_local_path(url, parsed)
         if local is not None:
             return local
-
-        download_path = Path(download_dir)
-        download_path.mkdir(parents=True, exist_ok=True)
-        if not filename:
-            url_filename = os.path.basename(parsed.path)
-            filename = (
-                url_filename
-                if url_filename
-                else f"file_{hashlib.md5(url.encode()).hexdigest()}"
-            )
-        local_file_path = download_path / filename
-        _download_remote_to_path(url, local_file_path)
-        if not local_file_path.exists():
-            raise FileNotFoundError("Downloaded file does not exist")
-        if local_file_path.stat().st_size == 0:
-            raise ValueError("Downloaded file is empty")
-        # DingTalk (and similar) return URLs that save as .file; replace with
-        # real extension. Try HEAD first; if that fails (e.g. OSS), use magic.
-        if local_file_path.suffix == ".file":
-            real_suffix = _guess_suffix_from_url_headers(url)
-            if not real_suffix:
-                real_suffix = _guess_suffix_from_file_content(local_file_path)
-            if real_suffix:
-                new_path = local_file_path.with_suffix(real_suffix)
-                local_file_path.rename(new_path)
-                local_file_path = new_path
-                logger.debug(
-                    "Replaced .file with %s for %s",
-                    real_suffix,
-                    local_file_path,
-                )
-        return str(local_file_path.absolute())
-    except subprocess.TimeoutExpired as e:
-        logger.error("Download timeout for URL: %s", url)
-        raise TimeoutError(f"Download timeout for URL: {url}") from e
+        stored = await get_media_store().ingest_url(url, filename)
+        return _place(stored, download_dir)
     except Exception as e:
         logger.error("Failed to download file from URL %s: %s", url, e)
         raise
+
+
+def _place(stored: str, download_dir: Optional[str]) -> str:
+    """Copy stored file *stored* into *download_dir*, if one is given."""
+    if not download_dir:
+        return stored
+    local_file_path = Path(download_dir) / Path(stored).name
+    copy_out(Path(stored), local_file_path)
+    logger.debug("Placed %s at %s", stored, local_file_path)
+    return str(local_file_path.absolute())
@@ -0,0 +1,544 @@
+# -*- coding: utf-8 -*-
+"""Content-addressed store for media attachments.
+
+Files from channel messages (URLs and base64 payloads) are kept under
+``WORKING_DIR/media/store/<sha256>/<filename>``:
+
+* downloads are async and streamed to disk, at most
+  ``MEDIA_DOWNLOAD_CONCURRENCY`` at once, and abort as soon as they
+  pass ``MEDIA_MAX_FILE_MB``;
+* content is stored once per hash, so the same image forwarded to a
+  group chat again (or under another name) takes no extra space;
+* the hash of each URL is remembered with its ETag / Last-Modified:
+  the next request for it is a conditional GET (a 304 reuses the stored
+  file) or, within the response's ``max-age``, no request at all, and
+  concurrent requests for one URL share a download;
+* stored files are read-only, since every message with the same
+  content points at them; :func:`copy_out` gives a private copy;
+* optionally (both off by default, as paths of stored files live on in
+  session history), least recently used files go once the store passes
+  ``MEDIA_STORE_MAX_MB``, and files unused for ``MEDIA_STORE_TTL``.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import threading
+import time
+import urllib.parse
+import uuid
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+
+from ...constant import (
+    MEDIA_DOWNLOAD_CONCURRENCY,
+    MEDIA_DOWNLOAD_TIMEOUT,
+    MEDIA_MAX_FILE_MB,
+    MEDIA_STORE_MAX_MB,
+    MEDIA_STORE_TTL,
+    WORKING_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+MEDIA_STORE_DIR = WORKING_DIR / "media" / "store"
+
+_MB = 1024 * 1024
+_CHUNK = 1 << 16
+# Hex digits of the sha256 naming a file's directory.
+_DIGEST_CHARS = 32
+_DIGEST_RE = re.compile(rf"[0-9a-f]{{{_DIGEST_CHARS}}}")
+_MAX_URLS = 4096
+# Stored files are shared by every message with the same content.
+_READ_ONLY = 0o444
+
+# Magic bytes (prefix) -> suffix, when neither name nor Content-Type
+# tell the type (e.g. OSS serving everything as octet-stream).
+_MAGIC_SUFFIX: list[tuple[bytes, str]] = [
+    (b"%PDF", ".pdf"),
+    (b"PK\x03\x04", ".zip"),
+    (b"PK\x05\x06", ".zip"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+    (b"\xd0\xcf\x11\xe0", ".doc"),  # MS Office (doc, xls, ppt)
+    (b"RIFF", ".webp"),  # or .wav; webp has RIFF....WEBP
+]
+_UNTYPED = frozenset({"", "application/octet-stream", "binary/octet-stream"})
+
+
+class MediaTooLargeError(ValueError):
+    """A download or payload is larger than the store accepts."""
+
+
+def guess_suffix(head: bytes) -> Optional[str]:
+    """Suffix like '.pdf' from the first bytes of a file, or None."""
+    for magic, suffix in _MAGIC_SUFFIX:
+        if head.startswith(magic):
+            return suffix
+    return None
+
+
+def _safe_name(name: Optional[str]) -> str:
+    name = os.path.basename((name or "").replace("\\", "/")).strip()
+    name = re.sub(r'[\x00-\x1f<>:"|?*]', "_", name)
+    return "" if name in ("", ".", "..") else name[-200:]
+
+
+def _file_name(
+    filename: Optional[str],
+    url_path: str,
+    content_type: str,
+    head: bytes,
+) -> str:
+    name = (
+        _safe_name(filename)
+        or _safe_name(urllib.parse.unquote(url_path))
+        or "file"
+    )
+    stem, suffix = os.path.splitext(name)
+    # DingTalk (and similar) download URLs end in .file.
+    if not suffix or suffix == ".file":
+        mime = content_type.split(";")[0].strip().lower()
+        guessed = (
+            mimetypes.guess_extension(mime) if mime not in _UNTYPED else None
+        ) or guess_suffix(head)
+        if guessed:
+            name = (stem or "file") + guessed
+    return name
+
+
+def _name_like(name: str, stored_name: str) -> str:
+    """*name* for content stored as *stored_name*, with its suffix."""
+    if not name:
+        return stored_name
+    stem, suffix = os.path.splitext(name)
+    if not suffix or suffix == ".file":
+        return (stem or "file") + os.path.splitext(stored_name)[1]
+    return name
+
+
+def _fresh_for(headers: httpx.Headers) -> float:
+    """Seconds the response may be reused without asking again."""
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0.0
+    m = re.search(r"max-age=(\d+)", cache_control)
+    return float(m.group(1)) if m else 0.0
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    """Make *target* a hard link to *source*, or a copy where links fail."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        target.unlink()
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+        target.chmod(_READ_ONLY)
+
+
+def copy_out(source: Path, target: Path) -> None:
+    """Write a private, writable copy of stored file *source* to *target*."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        target.unlink()
+    shutil.copyfile(source, target)
+
+
+class MediaStore:
+    """sha256-addressed media files with a URL cache; see the module doc.
+
+    Parameters
+    ----------
+    root:
+        Directory holding one sub-directory per content hash.
+    max_file_bytes:
+        Largest download or payload accepted.
+    max_bytes:
+        Store size beyond which least recently used files are evicted
+        (0 = no cap).
+    ttl:
+        Seconds after which unused files are evicted (0 = never).
+    concurrency:
+        Downloads running at once (per event loop).
+    timeout:
+        Seconds one download may take in total.
+    """
+
+    def __init__(
+        self,
+        root: Path = MEDIA_STORE_DIR,
+        *,
+        max_file_bytes: int = MEDIA_MAX_FILE_MB * _MB,
+        max_bytes: int = MEDIA_STORE_MAX_MB * _MB,
+        ttl: float = MEDIA_STORE_TTL,
+        concurrency: int = MEDIA_DOWNLOAD_CONCURRENCY,
+        timeout: float = MEDIA_DOWNLOAD_TIMEOUT,
+    ) -> None:
+        self.root = Path(root)
+        self.max_file_bytes = max_file_bytes
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        # digest -> {"size", "used"}, least recently used first.
+        self._files: Optional[OrderedDict[str, dict[str, Any]]] = None
+        # url -> {"digest", "name", "etag", "last_modified", "fresh_until"}
+        self._urls: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._limits: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._inflight: dict[tuple[int, str], asyncio.Future] = {}
+        self.downloads = 0
+
+    # -- public API ------------------------------------------------------
+
+    async def ingest_url(
+        self,
+        url: str,
+        filename: Optional[str] = None,
+    ) -> str:
+        """Local path of *url*'s content, downloading it if needed."""
+        self._load()
+        name = _safe_name(filename)
+        cached = self._urls.get(url)
+        if cached is not None and cached["fresh_until"] > time.time():
+            path = self._hit(
+                cached["digest"],
+                _name_like(name, cached["name"]),
+            )
+            if path is not None:
+                return path
+
+        key = (id(asyncio.get_running_loop()), url)
+        fetch = self._inflight.get(key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch(url, name))
+            self._inflight[key] = fetch
+            fetch.add_done_callback(lambda _: self._inflight.pop(key, None))
+        digest, stored_name = await asyncio.shield(fetch)
+        path = self._hit(digest, _name_like(name, stored_name))
+        if path is None:
+            raise RuntimeError(f"Downloaded file was evicted: {url}")
+        return path
+
+    async def ingest_bytes(
+        self,
+        data: bytes,
+        filename: Optional[str] = None,
+    ) -> str:
+        """Local path of a file holding *data*."""
+        if not data:
+            raise ValueError("File is empty")
+        if len(data) > self.max_file_bytes:
+            raise MediaTooLargeError(
+                f"File of {len(data)} bytes exceeds the "
+                f"{self.max_file_bytes} byte limit",
+            )
+        self._load()
+        digest = hashlib.sha256(data).hexdigest()[:_DIGEST_CHARS]
+        name = _file_name(filename, "", "", data[:32])
+        path = self._hit(digest, name)
+        if path is not None:
+            return path
+        tmp = self._tmp_path()
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            return self._commit(tmp, digest, len(data), name)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    async def ingest_base64(
+        self,
+        data: str,
+        filename: Optional[str] = None,
+    ) -> str:
+        """Local path of a file holding the decoded *data*."""
+        if len(data) * 3 // 4 > self.max_file_bytes + 2:
+            raise MediaTooLargeError(
+                f"Payload of ~{len(data) * 3 // 4} bytes exceeds the "
+                f"{self.max_file_bytes} byte limit",
+            )
+        return await self.ingest_bytes(base64.b64decode(data), filename)
+
+    def stats(self) -> dict[str, int]:
+        files = self._load()
+        return {
+            "files": len(files),
+            "bytes": sum(meta["size"] for meta in files.values()),
+            "urls": len(self._urls),
+            "downloads": self.downloads,
+        }
+
+    # -- downloads -------------------------------------------------------
+
+    def _limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits[loop] = asyncio.Semaphore(self.concurrency)
+        return limit
+
+    async def _fetch(self, url: str, name: str) -> tuple[str, str]:
+        async with self._limit():
+            try:
+                return await asyncio.wait_for(
+                    self._download(url, name),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError as e:
+                raise TimeoutError(f"Download timeout for URL: {url}") from e
+
+    async def _download(self, url: str, name: str) -> tuple[str, str]:
+        cached = self._urls.get(url)
+        headers = {}
+        if cached is not None and cached["digest"] in self._load():
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        tmp = self._tmp_path()
+        try:
+            async with httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=self.timeout,
+            ) as client:
+                async with client.stream("GET", url, headers=headers) as resp:
+                    if resp.status_code == 304 and headers:
+                        self._remember(url, cached, resp.headers)
+                        return cached["digest"], cached["name"]
+                    resp.raise_for_status()
+                    length = resp.headers.get("Content-Length", "")
+                    if length.isdigit() and int(length) > self.max_file_bytes:
+                        raise MediaTooLargeError(
+                            f"{url} is {length} bytes, over the "
+                            f"{self.max_file_bytes} byte limit",
+                        )
+                    self.downloads += 1
+                    digest, size, head = await self._write(
+                        resp.aiter_bytes(_CHUNK),
+                        tmp,
+                        url,
+                    )
+            if not size:
+                raise ValueError("Downloaded file is empty")
+            stored = Path(
+                self._commit(
+                    tmp,
+                    digest,
+                    size,
+                    _file_name(
+                        name,
+                        urllib.parse.urlparse(url).path,
+                        resp.headers.get("Content-Type", ""),
+                        head,
+                    ),
+                ),
+            )
+            self._remember(
+                url,
+                {"digest": digest, "name": stored.name},
+                resp.headers,
+            )
+            logger.debug("Downloaded %s (%d bytes) to %s", url, size, stored)
+            return digest, stored.name
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    async def _write(
+        self,
+        chunks: AsyncIterator[bytes],
+        tmp: Path,
+        url: str,
+    ) -> tuple[str, int, bytes]:
+        """Stream *chunks* into *tmp*; return digest, size and head."""
+        hasher = hashlib.sha256()
+        size = 0
+        head = b""
+        with open(tmp, "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_file_bytes:
+                    raise MediaTooLargeError(
+                        f"{url} exceeds the {self.max_file_bytes} byte limit",
+                    )
+                if len(head) < 32:
+                    head += chunk[: 32 - len(head)]
+                hasher.update(chunk)
+                f.write(chunk)
+        return hasher.hexdigest()[:_DIGEST_CHARS], size, head
+
+    def _remember(
+        self,
+        url: str,
+        entry: dict[str, Any],
+        headers: httpx.Headers,
+    ) -> None:
+        """Record *url*'s content and how to revalidate it."""
+        if "no-store" in headers.get("Cache-Control", "").lower():
+            return
+        entry = {
+            "digest": entry["digest"],
+            "name": entry["name"],
+            "etag": headers.get("ETag") or entry.get("etag"),
+            "last_modified": (
+                headers.get("Last-Modified") or entry.get("last_modified")
+            ),
+            "fresh_until": time.time() + _fresh_for(headers),
+        }
+        if not (entry["etag"] or entry["last_modified"]) and (
+            entry["fresh_until"] <= time.time()
+        ):
+            return
+        with self._lock:
+            self._urls[url] = entry
+            self._urls.move_to_end(url)
+            while len(self._urls) > _MAX_URLS:
+                self._urls.popitem(last=False)
+            urls = dict(self._urls)
+        self._save_urls(urls)
+
+    # -- the store -------------------------------------------------------
+
+    def _tmp_path(self) -> Path:
+        tmp_dir = self.root / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tmp_dir / uuid.uuid4().hex
+
+    def _load(self) -> OrderedDict[str, dict[str, Any]]:
+        with self._lock:
+            if self._files is None:
+                self._files = self._scan()
+                self._urls = self._read_urls()
+                self._evict(keep=None)
+            return self._files
+
+    def _scan(self) -> OrderedDict[str, dict[str, Any]]:
+        # Leftovers of downloads interrupted by a restart.
+        shutil.rmtree(self.root / ".tmp", ignore_errors=True)
+        found = []
+        if self.root.is_dir():
+            for folder in os.scandir(self.root):
+                if not (folder.is_dir() and _DIGEST_RE.fullmatch(folder.name)):
+                    continue
+                sizes = [
+                    f.stat().st_size
+                    for f in os.scandir(folder.path)
+                    if f.is_file()
+                ]
+                if not sizes:
+                    shutil.rmtree(folder.path, ignore_errors=True)
+                    continue
+                found.append((folder.stat().st_mtime, folder.name, sizes[0]))
+        found.sort()
+        return OrderedDict(
+            (digest, {"size": size, "used": used})
+            for used, digest, size in found
+        )
+
+    def _read_urls(self) -> OrderedDict[str, dict[str, Any]]:
+        try:
+            with open(self.root / "urls.json", encoding="utf-8") as f:
+                return OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            return OrderedDict()
+
+    def _save_urls(self, urls: dict[str, dict[str, Any]]) -> None:
+        tmp = self._tmp_path()
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(urls, f)
+            os.replace(tmp, self.root / "urls.json")
+        except OSError as e:
+            logger.debug("Saving the media URL cache failed: %s", e)
+            tmp.unlink(missing_ok=True)
+
+    def _named(self, digest: str, name: str) -> Optional[Path]:
+        """Stored content *digest* as *name*, linking it if needed."""
+        folder = self.root / digest
+        target = folder / name
+        if target.is_file():
+            return target
+        try:
+            source = next(p for p in folder.iterdir() if p.is_file())
+            _link_or_copy(source, target)
+        except (OSError, StopIteration):
+            return None
+        return target
+
+    def _touch(self, digest: str) -> None:
+        self._files[digest]["used"] = time.time()
+        self._files.move_to_end(digest)
+        try:
+            # The directory's mtime keeps the LRU order across restarts.
+            os.utime(self.root / digest)
+        except OSError:
+            pass
+
+    def _hit(self, digest: str, name: str) -> Optional[str]:
+        files = self._load()
+        with self._lock:
+            if digest not in files:
+                return None
+            path = self._named(digest, name)
+            if path is None:
+                del files[digest]
+                return None
+            self._touch(digest)
+        return str(path)
+
+    def _commit(self, tmp: Path, digest: str, size: int, name: str) -> str:
+        """Move downloaded *tmp* into the store, unless already there."""
+        with self._lock:
+            path = self._named(digest, name) if digest in self._files else None
+            if path is None:
+                path = self.root / digest / name
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp, path)
+                path.chmod(_READ_ONLY)
+                self._files[digest] = {"size": size}
+            self._touch(digest)
+            self._evict(keep=digest)
+        return str(path)
+
+    def _evict(self, keep: Optional[str]) -> None:
+        files = self._files
+        expired = time.time() - self.ttl if self.ttl else 0.0
+        total = sum(meta["size"] for meta in files.values())
+        for digest in list(files):
+            meta = files[digest]
+            over = self.max_bytes and total > self.max_bytes
+            if not over and meta["used"] >= expired:
+                break  # the rest were used more recently
+            if digest == keep:
+                continue
+            del files[digest]
+            total -= meta["size"]
+            shutil.rmtree(self.root / digest, ignore_errors=True)
+            logger.debug("Evicted stored media %s", digest)
+
+
+_media_store: Optional[MediaStore] = None
+
+
+def get_media_store() -> MediaStore:
+    """Get the process-wide :class:`MediaStore`."""
+    global _media_store
+    if _media_store is None:
+        _media_store = MediaStore()
+    return _media_store
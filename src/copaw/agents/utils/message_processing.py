@@ -15,7 +15,7 @@ from typing import Optional
 
 from agentscope.message import Msg
 
-from ...config import load_config
+from ...config import get_config_snapshot
 from ...constant import WORKING_DIR
 from .file_handling import download_file_from_base64, download_file_from_url
 
@@ -262,7 +262,7 @@ async def process_file_and_media_blocks_in_message(msg) -> None:
                 downloaded_files.append((i, local_path))
 
         if downloaded_files:
-            lang = load_config().agents.language
+            lang = get_config_snapshot().agents.language
             for i, local_path in reversed(downloaded_files):
                 text = (
                     f"用户上传文件，已经下载到 {local_path}"
@@ -4,12 +4,25 @@
 This module provides token counting functionality for estimating
 message token usage with Qwen tokenizer.
 """
+import functools
+import hashlib
+import json
 import logging
+from collections import OrderedDict
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from agentscope.message import Msg
 
 logger = logging.getLogger(__name__)
 
 _token_counter = None
+_message_token_cache: Optional["MessageTokenCache"] = None
+
+# Message ids are uuids, so one process-wide cache serves every session;
+# the bound only keeps long-running servers from growing without limit.
+_MESSAGE_TOKEN_CACHE_SIZE = 20000
 
 
 def _get_token_counter():
@@ -199,8 +212,10 @@ async def safe_count_message_tokens(
 def safe_count_str_tokens(text: str) -> int:
     """Safely count tokens in a string with fallback estimation.
 
-    Uses the tokenizer to count tokens in the given text. If the tokenizer
-    fails, falls back to a character-based estimation (len // 4).
+    Uses the tokenizer to count tokens in the given text. Results are
+    memoized, so re-counting an unchanged system prompt is a dict lookup.
+    If the tokenizer fails, falls back to a character-based estimation
+    (len // 4); fallback results are not cached.
 
     Args:
         text: The string to count tokens for.
@@ -209,15 +224,7 @@ def safe_count_str_tokens(text: str) -> int:
         int: The estimated number of tokens in the string.
     """
     try:
-        token_counter = _get_token_counter()
-        token_ids = token_counter.tokenizer.encode(text)
-        token_count = len(token_ids)
-        logger.debug(
-            "Counted %d tokens in string of length %d",
-            token_count,
-            len(text),
-        )
-        return token_count
+        return _count_str_tokens(text)
     except Exception as e:
         # Fallback to character-based estimation
         estimated_tokens = len(text.encode("utf-8")) // 4
@@ -227,3 +234,97 @@ def safe_count_str_tokens(text: str) -> int:
             estimated_tokens,
         )
         return estimated_tokens
+
+
+@functools.lru_cache(maxsize=256)
+def _count_str_tokens(text: str) -> int:
+    token_ids = _get_token_counter().tokenizer.encode(text)
+    logger.debug(
+        "Counted %d tokens in string of length %d",
+        len(token_ids),
+        len(text),
+    )
+    return len(token_ids)
+
+
+def _content_digest(content: Any) -> str:
+    """Hash message content so in-place edits invalidate cached counts."""
+    if isinstance(content, str):
+        payload = content
+    else:
+        payload = json.dumps(
+            content,
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+    return hashlib.blake2b(
+        payload.encode("utf-8", "surrogatepass"),
+        digest_size=16,
+    ).hexdigest()
+
+
+class MessageTokenCache:
+    """Per-message token counts keyed by message id plus a content hash.
+
+    Counts are computed with reme's ``AsMsgHandler.stat_message``, the
+    same routine ``check_context`` uses, so ``total()`` equals the total
+    ``check_context`` would compute. Only messages that are new, or whose
+    content changed since they were last counted (e.g. tool results
+    truncated by tool-result compaction), are re-encoded.
+    """
+
+    def __init__(
+        self,
+        token_counter=None,
+        max_entries: int = _MESSAGE_TOKEN_CACHE_SIZE,
+    ):
+        self._token_counter = token_counter
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._handler = None
+        self.hits = 0
+        self.misses = 0
+
+    def _get_handler(self):
+        if self._handler is None:
+            from reme.memory.file_based.utils import AsMsgHandler
+
+            self._handler = AsMsgHandler(
+                token_counter=self._token_counter or _get_token_counter(),
+            )
+        return self._handler
+
+    def count(self, msg: "Msg") -> int:
+        """Return the token count of one message, encoding it if needed."""
+        digest = _content_digest(msg.content)
+        entry = self._entries.get(msg.id)
+        if entry is not None and entry[0] == digest:
+            self._entries.move_to_end(msg.id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        count = self._get_handler().stat_message(msg).total_tokens
+        self._entries[msg.id] = (digest, count)
+        self._entries.move_to_end(msg.id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return count
+
+    def total(self, messages: list["Msg"]) -> int:
+        """Return the summed token count of ``messages``."""
+        return sum(self.count(msg) for msg in messages)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def get_message_token_cache() -> MessageTokenCache:
+    """Get the process-wide :class:`MessageTokenCache`."""
+    global _message_token_cache
+    if _message_token_cache is None:
+        _message_token_cache = MessageTokenCache()
+    return _message_token_cache
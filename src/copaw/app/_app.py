@@ -26,14 +26,16 @@ from ..utils.logging import setup_logger, add_copaw_file_handler
 from .channels import ChannelManager  # pylint: disable=no-name-in-module
 from .channels.utils import make_process_from_runner
 from .mcp import MCPClientManager, MCPConfigWatcher  # MCP hot-reload support
-from .runner.repo.json_repo import JsonChatRepository
+from .runner.repo.indexed_repo import IndexedChatRepository
 from .crons.repo.json_repo import JsonJobRepository
 from .crons.manager import CronManager
 from .runner.manager import ChatManager
 from .routers import router as api_router
+from .routers.metrics import metrics_router
 from .routers.voice import voice_router
 from ..envs import load_envs_into_environ
 from ..providers.provider_manager import ProviderManager
+from ..token_usage import get_token_usage_manager
 
 # Apply log level on load so reload child process gets same level as CLI.
 logger = setup_logger(os.environ.get(LOG_LEVEL_ENV, "info"))
@@ -72,14 +74,27 @@ async def lifespan(
     mcp_manager = MCPClientManager()
     if hasattr(config, "mcp"):
         try:
-            await mcp_manager.init_from_config(config.mcp)
-            logger.debug("MCP client manager initialized")
+            # Connect in the background so a slow or dead MCP server
+            # does not hold up channels and the HTTP server; the runner
+            # only hands ready clients to agents.
+            mcp_manager.start_from_config(config.mcp)
+            logger.debug("MCP client manager initialization started")
         except BaseException as e:
             if isinstance(e, (KeyboardInterrupt, SystemExit)):
                 raise
             logger.exception("Failed to initialize MCP manager")
     runner.set_mcp_manager(mcp_manager)
 
+    # --- preload local models (in a thread; loading takes a while) ---
+    if config.local_models.preload:
+        from ..local_models import preload_local_models
+
+        asyncio.get_running_loop().run_in_executor(
+            None,
+            preload_local_models,
+            list(config.local_models.preload),
+        )
+
     # --- channel connector init/start (from config.json) ---
     channel_manager = ChannelManager.from_config(
         process=make_process_from_runner(runner),
@@ -99,7 +114,7 @@ async def lifespan(
     await cron_manager.start()
 
     # --- chat manager init and connect to runner.session ---
-    chat_repo = JsonChatRepository(get_chats_path())
+    chat_repo = IndexedChatRepository(get_chats_path())
     chat_manager = ChatManager(
         repo=chat_repo,
     )
@@ -310,10 +325,10 @@ async def lifespan(
         new_mcp_manager = MCPClientManager()
         if hasattr(config, "mcp"):
             try:
-                await new_mcp_manager.init_from_config(config.mcp)
+                new_mcp_manager.start_from_config(config.mcp)
             except Exception:
                 logger.exception(
-                    "restart_services: mcp init_from_config failed",
+                    "restart_services: mcp start_from_config failed",
                 )
                 return
 
@@ -444,6 +459,7 @@ async def lifespan(
             except Exception:
                 pass
         await runner.stop()
+        await get_token_usage_manager().close()
 
 
 app = FastAPI(
@@ -527,6 +543,9 @@ app.include_router(
 # POST /voice/incoming, WS /voice/ws, POST /voice/status-callback
 app.include_router(voice_router, tags=["voice"])
 
+# Prometheus scrape endpoint at root level: GET /metrics
+app.include_router(metrics_router)
+
 # Mount console: root static files (logo.png etc.) then assets, then SPA
 # fallback.
 if os.path.isdir(_CONSOLE_STATIC_DIR):
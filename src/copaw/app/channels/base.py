@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from abc import ABC
 from typing import (
     Optional,
@@ -34,6 +35,7 @@ from agentscope_runtime.engine.schemas.agent_schemas import (
 
 from .renderer import MessageRenderer, RenderStyle
 from .schema import ChannelType
+from ...utils.tracing import hand_off, observe, span
 
 # Optional callback to enqueue payload (set by manager)
 EnqueueCallback = Optional[Callable[[Any], None]]
@@ -114,6 +116,7 @@ class BaseChannel(ABC):
         self._debounce_seconds: float = 0.0
         self._debounce_pending: Dict[str, List[Any]] = {}
         self._debounce_timers: Dict[str, asyncio.Task[None]] = {}
+        self._debounce_started: Dict[str, float] = {}
 
     def _is_native_payload(self, payload: Any) -> bool:
         """True if payload is a native dict that can be time-debounced."""
@@ -432,6 +435,7 @@ class BaseChannel(ABC):
                     self._debounce_pending[key],
                 )
             self._debounce_pending.setdefault(key, []).append(payload)
+            self._debounce_started.setdefault(key, time.perf_counter())
             old = self._debounce_timers.pop(key, None)
             if old and not old.done():
                 old.cancel()
@@ -440,13 +444,20 @@ class BaseChannel(ABC):
                 await asyncio.sleep(self._debounce_seconds)
                 items = self._debounce_pending.pop(k, [])
                 self._debounce_timers.pop(k, None)
+                started = self._debounce_started.pop(k, None)
+                if started is not None:
+                    observe("channel.debounce", time.perf_counter() - started)
                 if not items:
                     return
                 merged = self.merge_native_items(items)
                 if not merged:
                     return
-                await self._consume_one_request(merged)
+                with span("channel.message", root=True, channel=self.channel):
+                    await self._consume_one_request(merged)
 
+            # The reply runs in flush; the caller's span only covered
+            # the buffering.
+            hand_off("channel.message")
             self._debounce_timers[key] = asyncio.create_task(flush(key))
             return
         await self._consume_one_request(payload)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Keyed FIFO queue used by ChannelManager consumers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Tuple
+
+
+class KeyedQueue:
+    """Queue of payloads grouped by debounce key.
+
+    Each key has its own FIFO, and a ready-queue holds every key that
+    has queued payloads, ordered by its oldest payload. ``get_batch()``
+    pops the next ready key together with all of its payloads, so a
+    worker takes a whole session in O(batch) without scanning other
+    sessions' messages. Keys are served round-robin: a key that receives
+    more payloads after its batch was taken goes to the back of the
+    ready-queue. Nothing is kept for keys with no queued payloads.
+
+    ``maxsize`` bounds the total number of queued payloads, like
+    :class:`asyncio.Queue`; ``put_nowait`` raises ``asyncio.QueueFull``.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._maxsize = maxsize
+        self._items: Dict[Hashable, Deque[Any]] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._size = 0
+
+    def qsize(self) -> int:
+        """Number of queued payloads across all keys."""
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def full(self) -> bool:
+        return 0 < self._maxsize <= self._size
+
+    def put_nowait(self, key: Hashable, item: Any) -> None:
+        """Append *item* to the FIFO of *key*."""
+        if self.full():
+            raise asyncio.QueueFull
+        items = self._items.get(key)
+        if items is None:
+            items = self._items[key] = deque()
+            self._ready.put_nowait(key)
+        items.append(item)
+        self._size += 1
+
+    def _take(self, key: Hashable) -> Tuple[Hashable, List[Any]]:
+        batch = list(self._items.pop(key))
+        self._size -= len(batch)
+        return key, batch
+
+    def get_batch_nowait(self) -> Tuple[Hashable, List[Any]]:
+        """Pop the next ready key and all of its payloads.
+
+        Raises:
+            asyncio.QueueEmpty: If nothing is queued.
+        """
+        return self._take(self._ready.get_nowait())
+
+    async def get_batch(self) -> Tuple[Hashable, List[Any]]:
+        """Wait for the next ready key; return it with all its payloads."""
+        return self._take(await self._ready.get())
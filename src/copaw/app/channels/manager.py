@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 
 from typing import (
     Callable,
@@ -20,8 +21,10 @@ from typing import (
 )
 
 from .base import BaseChannel, ContentType, ProcessHandler, TextContent
+from .keyed_queue import KeyedQueue
 from .registry import get_channel_registry
 from ...config import get_available_channels
+from ...utils.tracing import observe, span
 
 if TYPE_CHECKING:
     from ....config.config import Config
@@ -34,33 +37,11 @@ OnLastDispatch = Optional[Callable[[str, str, str], None]]
 # Default max size per channel queue
 _CHANNEL_QUEUE_MAXSIZE = 1000
 
-# Workers per channel: drain same-session from queue and process in parallel
+# Workers per channel: each takes one session's batch and processes it;
+# different sessions run in parallel
 _CONSUMER_WORKERS_PER_CHANNEL = 4
 
 
-def _drain_same_key(
-    q: asyncio.Queue,
-    ch: BaseChannel,
-    key: str,
-    first_payload: Any,
-) -> List[Any]:
-    """Drain queue of payloads with same debounce key; return batch."""
-    batch = [first_payload]
-    put_back: List[Any] = []
-    while True:
-        try:
-            p = q.get_nowait()
-        except asyncio.QueueEmpty:
-            break
-        if ch.get_debounce_key(p) == key:
-            batch.append(p)
-        else:
-            put_back.append(p)
-    for p in put_back:
-        q.put_nowait(p)
-    return batch
-
-
 async def _process_batch(ch: BaseChannel, batch: List[Any]) -> None:
     """Merge if needed and process one payload (native or request)."""
     if ch.channel == "dingtalk" and batch and ch._is_native_payload(batch[0]):
@@ -92,7 +73,8 @@ async def _process_batch(ch: BaseChannel, batch: List[Any]) -> None:
 
 def _put_pending_merged(
     ch: BaseChannel,
-    q: asyncio.Queue,
+    q: KeyedQueue,
+    key: str,
     pending: List[Any],
 ) -> None:
     """Merge pending items if multiple and put one or more on queue."""
@@ -104,10 +86,10 @@ def _put_pending_merged(
     elif len(pending) > 1:
         merged = ch.merge_requests(pending)
     if merged is not None:
-        q.put_nowait(merged)
+        q.put_nowait(key, merged)
     else:
         for p in pending:
-            q.put_nowait(p)
+            q.put_nowait(key, p)
 
 
 class ChannelManager:
@@ -118,7 +100,7 @@ class ChannelManager:
     def __init__(self, channels: List[BaseChannel]):
         self.channels = channels
         self._lock = asyncio.Lock()
-        self._queues: Dict[str, asyncio.Queue] = {}
+        self._queues: Dict[str, KeyedQueue] = {}
         self._consumer_tasks: List[asyncio.Task[None]] = []
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         # Session in progress: (channel_id, debounce_key) -> True while worker
@@ -126,10 +108,9 @@ class ChannelManager:
         # when worker finishes.
         self._in_progress: Set[Tuple[str, str]] = set()
         self._pending: Dict[Tuple[str, str], List[Any]] = {}
-        # Per-key lock: same session is claimed by one worker for drain so
-        # [image1, text] are not split across workers (avoids no-text
-        # debounce reordering and duplicate content in AgentRequest).
-        self._key_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        # (channel_id, debounce_key) -> when its oldest waiting payload
+        # was enqueued, for the channel.queue_wait stage.
+        self._queued_at: Dict[Tuple[str, str], float] = {}
 
     @classmethod
     def from_env(
@@ -210,7 +191,12 @@ class ChannelManager:
 
         return cb
 
-    def _enqueue_one(self, channel_id: str, payload: Any) -> None:
+    def _enqueue_one(
+        self,
+        channel_id: str,
+        payload: Any,
+        queued_at: Optional[float] = None,
+    ) -> None:
         """Run on event loop: enqueue or append to pending if session in
         progress.
         """
@@ -223,9 +209,10 @@ class ChannelManager:
             None,
         )
         if not ch:
-            q.put_nowait(payload)
+            q.put_nowait(None, payload)
             return
         key = ch.get_debounce_key(payload)
+        queued_at = queued_at or time.perf_counter()
         if channel_id == "dingtalk" and isinstance(payload, dict):
             logger.info(
                 "manager _enqueue_one dingtalk: key=%s in_progress=%s "
@@ -239,8 +226,11 @@ class ChannelManager:
             )
         if (channel_id, key) in self._in_progress:
             self._pending.setdefault((channel_id, key), []).append(payload)
-            return
-        q.put_nowait(payload)
+        else:
+            q.put_nowait(key, payload)
+        # Only after the payload is held: a full queue raises above and
+        # must not leave a timestamp behind for the next payload.
+        self._queued_at.setdefault((channel_id, key), queued_at)
 
     def enqueue(self, channel_id: str, payload: Any) -> None:
         """Enqueue a payload for the channel. Thread-safe (e.g. from sync
@@ -258,6 +248,7 @@ class ChannelManager:
             self._enqueue_one,
             channel_id,
             payload,
+            time.perf_counter(),
         )
 
     async def _consume_channel_loop(
@@ -266,34 +257,44 @@ class ChannelManager:
         worker_index: int,
     ) -> None:
         """
-        Run one consumer worker: pop payload, drain queue of same session,
-        mark session in progress, merge batch (native or requests), process
-        once, then flush any pending for this session (merged) back to queue.
-        Multiple workers per channel allow different sessions in parallel.
+        Run one consumer worker: take the next session and all of its
+        queued payloads as one batch, mark session in progress, merge batch
+        (native or requests), process once, then flush any pending for this
+        session (merged) back to queue. The whole session is taken at once,
+        so [image1, text] are never split across workers. Multiple workers
+        per channel allow different sessions in parallel.
         """
         q = self._queues.get(channel_id)
         if not q:
             return
         while True:
             try:
-                payload = await q.get()
-                ch = await self.get_channel(channel_id)
-                if not ch:
-                    continue
-                key = ch.get_debounce_key(payload)
-                key_lock = self._key_locks.setdefault(
-                    (channel_id, key),
-                    asyncio.Lock(),
-                )
-                async with key_lock:
-                    self._in_progress.add((channel_id, key))
-                    batch = _drain_same_key(q, ch, key, payload)
+                key, batch = await q.get_batch()
+                # Mark before any await so new payloads for this session
+                # go to pending instead of a second worker.
+                self._in_progress.add((channel_id, key))
+                queued_at = self._queued_at.pop((channel_id, key), None)
+                if queued_at is not None:
+                    observe(
+                        "channel.queue_wait",
+                        time.perf_counter() - queued_at,
+                    )
+                ch = None
                 try:
-                    await _process_batch(ch, batch)
+                    ch = await self.get_channel(channel_id)
+                    if not ch:
+                        continue
+                    with span(
+                        "channel.message",
+                        channel=channel_id,
+                        batch=len(batch),
+                    ):
+                        await _process_batch(ch, batch)
                 finally:
                     self._in_progress.discard((channel_id, key))
                     pending = self._pending.pop((channel_id, key), [])
-                    _put_pending_merged(ch, q, pending)
+                    if ch is not None:
+                        _put_pending_merged(ch, q, key, pending)
             except asyncio.CancelledError:
                 break
             except Exception:
@@ -309,7 +310,7 @@ class ChannelManager:
             snapshot = list(self.channels)
         for ch in snapshot:
             if getattr(ch, "uses_manager_queue", True):
-                self._queues[ch.channel] = asyncio.Queue(
+                self._queues[ch.channel] = KeyedQueue(
                     maxsize=_CHANNEL_QUEUE_MAXSIZE,
                 )
                 ch.set_enqueue(self._make_enqueue_cb(ch.channel))
@@ -335,6 +336,7 @@ class ChannelManager:
     async def stop_all(self) -> None:
         self._in_progress.clear()
         self._pending.clear()
+        self._queued_at.clear()
         for task in self._consumer_tasks:
             task.cancel()
         if self._consumer_tasks:
@@ -389,7 +391,7 @@ class ChannelManager:
         #    (e.g. DingTalk) registers its handler with a valid callback.
         if new_channel_name not in self._queues:
             if getattr(new_channel, "uses_manager_queue", True):
-                self._queues[new_channel_name] = asyncio.Queue(
+                self._queues[new_channel_name] = KeyedQueue(
                     maxsize=_CHANNEL_QUEUE_MAXSIZE,
                 )
                 for w in range(_CONSUMER_WORKERS_PER_CHANNEL):
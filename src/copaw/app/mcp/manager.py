@@ -9,69 +9,256 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Dict, List, TYPE_CHECKING
+import time
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 from agentscope.mcp import HttpStatefulClient, StdIOStatefulClient
 
+from ...constant import MCP_CONNECT_CONCURRENCY
+
 if TYPE_CHECKING:
     from ...config.config import MCPClientConfig, MCPConfig
 
 logger = logging.getLogger(__name__)
 
 
+class _ClientSlot:
+    """Owns one MCP client for its whole lifetime.
+
+    ``connect()`` enters anyio cancel scopes that must be exited by the
+    task that entered them, so a client closed from any other task (the
+    config watcher, shutdown) fails to clean up and can leak its server
+    process. Each slot therefore runs connect, serve and close inside a
+    single dedicated task; other tasks only signal it.
+    """
+
+    def __init__(self, key: str, client: Any, timeout: float) -> None:
+        self.key = key
+        self.client = client
+        self.timeout = timeout
+        self.status = "connecting"
+        self.error: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self._connected: asyncio.Future = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(
+            self._run(),
+            name=f"mcp-client-{key}",
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == "ready"
+
+    async def _run(self) -> None:
+        task = asyncio.current_task()
+        timed_out = False
+
+        def _on_timeout() -> None:
+            nonlocal timed_out
+            timed_out = True
+            task.cancel()
+
+        handle = asyncio.get_running_loop().call_later(
+            self.timeout,
+            _on_timeout,
+        )
+        try:
+            await self.client.connect()
+        except asyncio.CancelledError:
+            handle.cancel()
+            await self._abort_connect()
+            if not timed_out:
+                self._fail(RuntimeError("closed before it connected"))
+                raise
+            logger.warning(
+                f"Timeout connecting MCP client '{self.key}' "
+                f"after {self.timeout}s",
+            )
+            self._fail(asyncio.TimeoutError())
+            return
+        except Exception as e:
+            handle.cancel()
+            self._fail(e)
+            return
+        handle.cancel()
+
+        self.status = "ready"
+        self.ready_at = time.monotonic()
+        self._connected.set_result(None)
+        try:
+            await self._stop.wait()
+        finally:
+            self.status = "closed"
+            try:
+                await self.client.close()
+            except Exception as e:
+                logger.warning(f"Error closing MCP client '{self.key}': {e}")
+
+    def _fail(self, error: BaseException) -> None:
+        self.status = "failed"
+        self.error = repr(error)
+        if not self._connected.done():
+            self._connected.set_exception(error)
+            # Mark retrieved: nobody may be waiting (background startup).
+            self._connected.exception()
+
+    async def _abort_connect(self) -> None:
+        """Unwind a connect() interrupted half-way (in this task)."""
+        stack = getattr(self.client, "stack", None)
+        if stack is None:
+            return
+        try:
+            await stack.aclose()
+        except Exception:
+            pass
+        self.client.stack = None
+
+    async def wait_connected(self) -> None:
+        """Wait until connected; re-raise the connect error if it failed."""
+        await asyncio.shield(self._connected)
+
+    async def close(self) -> None:
+        """Stop the client (cancelling a pending connect) and wait."""
+        if self._task.done():
+            return
+        self._stop.set()
+        if not self.is_ready:
+            self._task.cancel()
+        await asyncio.wait([self._task])
+
+    def info(self) -> Dict[str, Any]:
+        end = self.ready_at
+        return {
+            "status": self.status,
+            "error": self.error,
+            "connect_seconds": (
+                round(end - self.started_at, 3) if end is not None else None
+            ),
+        }
+
+
 class MCPClientManager:
     """Manages MCP clients with hot-reload support.
 
     This manager handles the lifecycle of MCP clients, including:
-    - Initial loading from config
+    - Initial loading from config, concurrently and in the background
+    - Per-client readiness tracking
     - Runtime replacement when config changes
     - Cleanup on shutdown
 
     Design pattern mirrors ChannelManager for consistency.
     """
 
-    def __init__(self) -> None:
-        """Initialize an empty MCP client manager."""
-        self._clients: Dict[str, Any] = {}
+    def __init__(
+        self,
+        max_concurrency: int = MCP_CONNECT_CONCURRENCY,
+        connect_timeout: float = 60.0,
+    ) -> None:
+        """Initialize an empty MCP client manager.
+
+        Args:
+            max_concurrency: Clients connected at the same time during
+                initial loading.
+            connect_timeout: Per-client connection timeout in seconds
+                during initial loading.
+        """
+        self._clients: Dict[str, _ClientSlot] = {}
         self._lock = asyncio.Lock()
+        self._max_concurrency = max(1, max_concurrency)
+        self._connect_timeout = connect_timeout
+        self._init_task: Optional[asyncio.Task] = None
 
     async def init_from_config(self, config: "MCPConfig") -> None:
         """Initialize clients from configuration.
 
+        Clients connect concurrently (at most ``max_concurrency`` at a
+        time); each becomes available to ``get_clients()`` as soon as it
+        is connected. Returns when every client is connected or failed.
+
         Args:
             config: MCP configuration containing client definitions
         """
         logger.debug("Initializing MCP clients from config")
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def _connect(key: str, client_config: "MCPClientConfig"):
+            async with semaphore:
+                try:
+                    await self._add_client(key, client_config)
+                    logger.debug(
+                        f"MCP client '{key}' initialized successfully",
+                    )
+                except BaseException as e:
+                    if isinstance(
+                        e,
+                        (
+                            KeyboardInterrupt,
+                            SystemExit,
+                            asyncio.CancelledError,
+                        ),
+                    ):
+                        raise
+                    logger.warning(
+                        f"Failed to initialize MCP client '{key}': {e!r}",
+                    )
+
+        pending = []
         for key, client_config in config.clients.items():
             if not client_config.enabled:
                 logger.debug(f"MCP client '{key}' is disabled, skipping")
                 continue
+            pending.append(_connect(key, client_config))
+        await asyncio.gather(*pending)
 
-            try:
-                await self._add_client(key, client_config)
-                logger.debug(f"MCP client '{key}' initialized successfully")
-            except BaseException as e:
-                if isinstance(e, (KeyboardInterrupt, SystemExit)):
-                    raise
-                logger.warning(
-                    f"Failed to initialize MCP client '{key}': {e}",
-                    exc_info=True,
-                )
+    def start_from_config(self, config: "MCPConfig") -> None:
+        """Run :meth:`init_from_config` in the background and return.
+
+        Callers that need the clients can ``await wait_ready()``.
+        """
+        self._init_task = asyncio.create_task(
+            self.init_from_config(config),
+            name="mcp-init",
+        )
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait for background initialization to finish.
+
+        Returns:
+            False if *timeout* expired first, True otherwise.
+        """
+        task = self._init_task
+        if task is None or task.done():
+            return True
+        done, _ = await asyncio.wait([task], timeout=timeout)
+        return bool(done)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Connection state of every known client.
+
+        Returns:
+            Mapping of client key to ``{"status", "error",
+            "connect_seconds"}``; status is one of ``connecting``,
+            ``ready``, ``failed`` or ``closed``.
+        """
+        return {key: slot.info() for key, slot in self._clients.items()}
 
     async def get_clients(self) -> List[Any]:
-        """Get list of all active MCP clients.
+        """Get list of all ready MCP clients.
 
         This method is called by the runner on each query to get
-        the latest set of clients.
+        the latest set of clients. Clients still connecting (or that
+        failed to connect) are left out.
 
         Returns:
             List of connected MCP client instances
         """
         async with self._lock:
             return [
-                client
-                for client in self._clients.values()
-                if client is not None
+                slot.client for slot in self._clients.values() if slot.is_ready
             ]
 
     async def replace_client(
@@ -92,41 +279,27 @@ class MCPClientManager:
         """
         # 1. Create and connect new client outside lock (may be slow)
         logger.debug(f"Connecting new MCP client: {key}")
-        new_client = self._build_client(client_config)
+        new_slot = _ClientSlot(key, self._build_client(client_config), timeout)
 
         try:
-            # Add timeout to prevent indefinite blocking
-            await asyncio.wait_for(new_client.connect(), timeout=timeout)
+            await new_slot.wait_connected()
+        except asyncio.CancelledError:
+            await new_slot.close()
+            raise
         except asyncio.TimeoutError:
-            logger.warning(
-                f"Timeout connecting MCP client '{key}' after {timeout}s",
-            )
-            try:
-                await new_client.close()
-            except Exception:
-                pass
             raise
         except Exception as e:
             logger.warning(f"Failed to connect MCP client '{key}': {e}")
-            try:
-                await new_client.close()
-            except Exception:
-                pass
             raise
 
         # 2. Swap and close old client inside lock
         async with self._lock:
-            old_client = self._clients.get(key)
-            self._clients[key] = new_client
+            old_slot = self._clients.get(key)
+            self._clients[key] = new_slot
 
-            if old_client is not None:
+            if old_slot is not None:
                 logger.debug(f"Closing old MCP client: {key}")
-                try:
-                    await old_client.close()
-                except Exception as e:
-                    logger.warning(
-                        f"Error closing old MCP client '{key}': {e}",
-                    )
+                await old_slot.close()
             else:
                 logger.debug(f"Added new MCP client: {key}")
 
@@ -137,52 +310,61 @@ class MCPClientManager:
             key: Client identifier to remove
         """
         async with self._lock:
-            old_client = self._clients.pop(key, None)
+            old_slot = self._clients.pop(key, None)
 
-        if old_client is not None:
+        if old_slot is not None:
             logger.debug(f"Removing MCP client: {key}")
-            try:
-                await old_client.close()
-            except Exception as e:
-                logger.warning(f"Error closing MCP client '{key}': {e}")
+            await old_slot.close()
 
     async def close_all(self) -> None:
         """Close all MCP clients.
 
-        Called during application shutdown.
+        Called during application shutdown. Clients still connecting
+        are cancelled.
         """
+        init_task, self._init_task = self._init_task, None
+        if init_task is not None and not init_task.done():
+            init_task.cancel()
+            await asyncio.wait([init_task])
+
         async with self._lock:
-            clients_snapshot = list(self._clients.items())
+            slots = list(self._clients.values())
             self._clients.clear()
 
         logger.debug("Closing all MCP clients")
-        for key, client in clients_snapshot:
-            if client is not None:
-                try:
-                    await client.close()
-                except Exception as e:
-                    logger.warning(f"Error closing MCP client '{key}': {e}")
+        await asyncio.gather(*(slot.close() for slot in slots))
 
     async def _add_client(
         self,
         key: str,
         client_config: "MCPClientConfig",
-        timeout: float = 60.0,
+        timeout: Optional[float] = None,
     ) -> None:
         """Add a new client (used during initial setup).
 
+        The client is registered as ``connecting`` right away and
+        becomes visible to ``get_clients()`` once connected.
+
         Args:
             key: Client identifier
             client_config: Client configuration
-            timeout: Connection timeout in seconds (default 60s)
+            timeout: Connection timeout in seconds (default: the
+                manager's ``connect_timeout``)
         """
-        client = self._build_client(client_config)
-
-        # Add timeout to prevent indefinite blocking
-        await asyncio.wait_for(client.connect(), timeout=timeout)
-
+        if timeout is None:
+            timeout = self._connect_timeout
+        slot = _ClientSlot(key, self._build_client(client_config), timeout)
         async with self._lock:
-            self._clients[key] = client
+            old_slot = self._clients.get(key)
+            self._clients[key] = slot
+        if old_slot is not None:
+            await old_slot.close()
+
+        try:
+            await slot.wait_connected()
+        except asyncio.CancelledError:
+            await slot.close()
+            raise
 
     @staticmethod
     def _build_client(client_config: "MCPClientConfig") -> Any:
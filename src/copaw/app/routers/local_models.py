@@ -54,6 +54,22 @@ class LocalModelResponse(BaseModel):
     display_name: str
 
 
+class ResidentModelResponse(BaseModel):
+    model_id: str
+    resident: bool
+    resident_bytes: int = Field(
+        0,
+        description="Estimated from the size of the weights on disk",
+    )
+    in_use: int
+    hits: int
+    misses: int
+    loads: int
+    evictions: int
+    last_load_seconds: float
+    last_used: float
+
+
 class DownloadTaskResponse(BaseModel):
     task_id: str
     status: str
@@ -120,6 +136,20 @@ async def list_local(
     ]
 
 
+@router.get(
+    "/resident",
+    response_model=List[ResidentModelResponse],
+    summary="Resident local models with load time and hit/miss counters",
+)
+async def list_resident() -> List[ResidentModelResponse]:
+    try:
+        from ...local_models import get_local_model_stats
+    except ImportError:
+        return []
+
+    return [ResidentModelResponse(**s) for s in get_local_model_stats()]
+
+
 @router.post(
     "/download",
     response_model=DownloadTaskResponse,
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Prometheus scrape endpoint for request hot-path stage timings."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ...utils.tracing import render_prometheus
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    description="Stage histograms of the message hot path "
+    "(Prometheus text exposition format)",
+    response_class=PlainTextResponse,
+)
+async def get_metrics() -> PlainTextResponse:
+    """Return stage histograms in the Prometheus text format."""
+    return PlainTextResponse(
+        render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -10,6 +10,7 @@ from .models import (
 )
 from .repo import (
     BaseChatRepository,
+    IndexedChatRepository,
     JsonChatRepository,
 )
 
@@ -26,5 +27,6 @@ __all__ = [
     "ChatsFile",
     # Chat Repository
     "BaseChatRepository",
+    "IndexedChatRepository",
     "JsonChatRepository",
 ]
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Warm pool of pre-built CoPawAgent instances.
+
+Building a ``CoPawAgent`` creates the toolkit, registers every skill,
+builds the system prompt, creates the model/formatter and registers
+hooks. None of that depends on the conversation, so the runner checks
+agents out of this pool, rebinds their memory and request context, and
+hands them back once the session state has been saved.
+
+Agents are keyed by a fingerprint of everything that goes into their
+construction (config, active model, skills on disk and MCP clients).
+When any of those change, the fingerprint changes and only idle agents
+built from the stale fingerprint are dropped.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections import deque
+from typing import Any, Optional
+
+from ...agents.memory import MemoryManager
+from ...agents.react_agent import CoPawAgent
+from ...agents.skill_index import get_skill_index
+from ...agents.skills_manager import get_active_skills_dir
+from ...config.config import Config
+from ...constant import AGENT_POOL_ENABLED, AGENT_POOL_MAX_IDLE
+from ...providers.provider_manager import ProviderManager
+from ...utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def _skills_signature() -> list[tuple[str, int, int]]:
+    """Return (name, mtime_ns, size) of every active SKILL.md."""
+    return get_skill_index(get_active_skills_dir()).signature()
+
+
+def _model_signature() -> Optional[dict[str, Any]]:
+    """Return the active model slot and its provider settings."""
+    manager = ProviderManager.get_instance()
+    active = manager.get_active_model()
+    if active is None:
+        return None
+    provider = manager.get_provider(active.provider_id)
+    return {
+        "active": active.model_dump(mode="json"),
+        "provider": (
+            provider.model_dump(mode="json") if provider is not None else None
+        ),
+    }
+
+
+def agent_fingerprint(
+    config: Config,
+    mcp_clients: Optional[list[Any]] = None,
+) -> str:
+    """Compute the pool key for agents built under the current setup.
+
+    Args:
+        config: Loaded config used to build the agent
+        mcp_clients: MCP clients the agent will register
+
+    Returns:
+        Hex digest identifying a compatible set of pooled agents
+    """
+    builtin_tools = {}
+    if hasattr(config, "tools") and hasattr(config.tools, "builtin_tools"):
+        builtin_tools = {
+            name: tool_config.enabled
+            for name, tool_config in config.tools.builtin_tools.items()
+        }
+    parts = {
+        "builtin_tools": builtin_tools,
+        "language": config.agents.language,
+        "max_input_length": config.agents.running.max_input_length,
+        "model": _model_signature(),
+        "skills": _skills_signature(),
+        "mcp": [id(client) for client in mcp_clients or []],
+    }
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AgentPool:
+    """Pool of idle, session-agnostic ``CoPawAgent`` instances.
+
+    Each request checks an agent out with :meth:`acquire` and returns it
+    with :meth:`release`. An agent is only ever used by one request at
+    a time; agents whose request failed are discarded, not pooled.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = AGENT_POOL_ENABLED,
+        max_idle_per_key: int = AGENT_POOL_MAX_IDLE,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            enabled: When False, every acquire builds a fresh agent and
+                release drops it (pre-pool behaviour)
+            max_idle_per_key: Maximum idle agents kept per fingerprint
+        """
+        self.enabled = enabled
+        self.max_idle_per_key = max_idle_per_key
+        self._idle: dict[str, deque[CoPawAgent]] = {}
+        self._keys: dict[int, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def acquire(
+        self,
+        *,
+        config: Config,
+        env_context: Optional[str],
+        mcp_clients: Optional[list[Any]],
+        memory_manager: MemoryManager | None,
+        request_context: dict[str, str],
+    ) -> CoPawAgent:
+        """Check out an agent bound to the given request.
+
+        Args:
+            config: Loaded config for this request
+            env_context: Environment context for the system prompt
+            mcp_clients: Ready MCP clients to register on new agents
+            memory_manager: Shared memory manager
+            request_context: Session/user/channel of the request
+
+        Returns:
+            An agent with fresh memory and the request context bound
+        """
+        max_iters = config.agents.running.max_iters
+        key = agent_fingerprint(config, mcp_clients) if self.enabled else ""
+        self._evict_stale(key)
+
+        idle = self._idle.get(key)
+        if idle:
+            agent = idle.pop()
+            agent.rebind_request(
+                env_context=env_context,
+                request_context=request_context,
+                max_iters=max_iters,
+            )
+            self.hits += 1
+        else:
+            with span("agent.build"):
+                agent = CoPawAgent(
+                    env_context=env_context,
+                    mcp_clients=list(mcp_clients or []),
+                    memory_manager=memory_manager,
+                    request_context=request_context,
+                    max_iters=max_iters,
+                    max_input_length=config.agents.running.max_input_length,
+                )
+            with span("mcp.register", clients=len(mcp_clients or [])):
+                await agent.register_mcp_clients()
+            self.misses += 1
+
+        agent.set_console_output_enabled(enabled=False)
+        self._keys[id(agent)] = key
+        return agent
+
+    def release(self, agent: CoPawAgent, reusable: bool = True) -> None:
+        """Return an agent to the pool.
+
+        Args:
+            agent: Agent previously returned by :meth:`acquire`
+            reusable: False if the request failed or was cancelled; the
+                agent is then dropped instead of pooled
+        """
+        key = self._keys.pop(id(agent), None)
+        if not self.enabled or key is None or not reusable:
+            return
+        idle = self._idle.get(key)
+        if idle is None:
+            # Built under a fingerprint that has since been replaced.
+            return
+        if len(idle) < self.max_idle_per_key:
+            idle.append(agent)
+
+    def invalidate(self) -> None:
+        """Drop all idle agents (e.g. after a daemon restart)."""
+        self._idle.clear()
+
+    def _evict_stale(self, key: str) -> None:
+        """Drop idle agents built under any fingerprint other than *key*."""
+        stale = [k for k in self._idle if k != key]
+        for k in stale:
+            dropped = self._idle.pop(k)
+            logger.debug(
+                "Agent pool: dropped %d idle agent(s) for stale "
+                "fingerprint %s",
+                len(dropped),
+                k[:12],
+            )
+        self._idle.setdefault(key, deque())
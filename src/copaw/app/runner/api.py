@@ -5,8 +5,8 @@ from typing import Optional
 from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from agentscope.memory import InMemoryMemory
+from agentscope.session import SessionBase
 
-from .session import SafeJSONSession
 from .manager import ChatManager
 from .models import (
     ChatSpec,
@@ -39,14 +39,14 @@ def get_chat_manager(request: Request) -> ChatManager:
     return mgr
 
 
-def get_session(request: Request) -> SafeJSONSession:
+def get_session(request: Request) -> SessionBase:
     """Get the session from app state.
 
     Args:
         request: FastAPI request object
 
     Returns:
-        SafeJSONSession instance
+        Session store instance (SQLite or JSON backend)
 
     Raises:
         HTTPException: If session is not initialized
@@ -126,14 +126,14 @@ async def batch_delete_chats(
 async def get_chat(
     chat_id: str,
     mgr: ChatManager = Depends(get_chat_manager),
-    session: SafeJSONSession = Depends(get_session),
+    session: SessionBase = Depends(get_session),
 ):
     """Get detailed information about a specific chat by UUID.
 
     Args:
         chat_id: Chat UUID
         mgr: Chat manager dependency
-        session: SafeJSONSession dependency
+        session: Session store dependency
 
     Returns:
         ChatHistory with messages
@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime, timezone
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from .models import ChatSpec
 from .repo import BaseChatRepository
@@ -35,6 +37,33 @@ class ChatManager:
         """
         self._repo = repo
         self._lock = asyncio.Lock()
+        # Per-chat locks, used when the repo supports concurrent writes.
+        # Weak values: a lock disappears once no caller holds it.
+        self._chat_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]"
+        self._chat_locks = weakref.WeakValueDictionary()
+
+    @asynccontextmanager
+    async def _locked(self, *chat_ids: str) -> AsyncIterator[None]:
+        """Serialize operations on the given chats (or on all chats).
+
+        Whole-file repositories get the single global lock. Repositories
+        with ``supports_concurrent_writes`` only serialize operations on
+        the same chat id; locks are taken in sorted order so callers that
+        touch several chats cannot deadlock. No ids means a read that
+        needs no lock.
+        """
+        if not self._repo.supports_concurrent_writes:
+            async with self._lock:
+                yield
+            return
+        async with AsyncExitStack() as stack:
+            for chat_id in sorted(set(chat_ids)):
+                lock = self._chat_locks.get(chat_id)
+                if lock is None:
+                    lock = asyncio.Lock()
+                    self._chat_locks[chat_id] = lock
+                await stack.enter_async_context(lock)
+            yield
 
     # ----- Read Operations -----
 
@@ -52,7 +81,7 @@ class ChatManager:
         Returns:
             List of chat specifications
         """
-        async with self._lock:
+        async with self._locked():
             return await self._repo.filter_chats(
                 user_id=user_id,
                 channel=channel,
@@ -67,7 +96,7 @@ class ChatManager:
         Returns:
             Chat spec or None if not found
         """
-        async with self._lock:
+        async with self._locked():
             return await self._repo.get_chat(chat_id)
 
     async def get_or_create_chat(
@@ -90,6 +119,17 @@ class ChatManager:
         Returns:
             Chat specification (existing or newly created)
         """
+        if self._repo.supports_concurrent_writes:
+            existing = await self._repo.get_chat_by_id(
+                session_id,
+                user_id,
+                channel,
+            )
+            if existing:
+                return existing
+
+        # Auto-registration always runs under the global lock so two
+        # messages from the same new session cannot both create a chat.
         async with self._lock:
             # Try to find existing by session_id
             existing = await self._repo.get_chat_by_id(
@@ -123,7 +163,7 @@ class ChatManager:
         Returns:
             Chat spec
         """
-        async with self._lock:
+        async with self._locked(spec.id):
             await self._repo.upsert_chat(spec)
             return spec
 
@@ -136,7 +176,7 @@ class ChatManager:
         Returns:
             Updated chat spec
         """
-        async with self._lock:
+        async with self._locked(spec.id):
             spec.updated_at = datetime.now(timezone.utc)
             await self._repo.upsert_chat(spec)
             return spec
@@ -152,7 +192,7 @@ class ChatManager:
         Returns:
             True if deleted, False if not found
         """
-        async with self._lock:
+        async with self._locked(*chat_ids):
             deleted = await self._repo.delete_chats(chat_ids)
 
             if deleted:
@@ -174,7 +214,7 @@ class ChatManager:
         Returns:
             Number of matching chats
         """
-        async with self._lock:
+        async with self._locked():
             chats = await self._repo.filter_chats(
                 user_id=user_id,
                 channel=channel,
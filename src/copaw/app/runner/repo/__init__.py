@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 """Chat repository implementations."""
 from .base import BaseChatRepository
+from .indexed_repo import IndexedChatRepository
 from .json_repo import JsonChatRepository
 
-__all__ = ["BaseChatRepository", "JsonChatRepository"]
+__all__ = [
+    "BaseChatRepository",
+    "IndexedChatRepository",
+    "JsonChatRepository",
+]
@@ -12,6 +12,12 @@ from ...channels.schema import DEFAULT_CHANNEL
 class BaseChatRepository(ABC):
     """Abstract repository for chat specs persistence."""
 
+    # True if individual upserts/deletes for different chats may run
+    # concurrently without losing updates. Whole-file repositories
+    # (load-modify-save) must keep this False so ChatManager serializes
+    # every call behind a single lock.
+    supports_concurrent_writes: bool = False
+
     @abstractmethod
     async def load(self) -> ChatsFile:
         """Load all chat specs from storage."""
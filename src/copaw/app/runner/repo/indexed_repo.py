@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""Indexed chat repository (in-memory indexes + append log)."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from .base import BaseChatRepository
+from ..models import ChatSpec, ChatsFile
+from ...channels.schema import DEFAULT_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Compact the log into the snapshot once it has this many records
+# (or more records than there are chats, whichever is larger).
+_COMPACT_MIN_RECORDS = 1000
+
+_ChatKey = tuple[str, str, str]
+
+
+class IndexedChatRepository(BaseChatRepository):
+    """chats.json repository with O(1) lookups and incremental writes.
+
+    All chat specs are held in memory, indexed by chat id and by
+    ``(user_id, channel, session_id)``. Each change is appended as one
+    JSON line to ``<path>.log`` instead of rewriting the whole file; the
+    log is folded back into the ``chats.json`` snapshot on startup and
+    whenever it grows past the compaction threshold. The index is
+    updated before the record is appended, so a compaction triggered by
+    that append includes it. Log appends (fsynced, batched while a
+    write is running) and snapshot writes run in a worker thread under
+    one lock, so appends wait until the old log is gone.
+
+    The snapshot keeps the same format as :class:`JsonChatRepository`,
+    so both repositories can read each other's files.
+
+    Notes:
+    - Single-machine, single-process (the in-memory index is the source
+      of truth while the app runs).
+    - Returned specs are copies; changes must go through ``upsert_chat``.
+    """
+
+    supports_concurrent_writes = True
+
+    def __init__(self, path: Path | str):
+        """Initialize indexed chat repository.
+
+        Args:
+            path: Path to chats.json file
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        self._path = path.expanduser()
+        self._log_path = self._path.with_suffix(self._path.suffix + ".log")
+        self._by_id: dict[str, ChatSpec] = {}
+        self._by_key: dict[_ChatKey, str] = {}
+        self._log_records = 0
+        # Log records waiting for the next write, in change order.
+        self._pending_lines: list[str] = []
+        self._loaded = False
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def path(self) -> Path:
+        """Get the repository snapshot path."""
+        return self._path
+
+    # ----- Storage -----
+
+    @staticmethod
+    def _key(spec: ChatSpec) -> _ChatKey:
+        return (spec.user_id, spec.channel, spec.session_id)
+
+    def _index(self, spec: ChatSpec) -> None:
+        old = self._by_id.get(spec.id)
+        if old is not None:
+            self._by_key.pop(self._key(old), None)
+        self._by_id[spec.id] = spec
+        self._by_key[self._key(spec)] = spec.id
+
+    def _unindex(self, chat_id: str) -> bool:
+        old = self._by_id.pop(chat_id, None)
+        if old is None:
+            return False
+        if self._by_key.get(self._key(old)) == chat_id:
+            del self._by_key[self._key(old)]
+        return True
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        if self._path.exists():
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+            for spec in ChatsFile.model_validate(data).chats:
+                self._index(spec)
+
+        replayed = 0
+        if self._log_path.exists():
+            with open(self._log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn final line from a crash mid-append.
+                        logger.warning(
+                            "Ignoring corrupt record in %s",
+                            self._log_path,
+                        )
+                        continue
+                    self._apply(record)
+                    replayed += 1
+
+        self._loaded = True
+        if replayed:
+            async with self._write_lock:
+                await self._compact()
+
+    def _apply(self, record: dict) -> None:
+        op = record.get("op")
+        if op == "upsert":
+            self._index(ChatSpec.model_validate(record["chat"]))
+        elif op == "delete":
+            for chat_id in record.get("ids", []):
+                self._unindex(chat_id)
+
+    async def _append(self, record: dict) -> None:
+        """Log a change already applied to the index; compact if due.
+
+        Returns once the record is fsynced. Records queued while another
+        write runs go out together in the next one (group commit).
+        """
+        self._pending_lines.append(json.dumps(record, ensure_ascii=False))
+        async with self._write_lock:
+            # Empty if an earlier writer already took this record.
+            lines, self._pending_lines = self._pending_lines, []
+            if lines:
+                try:
+                    await asyncio.to_thread(self._write_log, lines)
+                except BaseException:
+                    # Left for the next writer; this caller sees the error.
+                    self._pending_lines[:0] = lines
+                    raise
+                self._log_records += len(lines)
+            if self._log_records >= max(
+                _COMPACT_MIN_RECORDS,
+                len(self._by_id),
+            ):
+                await self._compact()
+
+    def _write_log(self, lines: list[str]) -> None:
+        """Append *lines* to the log and fsync it."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._log_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _compact(self) -> None:
+        """Snapshot the index, then write it and drop the log off-loop.
+
+        Callers hold ``_write_lock``, so no record is appended to the log
+        between taking the snapshot and deleting the log.
+        """
+        payload = ChatsFile(
+            version=1,
+            chats=list(self._by_id.values()),
+        ).model_dump(mode="json")
+        await asyncio.to_thread(self._write_snapshot, payload)
+        self._log_records = 0
+
+    def _write_snapshot(self, payload: dict) -> None:
+        """Write a fresh snapshot atomically, then drop the log."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(self._path)
+        # Snapshot is durable; the log is now redundant.
+        if self._log_path.exists():
+            self._log_path.unlink()
+
+    # ----- BaseChatRepository API -----
+
+    async def load(self) -> ChatsFile:
+        """Return all chat specs (copies of the in-memory index)."""
+        await self._ensure_loaded()
+        return ChatsFile(
+            version=1,
+            chats=[spec.model_copy() for spec in self._by_id.values()],
+        )
+
+    async def save(self, chats_file: ChatsFile) -> None:
+        """Replace all chat specs and write a fresh snapshot."""
+        await self._ensure_loaded()
+        self._by_id.clear()
+        self._by_key.clear()
+        for spec in chats_file.chats:
+            self._index(spec.model_copy())
+        async with self._write_lock:
+            await self._compact()
+
+    async def list_chats(self) -> list[ChatSpec]:
+        await self._ensure_loaded()
+        return [spec.model_copy() for spec in self._by_id.values()]
+
+    async def get_chat(self, chat_id: str) -> Optional[ChatSpec]:
+        await self._ensure_loaded()
+        spec = self._by_id.get(chat_id)
+        return spec.model_copy() if spec is not None else None
+
+    async def get_chat_by_id(
+        self,
+        session_id: str,
+        user_id: str,
+        channel: str = DEFAULT_CHANNEL,
+    ) -> Optional[ChatSpec]:
+        await self._ensure_loaded()
+        chat_id = self._by_key.get((user_id, channel, session_id))
+        if chat_id is None:
+            return None
+        return self._by_id[chat_id].model_copy()
+
+    async def upsert_chat(self, spec: ChatSpec) -> None:
+        await self._ensure_loaded()
+        stored = spec.model_copy(deep=True)
+        self._index(stored)
+        await self._append(
+            {"op": "upsert", "chat": stored.model_dump(mode="json")},
+        )
+
+    async def delete_chats(self, chat_ids: list[str]) -> bool:
+        await self._ensure_loaded()
+        existing = [chat_id for chat_id in chat_ids if chat_id in self._by_id]
+        if not existing:
+            return False
+        for chat_id in existing:
+            self._unindex(chat_id)
+        await self._append({"op": "delete", "ids": existing})
+        return True
+
+    async def filter_chats(
+        self,
+        user_id: Optional[str] = None,
+        channel: Optional[str] = None,
+    ) -> list[ChatSpec]:
+        await self._ensure_loaded()
+        return [
+            spec.model_copy()
+            for spec in self._by_id.values()
+            if (user_id is None or spec.user_id == user_id)
+            and (channel is None or spec.channel == channel)
+        ]
@@ -14,6 +14,7 @@ from agentscope_runtime.engine.runner import Runner
 from agentscope_runtime.engine.schemas.agent_schemas import AgentRequest
 from dotenv import load_dotenv
 
+from .agent_pool import AgentPool
 from .command_dispatch import (
     _get_last_user_text,
     _is_command,
@@ -21,16 +22,18 @@ from .command_dispatch import (
 )
 from .query_error_dump import write_query_error_dump
 from .session import SafeJSONSession
+from .sqlite_session import SQLiteSession
 from .utils import build_env_context
 from ..channels.schema import DEFAULT_CHANNEL
 from ...agents.memory import MemoryManager
-from ...agents.react_agent import CoPawAgent
 from ...security.tool_guard.models import TOOL_GUARD_DENIED_MARK
-from ...config import load_config
+from ...config import get_config_snapshot
 from ...constant import (
+    SESSION_BACKEND,
     TOOL_GUARD_APPROVAL_TIMEOUT_SECONDS,
     WORKING_DIR,
 )
+from ...utils.tracing import span
 from ...security.tool_guard.approval import ApprovalDecision
 
 logger = logging.getLogger(__name__)
@@ -43,6 +46,7 @@ class AgentRunner(Runner):
         self._chat_manager = None  # Store chat_manager reference
         self._mcp_manager = None  # MCP client manager for hot-reload
         self.memory_manager: MemoryManager | None = None
+        self.agent_pool = AgentPool()
 
     def set_chat_manager(self, chat_manager):
         """Set chat manager for auto-registration.
@@ -59,6 +63,8 @@ class AgentRunner(Runner):
             mcp_manager: MCPClientManager instance
         """
         self._mcp_manager = mcp_manager
+        # Pooled agents hold tools registered from the old clients.
+        self.agent_pool.invalidate()
 
     _APPROVAL_TIMEOUT_SECONDS = TOOL_GUARD_APPROVAL_TIMEOUT_SECONDS
 
@@ -173,6 +179,7 @@ class AgentRunner(Runner):
             return
 
         agent = None
+        agent_reusable = False
         chat = None
         session_state_loaded = False
         try:
@@ -202,29 +209,26 @@ class AgentRunner(Runner):
                 working_dir=str(WORKING_DIR),
             )
 
-            # Get MCP clients from manager (hot-reloadable)
+            # Get ready MCP clients from manager (hot-reloadable); ones
+            # still connecting in the background are picked up later
             mcp_clients = []
             if self._mcp_manager is not None:
-                mcp_clients = await self._mcp_manager.get_clients()
-
-            config = load_config()
-            max_iters = config.agents.running.max_iters
-            max_input_length = config.agents.running.max_input_length
-
-            agent = CoPawAgent(
-                env_context=env_context,
-                mcp_clients=mcp_clients,
-                memory_manager=self.memory_manager,
-                request_context={
-                    "session_id": session_id,
-                    "user_id": user_id,
-                    "channel": channel,
-                },
-                max_iters=max_iters,
-                max_input_length=max_input_length,
-            )
-            await agent.register_mcp_clients()
-            agent.set_console_output_enabled(enabled=False)
+                with span("mcp.list"):
+                    mcp_clients = await self._mcp_manager.get_clients()
+
+            config = get_config_snapshot()
+            with span("agent.acquire"):
+                agent = await self.agent_pool.acquire(
+                    config=config,
+                    env_context=env_context,
+                    mcp_clients=mcp_clients,
+                    memory_manager=self.memory_manager,
+                    request_context={
+                        "session_id": session_id,
+                        "user_id": user_id,
+                        "channel": channel,
+                    },
+                )
 
             logger.debug(
                 f"Agent Query msgs {msgs}",
@@ -247,11 +251,12 @@ class AgentRunner(Runner):
                 )
 
             try:
-                await self.session.load_session_state(
-                    session_id=session_id,
-                    user_id=user_id,
-                    agent=agent,
-                )
+                with span("session.load"):
+                    await self.session.load_session_state(
+                        session_id=session_id,
+                        user_id=user_id,
+                        agent=agent,
+                    )
             except KeyError as e:
                 logger.warning(
                     "load_session_state skipped (state schema mismatch): %s; "
@@ -270,6 +275,7 @@ class AgentRunner(Runner):
                 coroutine_task=agent(msgs),
             ):
                 yield msg, last
+            agent_reusable = True
 
         except asyncio.CancelledError as exc:
             logger.info(f"query_handler: {session_id} cancelled!")
@@ -299,11 +305,14 @@ class AgentRunner(Runner):
             raise
         finally:
             if agent is not None and session_state_loaded:
-                await self.session.save_session_state(
-                    session_id=session_id,
-                    user_id=user_id,
-                    agent=agent,
-                )
+                with span("session.save"):
+                    await self.session.save_session_state(
+                        session_id=session_id,
+                        user_id=user_id,
+                        agent=agent,
+                    )
+            if agent is not None:
+                self.agent_pool.release(agent, reusable=agent_reusable)
 
             if self._chat_manager is not None and chat is not None:
                 await self._chat_manager.update_chat(chat)
@@ -328,21 +337,13 @@ class AgentRunner(Runner):
         if not hasattr(self, "session") or self.session is None:
             return
 
-        path = self.session._get_save_path(  # pylint: disable=protected-access
-            session_id,
-            user_id,
-        )
-        if not Path(path).exists():
-            return
-
         try:
-            with open(
-                path,
-                "r",
-                encoding="utf-8",
-                errors="surrogatepass",
-            ) as f:
-                states = json.load(f)
+            states = await self.session.get_session_state_dict(
+                session_id=session_id,
+                user_id=user_id,
+            )
+            if not states:
+                return
 
             agent_state = states.get("agent", {})
             memory_state = agent_state.get("memory", {})
@@ -400,16 +401,15 @@ class AgentRunner(Runner):
                 modified = True
 
             if modified:
-                with open(
-                    path,
-                    "w",
-                    encoding="utf-8",
-                    errors="surrogatepass",
-                ) as f:
-                    json.dump(states, f, ensure_ascii=False)
+                await self.session.update_session_state(
+                    session_id=session_id,
+                    key="agent.memory",
+                    value=memory_state,
+                    user_id=user_id,
+                )
                 logger.info(
-                    "Tool guard: cleaned up denied session memory in %s",
-                    path,
+                    "Tool guard: cleaned up denied session memory for %s",
+                    session_id,
                 )
         except Exception:  # pylint: disable=broad-except
             logger.warning(
@@ -434,7 +434,13 @@ class AgentRunner(Runner):
             )
 
         session_dir = str(WORKING_DIR / "sessions")
-        self.session = SafeJSONSession(save_dir=session_dir)
+        if SESSION_BACKEND == "sqlite":
+            self.session = SQLiteSession(
+                db_path=str(WORKING_DIR / "sessions.db"),
+                legacy_json_dir=session_dir,
+            )
+        else:
+            self.session = SafeJSONSession(save_dir=session_dir)
 
         try:
             if self.memory_manager is None:
@@ -454,3 +460,5 @@ class AgentRunner(Runner):
                 await self.memory_manager.close()
         except Exception as e:
             logger.warning(f"MemoryManager stop failed: {e}")
+        if isinstance(getattr(self, "session", None), SQLiteSession):
+            self.session.close()
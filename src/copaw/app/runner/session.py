@@ -34,6 +34,19 @@ def sanitize_filename(name: str) -> str:
     return _UNSAFE_FILENAME_RE.sub("--", name)
 
 
+def session_file_stem(session_id: str, user_id: str = "") -> str:
+    """Return the filesystem-safe stem identifying a session.
+
+    >>> session_file_stem('discord:dm:12345', 'alice')
+    'alice_discord--dm--12345'
+    """
+    safe_sid = sanitize_filename(session_id)
+    safe_uid = sanitize_filename(user_id) if user_id else ""
+    if safe_uid:
+        return f"{safe_uid}_{safe_sid}"
+    return safe_sid
+
+
 class SafeJSONSession(SessionBase):
     """SessionBase subclass with filename sanitization and async file I/O.
 
@@ -60,12 +73,7 @@ class SafeJSONSession(SessionBase):
         filename is valid on Windows, macOS and Linux.
         """
         os.makedirs(self.save_dir, exist_ok=True)
-        safe_sid = sanitize_filename(session_id)
-        safe_uid = sanitize_filename(user_id) if user_id else ""
-        if safe_uid:
-            file_path = f"{safe_uid}_{safe_sid}.json"
-        else:
-            file_path = f"{safe_sid}.json"
+        file_path = f"{session_file_stem(session_id, user_id)}.json"
         return os.path.join(self.save_dir, file_path)
 
     async def save_session_state(
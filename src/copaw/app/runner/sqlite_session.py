@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""SQLite (WAL) session store.
+
+Drop-in alternative to :class:`SafeJSONSession`. Instead of one JSON file
+per conversation that is parsed and rewritten in full on every turn,
+memory messages are stored as rows and each save only appends (or
+rewrites from the first changed entry onwards) the messages that differ
+from what is already on disk. Everything else in the session state is
+small and stored as a single JSON blob per session.
+
+Sessions are keyed by the same stem the JSON store uses for file names
+(see :func:`session_file_stem`), so existing JSON sessions can be
+imported one-to-one by :func:`migrate_json_sessions`.
+
+All SQLite calls run in a worker thread so the event loop never blocks
+on disk I/O.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+from agentscope.session import SessionBase
+
+from .session import session_file_stem
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_state (
+    session_key TEXT PRIMARY KEY,
+    state BLOB NOT NULL,
+    has_content INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_messages (
+    session_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    entry BLOB NOT NULL,
+    PRIMARY KEY (session_key, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_MIGRATED_FLAG = "json_sessions_migrated"
+
+
+def _dumps(obj: Any) -> bytes:
+    # surrogatepass mirrors how SafeJSONSession reads its files: model
+    # output occasionally carries lone surrogates that plain utf-8 rejects.
+    return json.dumps(obj, ensure_ascii=False).encode(
+        "utf-8",
+        "surrogatepass",
+    )
+
+
+def _loads(data: bytes) -> Any:
+    return json.loads(bytes(data).decode("utf-8", "surrogatepass"))
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _split_memory_content(
+    states: dict,
+) -> tuple[dict, Optional[list]]:
+    """Split ``agent.memory.content`` out of a session state dict.
+
+    Returns the remaining state (shallow-copied, input untouched) and the
+    content list, or ``None`` if the state carries no memory content.
+    """
+    agent_state = states.get("agent")
+    if not isinstance(agent_state, dict):
+        return states, None
+    memory_state = agent_state.get("memory")
+    if not isinstance(memory_state, dict):
+        return states, None
+    content = memory_state.get("content")
+    if not isinstance(content, list):
+        return states, None
+
+    memory_rest = {k: v for k, v in memory_state.items() if k != "content"}
+    agent_rest = {**agent_state, "memory": memory_rest}
+    return {**states, "agent": agent_rest}, content
+
+
+class SQLiteSession(SessionBase):
+    """Session store backed by a single SQLite database in WAL mode."""
+
+    def __init__(
+        self,
+        db_path: str,
+        legacy_json_dir: Optional[str] = None,
+    ) -> None:
+        """Initialize the SQLite session store.
+
+        Args:
+            db_path (`str`):
+                Path of the SQLite database file.
+            legacy_json_dir (`Optional[str]`, defaults to `None`):
+                Directory of ``SafeJSONSession`` files to import once, the
+                first time the database is opened.
+        """
+        self.db_path = db_path
+        self.legacy_json_dir = legacy_json_dir
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # session_key -> digests of the rows currently stored, so a save
+        # does not need to read anything back to find what changed.
+        self._digests: dict[str, list[str]] = {}
+
+    # ------------------------------------------------------------------
+    # Connection
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is not None:
+                return self._conn
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            if self.legacy_json_dir:
+                self._migrate_once()
+            return conn
+
+    def _migrate_once(self) -> None:
+        conn = self._conn
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key = ?",
+            (_MIGRATED_FLAG,),
+        ).fetchone()
+        if row is not None:
+            return
+        count = migrate_json_sessions(self.legacy_json_dir, self)
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (_MIGRATED_FLAG, str(time.time())),
+        )
+        if count:
+            logger.info(
+                "Imported %d JSON session(s) from %s into %s",
+                count,
+                self.legacy_json_dir,
+                self.db_path,
+            )
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._digests.clear()
+
+    # ------------------------------------------------------------------
+    # Synchronous primitives (run in a worker thread)
+    # ------------------------------------------------------------------
+
+    def has_session(self, session_key: str) -> bool:
+        """Return True if a state row exists for *session_key*."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT 1 FROM session_state WHERE session_key = ?",
+                    (session_key,),
+                )
+                .fetchone()
+            )
+        return row is not None
+
+    def write_state(self, session_key: str, states: dict) -> None:
+        """Persist *states*, writing only memory entries that changed."""
+        rest, content = _split_memory_content(states)
+        entries = [_dumps(entry) for entry in content or []]
+        digests = [_digest(entry) for entry in entries]
+        state_blob = _dumps(rest)
+
+        with self._lock:
+            conn = self._connect()
+            stored = self._digests.get(session_key)
+            if stored is None:
+                stored = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT digest FROM session_messages "
+                        "WHERE session_key = ? ORDER BY seq",
+                        (session_key,),
+                    )
+                ]
+
+            common = 0
+            for old, new in zip(stored, digests):
+                if old != new:
+                    break
+                common += 1
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if common < len(stored):
+                    conn.execute(
+                        "DELETE FROM session_messages "
+                        "WHERE session_key = ? AND seq >= ?",
+                        (session_key, common),
+                    )
+                conn.executemany(
+                    "INSERT INTO session_messages "
+                    "(session_key, seq, digest, entry) VALUES (?, ?, ?, ?)",
+                    [
+                        (session_key, seq, digests[seq], entries[seq])
+                        for seq in range(common, len(entries))
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO session_state "
+                    "(session_key, state, has_content, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        session_key,
+                        state_blob,
+                        int(content is not None),
+                        time.time(),
+                    ),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._digests.pop(session_key, None)
+                raise
+            self._digests[session_key] = digests
+
+    def read_state(
+        self,
+        session_key: str,
+        last_n: Optional[int] = None,
+    ) -> Optional[dict]:
+        """Load the state dict for *session_key*.
+
+        Args:
+            session_key: Session stem
+            last_n: If set, only the last *last_n* memory entries are
+                loaded into ``agent.memory.content``
+
+        Returns:
+            The reconstructed state dict, or None if not stored
+        """
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT state, has_content FROM session_state "
+                "WHERE session_key = ?",
+                (session_key,),
+            ).fetchone()
+            if row is None:
+                return None
+            states = _loads(row[0])
+            if not row[1]:
+                return states
+            if last_n is None:
+                cursor = conn.execute(
+                    "SELECT entry FROM session_messages "
+                    "WHERE session_key = ? ORDER BY seq",
+                    (session_key,),
+                )
+            else:
+                cursor = conn.execute(
+                    "SELECT entry FROM ("
+                    "SELECT seq, entry FROM session_messages "
+                    "WHERE session_key = ? ORDER BY seq DESC LIMIT ?"
+                    ") ORDER BY seq",
+                    (session_key, max(last_n, 0)),
+                )
+            content = [_loads(entry) for (entry,) in cursor]
+
+        states.setdefault("agent", {}).setdefault("memory", {})
+        states["agent"]["memory"]["content"] = content
+        return states
+
+    # ------------------------------------------------------------------
+    # SessionBase API
+    # ------------------------------------------------------------------
+
+    async def save_session_state(
+        self,
+        session_id: str,
+        user_id: str = "",
+        **state_modules_mapping,
+    ) -> None:
+        """Save state modules, appending only new memory messages."""
+        state_dicts = {
+            name: state_module.state_dict()
+            for name, state_module in state_modules_mapping.items()
+        }
+        session_key = session_file_stem(session_id, user_id)
+        await asyncio.to_thread(self.write_state, session_key, state_dicts)
+        logger.info("Saved session state for %s successfully.", session_key)
+
+    async def load_session_state(
+        self,
+        session_id: str,
+        user_id: str = "",
+        allow_not_exist: bool = True,
+        **state_modules_mapping,
+    ) -> None:
+        """Load state modules from the database."""
+        session_key = session_file_stem(session_id, user_id)
+        states = await asyncio.to_thread(self.read_state, session_key)
+        if states is None:
+            if allow_not_exist:
+                logger.info(
+                    "Session %s does not exist. Skip loading session state.",
+                    session_key,
+                )
+                return
+            raise ValueError(
+                f"Failed to load session state for {session_key} "
+                "because it does not exist.",
+            )
+
+        for name, state_module in state_modules_mapping.items():
+            if name in states:
+                state_module.load_state_dict(states[name])
+        logger.info("Load session state for %s successfully.", session_key)
+
+    async def update_session_state(
+        self,
+        session_id: str,
+        key: Union[str, Sequence[str]],
+        value,
+        user_id: str = "",
+        create_if_not_exist: bool = True,
+    ) -> None:
+        session_key = session_file_stem(session_id, user_id)
+        path = key.split(".") if isinstance(key, str) else list(key)
+        if not path:
+            raise ValueError("key path is empty")
+
+        def _update() -> None:
+            with self._lock:
+                states = self.read_state(session_key)
+                if states is None:
+                    if not create_if_not_exist:
+                        raise ValueError(
+                            f"Session {session_key} does not exist.",
+                        )
+                    states = {}
+                cur = states
+                for k in path[:-1]:
+                    if k not in cur or not isinstance(cur[k], dict):
+                        cur[k] = {}
+                    cur = cur[k]
+                cur[path[-1]] = value
+                self.write_state(session_key, states)
+
+        await asyncio.to_thread(_update)
+        logger.info(
+            "Updated session state key '%s' for %s successfully.",
+            key,
+            session_key,
+        )
+
+    async def get_session_state_dict(
+        self,
+        session_id: str,
+        user_id: str = "",
+        allow_not_exist: bool = True,
+    ) -> dict:
+        """Return the session state dict, as SafeJSONSession would."""
+        session_key = session_file_stem(session_id, user_id)
+        states = await asyncio.to_thread(self.read_state, session_key)
+        if states is not None:
+            return states
+        if allow_not_exist:
+            return {}
+        raise ValueError(
+            f"Failed to get session state for {session_key} "
+            "because it does not exist.",
+        )
+
+    async def get_recent_messages(
+        self,
+        session_id: str,
+        user_id: str = "",
+        last_n: int = 20,
+    ) -> list:
+        """Return the last *last_n* ``[msg_dict, marks]`` memory entries.
+
+        Only those rows are read and decoded, regardless of how long the
+        conversation is.
+        """
+        session_key = session_file_stem(session_id, user_id)
+        states = await asyncio.to_thread(
+            self.read_state,
+            session_key,
+            last_n,
+        )
+        if not states:
+            return []
+        return states.get("agent", {}).get("memory", {}).get("content", [])
+
+
+def migrate_json_sessions(
+    json_dir: Union[str, Path],
+    session: SQLiteSession,
+    overwrite: bool = False,
+) -> int:
+    """Import ``SafeJSONSession`` files into a :class:`SQLiteSession`.
+
+    The JSON files are left in place. Sessions already present in the
+    database are skipped unless *overwrite* is set.
+
+    Args:
+        json_dir: Directory containing ``<stem>.json`` session files
+        session: Target SQLite session store
+        overwrite: Replace sessions that already exist in the database
+
+    Returns:
+        Number of sessions imported
+    """
+    json_dir = Path(json_dir)
+    if not json_dir.is_dir():
+        return 0
+
+    imported = 0
+    for path in sorted(json_dir.glob("*.json")):
+        session_key = path.stem
+        if not overwrite and session.has_session(session_key):
+            continue
+        try:
+            states = json.loads(
+                path.read_text(encoding="utf-8", errors="surrogatepass"),
+            )
+        except (OSError, ValueError) as e:
+            logger.warning("Skip migrating session file %s: %s", path, e)
+            continue
+        if not isinstance(states, dict):
+            continue
+        session.write_state(session_key, states)
+        imported += 1
+    return imported
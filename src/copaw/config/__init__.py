@@ -12,6 +12,7 @@ from .config import (
 from .utils import (
     get_available_channels,
     get_config_path,
+    get_config_snapshot,
     get_heartbeat_config,
     get_heartbeat_query_path,
     get_playwright_chromium_executable_path,
@@ -33,6 +34,7 @@ __all__ = [
     "ConfigWatcher",
     "get_available_channels",
     "get_config_path",
+    "get_config_snapshot",
     "get_heartbeat_config",
     "get_heartbeat_query_path",
     "get_playwright_chromium_executable_path",
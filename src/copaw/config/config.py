@@ -233,12 +233,35 @@ class AgentsLLMRoutingConfig(BaseModel):
     model_config = ConfigDict(extra="ignore")
 
     enabled: bool = Field(default=False)
-    mode: Literal["local_first", "cloud_first"] = Field(
+    mode: Literal["local_first", "cloud_first", "adaptive"] = Field(
         default="local_first",
         description=(
             "local_first routes to the local slot by default; cloud_first "
-            "routes to the cloud slot by default. Smarter switching can be "
-            "added later without changing the dual-slot config shape."
+            "routes to the cloud slot by default; adaptive routes each call "
+            "to the slot expected to answer faster, from prompt size, tool "
+            "use, local queue depth and rolling p95 latency."
+        ),
+    )
+    cloud_allowed: bool = Field(
+        default=True,
+        description=(
+            "Privacy constraint for adaptive mode: when false, requests "
+            "never leave the local slot."
+        ),
+    )
+    local_tools: bool = Field(
+        default=True,
+        description=(
+            "Whether the local model handles tool calls; when false, "
+            "adaptive mode sends calls with tools to the cloud slot."
+        ),
+    )
+    local_max_prompt_tokens: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Estimated prompt tokens above which adaptive mode uses the "
+            "cloud slot (0 = no limit)."
         ),
     )
     local: ModelSlotConfig = Field(
@@ -476,6 +499,24 @@ class SecurityConfig(BaseModel):
     tool_guard: ToolGuardConfig = Field(default_factory=ToolGuardConfig)
 
 
+class LocalModelsConfig(BaseModel):
+    """Top-level ``local_models`` section in config.json."""
+
+    memory_budget_mb: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Memory budget (MiB) for resident local models; the least "
+            "recently used idle models are unloaded to stay under it. "
+            "0 keeps a single model resident."
+        ),
+    )
+    preload: List[str] = Field(
+        default_factory=list,
+        description="Local model IDs to load at startup.",
+    )
+
+
 class Config(BaseModel):
     """Root config (config.json)."""
 
@@ -486,6 +527,7 @@ class Config(BaseModel):
     agents: AgentsConfig = Field(default_factory=AgentsConfig)
     last_dispatch: Optional[LastDispatchConfig] = None
     security: SecurityConfig = Field(default_factory=SecurityConfig)
+    local_models: LocalModelsConfig = Field(default_factory=LocalModelsConfig)
     show_tool_details: bool = True
 
 
@@ -4,8 +4,10 @@ from __future__ import annotations
 import json
 import os
 import plistlib
+import stat
 import subprocess
 import sys
+import threading
 from pathlib import Path
 from typing import Optional, Tuple
 
@@ -328,10 +330,29 @@ def get_heartbeat_query_path() -> Path:
     return get_config_path().parent.joinpath(HEARTBEAT_FILE)
 
 
-def load_config(config_path: Optional[Path] = None) -> Config:
-    """Load config from file. Returns default Config if file is missing."""
-    if config_path is None:
-        config_path = get_config_path()
+# config path -> ((inode, mtime_ns, size) or None if missing, Config).
+# The cached Config is handed out as is (no copy, so the hot path stays a
+# single stat) and is shared by every caller: it must never be mutated.
+# Code that changes the config works on load_config()'s private copy and
+# saves it with save_config(), which swaps in a new snapshot.
+_ConfigSignature = Optional[Tuple[int, int, int]]
+_config_cache: dict[Path, Tuple[_ConfigSignature, Config]] = {}
+_config_cache_lock = threading.Lock()
+
+
+def _config_file_signature(config_path: Path) -> _ConfigSignature:
+    """Return (inode, mtime_ns, size) of the config file, None if absent."""
+    try:
+        st = os.stat(config_path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _read_config_file(config_path: Path) -> Config:
+    """Parse and validate config.json. Returns default Config if missing."""
     if not config_path.is_file():
         return Config()
     with open(config_path, "r", encoding="utf-8") as file:
@@ -346,18 +367,65 @@ def load_config(config_path: Optional[Path] = None) -> Config:
     return Config.model_validate(data)
 
 
+def get_config_snapshot(config_path: Optional[Path] = None) -> Config:
+    """Return the shared, read-only Config for the current config file.
+
+    The file is only re-parsed when its (inode, mtime, size) changes, so
+    this costs a single ``stat`` on the hot path. The returned object is
+    shared between callers and must not be mutated (a change would leak
+    into every other reader until the file next changes); use
+    :func:`load_config` to get a private copy to modify and save.
+    """
+    if config_path is None:
+        config_path = get_config_path()
+    signature = _config_file_signature(config_path)
+    with _config_cache_lock:
+        cached = _config_cache.get(config_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    config = _read_config_file(config_path)
+    with _config_cache_lock:
+        _config_cache[config_path] = (signature, config)
+    return config
+
+
+def load_config(config_path: Optional[Path] = None) -> Config:
+    """Load config from file. Returns default Config if file is missing.
+
+    Always returns a fresh object that the caller may modify and pass to
+    :func:`save_config`. Read-only callers should prefer
+    :func:`get_config_snapshot`.
+    """
+    if config_path is None:
+        config_path = get_config_path()
+    return _read_config_file(config_path)
+
+
 def save_config(config: Config, config_path: Optional[Path] = None) -> None:
-    """Save the config to the file."""
+    """Save the config to the file.
+
+    The file is replaced atomically and the shared snapshot is updated
+    in the same step, so readers never see a half-written config.
+    """
     if config_path is None:
         config_path = get_config_path()
     config_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(config_path, "w", encoding="utf-8") as file:
+    tmp_path = config_path.with_suffix(config_path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as file:
         json.dump(
             config.model_dump(mode="json", by_alias=True),
             file,
             indent=2,
             ensure_ascii=False,
         )
+    snapshot = config.model_copy(deep=True)
+    with _config_cache_lock:
+        os.replace(tmp_path, config_path)
+        _config_cache[config_path] = (
+            _config_file_signature(config_path),
+            snapshot,
+        )
 
 
 def get_heartbeat_config() -> HeartbeatConfig:
@@ -380,7 +448,7 @@ def update_last_dispatch(channel: str, user_id: str, session_id: str) -> None:
 
 def read_last_api() -> Optional[Tuple[str, int]]:
     """Read last API host/port from config (via config load/save)."""
-    config = load_config()
+    config = get_config_snapshot()
     host = config.last_api.host
     port = config.last_api.port
     if not host or port is None:
@@ -124,6 +124,115 @@ DOCS_ENABLED = EnvVarLoader.get_bool("COPAW_OPENAPI_DOCS", False)
 ACTIVE_SKILLS_DIR = WORKING_DIR / "active_skills"
 # Customized skills directory (user-created skills)
 CUSTOMIZED_SKILLS_DIR = WORKING_DIR / "customized_skills"
+# Persisted skill index (per-directory signatures and parsed frontmatter)
+SKILL_INDEX_FILE = EnvVarLoader.get_str(
+    "COPAW_SKILL_INDEX_FILE",
+    "skill_index.json",
+)
+# Persisted workspace search indexes for grep_search / glob_search (one
+# file per searched root) and the threads scanning files for grep_search;
+# see agents/tools/search_index.py.
+SEARCH_INDEX_DIR = EnvVarLoader.get_str(
+    "COPAW_SEARCH_INDEX_DIR",
+    ".search_index",
+)
+SEARCH_WORKERS = EnvVarLoader.get_int(
+    "COPAW_SEARCH_WORKERS",
+    4,
+    min_value=1,
+)
+# browser_use gives each session its own browser context in one shared
+# browser (see agents/tools/browser_pool.py): how many sessions hold a
+# context at once before the least recently used is recycled, how many
+# spare contexts are kept warm, how many pages and how much JS heap
+# (MB, 0 = no limit) one context may hold before its least recently
+# used pages are closed, and after how many idle seconds a context is
+# recycled and the browser itself is stopped. The browser timeout keeps
+# the old 30-minute default; setting it to 0 never stops the browser,
+# which also keeps its warm spare context alive for good.
+BROWSER_MAX_CONTEXTS = EnvVarLoader.get_int(
+    "COPAW_BROWSER_MAX_CONTEXTS",
+    8,
+    min_value=1,
+)
+BROWSER_WARM_CONTEXTS = EnvVarLoader.get_int(
+    "COPAW_BROWSER_WARM_CONTEXTS",
+    1,
+    min_value=0,
+)
+BROWSER_MAX_PAGES_PER_CONTEXT = EnvVarLoader.get_int(
+    "COPAW_BROWSER_MAX_PAGES_PER_CONTEXT",
+    10,
+    min_value=1,
+)
+BROWSER_CONTEXT_MEMORY_MB = EnvVarLoader.get_int(
+    "COPAW_BROWSER_CONTEXT_MEMORY_MB",
+    512,
+    min_value=0,
+)
+BROWSER_CONTEXT_IDLE_TIMEOUT = EnvVarLoader.get_float(
+    "COPAW_BROWSER_CONTEXT_IDLE_TIMEOUT",
+    1800.0,
+    min_value=60.0,
+)
+BROWSER_IDLE_TIMEOUT = EnvVarLoader.get_float(
+    "COPAW_BROWSER_IDLE_TIMEOUT",
+    1800.0,
+    min_value=0,
+)
+# What browser_use snapshot returns by default ("full": the whole tree;
+# "diff": changes since the page's previous snapshot), and the share of
+# changed lines above which a diff falls back to the full tree. A diff
+# only helps while the base snapshot is still in the model's context,
+# which memory compaction may have summarised away, so callers opt in
+# per call with snapshot_mode="diff".
+BROWSER_SNAPSHOT_MODE = EnvVarLoader.get_str(
+    "COPAW_BROWSER_SNAPSHOT_MODE",
+    "full",
+).lower()
+BROWSER_SNAPSHOT_DIFF_MAX_RATIO = EnvVarLoader.get_float(
+    "COPAW_BROWSER_SNAPSHOT_DIFF_MAX_RATIO",
+    0.5,
+    min_value=0,
+    max_value=1,
+)
+# Seconds between progress responses streamed by execute_shell_command
+# while a command runs (0 = final result only).
+SHELL_PROGRESS_INTERVAL = EnvVarLoader.get_float(
+    "COPAW_SHELL_PROGRESS_INTERVAL",
+    2.0,
+    min_value=0,
+)
+# Media attachments (see agents/utils/media_store.py): downloads at once,
+# largest file accepted (MB), time limit per download (seconds), and the
+# content store's size cap (MB, 0 = none) and lifetime of unused files
+# (seconds, 0 = forever). Eviction is off by default: session history
+# keeps the stored paths, so evicted files break older chats.
+MEDIA_DOWNLOAD_CONCURRENCY = EnvVarLoader.get_int(
+    "COPAW_MEDIA_DOWNLOAD_CONCURRENCY",
+    4,
+    min_value=1,
+)
+MEDIA_MAX_FILE_MB = EnvVarLoader.get_int(
+    "COPAW_MEDIA_MAX_FILE_MB",
+    100,
+    min_value=1,
+)
+MEDIA_DOWNLOAD_TIMEOUT = EnvVarLoader.get_float(
+    "COPAW_MEDIA_DOWNLOAD_TIMEOUT",
+    120.0,
+    min_value=1,
+)
+MEDIA_STORE_MAX_MB = EnvVarLoader.get_int(
+    "COPAW_MEDIA_STORE_MAX_MB",
+    0,
+    min_value=0,
+)
+MEDIA_STORE_TTL = EnvVarLoader.get_float(
+    "COPAW_MEDIA_STORE_TTL",
+    0.0,
+    min_value=0,
+)
 
 # Memory directory
 MEMORY_DIR = WORKING_DIR / "memory"
@@ -135,6 +244,20 @@ CUSTOM_CHANNELS_DIR = WORKING_DIR / "custom_channels"
 # Local models directory
 MODELS_DIR = WORKING_DIR / "models"
 
+# llama.cpp prompt-prefix state cache per loaded model (MiB, 0 = off) and
+# states kept per conversation; see local_models/backends/prefix_cache.py.
+# The cache capacity counts towards local_models.memory_budget_mb.
+LLAMACPP_PREFIX_CACHE_MB = EnvVarLoader.get_int(
+    "COPAW_LLAMACPP_PREFIX_CACHE_MB",
+    2048,
+    min_value=0,
+)
+LLAMACPP_PREFIX_CACHE_STATES = EnvVarLoader.get_int(
+    "COPAW_LLAMACPP_PREFIX_CACHE_STATES",
+    2,
+    min_value=1,
+)
+
 # Memory compaction configuration
 MEMORY_COMPACT_KEEP_RECENT = EnvVarLoader.get_int(
     "COPAW_MEMORY_COMPACT_KEEP_RECENT",
@@ -149,6 +272,20 @@ MEMORY_COMPACT_RATIO = EnvVarLoader.get_float(
     allow_inf=False,
 )
 
+# Summarize older messages in the background once the context passes
+# this fraction of the compaction threshold; a reply only waits for
+# compaction when the context would otherwise overflow.
+MEMORY_COMPACT_BACKGROUND = EnvVarLoader.get_bool(
+    "COPAW_MEMORY_COMPACT_BACKGROUND",
+    True,
+)
+MEMORY_COMPACT_WATERMARK = EnvVarLoader.get_float(
+    "COPAW_MEMORY_COMPACT_WATERMARK",
+    0.8,
+    min_value=0.1,
+    max_value=1.0,
+)
+
 DASHSCOPE_BASE_URL = EnvVarLoader.get_str(
     "DASHSCOPE_BASE_URL",
     "https://dashscope.aliyuncs.com/compatible-mode/v1",
@@ -178,6 +315,58 @@ LLM_BACKOFF_CAP = EnvVarLoader.get_float(
     min_value=0.5,
 )
 
+# Per-provider circuit breaker: consecutive retryable failures before the
+# circuit opens, and seconds before a single half-open probe is allowed.
+LLM_CIRCUIT_FAILURE_THRESHOLD = EnvVarLoader.get_int(
+    "COPAW_LLM_CIRCUIT_FAILURE_THRESHOLD",
+    5,
+    min_value=1,
+)
+
+LLM_CIRCUIT_RESET_TIMEOUT = EnvVarLoader.get_float(
+    "COPAW_LLM_CIRCUIT_RESET_TIMEOUT",
+    30.0,
+    min_value=0.0,
+)
+
+# Per-provider requests / tokens per minute shared by all agents in the
+# process (0 = unlimited).
+LLM_RATE_LIMIT_RPM = EnvVarLoader.get_float(
+    "COPAW_LLM_RATE_LIMIT_RPM",
+    0.0,
+    min_value=0.0,
+)
+
+LLM_RATE_LIMIT_TPM = EnvVarLoader.get_float(
+    "COPAW_LLM_RATE_LIMIT_TPM",
+    0.0,
+    min_value=0.0,
+)
+
+# Seconds to wait for a response (or the first stream chunk) before the
+# attempt is abandoned and retried (0 = no timeout).
+LLM_FIRST_BYTE_TIMEOUT = EnvVarLoader.get_float(
+    "COPAW_LLM_FIRST_BYTE_TIMEOUT",
+    0.0,
+    min_value=0.0,
+)
+
+# Seconds after which a second, hedged request is sent if the first has
+# produced nothing yet; the first to respond wins (0 = no hedging).
+LLM_HEDGE_DELAY = EnvVarLoader.get_float(
+    "COPAW_LLM_HEDGE_DELAY",
+    0.0,
+    min_value=0.0,
+)
+
+# JSONL file (relative to the working dir) that LLM routing decisions and
+# their latencies are appended to, for replay with
+# benchmarks/sim_routing.py. Empty disables recording.
+LLM_ROUTING_TRACE_FILE = EnvVarLoader.get_str(
+    "COPAW_LLM_ROUTING_TRACE_FILE",
+    "",
+).strip()
+
 # Tool guard approval timeout (seconds).
 try:
     TOOL_GUARD_APPROVAL_TIMEOUT_SECONDS = max(
@@ -188,3 +377,52 @@ try:
     )
 except (TypeError, ValueError):
     TOOL_GUARD_APPROVAL_TIMEOUT_SECONDS = 600.0
+
+# Guard verdicts remembered per (tool, parameters) by the rule-based
+# guardian (0 = no cache), and seconds between checks of its YAML rule
+# files for edits (0 = only reload on config change).
+TOOL_GUARD_VERDICT_CACHE_SIZE = EnvVarLoader.get_int(
+    "COPAW_TOOL_GUARD_VERDICT_CACHE_SIZE",
+    1024,
+    min_value=0,
+)
+TOOL_GUARD_RULES_CHECK_INTERVAL = EnvVarLoader.get_float(
+    "COPAW_TOOL_GUARD_RULES_CHECK_INTERVAL",
+    1.0,
+    min_value=0,
+)
+
+# Warm agent pool: reuse pre-built CoPawAgent instances across requests
+# whose (config, skills, MCP) fingerprint is unchanged.
+AGENT_POOL_ENABLED = EnvVarLoader.get_bool("COPAW_AGENT_POOL_ENABLED", True)
+AGENT_POOL_MAX_IDLE = EnvVarLoader.get_int(
+    "COPAW_AGENT_POOL_MAX_IDLE",
+    4,
+    min_value=0,
+)
+
+# Session store backend: "json" (one SafeJSONSession file per
+# conversation) or "sqlite" (WAL, append-only message rows; opt-in for
+# now, imports the existing JSON sessions once on first start).
+SESSION_BACKEND = EnvVarLoader.get_str("COPAW_SESSION_BACKEND", "json")
+
+# Reuse remote chat model instances (and their HTTP keep-alive pools)
+# across requests while the provider configuration is unchanged.
+MODEL_CLIENT_CACHE_ENABLED = EnvVarLoader.get_bool(
+    "COPAW_MODEL_CLIENT_CACHE_ENABLED",
+    True,
+)
+
+# MCP clients connected at once during startup; the app does not wait
+# for them, and agents only see clients that finished connecting.
+MCP_CONNECT_CONCURRENCY = EnvVarLoader.get_int(
+    "COPAW_MCP_CONNECT_CONCURRENCY",
+    8,
+    min_value=1,
+)
+
+# Request hot-path tracing (see utils/tracing.py): per-stage histograms
+# served on GET /metrics, and optionally every finished span appended to
+# this file as OTLP/JSON lines (empty = no file export).
+TRACING_ENABLED = EnvVarLoader.get_bool("COPAW_TRACING_ENABLED", True)
+TRACING_OTLP_FILE = EnvVarLoader.get_str("COPAW_TRACING_OTLP_FILE", "")
@@ -17,6 +17,8 @@ from .factory import (
     create_local_chat_model,
     unload_active_model,
     get_active_local_model,
+    get_local_model_stats,
+    preload_local_models,
 )
 
 __all__ = [
@@ -31,4 +33,6 @@ __all__ = [
     "create_local_chat_model",
     "unload_active_model",
     "get_active_local_model",
+    "get_local_model_stats",
+    "preload_local_models",
 ]
@@ -8,7 +8,9 @@ from typing import Any, Iterator, Optional, Type
 
 from pydantic import BaseModel
 
+from ...constant import LLAMACPP_PREFIX_CACHE_MB, LLAMACPP_PREFIX_CACHE_STATES
 from .base import LocalBackend
+from .prefix_cache import SessionPrefixCache
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +45,12 @@ def _normalize_messages(messages: list[dict]) -> list[dict]:
 
 
 class LlamaCppBackend(LocalBackend):
-    """Backend implementation using llama-cpp-python."""
+    """Backend implementation using llama-cpp-python.
+
+    With ``prefix_cache_mb`` > 0, llama.cpp states are cached per
+    conversation so a new turn only evaluates the tokens after the
+    longest cached prompt prefix (see :class:`SessionPrefixCache`).
+    """
 
     def __init__(
         self,
@@ -52,6 +59,7 @@ class LlamaCppBackend(LocalBackend):
         n_gpu_layers: int = -1,
         verbose: bool = False,
         chat_format: Optional[str] = None,
+        prefix_cache_mb: int = LLAMACPP_PREFIX_CACHE_MB,
         **kwargs: Any,
     ) -> None:
         try:
@@ -81,6 +89,13 @@ class LlamaCppBackend(LocalBackend):
 
         self._llm = Llama(**init_kwargs)
         self._model_path = model_path
+        self._prefix_cache: Optional[SessionPrefixCache] = None
+        if prefix_cache_mb > 0:
+            self._prefix_cache = SessionPrefixCache(
+                capacity_bytes=prefix_cache_mb * 1024 * 1024,
+                states_per_session=LLAMACPP_PREFIX_CACHE_STATES,
+            )
+            self._llm.set_cache(self._prefix_cache)
         logger.info("Model loaded successfully: %s", model_path)
 
     def chat_completion(
@@ -108,6 +123,8 @@ class LlamaCppBackend(LocalBackend):
                 "schema": schema,
             }
 
+        if self._prefix_cache is not None:
+            self._prefix_cache.begin(messages)
         return self._llm.create_chat_completion(**call_kwargs)
 
     def chat_completion_stream(
@@ -126,12 +143,15 @@ class LlamaCppBackend(LocalBackend):
             call_kwargs["tools"] = tools
             call_kwargs["tool_choice"] = tool_choice or "auto"
 
+        if self._prefix_cache is not None:
+            self._prefix_cache.begin(messages)
         yield from self._llm.create_chat_completion(**call_kwargs)
 
     def unload(self) -> None:
         if self._llm is not None:
             del self._llm
             self._llm = None
+            self._prefix_cache = None
             logger.info("Model unloaded: %s", self._model_path)
 
     @property
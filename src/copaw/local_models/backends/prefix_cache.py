@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Session-aware prompt-prefix state cache for llama.cpp.
+
+llama-cpp-python only reuses the evaluated prefix of the *last* prompt;
+as soon as two conversations interleave, each turn re-evaluates the
+whole system prompt and history. :class:`SessionPrefixCache` plugs into
+``Llama.set_cache``: llama.cpp stores its state (KV cache) after every
+completion and, before the next one, loads the cached state with the
+longest common token prefix if that beats what is already evaluated.
+
+States are grouped by session, fingerprinted as (system prompt, first
+conversation message). Lookups consider the current session's states
+first and then other sessions with the same system prompt, which share
+at least the system prompt prefix. Each session keeps its
+``states_per_session`` most recent states; all states together stay
+under ``capacity_bytes`` (least recently used evicted first). When a
+session's system prompt changes, its states are dropped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Conversations whose system prompt is remembered for invalidation.
+_MAX_TRACKED_CONVERSATIONS = 1024
+
+
+def _digest(value: Any) -> str:
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _common_prefix_len(a: Sequence[int], b: Sequence[int]) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class SessionPrefixCache:
+    """``BaseLlamaCache``-compatible cache of llama.cpp states."""
+
+    def __init__(
+        self,
+        capacity_bytes: int,
+        states_per_session: int = 2,
+    ) -> None:
+        self.capacity_bytes = capacity_bytes
+        self.states_per_session = max(1, states_per_session)
+        # (session key, token tuple) -> LlamaState, least recent first
+        self._states: OrderedDict[
+            tuple[str, tuple[int, ...]],
+            Any,
+        ] = OrderedDict()
+        # conversation digest -> system prompt digest
+        self._system_of: OrderedDict[str, str] = OrderedDict()
+        self._system = ""
+        self._session = ""
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def begin(self, messages: list[dict]) -> None:
+        """Set the session of the next completion from its messages."""
+        system = [
+            m.get("content") for m in messages if m.get("role") == "system"
+        ]
+        first = next(
+            (m.get("content") for m in messages if m.get("role") != "system"),
+            "",
+        )
+        self._system = _digest(system)
+        conversation = _digest(first)
+        previous = self._system_of.get(conversation)
+        if previous is not None and previous != self._system:
+            logger.debug("System prompt changed, dropping cached states")
+            self._drop_session(f"{previous}:{conversation}")
+            self.invalidations += 1
+        self._system_of[conversation] = self._system
+        self._system_of.move_to_end(conversation)
+        if len(self._system_of) > _MAX_TRACKED_CONVERSATIONS:
+            self._system_of.popitem(last=False)
+        self._session = f"{self._system}:{conversation}"
+
+    def _drop_session(self, session: str) -> None:
+        for key in [k for k in self._states if k[0] == session]:
+            del self._states[key]
+
+    @property
+    def cache_size(self) -> int:
+        return sum(state.llama_state_size for state in self._states.values())
+
+    def _find(self, tokens: Sequence[int]) -> Optional[tuple]:
+        system_prefix = f"{self._system}:"
+        best_key, best_len = None, 0
+        for key in self._states:
+            session, cached = key
+            if not session.startswith(system_prefix):
+                continue
+            prefix = _common_prefix_len(cached, tokens)
+            # Prefer the current session on ties.
+            if prefix > best_len or (
+                prefix == best_len and prefix and session == self._session
+            ):
+                best_key, best_len = key, prefix
+        return best_key
+
+    def __getitem__(self, key: Sequence[int]) -> Any:
+        found = self._find(key)
+        if found is None:
+            self.misses += 1
+            raise KeyError("no cached prefix")
+        self.hits += 1
+        self._states.move_to_end(found)
+        return self._states[found]
+
+    def __contains__(self, key: Sequence[int]) -> bool:
+        return self._find(key) is not None
+
+    def __setitem__(self, key: Sequence[int], value: Any) -> None:
+        entry = (self._session, tuple(key))
+        self._states.pop(entry, None)
+        self._states[entry] = value
+        own = [k for k in self._states if k[0] == self._session]
+        for old in own[: -self.states_per_session]:
+            del self._states[old]
+        size = self.cache_size
+        while size > self.capacity_bytes and self._states:
+            _, evicted = self._states.popitem(last=False)
+            size -= evicted.llama_state_size
@@ -19,6 +19,7 @@ from agentscope.message import TextBlock, ToolUseBlock, ThinkingBlock
 
 from .backends.base import LocalBackend
 from .tag_parser import (
+    StreamingTagParser,
     extract_thinking_from_text,
     parse_tool_calls_from_text,
     text_contains_think_tag,
@@ -126,7 +127,7 @@ class LocalChatModel(ChatModelBase):
 
         loop.run_in_executor(None, _produce)
 
-        accumulated_text = ""
+        tag_parser = StreamingTagParser()
         accumulated_thinking = ""
         tool_calls: dict[int, dict] = {}
 
@@ -144,9 +145,8 @@ class LocalChatModel(ChatModelBase):
 
             delta = choices[0].get("delta", {})
 
-            # Accumulate text
-            content_piece = delta.get("content") or ""
-            accumulated_text += content_piece
+            # Accumulate text; the parser only scans the new piece.
+            tag_parser.feed(delta.get("content") or "")
 
             # Accumulate reasoning/thinking content
             thinking_piece = delta.get("reasoning_content") or ""
@@ -171,22 +171,12 @@ class LocalChatModel(ChatModelBase):
             # Determine effective thinking and display text.
             # If the backend provides structured reasoning_content we use
             # that; otherwise fall back to extracting <think> tags from
-            # the accumulated text.
-            effective_thinking = accumulated_thinking
-            effective_text = accumulated_text
-
-            if (
-                not effective_thinking
-                and effective_text
-                and text_contains_think_tag(effective_text)
-            ):
-                parsed_thinking = extract_thinking_from_text(effective_text)
-                effective_thinking = parsed_thinking.thinking
-                effective_text = parsed_thinking.remaining_text
-                # If <think> is still open, suppress all text output
-                # (thinking is still streaming).
-                if parsed_thinking.has_open_tag:
-                    effective_text = ""
+            # the accumulated text (while <think> is still open, all text
+            # output is suppressed).
+            if accumulated_thinking:
+                tag_parser.disable_thinking()
+            effective_thinking = accumulated_thinking or tag_parser.thinking
+            effective_text = tag_parser.text
 
             if effective_thinking:
                 contents.append(
@@ -201,21 +191,14 @@ class LocalChatModel(ChatModelBase):
             if (
                 not tool_calls
                 and effective_text
-                and text_contains_tool_call_tag(effective_text)
+                and tag_parser.has_tool_call_tag
             ):
-                parsed = parse_tool_calls_from_text(effective_text)
-                display_text = parsed.text_before
-                if parsed.text_after:
-                    display_text = (
-                        f"{display_text}\n{parsed.text_after}".strip()
-                        if display_text
-                        else parsed.text_after
-                    )
+                display_text, parsed_calls = tag_parser.split_tool_calls()
                 if display_text:
                     contents.append(
                         TextBlock(type="text", text=display_text),
                     )
-                for ptc in parsed.tool_calls:
+                for ptc in parsed_calls:
                     contents.append(
                         ToolUseBlock(
                             type="tool_use",
@@ -1,12 +1,34 @@
 # -*- coding: utf-8 -*-
-"""Singleton factory for local model instances."""
+"""Resident pool of loaded local models.
+
+Several models can stay loaded at once, within the ``local_models.
+memory_budget_mb`` config budget; when loading another model would
+exceed it, the least recently used idle models are unloaded first. A
+budget of 0 keeps a single model resident (load-one-unload-the-rest).
+A model's share of the budget is its weights plus, for llama.cpp, the
+capacity of its prompt-prefix state cache.
+
+Chat models get a :class:`_PooledBackend` proxy rather than the loaded
+backend itself: every call leases the model from the pool, reloading it
+if it was evicted in the meantime. A leased model is never evicted.
+Calls to the same model are serialized (inference backends are not
+thread-safe); calls to different resident models run concurrently.
+"""
 
 from __future__ import annotations
 
 import logging
+import os
 import threading
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Type
 
+from pydantic import BaseModel
+
+from ..constant import LLAMACPP_PREFIX_CACHE_MB
 from .schema import BackendType, LocalModelInfo
 from .manager import get_local_model
 from .backends.base import LocalBackend
@@ -14,29 +36,322 @@ from .chat_model import LocalChatModel
 
 logger = logging.getLogger(__name__)
 
-_lock = threading.Lock()
-_active_backend: Optional[LocalBackend] = None
-_active_model_id: Optional[str] = None
+
+class _ResidentModel:
+    """Pool slot of one model: its backend (if loaded) and counters."""
+
+    def __init__(self, model_id: str) -> None:
+        self.model_id = model_id
+        self.backend: Optional[LocalBackend] = None
+        self.size_bytes = 0
+        # Budget held while this model loads, and whether it has been
+        # picked for eviction; both guarded by the pool lock.
+        self.reserved_bytes = 0
+        self.evicting = False
+        self.in_use = 0
+        self.last_used = 0.0
+        # Serializes loading, then inference, on this model.
+        self.load_lock = threading.Lock()
+        self.run_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.last_load_seconds = 0.0
+
+    @property
+    def resident(self) -> bool:
+        return self.backend is not None and self.backend.is_loaded
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "model_id": self.model_id,
+            "resident": self.resident,
+            "resident_bytes": self.size_bytes if self.resident else 0,
+            "in_use": self.in_use,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "last_load_seconds": round(self.last_load_seconds, 3),
+            "last_used": self.last_used,
+        }
+
+
+def _model_size_bytes(info: LocalModelInfo) -> int:
+    """Estimate resident memory from the weights on disk."""
+    path = Path(info.local_path)
+    try:
+        if path.is_dir():
+            return sum(
+                f.stat().st_size for f in path.rglob("*") if f.is_file()
+            )
+        return os.path.getsize(path)
+    except OSError:
+        return info.file_size
+
+
+def _prefix_cache_bytes(info: LocalModelInfo, backend_kwargs: dict) -> int:
+    """Capacity of the llama.cpp prefix cache the backend will fill."""
+    if info.backend != BackendType.LLAMACPP:
+        return 0
+    mb = backend_kwargs.get("prefix_cache_mb", LLAMACPP_PREFIX_CACHE_MB)
+    return max(0, int(mb)) * 1024 * 1024
+
+
+def _configured_budget_bytes() -> int:
+    # Imported lazily: copaw.config imports the providers package,
+    # which imports this module.
+    from ..config import get_config_snapshot
+
+    return get_config_snapshot().local_models.memory_budget_mb * 1024 * 1024
+
+
+class ResidentModelPool:
+    """LRU pool of loaded local models under a memory budget."""
+
+    def __init__(
+        self,
+        budget_bytes: Callable[[], int] = _configured_budget_bytes,
+    ) -> None:
+        self._budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        # model_id -> slot, least recently used first
+        self._models: OrderedDict[str, _ResidentModel] = OrderedDict()
+
+    @contextmanager
+    def lease(
+        self,
+        model_id: str,
+        backend_kwargs: Optional[dict[str, Any]] = None,
+    ) -> Iterator[LocalBackend]:
+        """Yield the loaded backend of ``model_id`` for one call."""
+        with self._lock:
+            slot = self._models.get(model_id)
+            if slot is None:
+                slot = _ResidentModel(model_id)
+                self._models[model_id] = slot
+            self._models.move_to_end(model_id)
+            slot.in_use += 1
+        try:
+            with slot.load_lock:
+                if slot.resident:
+                    slot.hits += 1
+                else:
+                    slot.misses += 1
+                    self._load(slot, backend_kwargs or {})
+            with slot.run_lock:
+                yield slot.backend
+        finally:
+            with self._lock:
+                slot.in_use -= 1
+                slot.last_used = time.time()
+
+    def _load(self, slot: _ResidentModel, backend_kwargs: dict) -> None:
+        info = get_local_model(slot.model_id)
+        if info is None:
+            raise ValueError(
+                f"Local model '{slot.model_id}' not found. "
+                "Download it first with 'copaw models download'.",
+            )
+        size = _model_size_bytes(info) + _prefix_cache_bytes(
+            info,
+            backend_kwargs,
+        )
+        self._make_room(slot, size)
+        try:
+            started = time.monotonic()
+            backend = _create_backend(info, backend_kwargs)
+            slot.last_load_seconds = time.monotonic() - started
+        finally:
+            with self._lock:
+                slot.reserved_bytes = 0
+        slot.backend = backend
+        slot.size_bytes = size
+        slot.loads += 1
+        logger.info(
+            "Loaded local model %s in %.1fs (%.0f MiB resident)",
+            slot.model_id,
+            slot.last_load_seconds,
+            size / (1024 * 1024),
+        )
+
+    def _make_room(self, loading: _ResidentModel, needed: int) -> None:
+        """Reserve ``needed`` bytes for ``loading``, unloading LRU idle
+        models until it fits the budget.
+
+        Victims are picked under the pool lock, which also counts the
+        reservations of models still loading, and unloaded outside it
+        under their own locks.
+        """
+        budget = self._budget_bytes()
+        with self._lock:
+            others = [
+                slot
+                for slot in self._models.values()
+                if slot is not loading and not slot.evicting
+            ]
+            used = sum(
+                slot.reserved_bytes
+                + (slot.size_bytes if slot.resident else 0)
+                for slot in others
+            )
+            victims = []
+            for slot in others:
+                if used + needed <= budget:
+                    break
+                if slot.in_use or not slot.resident:
+                    continue
+                slot.evicting = True
+                victims.append(slot)
+                used -= slot.size_bytes
+            loading.reserved_bytes = needed
+        if used + needed > budget and used:
+            logger.warning(
+                "Local models in use exceed the memory budget "
+                "(%.0f MiB needed, %.0f MiB budget)",
+                (used + needed) / (1024 * 1024),
+                budget / (1024 * 1024),
+            )
+        for slot in victims:
+            with slot.load_lock:
+                try:
+                    with self._lock:
+                        # Leased since it was picked: keep it loaded.
+                        if slot.in_use:
+                            continue
+                    with slot.run_lock:
+                        self._unload(slot)
+                    slot.evictions += 1
+                finally:
+                    with self._lock:
+                        slot.evicting = False
+
+    @staticmethod
+    def _unload(slot: _ResidentModel) -> None:
+        if slot.backend is not None:
+            logger.info("Unloading local model: %s", slot.model_id)
+            slot.backend.unload()
+            slot.backend = None
+
+    def is_resident(self, model_id: str) -> bool:
+        with self._lock:
+            slot = self._models.get(model_id)
+            return slot is not None and slot.resident
+
+    def unload(self, model_id: Optional[str] = None) -> None:
+        """Unload one model, or every idle model if ``model_id`` is None."""
+        with self._lock:
+            slots = (
+                list(self._models.values())
+                if model_id is None
+                else [s for s in [self._models.get(model_id)] if s]
+            )
+        for slot in slots:
+            with slot.load_lock:
+                if slot.in_use and model_id is None:
+                    continue
+                with slot.run_lock:
+                    self._unload(slot)
+
+    def most_recent(self) -> Optional[tuple[str, LocalBackend]]:
+        """Return (model_id, backend) of the last used resident model."""
+        with self._lock:
+            for slot in reversed(self._models.values()):
+                if slot.resident:
+                    return slot.model_id, slot.backend
+        return None
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Per-model residency, load time and hit/miss counters."""
+        with self._lock:
+            return [slot.stats() for slot in reversed(self._models.values())]
+
+
+class _PooledBackend(LocalBackend):
+    """Backend proxy that leases its model from the pool per call."""
+
+    # pylint: disable=super-init-not-called
+    def __init__(
+        self,
+        model_path: str,
+        pool: Optional[ResidentModelPool] = None,
+        model_id: str = "",
+        backend_kwargs: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self._model_path = model_path
+        self._pool = pool or _pool
+        self._model_id = model_id
+        self._backend_kwargs = backend_kwargs or {}
+
+    def chat_completion(
+        self,
+        messages: list[dict],
+        tools: Optional[list[dict]] = None,
+        tool_choice: Optional[str] = None,
+        structured_model: Optional[Type[BaseModel]] = None,
+        **kwargs: Any,
+    ) -> dict:
+        with self._pool.lease(self._model_id, self._backend_kwargs) as b:
+            return b.chat_completion(
+                messages=messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                structured_model=structured_model,
+                **kwargs,
+            )
+
+    def chat_completion_stream(
+        self,
+        messages: list[dict],
+        tools: Optional[list[dict]] = None,
+        tool_choice: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Iterator[dict]:
+        with self._pool.lease(self._model_id, self._backend_kwargs) as b:
+            yield from b.chat_completion_stream(
+                messages=messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                **kwargs,
+            )
+
+    def unload(self) -> None:
+        self._pool.unload(self._model_id)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._pool.is_resident(self._model_id)
+
+
+_pool = ResidentModelPool()
 
 
 def get_active_local_model() -> (
     Optional[tuple[Optional[str], LocalBackend]] | None
 ):
-    """Return (model_id, backend) if a local model is currently loaded."""
-    with _lock:
-        if _active_backend is not None and _active_backend.is_loaded:
-            return _active_model_id, _active_backend
-        return None
+    """Return (model_id, backend) of the most recently used local model."""
+    return _pool.most_recent()
 
 
 def unload_active_model() -> None:
-    """Unload the currently loaded local model, freeing resources."""
-    global _active_backend, _active_model_id
-    with _lock:
-        if _active_backend is not None:
-            _active_backend.unload()
-            _active_backend = None
-            _active_model_id = None
+    """Unload every idle resident local model, freeing resources."""
+    _pool.unload()
+
+
+def get_local_model_stats() -> list[dict[str, Any]]:
+    """Per-model residency, load time and hit/miss counters."""
+    return _pool.stats()
+
+
+def preload_local_models(model_ids: list[str]) -> None:
+    """Load ``model_ids`` into the pool (blocking; run in a thread)."""
+    for model_id in model_ids:
+        try:
+            with _pool.lease(model_id):
+                pass
+        except Exception as e:
+            logger.warning("Failed to preload local model %s: %s", model_id, e)
 
 
 def create_local_chat_model(
@@ -47,8 +362,9 @@ def create_local_chat_model(
 ) -> LocalChatModel:
     """Create a LocalChatModel for the given model_id.
 
-    Uses singleton pattern: if the same model is already loaded, reuses it.
-    If a different model is loaded, unloads it first.
+    The model is loaded into the resident pool on first use (or reused
+    if already resident), evicting least recently used models if the
+    memory budget requires it.
 
     Args:
         model_id: ID of a downloaded local model (from manifest).
@@ -65,8 +381,6 @@ def create_local_chat_model(
         ValueError: If model_id is not found in the manifest.
         ImportError: If the required backend library is not installed.
     """
-    global _active_backend, _active_model_id
-
     info = get_local_model(model_id)
     if info is None:
         raise ValueError(
@@ -74,37 +388,20 @@ def create_local_chat_model(
             "Download it first with 'copaw models download'.",
         )
 
-    with _lock:
-        # Reuse if same model already loaded
-        if (
-            _active_model_id == model_id
-            and _active_backend is not None
-            and _active_backend.is_loaded
-        ):
-            logger.debug("Reusing already-loaded model: %s", model_id)
-            return LocalChatModel(
-                model_name=model_id,
-                backend=_active_backend,
-                stream=stream,
-                generate_kwargs=generate_kwargs,
-            )
+    # Load eagerly so missing backend libraries surface here, as before.
+    with _pool.lease(model_id, backend_kwargs):
+        pass
 
-        # Unload previous model
-        if _active_backend is not None:
-            logger.info("Unloading previous model: %s", _active_model_id)
-            _active_backend.unload()
-
-        # Load new model
-        backend = _create_backend(info, backend_kwargs or {})
-        _active_backend = backend
-        _active_model_id = model_id
-
-        return LocalChatModel(
-            model_name=model_id,
-            backend=_active_backend,
-            stream=stream,
-            generate_kwargs=generate_kwargs,
-        )
+    return LocalChatModel(
+        model_name=model_id,
+        backend=_PooledBackend(
+            info.local_path,
+            model_id=model_id,
+            backend_kwargs=backend_kwargs,
+        ),
+        stream=stream,
+        generate_kwargs=generate_kwargs,
+    )
 
 
 def _create_backend(
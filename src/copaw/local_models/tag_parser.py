@@ -227,3 +227,228 @@ def parse_tool_calls_from_text(text: str) -> TextWithToolCalls:
         has_open_tag=has_open_tag,
         partial_tool_text=partial_tool_text,
     )
+
+
+# ---------------------------------------------------------------------------
+# Streaming (incremental) parser
+# ---------------------------------------------------------------------------
+
+
+class _ToolCallScanner:
+    """Incremental ``<tool_call>`` scanner over an append-only buffer.
+
+    Mirrors :func:`parse_tool_calls_from_text` on ``text`` (or on
+    ``text.strip()`` when *strip_text* is set) while only scanning the
+    newly fed characters.
+    """
+
+    def __init__(self, strip_text: bool = False) -> None:
+        self.text = ""
+        self._strip_text = strip_text
+        self._lead: int | None = None if strip_text else 0
+        # Spans (open_idx, close_idx) of complete blocks, in order.
+        self._blocks: list[tuple[int, int]] = []
+        self._parsed: list[ParsedToolCall] = []
+        self._n_parsed = 0
+        self._last_end = 0
+        # First opening tag at or after ``_last_end`` (None if none yet).
+        self._open: int | None = None
+        self._open_scan = 0
+        self._close_scan = 0
+        # Last opening tag anywhere in the buffer.
+        self._last_open: int | None = None
+        self._last_open_scan = 0
+
+    @property
+    def has_tag(self) -> bool:
+        return self._last_open is not None
+
+    def feed(self, delta: str) -> None:
+        if not delta:
+            return
+        self.text += delta
+        text = self.text
+
+        idx = text.find(TOOL_CALL_START, self._last_open_scan)
+        while idx != -1:
+            self._last_open = idx
+            idx = text.find(TOOL_CALL_START, idx + len(TOOL_CALL_START))
+        self._last_open_scan = max(0, len(text) - len(TOOL_CALL_START) + 1)
+
+        while True:
+            if self._open is None:
+                idx = text.find(
+                    TOOL_CALL_START,
+                    max(self._last_end, self._open_scan),
+                )
+                if idx == -1:
+                    self._open_scan = max(
+                        self._last_end,
+                        len(text) - len(TOOL_CALL_START) + 1,
+                    )
+                    return
+                self._open = idx
+                self._close_scan = idx + len(TOOL_CALL_START)
+
+            close = text.find(TOOL_CALL_END, self._close_scan)
+            if close == -1:
+                self._close_scan = max(
+                    self._open + len(TOOL_CALL_START),
+                    len(text) - len(TOOL_CALL_END) + 1,
+                )
+                return
+            self._blocks.append((self._open, close))
+            self._last_end = close + len(TOOL_CALL_END)
+            self._open = None
+            self._open_scan = self._last_end
+
+    def _leading(self) -> int:
+        if self._lead is None:
+            stripped = self.text.lstrip()
+            if not stripped:
+                return len(self.text)
+            self._lead = len(self.text) - len(stripped)
+        return self._lead
+
+    def split(self) -> tuple[str, list[ParsedToolCall]]:
+        """Return ``(display_text, tool_calls)`` for the current buffer."""
+        text = self.text
+        lead = self._leading()
+        if not self._blocks:
+            if self._last_open is None:
+                return text[lead:].rstrip() if self._strip_text else text, []
+            return text[lead : self._last_open].rstrip(), []
+
+        # Each block is parsed once, so call ids stay stable across chunks.
+        while self._n_parsed < len(self._blocks):
+            open_idx, close_idx = self._blocks[self._n_parsed]
+            parsed = _parse_single_tool_call(
+                text[open_idx + len(TOOL_CALL_START) : close_idx],
+            )
+            self._n_parsed += 1
+            if parsed is not None:
+                self._parsed.append(parsed)
+
+        text_before = text[lead : self._blocks[0][0]].rstrip()
+        if self._open is not None:
+            text_after = text[self._last_end : self._open].strip()
+        else:
+            text_after = text[self._last_end :].strip()
+
+        display_text = text_before
+        if text_after:
+            display_text = (
+                f"{display_text}\n{text_after}".strip()
+                if display_text
+                else text_after
+            )
+        return display_text, list(self._parsed)
+
+
+class StreamingTagParser:
+    """Incremental ``<think>`` / ``<tool_call>`` parser for streamed text.
+
+    Feed each text delta with :meth:`feed`. The properties and
+    :meth:`split_tool_calls` give the same results as running
+    :func:`extract_thinking_from_text` and then
+    :func:`parse_tool_calls_from_text` over the whole accumulated text,
+    but each call only scans the new delta. A complete tool call is
+    parsed once, so its id stays the same on every later chunk.
+    """
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._extract_thinking = True
+        self._think_start: int | None = None
+        self._think_end: int | None = None
+        self._think_scan = 0
+        self._thinking = ""
+        self._tools = _ToolCallScanner()
+
+    def feed(self, delta: str) -> None:
+        """Append *delta* to the accumulated text."""
+        if not delta:
+            return
+        prev_len = len(self._text)
+        self._text += delta
+        if not self._extract_thinking or self._think_end is not None:
+            self._tools.feed(delta)
+            return
+
+        text = self._text
+        if self._think_start is None:
+            idx = text.find(
+                THINK_START,
+                max(0, prev_len - len(THINK_START) + 1),
+            )
+            if idx == -1:
+                self._tools.feed(delta)
+                return
+            self._think_start = idx
+            self._think_scan = idx + len(THINK_START)
+
+        end = text.find(THINK_END, self._think_scan)
+        if end == -1:
+            self._think_scan = max(
+                self._think_start + len(THINK_START),
+                len(text) - len(THINK_END) + 1,
+            )
+            return
+
+        # The think block closed: the visible text is now everything
+        # outside it, stripped, so rescan that once.
+        self._think_end = end
+        self._thinking = text[
+            self._think_start + len(THINK_START) : end
+        ].strip()
+        self._tools = _ToolCallScanner(strip_text=True)
+        self._tools.feed(
+            text[: self._think_start] + text[end + len(THINK_END) :],
+        )
+
+    def disable_thinking(self) -> None:
+        """Stop extracting ``<think>`` tags (the backend sends reasoning
+        separately); the whole text becomes visible again."""
+        if not self._extract_thinking:
+            return
+        self._extract_thinking = False
+        if self._think_start is not None:
+            self._tools = _ToolCallScanner()
+            self._tools.feed(self._text)
+
+    @property
+    def _thinking_active(self) -> bool:
+        return self._extract_thinking and self._think_start is not None
+
+    @property
+    def thinking(self) -> str:
+        """Reasoning text inside the ``<think>`` block ("" if none)."""
+        if not self._thinking_active:
+            return ""
+        if self._think_end is None:
+            return self._text[self._think_start + len(THINK_START) :].strip()
+        return self._thinking
+
+    @property
+    def text(self) -> str:
+        """Text outside the ``<think>`` block ("" while it is open)."""
+        if not self._thinking_active:
+            return self._text
+        if self._think_end is None:
+            return ""
+        return self._tools.text.strip()
+
+    @property
+    def has_tool_call_tag(self) -> bool:
+        """Whether :attr:`text` contains a ``<tool_call>`` tag."""
+        if self._thinking_active and self._think_end is None:
+            return False
+        return self._tools.has_tag
+
+    def split_tool_calls(self) -> tuple[str, list[ParsedToolCall]]:
+        """Split :attr:`text` into display text and parsed tool calls.
+
+        The display text is the text before the first tool call joined
+        with the text after the last one, as ``LocalChatModel`` shows it.
+        """
+        return self._tools.split()
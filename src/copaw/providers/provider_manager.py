@@ -4,7 +4,10 @@ It provides a unified interface to manage providers, such as listing available
 providers, adding/removing custom providers, and fetching provider details."""
 
 import asyncio
+import hashlib
 import os
+import weakref
+from collections import OrderedDict
 from typing import Dict, List
 import logging
 import json
@@ -22,11 +25,14 @@ from copaw.providers.provider import (
 from copaw.providers.openai_provider import OpenAIProvider
 from copaw.providers.anthropic_provider import AnthropicProvider
 from copaw.providers.ollama_provider import OllamaProvider
-from copaw.constant import SECRET_DIR
+from copaw.constant import MODEL_CLIENT_CACHE_ENABLED, SECRET_DIR
 from copaw.local_models import create_local_chat_model
 
 logger = logging.getLogger(__name__)
 
+# Distinct provider/model configurations kept warm at once.
+_CHAT_MODEL_CACHE_SIZE = 8
+
 
 # -------------------------------------------------------
 # Built-in provider definitions and their default models.
@@ -201,6 +207,10 @@ class ProviderManager:
         self.root_path = SECRET_DIR / "providers"
         self.builtin_path = self.root_path / "builtin"
         self.custom_path = self.root_path / "custom"
+        # Chat model instances keyed by their full configuration; each
+        # owns an HTTP client whose keep-alive pool is reused.
+        self._chat_models: OrderedDict[tuple, tuple] = OrderedDict()
+        self._storage_signature: tuple | None = None
         self._prepare_disk_storage()
         self._init_builtins()
         try:
@@ -576,6 +586,84 @@ class ProviderManager:
             # local_models dependencies not installed; leave model lists empty
             pass
 
+    def _current_storage_signature(self) -> tuple:
+        """(name, mtime_ns, size) of every provider JSON file and
+        active_model.json."""
+        signature = []
+        for directory in (self.root_path, self.builtin_path, self.custom_path):
+            try:
+                entries = sorted(os.scandir(directory), key=lambda e: e.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                signature.append(
+                    (entry.path, st.st_mtime_ns, st.st_size),
+                )
+        return tuple(signature)
+
+    def clear_chat_model_cache(self) -> None:
+        """Drop all cached chat model instances."""
+        self._chat_models.clear()
+
+    def _get_cached_chat_model(
+        self,
+        provider: Provider,
+        model_id: str,
+    ) -> ChatModelBase:
+        """Return a chat model for *provider*/*model_id*, reusing a cached
+        instance while the provider configuration is unchanged.
+
+        Cached instances are only reused on the event loop that created
+        them, since their HTTP connections are bound to it. The cache is
+        dropped whenever a provider JSON file or active_model.json changes
+        on disk.
+        """
+        if not MODEL_CLIENT_CACHE_ENABLED:
+            return provider.get_chat_model_instance(model_id)
+
+        signature = self._current_storage_signature()
+        if signature != self._storage_signature:
+            self.clear_chat_model_cache()
+            self._storage_signature = signature
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        key = (
+            provider.id,
+            type(provider).__name__,
+            provider.chat_model,
+            provider.base_url,
+            hashlib.sha256(provider.api_key.encode("utf-8")).hexdigest(),
+            model_id,
+            json.dumps(provider.generate_kwargs, sort_keys=True, default=str),
+            id(loop),
+        )
+        cached = self._chat_models.get(key)
+        if cached is not None:
+            loop_ref, instance = cached
+            cached_loop = loop_ref() if loop_ref is not None else None
+            if cached_loop is loop and not (loop and loop.is_closed()):
+                self._chat_models.move_to_end(key)
+                return instance
+            del self._chat_models[key]
+
+        instance = provider.get_chat_model_instance(model_id)
+        self._chat_models[key] = (
+            weakref.ref(loop) if loop is not None else None,
+            instance,
+        )
+        while len(self._chat_models) > _CHAT_MODEL_CACHE_SIZE:
+            self._chat_models.popitem(last=False)
+        return instance
+
     @staticmethod
     def get_instance() -> "ProviderManager":
         """Get the singleton instance of ProviderManager."""
@@ -601,4 +689,5 @@ class ProviderManager:
                 stream=True,
                 generate_kwargs={"max_tokens": None},
             )
-        return provider.get_chat_model_instance(model.model)
+        # pylint: disable-next=protected-access
+        return manager._get_cached_chat_model(provider, model.model)
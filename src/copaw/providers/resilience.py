@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""Process-wide resilience state for LLM providers.
+
+One :class:`ProviderGuard` per provider holds a circuit breaker and
+token-bucket limiters for requests and tokens per minute. Guards are
+shared by every model instance (and so every agent) in the process, so
+a degraded provider is throttled and short-circuited once rather than
+once per concurrent request.
+
+Configuration via environment variables (see constant.py):
+    COPAW_LLM_CIRCUIT_FAILURE_THRESHOLD – consecutive failures to open
+    COPAW_LLM_CIRCUIT_RESET_TIMEOUT     – seconds before a half-open probe
+    COPAW_LLM_RATE_LIMIT_RPM            – requests per minute (0 = off)
+    COPAW_LLM_RATE_LIMIT_TPM            – tokens per minute (0 = off)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from ..constant import (
+    LLM_CIRCUIT_FAILURE_THRESHOLD,
+    LLM_CIRCUIT_RESET_TIMEOUT,
+    LLM_RATE_LIMIT_RPM,
+    LLM_RATE_LIMIT_TPM,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, provider_id: str, retry_after: float) -> None:
+        super().__init__(
+            f"Provider '{provider_id}' is unavailable after repeated "
+            f"failures; retrying in {retry_after:.0f}s",
+        )
+        self.provider_id = provider_id
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker.
+
+    The circuit opens after ``failure_threshold`` consecutive failures.
+    While open, calls fail fast. After ``reset_timeout`` seconds a single
+    probe call is let through (half-open): its success closes the
+    circuit, its failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = LLM_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = LLM_CIRCUIT_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        """Admit a call or raise :class:`CircuitOpenError`."""
+        with self._lock:
+            if self.state == self.OPEN:
+                elapsed = self._clock() - self._opened_at
+                if elapsed < self.reset_timeout:
+                    raise CircuitOpenError(
+                        self.name,
+                        self.reset_timeout - elapsed,
+                    )
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+                logger.info("Circuit for '%s' is half-open", self.name)
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.name, self.reset_timeout)
+                self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit for '%s' closed", self.name)
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if (
+                self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                if self.state != self.OPEN:
+                    logger.warning(
+                        "Circuit for '%s' opened after %d failure(s)",
+                        self.name,
+                        self.failures,
+                    )
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot whose call never completed."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate_per_minute``.
+
+    The bucket holds at most one minute's worth of tokens. It has no
+    asyncio primitives, so it can be shared across event loops.
+    :meth:`consume` may drive the balance negative (e.g. output tokens
+    known only after a call), which delays later acquirers.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = float(rate_per_minute)
+        self._rate = self.capacity / 60.0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated) * self._rate,
+        )
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens if available.
+
+        Returns:
+            0.0 on success, otherwise the seconds to wait before retrying.
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self._rate
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until ``amount`` tokens are available and take them."""
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def consume(self, amount: float) -> None:
+        """Take ``amount`` tokens without waiting."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+
+class ProviderGuard:
+    """Circuit breaker and rate limiters for one provider."""
+
+    def __init__(
+        self,
+        provider_id: str,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+    ) -> None:
+        rpm = LLM_RATE_LIMIT_RPM if rpm is None else rpm
+        tpm = LLM_RATE_LIMIT_TPM if tpm is None else tpm
+        self.provider_id = provider_id
+        self.breaker = CircuitBreaker(provider_id)
+        self.requests: Optional[TokenBucket] = (
+            TokenBucket(rpm) if rpm > 0 else None
+        )
+        self.tokens: Optional[TokenBucket] = (
+            TokenBucket(tpm) if tpm > 0 else None
+        )
+
+    async def admit(self, estimated_tokens: int = 0) -> None:
+        """Wait for rate-limit capacity, then pass the circuit breaker."""
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and estimated_tokens > 0:
+            await self.tokens.acquire(estimated_tokens)
+        self.breaker.before_call()
+
+    def try_admit_extra(self) -> bool:
+        """Admit an optional extra request (a hedge) without waiting."""
+        if self.breaker.state != CircuitBreaker.CLOSED:
+            return False
+        return self.requests is None or self.requests.try_acquire(1) == 0
+
+    def record_tokens(self, amount: int) -> None:
+        """Charge tokens learned after the fact (e.g. output tokens)."""
+        if self.tokens is not None and amount > 0:
+            self.tokens.consume(amount)
+
+
+_guards: dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_provider_guard(provider_id: str) -> ProviderGuard:
+    """Get the process-wide :class:`ProviderGuard` for a provider."""
+    with _guards_lock:
+        guard = _guards.get(provider_id)
+        if guard is None:
+            guard = ProviderGuard(provider_id)
+            _guards[provider_id] = guard
+        return guard
+
+
+def reset_provider_guards() -> None:
+    """Forget all breaker and limiter state."""
+    with _guards_lock:
+        _guards.clear()
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ProviderGuard",
+    "TokenBucket",
+    "get_provider_guard",
+    "reset_provider_guards",
+]
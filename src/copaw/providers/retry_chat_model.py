@@ -8,23 +8,48 @@ Configuration via environment variables (or use defaults from constant.py):
     COPAW_LLM_MAX_RETRIES   – max retry attempts (default 3)
     COPAW_LLM_BACKOFF_BASE  – base delay in seconds (default 1.0)
     COPAW_LLM_BACKOFF_CAP   – max delay cap in seconds (default 10.0)
+    COPAW_LLM_FIRST_BYTE_TIMEOUT – per-attempt first-byte timeout (0 = off)
+    COPAW_LLM_HEDGE_DELAY   – delay before a hedged request (0 = off)
+
+Every call also passes the provider's process-wide circuit breaker and
+rate limiters (see :mod:`.resilience`).
 """
 
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 from typing import Any, AsyncGenerator
 
 from agentscope.model import ChatModelBase
 from agentscope.model._model_response import ChatResponse
 
-from ..constant import LLM_BACKOFF_BASE, LLM_BACKOFF_CAP, LLM_MAX_RETRIES
+from ..constant import (
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_CAP,
+    LLM_FIRST_BYTE_TIMEOUT,
+    LLM_HEDGE_DELAY,
+    LLM_MAX_RETRIES,
+)
+from .resilience import ProviderGuard, get_provider_guard
 
 logger = logging.getLogger(__name__)
 
 RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 
+# Rough characters-per-token ratio for estimating request size before
+# the call, for the tokens-per-minute limiter.
+_CHARS_PER_TOKEN = 4
+
+# Marks a stream that ended before yielding anything.
+_EMPTY = object()
+
+
+class FirstByteTimeoutError(TimeoutError):
+    """The provider sent nothing within ``LLM_FIRST_BYTE_TIMEOUT``."""
+
+
 _openai_retryable: tuple[type[Exception], ...] | None = None
 _anthropic_retryable: tuple[type[Exception], ...] | None = None
 
@@ -63,6 +88,8 @@ def _get_anthropic_retryable() -> tuple[type[Exception], ...]:
 
 def _is_retryable(exc: Exception) -> bool:
     """Return *True* if *exc* should trigger a retry."""
+    if isinstance(exc, FirstByteTimeoutError):
+        return True
     retryable = _get_openai_retryable() + _get_anthropic_retryable()
     if retryable and isinstance(exc, retryable):
         return True
@@ -79,6 +106,30 @@ def _compute_backoff(attempt: int) -> float:
     return min(LLM_BACKOFF_CAP, LLM_BACKOFF_BASE * (2 ** max(0, attempt - 1)))
 
 
+def _estimate_tokens(args: tuple, kwargs: dict) -> int:
+    """Estimate the input tokens of a call from its messages."""
+    messages = kwargs.get("messages", args[0] if args else None)
+    if not messages:
+        return 0
+    try:
+        size = len(json.dumps(messages, ensure_ascii=False, default=str))
+    except (TypeError, ValueError):
+        size = len(str(messages))
+    return size // _CHARS_PER_TOKEN
+
+
+def _output_tokens(response: Any) -> int:
+    usage = getattr(response, "usage", None)
+    return int(getattr(usage, "output_tokens", 0) or 0)
+
+
+async def _discard(response: tuple) -> None:
+    """Close the stream of an attempt whose response is not used."""
+    result, first = response
+    if first is not None:
+        await result.aclose()
+
+
 class RetryChatModel(ChatModelBase):
     """Transparent retry wrapper around any :class:`ChatModelBase`.
 
@@ -86,11 +137,24 @@ class RetryChatModel(ChatModelBase):
     retries on transient errors with exponential back-off.  Streaming
     responses are also covered: if the stream fails mid-consumption the
     entire request is retried from scratch.
+
+    Calls pass the provider's shared :class:`ProviderGuard` (circuit
+    breaker, request and token rate limits). An attempt lasts until the
+    response, or the first stream chunk, arrives. Nothing has reached the
+    caller before that, so the attempt can safely be timed out
+    (``LLM_FIRST_BYTE_TIMEOUT``) or hedged (``LLM_HEDGE_DELAY``).
     """
 
-    def __init__(self, inner: ChatModelBase) -> None:
+    def __init__(
+        self,
+        inner: ChatModelBase,
+        provider_id: str | None = None,
+    ) -> None:
         super().__init__(model_name=inner.model_name, stream=inner.stream)
         self._inner = inner
+        self._guard: ProviderGuard = get_provider_guard(
+            provider_id or f"model:{inner.model_name}",
+        )
 
     # Expose the real model's class so that formatter mapping keeps working
     # when code inspects ``model.__class__`` after wrapping.
@@ -103,45 +167,162 @@ class RetryChatModel(ChatModelBase):
         *args: Any,
         **kwargs: Any,
     ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
-        retries = LLM_MAX_RETRIES
-        attempts = retries + 1
-        last_exc: Exception | None = None
+        attempts = LLM_MAX_RETRIES + 1
+        result, first, attempt = await self._open(args, kwargs, 1, attempts)
+        if first is None:
+            self._guard.record_tokens(_output_tokens(result))
+            return result
+        return self._wrap_stream(
+            result,
+            first,
+            args,
+            kwargs,
+            attempt,
+            attempts,
+        )
 
-        for attempt in range(1, attempts + 1):
-            try:
-                result = await self._inner(*args, **kwargs)
-
-                if isinstance(result, AsyncGenerator):
-                    return self._wrap_stream(
-                        result,
-                        args,
-                        kwargs,
-                        attempt,
-                        attempts,
-                    )
-                return result
+    def _record(self, retryable: bool) -> None:
+        # Non-retryable errors (bad request, auth) mean the provider is up.
+        if retryable:
+            self._guard.breaker.record_failure()
+        else:
+            self._guard.breaker.record_success()
+
+    async def _backoff(
+        self,
+        what: str,
+        attempt: int,
+        attempts: int,
+        exc: Exception,
+    ) -> None:
+        delay = _compute_backoff(attempt)
+        logger.warning(
+            "%s failed (attempt %d/%d): %s. Retrying in %.1fs …",
+            what,
+            attempt,
+            attempts,
+            exc,
+            delay,
+        )
+        await asyncio.sleep(delay)
 
+    async def _open(
+        self,
+        args: tuple,
+        kwargs: dict,
+        attempt: int,
+        attempts: int,
+    ) -> tuple[Any, Any, int]:
+        """Make attempts until one responds.
+
+        Returns:
+            (result, first stream chunk or None, attempt number)
+        """
+        estimated = _estimate_tokens(args, kwargs)
+        while True:
+            await self._guard.admit(estimated)
+            try:
+                result, first = await self._respond(args, kwargs)
+            except asyncio.CancelledError:
+                self._guard.breaker.release()
+                raise
             except Exception as exc:
-                last_exc = exc
-                if not _is_retryable(exc) or attempt >= attempts:
+                retryable = _is_retryable(exc)
+                self._record(retryable)
+                if not retryable or attempt >= attempts:
                     raise
-                delay = _compute_backoff(attempt)
-                logger.warning(
-                    "LLM call failed (attempt %d/%d): %s. "
-                    "Retrying in %.1fs …",
-                    attempt,
-                    attempts,
-                    exc,
-                    delay,
+                await self._backoff("LLM call", attempt, attempts, exc)
+                attempt += 1
+                continue
+            self._guard.breaker.record_success()
+            return result, first, attempt
+
+    async def _attempt(self, args: tuple, kwargs: dict) -> tuple[Any, Any]:
+        result = await self._inner(*args, **kwargs)
+        if not isinstance(result, AsyncGenerator):
+            return result, None
+        try:
+            first = await result.__anext__()
+        except StopAsyncIteration:
+            first = _EMPTY
+        except BaseException:
+            await result.aclose()
+            raise
+        return result, first
+
+    async def _timed_attempt(
+        self,
+        args: tuple,
+        kwargs: dict,
+    ) -> tuple[Any, Any]:
+        if LLM_FIRST_BYTE_TIMEOUT <= 0:
+            return await self._attempt(args, kwargs)
+        try:
+            return await asyncio.wait_for(
+                self._attempt(args, kwargs),
+                LLM_FIRST_BYTE_TIMEOUT,
+            )
+        except asyncio.TimeoutError as exc:
+            raise FirstByteTimeoutError(
+                f"No response within {LLM_FIRST_BYTE_TIMEOUT:.1f}s",
+            ) from exc
+
+    # pylint: disable-next=too-many-branches
+    async def _respond(self, args: tuple, kwargs: dict) -> tuple[Any, Any]:
+        """Run one attempt, hedged with a second request if it is slow."""
+        if LLM_HEDGE_DELAY <= 0:
+            return await self._timed_attempt(args, kwargs)
+
+        primary = asyncio.ensure_future(self._timed_attempt(args, kwargs))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=LLM_HEDGE_DELAY)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done or not self._guard.try_admit_extra():
+            return await primary
+
+        logger.info(
+            "LLM call to '%s' slow after %.1fs, sending hedged request",
+            self._guard.provider_id,
+            LLM_HEDGE_DELAY,
+        )
+        tasks = {
+            primary,
+            asyncio.ensure_future(self._timed_attempt(args, kwargs)),
+        }
+        winner: tuple[Any, Any] | None = None
+        error: BaseException | None = None
+        try:
+            while tasks and winner is None:
+                done, tasks = await asyncio.wait(
+                    tasks,
+                    return_when=asyncio.FIRST_COMPLETED,
                 )
-                await asyncio.sleep(delay)
-
-        # Should be unreachable, but satisfies the type-checker.
-        raise last_exc  # type: ignore[misc]
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task.result()
+                    else:
+                        await _discard(task.result())
+        finally:
+            for task in tasks:
+                task.cancel()
+            for response in await asyncio.gather(
+                *tasks,
+                return_exceptions=True,
+            ):
+                if isinstance(response, tuple):
+                    await _discard(response)
+        if winner is None:
+            raise error  # type: ignore[misc]
+        return winner
 
     async def _wrap_stream(
         self,
         stream: AsyncGenerator[ChatResponse, None],
+        first: Any,
         call_args: tuple,
         call_kwargs: dict,
         current_attempt: int,
@@ -149,55 +330,41 @@ class RetryChatModel(ChatModelBase):
     ) -> AsyncGenerator[ChatResponse, None]:
         """Yield chunks from *stream*; on transient failure, retry the
         full request and yield from the new stream instead."""
-        failed_exc: Exception | None = None
-        try:
-            async for chunk in stream:
-                yield chunk
-        except Exception as exc:
-            failed_exc = exc
-        finally:
-            await stream.aclose()
-
-        if failed_exc is None:
-            return
+        while True:
+            failed_exc: Exception | None = None
+            last: Any = None
+            try:
+                if first is not _EMPTY:
+                    last = first
+                    yield first
+                async for chunk in stream:
+                    last = chunk
+                    yield chunk
+            except Exception as exc:
+                failed_exc = exc
+            finally:
+                await stream.aclose()
 
-        if not _is_retryable(failed_exc) or current_attempt >= max_attempts:
-            raise failed_exc
-        delay = _compute_backoff(current_attempt)
-        logger.warning(
-            "LLM stream failed (attempt %d/%d): %s. Retrying in %.1fs …",
-            current_attempt,
-            max_attempts,
-            failed_exc,
-            delay,
-        )
-        await asyncio.sleep(delay)
+            if failed_exc is None:
+                self._guard.record_tokens(_output_tokens(last))
+                return
 
-        new_stream: AsyncGenerator | None = None
-        for attempt in range(current_attempt + 1, max_attempts + 1):
-            try:
-                result = await self._inner(*call_args, **call_kwargs)
-                if isinstance(result, AsyncGenerator):
-                    new_stream = result
-                    async for chunk in new_stream:
-                        yield chunk
-                    new_stream = None
-                else:
-                    yield result
+            retryable = _is_retryable(failed_exc)
+            self._record(retryable)
+            if not retryable or current_attempt >= max_attempts:
+                raise failed_exc
+            await self._backoff(
+                "LLM stream",
+                current_attempt,
+                max_attempts,
+                failed_exc,
+            )
+            stream, first, current_attempt = await self._open(
+                call_args,
+                call_kwargs,
+                current_attempt + 1,
+                max_attempts,
+            )
+            if first is None:
+                yield stream
                 return
-            except Exception as retry_exc:
-                if new_stream is not None:
-                    await new_stream.aclose()
-                    new_stream = None
-                if not _is_retryable(retry_exc) or attempt >= max_attempts:
-                    raise
-                retry_delay = _compute_backoff(attempt)
-                logger.warning(
-                    "LLM stream retry failed (attempt %d/%d): %s. "
-                    "Retrying in %.1fs …",
-                    attempt,
-                    max_attempts,
-                    retry_exc,
-                    retry_delay,
-                )
-                await asyncio.sleep(retry_delay)
@@ -41,9 +41,9 @@ def _guard_enabled() -> bool:
         return env_val.lower() in _TRUE_STRINGS
 
     try:
-        from copaw.config import load_config
+        from copaw.config import get_config_snapshot
 
-        cfg = load_config()
+        cfg = get_config_snapshot()
         return cfg.security.tool_guard.enabled
     except Exception:
         return True
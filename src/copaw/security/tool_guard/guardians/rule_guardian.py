@@ -19,17 +19,31 @@ Rule format (one YAML file per threat category)::
         - "^#"
       description: "Piping downloaded content directly to a shell"
       remediation: "Download to a file first and inspect before execution"
+
+Rules are grouped per ``(tool, param)`` behind a literal prefilter
+(:class:`_RuleMatcher`), verdicts for recently seen parameters are
+cached, and edited rule files are picked up on the next call.
 """
 from __future__ import annotations
 
 import logging
+import os
 import re
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import yaml
 
+from ....constant import (
+    TOOL_GUARD_RULES_CHECK_INTERVAL,
+    TOOL_GUARD_VERDICT_CACHE_SIZE,
+)
+from ....utils.regex_parser import sre_parse
 from ..models import GuardFinding, GuardSeverity, GuardThreatCategory
 from . import BaseToolGuardian
 
@@ -43,6 +57,16 @@ _DEFAULT_RULE_FILES: list[str] = [
     "dangerous_shell_commands.yaml",
 ]
 
+# Parameters whose values add up to more than this many characters are
+# scanned but not cached.
+_MAX_CACHED_CHARS = 4096
+
+_REPEATS = {
+    sre_parse.MAX_REPEAT,
+    sre_parse.MIN_REPEAT,
+    getattr(sre_parse, "POSSESSIVE_REPEAT", sre_parse.MAX_REPEAT),
+}
+
 
 # ---------------------------------------------------------------------------
 # GuardRule – one YAML rule entry
@@ -204,11 +228,30 @@ def load_rules_from_directory(
         ``*.yml`` files in that directory are loaded.
     """
     directory = rules_dir or _DEFAULT_RULES_DIR
-    if not directory.is_dir():
+    yaml_files = _rule_file_paths(rules_dir, rule_files)
+    if yaml_files is None:
         logger.warning("Guard rules directory not found: %s", directory)
         return []
 
-    # Determine which files to load
+    rules: list[GuardRule] = []
+    for yaml_file in yaml_files:
+        if yaml_file.is_file():
+            rules.extend(load_rules_from_yaml(yaml_file))
+        else:
+            logger.warning("Guard rule file not found: %s", yaml_file)
+
+    logger.debug("Loaded %d guard rules from %s", len(rules), directory)
+    return rules
+
+
+def _rule_file_paths(
+    rules_dir: Path | None,
+    rule_files: list[str] | None = None,
+) -> list[Path] | None:
+    """Files :func:`load_rules_from_directory` reads (None: no dir)."""
+    directory = rules_dir or _DEFAULT_RULES_DIR
+    if not directory.is_dir():
+        return None
     if rule_files is not None:
         yaml_files = [directory / f for f in rule_files]
     elif rules_dir is not None:
@@ -219,16 +262,20 @@ def load_rules_from_directory(
     else:
         # Default directory: load only the default subset
         yaml_files = [directory / f for f in _DEFAULT_RULE_FILES]
+    return yaml_files
 
-    rules: list[GuardRule] = []
-    for yaml_file in yaml_files:
-        if yaml_file.is_file():
-            rules.extend(load_rules_from_yaml(yaml_file))
-        else:
-            logger.warning("Guard rule file not found: %s", yaml_file)
 
-    logger.debug("Loaded %d guard rules from %s", len(rules), directory)
-    return rules
+def _files_signature(paths: list[Path] | None) -> tuple:
+    """``(path, mtime_ns, size)`` per rule file, to notice edits."""
+    signature = []
+    for path in paths or []:
+        try:
+            st = os.stat(path)
+        except OSError:
+            signature.append((str(path), None, None))
+            continue
+        signature.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(signature)
 
 
 # ---------------------------------------------------------------------------
@@ -242,9 +289,9 @@ def _load_config_rules() -> tuple[list[GuardRule], set[str]]:
     Returns ``(custom_rules, disabled_ids)``.
     """
     try:
-        from copaw.config import load_config
+        from copaw.config import get_config_snapshot
 
-        cfg = load_config().security.tool_guard
+        cfg = get_config_snapshot().security.tool_guard
     except Exception:
         return [], set()
 
@@ -272,6 +319,183 @@ def _load_config_rules() -> tuple[list[GuardRule], set[str]]:
     return custom, disabled
 
 
+# ---------------------------------------------------------------------------
+# Compiled matcher – literal prefilter per (tool, param)
+# ---------------------------------------------------------------------------
+
+
+def _required_literals(parsed: Any) -> Optional[frozenset[str]]:
+    """Lowercased strings one of which every match of *parsed* contains.
+
+    ``None`` when no such set is known (e.g. ``\\w+`` or ``a|\\d``).
+    Runs of ASCII literals in a sequence are candidates, as are groups,
+    alternations whose branches all have literals and repeats of at
+    least one; the candidate with the longest shortest string wins.
+    """
+    options: list[frozenset[str]] = []
+    run: list[str] = []
+    for op, arg in list(parsed) + [(None, None)]:
+        if op == sre_parse.LITERAL and arg < 0x80:
+            run.append(chr(arg))
+            continue
+        if run:
+            options.append(frozenset(["".join(run).lower()]))
+            run = []
+        sub: Optional[frozenset[str]] = None
+        if op == sre_parse.SUBPATTERN:
+            sub = _required_literals(arg[-1])
+        elif op == sre_parse.BRANCH:
+            branches = [_required_literals(b) for b in arg[1]]
+            if all(branches):
+                sub = frozenset().union(*branches)
+        elif op in _REPEATS and arg[0] >= 1:
+            sub = _required_literals(arg[2])
+        if sub:
+            options.append(sub)
+    if not options:
+        return None
+    return max(options, key=lambda option: min(map(len, option)))
+
+
+@lru_cache(maxsize=4096)
+def _pattern_literals(source: str, flags: int) -> Optional[frozenset[str]]:
+    try:
+        return _required_literals(sre_parse.parse(source, flags))
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+class _RuleMatcher:
+    """The rules that apply to one ``(tool, param)``, in rule order.
+
+    Every pattern is reduced to literals one of which any match must
+    contain (:func:`_required_literals`). Literals are indexed by their
+    first three characters, so a single pass over the trigrams of a
+    value finds the rules that can match it; only those run
+    :meth:`GuardRule.match`, which keeps the hits identical to trying
+    every rule. Rules without usable literals are always tried, and
+    non-ASCII values (where ``IGNORECASE`` matches the Kelvin sign to
+    ``k``) skip the filter.
+    """
+
+    __slots__ = ("rules", "_always", "_short", "_long", "_grams")
+
+    def __init__(self, rules: list[GuardRule]) -> None:
+        self.rules = rules
+        self._always: list[int] = []
+        self._short: dict[str, list[int]] = {}
+        self._long: dict[str, dict[str, list[int]]] = {}
+        for index, rule in enumerate(rules):
+            literals: Optional[set[str]] = set()
+            for pattern in rule.compiled_patterns:
+                found = _pattern_literals(pattern.pattern, pattern.flags)
+                if found is None:
+                    literals = None
+                    break
+                literals |= found
+            if literals is None:
+                self._always.append(index)
+                continue
+            for literal in literals:
+                if len(literal) < 3:
+                    self._short.setdefault(literal, []).append(index)
+                else:
+                    self._long.setdefault(literal[:3], {}).setdefault(
+                        literal,
+                        [],
+                    ).append(index)
+        self._grams = frozenset(self._long)
+
+    def candidates(self, value: str) -> list[GuardRule]:
+        """Rules that may match *value*, in rule order."""
+        if not value.isascii():
+            return self.rules
+        lowered = value.lower()
+        hit = set(self._always)
+        for literal, indexes in self._short.items():
+            if literal in lowered:
+                hit.update(indexes)
+        grams = {lowered[i : i + 3] for i in range(len(lowered) - 2)}
+        for gram in grams & self._grams:
+            for literal, indexes in self._long[gram].items():
+                if literal in lowered:
+                    hit.update(indexes)
+        return [self.rules[i] for i in sorted(hit)]
+
+    def hits(self, value: str) -> list[tuple[GuardRule, str, str, str]]:
+        """``(rule, matched_value, pattern, snippet)`` per matching rule."""
+        out = []
+        for rule in self.candidates(value):
+            m, pattern_str = rule.match(value)
+            if m:
+                # Context snippet around the match
+                start = max(0, m.start() - 40)
+                end = min(len(value), m.end() + 40)
+                out.append((rule, m.group(0), pattern_str, value[start:end]))
+        return out
+
+
+class _CompiledRules:
+    """One loaded rule set with its matchers and verdict cache.
+
+    Swapped as a whole on reload, so a scan that started before a
+    reload finishes against the rules it started with.
+    """
+
+    def __init__(self, rules: list[GuardRule], files_signature: tuple):
+        self.rules = rules
+        self.files_signature = files_signature
+        self._lock = threading.Lock()
+        self._matchers: dict[tuple[str, str], _RuleMatcher] = {}
+        self._verdicts: OrderedDict[tuple, tuple] = OrderedDict()
+
+    def matcher(self, tool_name: str, param_name: str) -> _RuleMatcher:
+        key = (tool_name, param_name)
+        matcher = self._matchers.get(key)
+        if matcher is None:
+            matcher = _RuleMatcher(
+                [
+                    r
+                    for r in self.rules
+                    if r.applies_to_tool(tool_name)
+                    and r.applies_to_param(param_name)
+                ],
+            )
+            with self._lock:
+                if len(self._matchers) >= 4096:
+                    self._matchers.clear()
+                self._matchers[key] = matcher
+        return matcher
+
+    def scan(self, tool_name: str, values: tuple) -> tuple:
+        """``(rule, param, matched, pattern, snippet)`` hits, cached."""
+        cacheable = (
+            TOOL_GUARD_VERDICT_CACHE_SIZE > 0
+            and sum(len(v) for _, v in values) <= _MAX_CACHED_CHARS
+        )
+        key = (tool_name, values)
+        if cacheable:
+            with self._lock:
+                hits = self._verdicts.get(key)
+                if hits is not None:
+                    self._verdicts.move_to_end(key)
+                    return hits
+        hits = tuple(
+            (rule, param_name, matched, pattern_str, snippet)
+            for param_name, value in values
+            for rule, matched, pattern_str, snippet in self.matcher(
+                tool_name,
+                param_name,
+            ).hits(value)
+        )
+        if cacheable:
+            with self._lock:
+                self._verdicts[key] = hits
+                if len(self._verdicts) > TOOL_GUARD_VERDICT_CACHE_SIZE:
+                    self._verdicts.popitem(last=False)
+        return hits
+
+
 # ---------------------------------------------------------------------------
 # RuleBasedToolGuardian
 # ---------------------------------------------------------------------------
@@ -298,29 +522,50 @@ class RuleBasedToolGuardian(BaseToolGuardian):
         super().__init__(name="rule_based_tool_guardian")
         self._rules_dir = rules_dir
         self._extra_rules = list(extra_rules) if extra_rules else []
-        self._rules: list[GuardRule] = []
+        self._compiled = _CompiledRules([], ())
+        self._next_files_check = 0.0
         self._load_all_rules()
 
     def _load_all_rules(self) -> None:
         """(Re)load built-in + config custom rules, filtering disabled."""
+        # Signed before reading, so an edit made mid-load is seen later.
+        signature = _files_signature(_rule_file_paths(self._rules_dir))
         builtin = load_rules_from_directory(self._rules_dir)
         custom, disabled = _load_config_rules()
         merged = builtin + self._extra_rules + custom
-        self._rules = [r for r in merged if r.id not in disabled]
+        self._compiled = _CompiledRules(
+            [r for r in merged if r.id not in disabled],
+            signature,
+        )
 
     def reload(self) -> None:
         """Reload rules from YAML + config (called on config change)."""
         self._load_all_rules()
-        logger.info("Reloaded guard rules: %d active", len(self._rules))
+        logger.info(
+            "Reloaded guard rules: %d active",
+            len(self._compiled.rules),
+        )
+
+    def _reload_if_files_changed(self) -> None:
+        """Reload when a rule file was edited, added or removed."""
+        if TOOL_GUARD_RULES_CHECK_INTERVAL <= 0:
+            return
+        now = time.monotonic()
+        if now < self._next_files_check:
+            return
+        self._next_files_check = now + TOOL_GUARD_RULES_CHECK_INTERVAL
+        signature = _files_signature(_rule_file_paths(self._rules_dir))
+        if signature != self._compiled.files_signature:
+            self.reload()
 
     @property
     def rules(self) -> list[GuardRule]:
         """Return the loaded rules (read-only view)."""
-        return list(self._rules)
+        return list(self._compiled.rules)
 
     @property
     def rule_count(self) -> int:
-        return len(self._rules)
+        return len(self._compiled.rules)
 
     # ------------------------------------------------------------------
     # Core interface
@@ -332,51 +577,37 @@ class RuleBasedToolGuardian(BaseToolGuardian):
         params: dict[str, Any],
     ) -> list[GuardFinding]:
         """Scan all string-like parameter values against loaded rules."""
-        findings: list[GuardFinding] = []
-        applicable_rules = [
-            r for r in self._rules if r.applies_to_tool(tool_name)
-        ]
-
-        if not applicable_rules:
-            return findings
-
+        self._reload_if_files_changed()
+        # Parameters normalized to their scanned string form, which is
+        # also the verdict cache key.
+        values = []
         for param_name, param_value in params.items():
-            # Convert to string for scanning
             value_str = str(param_value) if param_value is not None else ""
-            if not value_str:
-                continue
+            if value_str:
+                values.append((param_name, value_str))
+        if not values:
+            return []
 
-            for rule in applicable_rules:
-                if not rule.applies_to_param(param_name):
-                    continue
-                m, pattern_str = rule.match(value_str)
-                if m:
-                    # Context snippet around the match
-                    start = max(0, m.start() - 40)
-                    end = min(len(value_str), m.end() + 40)
-                    snippet = value_str[start:end]
-
-                    findings.append(
-                        GuardFinding(
-                            id=f"GUARD-{uuid.uuid4().hex}",
-                            rule_id=rule.id,
-                            category=rule.category,
-                            severity=rule.severity,
-                            title=(
-                                f"[{rule.severity.value}]"
-                                f" {rule.description}"
-                            ),
-                            description=(
-                                f"Rule {rule.id} matched parameter "
-                                f"'{param_name}' of tool '{tool_name}'."
-                            ),
-                            tool_name=tool_name,
-                            param_name=param_name,
-                            matched_value=m.group(0),
-                            matched_pattern=pattern_str,
-                            snippet=snippet,
-                            remediation=rule.remediation,
-                            guardian=self.name,
-                        ),
-                    )
-        return findings
+        return [
+            GuardFinding(
+                id=f"GUARD-{uuid.uuid4().hex}",
+                rule_id=rule.id,
+                category=rule.category,
+                severity=rule.severity,
+                title=f"[{rule.severity.value}] {rule.description}",
+                description=(
+                    f"Rule {rule.id} matched parameter "
+                    f"'{param_name}' of tool '{tool_name}'."
+                ),
+                tool_name=tool_name,
+                param_name=param_name,
+                matched_value=matched,
+                matched_pattern=pattern_str,
+                snippet=snippet,
+                remediation=rule.remediation,
+                guardian=self.name,
+            )
+            for rule, param_name, matched, pattern_str, snippet in (
+                self._compiled.scan(tool_name, tuple(values))
+            )
+        ]
@@ -46,9 +46,9 @@ def _load_config_tool_guard():
     Returns ``None`` when config cannot be loaded.
     """
     try:
-        from copaw.config import load_config
+        from copaw.config import get_config_snapshot
 
-        return load_config().security.tool_guard
+        return get_config_snapshot().security.tool_guard
     except Exception:
         return None
 
@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 """Token usage manager"""
 
+import asyncio
+import atexit
+import bisect
+import copy
 import json
 import logging
+import os
 import threading
 from datetime import date, timedelta
 from pathlib import Path
 
-import aiofiles
 from pydantic import BaseModel, Field
 
 from ..constant import WORKING_DIR, TOKEN_USAGE_FILE
@@ -58,53 +62,243 @@ class TokenUsageSummary(BaseModel):
     )
 
 
+# Flush buffered events once this many are pending, or after this many
+# seconds, whichever comes first.
+_FLUSH_MAX_EVENTS = 256
+_FLUSH_INTERVAL_S = 5.0
+# Fold the event log into the rollup snapshot after this many batches.
+_COMPACT_BATCHES = 64
+
+_SEQ_KEY = "_seq"
+
+
 class TokenUsageManager:
     """Manager for token usage records.
-    Use get_instance() to obtain the singleton."""
+    Use get_instance() to obtain the singleton.
+
+    Usage is kept as per-day rollups, one bucket per provider/model pair,
+    in memory. ``record()`` only updates the rollup and buffers the event.
+    Buffered events are appended in batches to ``<file>.log`` (JSON
+    lines), either on a timer or once enough are pending. The log is
+    periodically folded into the rollup snapshot ``token_usage.json``,
+    whose format is unchanged apart from a ``_seq`` key. Each batch
+    carries a sequence number, and replay skips batches the snapshot
+    already contains, so a crash at any point neither loses flushed
+    events nor counts them twice.
+    """
 
     _instance: "TokenUsageManager | None" = None
     _lock = threading.Lock()
 
-    def __init__(self) -> None:
-        self._path: Path = (WORKING_DIR / TOKEN_USAGE_FILE).expanduser()
+    def __init__(
+        self,
+        path: Path | None = None,
+        flush_max_events: int = _FLUSH_MAX_EVENTS,
+        flush_interval: float = _FLUSH_INTERVAL_S,
+        compact_batches: int = _COMPACT_BATCHES,
+    ) -> None:
+        self._path: Path = (
+            path or WORKING_DIR / TOKEN_USAGE_FILE
+        ).expanduser()
+        self._log_path = self._path.with_suffix(self._path.suffix + ".log")
+        self._flush_max_events = flush_max_events
+        self._flush_interval = flush_interval
+        self._compact_batches = compact_batches
+
+        # Guards the in-memory state; never held across an await.
+        self._state_lock = threading.Lock()
+        # Serializes flushes (log appends and snapshot rewrites).
         self._file_lock = threading.Lock()
+        # date -> "provider:model" -> entry (same shape as the snapshot).
+        self._days: dict[str, dict[str, dict]] = {}
+        self._day_keys: list[str] = []
+        self._pending: list[dict] = []
+        self._seq = 0
+        self._log_batches = 0
+        self._loaded = False
+
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_loop: asyncio.AbstractEventLoop | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    # ----- Storage -----
+
+    def _apply(self, event: dict) -> None:
+        date_str = event["date"]
+        provider_id = event.get("provider_id", "")
+        model_name = event.get("model_name", "")
+        composite_key = f"{provider_id}:{model_name}"
 
-    async def _load_data(self) -> dict:
-        """Load full token usage data from disk."""
-        if not self._path.exists():
-            return {}
-        try:
-            async with aiofiles.open(
-                self._path,
-                mode="r",
-                encoding="utf-8",
-            ) as f:
-                raw = await f.read()
-            return json.loads(raw) if raw.strip() else {}
-        except (json.JSONDecodeError, OSError) as e:
-            logger.warning(
-                "Failed to read token usage file %s: %s",
-                self._path,
-                e,
-            )
-            return {}
-
-    async def _save_data(self, data: dict) -> None:
-        """Persist token usage data to disk."""
-        try:
-            self._path.parent.mkdir(parents=True, exist_ok=True)
-            async with aiofiles.open(
-                self._path,
-                mode="w",
-                encoding="utf-8",
-            ) as f:
-                await f.write(json.dumps(data, ensure_ascii=False, indent=2))
-        except OSError as e:
-            logger.warning(
-                "Failed to write token usage to %s: %s",
-                self._path,
-                e,
+        by_key = self._days.get(date_str)
+        if by_key is None:
+            by_key = self._days[date_str] = {}
+            bisect.insort(self._day_keys, date_str)
+        entry = by_key.get(composite_key)
+        if entry is None:
+            entry = by_key[composite_key] = {
+                "provider_id": provider_id,
+                "model_name": model_name,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "call_count": 0,
+            }
+        entry["prompt_tokens"] += event.get("prompt_tokens", 0)
+        entry["completion_tokens"] += event.get("completion_tokens", 0)
+        entry["call_count"] += event.get("call_count", 1)
+
+    def _ensure_loaded(self) -> None:
+        """Load the snapshot and replay the event log (caller holds
+        ``_state_lock``)."""
+        if self._loaded:
+            return
+        data: dict = {}
+        if self._path.exists():
+            try:
+                raw = self._path.read_text(encoding="utf-8")
+                data = json.loads(raw) if raw.strip() else {}
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(
+                    "Failed to read token usage file %s: %s",
+                    self._path,
+                    e,
+                )
+        self._seq = int(data.pop(_SEQ_KEY, 0) or 0)
+        for date_str, by_key in data.items():
+            if not isinstance(by_key, dict):
+                continue
+            for key, entry in by_key.items():
+                # Older files may lack provider_id/model_name.
+                self._apply(
+                    {
+                        "date": date_str,
+                        "provider_id": entry.get("provider_id", ""),
+                        "model_name": entry.get("model_name") or key,
+                        "prompt_tokens": entry.get("prompt_tokens", 0),
+                        "completion_tokens": entry.get(
+                            "completion_tokens",
+                            0,
+                        ),
+                        "call_count": entry.get("call_count", 0),
+                    },
+                )
+
+        if self._log_path.exists():
+            snapshot_seq = self._seq
+            with open(self._log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        batch = json.loads(line)
+                    except ValueError:
+                        # Torn final line from a crash mid-append.
+                        logger.warning(
+                            "Ignoring corrupt record in %s",
+                            self._log_path,
+                        )
+                        continue
+                    seq = int(batch.get("seq", 0))
+                    self._log_batches += 1
+                    if seq <= snapshot_seq:
+                        continue
+                    for event in batch.get("events", []):
+                        self._apply(event)
+                    self._seq = max(self._seq, seq)
+        self._loaded = True
+
+    def _write_snapshot(self, days: dict, seq: int) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        payload = {_SEQ_KEY: seq, **days}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(payload, ensure_ascii=False, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(self._path)
+
+    def flush_sync(self) -> None:
+        """Write buffered events to disk (blocking)."""
+        with self._file_lock:
+            with self._state_lock:
+                if not self._pending:
+                    return
+                events, self._pending = self._pending, []
+                self._seq += 1
+                seq = self._seq
+                self._log_batches += 1
+                snapshot = None
+                if self._log_batches >= self._compact_batches:
+                    # Taken together with the batch, so the snapshot
+                    # holds exactly the events up to ``seq``.
+                    snapshot = copy.deepcopy(self._days)
+                    self._log_batches = 0
+            try:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self._log_path, "a", encoding="utf-8") as f:
+                    f.write(
+                        json.dumps(
+                            {"seq": seq, "events": events},
+                            ensure_ascii=False,
+                        )
+                        + "\n",
+                    )
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                logger.warning(
+                    "Failed to write token usage to %s: %s",
+                    self._log_path,
+                    e,
+                )
+                # Keep the events for the next flush.
+                with self._state_lock:
+                    self._pending[:0] = events
+                return
+            if snapshot is None:
+                return
+            try:
+                self._write_snapshot(snapshot, seq)
+                # Snapshot is durable; the log is now redundant.
+                self._log_path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(
+                    "Failed to write token usage to %s: %s",
+                    self._path,
+                    e,
+                )
+
+    async def flush(self) -> None:
+        """Write buffered events to disk."""
+        await asyncio.to_thread(self.flush_sync)
+
+    async def close(self) -> None:
+        """Cancel the flush timer and write all buffered events."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    def _schedule_flush(self, pending: int) -> None:
+        loop = asyncio.get_running_loop()
+        if pending >= self._flush_max_events:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._start_flush()
+        elif self._timer is None or self._timer_loop is not loop:
+            self._timer = loop.call_later(
+                self._flush_interval,
+                self._start_flush,
             )
+            self._timer_loop = loop
 
     async def record(
         self,
@@ -116,6 +310,9 @@ class TokenUsageManager:
     ) -> None:
         """Record token usage for a given provider, model and date.
 
+        The rollup is updated immediately; the event reaches disk with
+        the next batched flush.
+
         Args:
             provider_id: ID of the provider (e.g. "dashscope", "openai").
             model_name: Name of the model (e.g. "qwen3-max", "gpt-4").
@@ -126,32 +323,19 @@ class TokenUsageManager:
         if at_date is None:
             at_date = date.today()
 
-        date_str = at_date.isoformat()
-        composite_key = f"{provider_id}:{model_name}"
-
-        with self._file_lock:
-            data = await self._load_data()
-            if date_str not in data:
-                data[date_str] = {}
-
-            by_key = data[date_str]
-            if composite_key not in by_key:
-                by_key[composite_key] = {
-                    "provider_id": provider_id,
-                    "model_name": model_name,
-                    "prompt_tokens": 0,
-                    "completion_tokens": 0,
-                    "call_count": 0,
-                }
-
-            entry = by_key[composite_key]
-            entry.setdefault("provider_id", provider_id)
-            entry.setdefault("model_name", model_name)
-            entry["prompt_tokens"] += prompt_tokens
-            entry["completion_tokens"] += completion_tokens
-            entry["call_count"] += 1
-
-            await self._save_data(data)
+        event = {
+            "date": at_date.isoformat(),
+            "provider_id": provider_id,
+            "model_name": model_name,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        }
+        with self._state_lock:
+            self._ensure_loaded()
+            self._apply(event)
+            self._pending.append(event)
+            pending = len(self._pending)
+        self._schedule_flush(pending)
 
     async def _query(
         self,
@@ -161,36 +345,35 @@ class TokenUsageManager:
         provider_id: str | None = None,
     ) -> list[TokenUsageRecord]:
         """Return raw token usage records (used by get_summary)."""
-        data = await self._load_data()
         if end_date is None:
             end_date = date.today()
         if start_date is None:
             start_date = end_date - timedelta(days=30)
 
         results: list[TokenUsageRecord] = []
-        current = start_date
-        while current <= end_date:
-            date_str = current.isoformat()
-            by_key = data.get(date_str, {})
-            for _key, entry in by_key.items():
-                rec_provider = entry.get("provider_id", "")
-                rec_model = entry.get("model_name") or _key
-
-                if model_name is not None and rec_model != model_name:
-                    continue
-                if provider_id is not None and rec_provider != provider_id:
-                    continue
-                results.append(
-                    TokenUsageRecord(
-                        date=date_str,
-                        provider_id=rec_provider,
-                        model=rec_model,
-                        prompt_tokens=entry.get("prompt_tokens", 0),
-                        completion_tokens=entry.get("completion_tokens", 0),
-                        call_count=entry.get("call_count", 0),
-                    ),
-                )
-            current += timedelta(days=1)
+        with self._state_lock:
+            self._ensure_loaded()
+            lo = bisect.bisect_left(self._day_keys, start_date.isoformat())
+            hi = bisect.bisect_right(self._day_keys, end_date.isoformat())
+            for date_str in self._day_keys[lo:hi]:
+                for entry in self._days[date_str].values():
+                    rec_provider = entry["provider_id"]
+                    rec_model = entry["model_name"]
+
+                    if model_name is not None and rec_model != model_name:
+                        continue
+                    if provider_id is not None and rec_provider != provider_id:
+                        continue
+                    results.append(
+                        TokenUsageRecord(
+                            date=date_str,
+                            provider_id=rec_provider,
+                            model=rec_model,
+                            prompt_tokens=entry["prompt_tokens"],
+                            completion_tokens=entry["completion_tokens"],
+                            call_count=entry["call_count"],
+                        ),
+                    )
 
         return results
 
@@ -299,6 +482,9 @@ class TokenUsageManager:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = cls()
+                    # Last-chance flush on interpreter exit; the app
+                    # lifespan calls close() on a normal shutdown.
+                    atexit.register(cls._instance.flush_sync)
         return cls._instance
 
 
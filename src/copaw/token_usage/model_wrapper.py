@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Model wrapper that records token usage from LLM responses."""
 
+import time
 from datetime import date
 from typing import Any, AsyncGenerator, Literal, Type
 
@@ -10,6 +11,7 @@ from agentscope.model._model_usage import ChatUsage
 from pydantic import BaseModel
 
 from .manager import get_token_usage_manager
+from ..utils.tracing import observe
 
 
 class TokenRecordingModelWrapper(ChatModelBase):
@@ -45,6 +47,7 @@ class TokenRecordingModelWrapper(ChatModelBase):
         structured_model: Type[BaseModel] | None = None,
         **kwargs: Any,
     ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        started = time.perf_counter()
         result = await self._model(
             messages=messages,
             tools=tools,
@@ -54,16 +57,21 @@ class TokenRecordingModelWrapper(ChatModelBase):
         )
 
         if isinstance(result, AsyncGenerator):
-            return self._wrap_stream(result)
+            return self._wrap_stream(result, started)
+        observe("model.first_byte", time.perf_counter() - started)
         await self._record_usage(getattr(result, "usage", None))
         return result
 
     async def _wrap_stream(
         self,
         stream: AsyncGenerator[ChatResponse, None],
+        started: float,
     ) -> AsyncGenerator[ChatResponse, None]:
         last_usage: ChatUsage | None = None
         async for chunk in stream:
+            if started:
+                observe("model.first_byte", time.perf_counter() - started)
+                started = 0.0
             if getattr(chunk, "usage", None) is not None:
                 last_usage = chunk.usage
             yield chunk
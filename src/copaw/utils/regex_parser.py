@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""The regex parser behind :mod:`re`, for reading literals out of
+patterns (search index prefilter, tool guard rule prefilter).
+
+CPython has no public API for this. Supported: Python 3.10 - 3.13
+(``requires-python`` in pyproject.toml). On 3.11+ the parser lives in
+the private ``re._parser``; the top-level ``sre_parse`` alias is
+deprecated there, but it is the only name on 3.10. Re-check both
+callers when widening the supported range.
+"""
+import sys
+
+if sys.version_info >= (3, 11):
+    from re import _parser as sre_parse
+else:
+    import sre_parse  # pylint: disable=deprecated-module
+
+__all__ = ["sre_parse"]
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""Spans and stage histograms for the message hot path.
+
+Each stage of handling a message runs inside :func:`span` (or reports a
+duration it measured itself through :func:`observe`). Every stage lands
+in the ``copaw_stage_seconds`` histogram, labelled by stage, which
+``GET /metrics`` serves in the Prometheus text format. Spans nest
+through a context variable, so the stages of one reply share a trace;
+with ``COPAW_TRACING_OTLP_FILE`` set, finished spans are appended to
+that file as OTLP/JSON lines (one ``ExportTraceServiceRequest`` per
+line, as written by the OpenTelemetry collector's file exporter).
+
+Stages, in the order a reply goes through them:
+
+- ``channel.queue_wait``: enqueue until a consumer worker takes it
+- ``channel.debounce``: time-debounce buffering in ``consume_one``
+- ``channel.message``: the whole reply (root span)
+- ``mcp.list``: fetching the ready MCP clients
+- ``agent.acquire``: agent checkout; on a pool miss it includes
+  ``agent.build`` (construction) and ``mcp.register`` (tool listing)
+- ``session.load`` / ``session.save``: session state
+- ``agent.reasoning``: one reasoning step, including the model call
+- ``model.first_byte``: model request until the first chunk
+- ``memory.compaction``: the pre-reasoning compaction hook
+- ``tool.guard`` / ``tool.execute``: tool-guard check and tool call
+"""
+from __future__ import annotations
+
+import atexit
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from ..constant import TRACING_ENABLED, TRACING_OTLP_FILE
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds (seconds): queue hops well below a
+# millisecond up to tool calls of several minutes.
+BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+# Finished spans buffered before a write when no trace has ended yet
+# (e.g. during a long tool loop).
+_EXPORT_BATCH = 256
+
+_current: ContextVar[Optional["Span"]] = ContextVar(
+    "copaw_span",
+    default=None,
+)
+
+
+class Histogram:
+    """Per-bucket counts, sum and count of one stage's durations."""
+
+    __slots__ = ("counts", "total", "count", "errors")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        if error:
+            self.errors += 1
+
+
+class Span:
+    """One timed stage; ids and wall-clock start only when exporting."""
+
+    __slots__ = (
+        "name",
+        "attributes",
+        "parent",
+        "start",
+        "start_ns",
+        "trace_id",
+        "span_id",
+        "error",
+        "dropped",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        attributes: dict[str, Any],
+        parent: Optional["Span"],
+        exporting: bool,
+    ) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.error: Optional[str] = None
+        self.dropped = False
+        self.start_ns = 0
+        self.trace_id = self.span_id = ""
+        if exporting:
+            self.start_ns = time.time_ns()
+            self.trace_id = (
+                parent.trace_id
+                if parent is not None and parent.trace_id
+                else f"{random.getrandbits(128):032x}"
+            )
+            self.span_id = f"{random.getrandbits(64):016x}"
+        self.start = time.perf_counter()
+
+    def set(self, key: str, value: Any) -> None:
+        """Attach an attribute (exported with the span)."""
+        self.attributes[key] = value
+
+    def drop(self) -> None:
+        """Record nothing for this span (its work continues elsewhere)."""
+        self.dropped = True
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+class OtlpFileExporter:
+    """Appends finished spans to a file as OTLP/JSON lines.
+
+    Spans are buffered and written when their trace's root span ends
+    (or the buffer fills), so a reply costs one small append.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path).expanduser()
+        self._lock = threading.Lock()
+        self._pending: list[dict[str, Any]] = []
+        atexit.register(self.flush)
+
+    def add(self, finished: Span, elapsed: float) -> None:
+        record = {
+            "traceId": finished.trace_id,
+            "spanId": finished.span_id,
+            "parentSpanId": finished.parent.span_id if finished.parent else "",
+            "name": finished.name,
+            "kind": 1,
+            "startTimeUnixNano": str(finished.start_ns),
+            "endTimeUnixNano": str(finished.start_ns + int(elapsed * 1e9)),
+            "attributes": _otlp_attributes(finished.attributes),
+            "status": (
+                {"code": 2, "message": finished.error}
+                if finished.error
+                else {}
+            ),
+        }
+        with self._lock:
+            self._pending.append(record)
+            if finished.parent is not None and (
+                len(self._pending) < _EXPORT_BATCH
+            ):
+                return
+            batch, self._pending = self._pending, []
+        self._write(batch)
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, spans: list[dict[str, Any]]) -> None:
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": _otlp_attributes(
+                                {"service.name": "copaw"},
+                            ),
+                        },
+                        "scopeSpans": [
+                            {"scope": {"name": "copaw"}, "spans": spans},
+                        ],
+                    },
+                ],
+            },
+            separators=(",", ":"),
+        )
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning("Tracing: cannot write %s: %s", self.path, e)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Tracer:
+    """Stage histograms plus the optional span exporter."""
+
+    def __init__(
+        self,
+        enabled: bool = TRACING_ENABLED,
+        otlp_file: str = TRACING_OTLP_FILE,
+    ) -> None:
+        self.enabled = enabled
+        self.exporter = OtlpFileExporter(otlp_file) if otlp_file else None
+        self._lock = threading.Lock()
+        self._histograms: dict[str, Histogram] = {}
+
+    def observe(self, stage: str, seconds: float, error: bool = False) -> None:
+        """Record a duration measured outside of :meth:`span`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = Histogram()
+            hist.observe(seconds, error)
+
+    @contextmanager
+    def span(
+        self,
+        stage: str,
+        root: bool = False,
+        **attributes: Any,
+    ) -> Iterator[Optional[Span]]:
+        """Time the enclosed block as *stage*; yields the span (or None).
+
+        ``root=True`` starts a new trace instead of nesting in the open
+        span.
+        """
+        if not self.enabled:
+            yield None
+            return
+        current = Span(
+            stage,
+            attributes,
+            None if root else _current.get(),
+            self.exporter is not None,
+        )
+        token = _current.set(current)
+        try:
+            yield current
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            current.error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - current.start
+            try:
+                _current.reset(token)
+            except ValueError:
+                # Closed from another context (e.g. an async generator
+                # finalised by the event loop); nothing to restore.
+                pass
+            if not current.dropped:
+                self.observe(stage, elapsed, current.error is not None)
+                if self.exporter is not None:
+                    self.exporter.add(current, elapsed)
+
+    def render_prometheus(self) -> str:
+        """Histograms and error counts in the Prometheus text format."""
+        with self._lock:
+            stages = [
+                (stage, list(h.counts), h.total, h.count, h.errors)
+                for stage, h in sorted(self._histograms.items())
+            ]
+        lines = [
+            "# HELP copaw_stage_seconds Time spent in each stage of "
+            "handling a message.",
+            "# TYPE copaw_stage_seconds histogram",
+        ]
+        for stage, counts, total, count, _ in stages:
+            label = f'stage="{_label(stage)}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                lines.append(
+                    f'copaw_stage_seconds_bucket{{{label},le="{bound:g}"}} '
+                    f"{cumulative}",
+                )
+            lines.append(
+                f'copaw_stage_seconds_bucket{{{label},le="+Inf"}} {count}',
+            )
+            lines.append(f"copaw_stage_seconds_sum{{{label}}} {total!r}")
+            lines.append(f"copaw_stage_seconds_count{{{label}}} {count}")
+        lines += [
+            "# HELP copaw_stage_errors_total Stages that ended with an "
+            "exception.",
+            "# TYPE copaw_stage_errors_total counter",
+        ]
+        for stage, _, _, _, errors in stages:
+            lines.append(
+                f'copaw_stage_errors_total{{stage="{_label(stage)}"}} '
+                f"{errors}",
+            )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop all recorded durations."""
+        with self._lock:
+            self._histograms.clear()
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def span(stage: str, root: bool = False, **attributes: Any):
+    """Time a block as *stage* on the process-wide tracer."""
+    return get_tracer().span(stage, root, **attributes)
+
+
+def hand_off(stage: str) -> None:
+    """Record nothing for the open *stage* span: the work it stands for
+    continues elsewhere (e.g. a debounced reply), which opens its own
+    root span with ``span(stage, root=True)``.
+    """
+    current = _current.get()
+    if current is not None and current.name == stage:
+        current.drop()
+
+
+def observe(stage: str, seconds: float, error: bool = False) -> None:
+    """Record a duration for *stage* on the process-wide tracer."""
+    get_tracer().observe(stage, seconds, error)
+
+
+def render_prometheus() -> str:
+    """Prometheus text exposition of the process-wide tracer."""
+    return get_tracer().render_prometheus()
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from copaw.agents.tools import browser_control
+from copaw.agents.tools.browser_pool import (
+    BrowserContextPool,
+    browser_session,
+    current_session_key,
+)
+
+
+class _FakePage:
+    def __init__(self, context: "_FakeContext") -> None:
+        self.context = context
+        self.url = "about:blank"
+        self.closed = False
+
+    def on(self, event, callback) -> None:
+        pass
+
+    async def goto(self, url: str) -> None:
+        self.url = url
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def evaluate(self, _code: str) -> int:
+        return 0
+
+
+class _FakeContext:
+    def __init__(self) -> None:
+        self.closed = False
+        self.pages: list[_FakePage] = []
+        self._listeners: list = []
+
+    def on(self, event, callback) -> None:
+        assert event == "page"
+        self._listeners.append(callback)
+
+    async def new_page(self) -> _FakePage:
+        page = self.open_popup()
+        await asyncio.sleep(0)
+        return page
+
+    def open_popup(self) -> _FakePage:
+        # Playwright emits "page" for new_page() as well as popups.
+        page = _FakePage(self)
+        self.pages.append(page)
+        for callback in self._listeners:
+            callback(page)
+        return page
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self) -> None:
+        self.contexts: list[_FakeContext] = []
+
+    async def new_context(self) -> _FakeContext:
+        await asyncio.sleep(0)
+        context = _FakeContext()
+        self.contexts.append(context)
+        return context
+
+
+def _pool(**kwargs):
+    created: list[_FakeContext] = []
+
+    async def new_context():
+        await asyncio.sleep(0)
+        created.append(_FakeContext())
+        return created[-1]
+
+    async def close_context(context):
+        await context.close()
+
+    pool = BrowserContextPool(**kwargs)
+    pool.attach(new_context, close_context)
+    return pool, created
+
+
+async def test_checkout_isolates_sessions_and_uses_spares() -> None:
+    pool, created = _pool(max_contexts=4, warm_spares=1)
+    await asyncio.sleep(0.01)
+    assert pool.stats()["spares"] == 1
+
+    first, again, other = await asyncio.gather(
+        pool.checkout("a"),
+        pool.checkout("a"),
+        pool.checkout("b"),
+    )
+
+    assert first is again and first.context is not other.context
+    assert first.context is created[0]  # the warm spare
+    await asyncio.sleep(0.01)
+    assert pool.stats() == {
+        "sessions": 2,
+        "spares": 1,
+        "in_use": 0,
+        "recycled": 0,
+    }
+    assert pool.owner(other.context) is other
+
+
+async def test_least_recently_used_idle_context_is_recycled() -> None:
+    pool, _ = _pool(max_contexts=2, warm_spares=0)
+    a = await pool.checkout("a")
+    b = await pool.checkout("b")
+    await pool.checkout("a")  # "b" is now least recently used
+
+    with pool.using("b"):
+        c = await pool.checkout("c")
+        # "b" is busy, so "a" goes even though it was used later.
+        assert pool.keys() == ["b", "c"] and a.context.closed
+
+    await pool.checkout("d")
+
+    assert pool.keys() == ["c", "d"]
+    assert b.context.closed and not c.context.closed
+    assert pool.stats()["recycled"] == 2
+
+
+async def test_release_and_idle_recycling() -> None:
+    pool, _ = _pool(warm_spares=0)
+    a = await pool.checkout("a")
+    b = await pool.checkout("b")
+
+    assert await pool.release("a") and a.context.closed
+    assert not await pool.release("a")
+    b.last_used -= 100
+    assert await pool.recycle_idle(50) == 1 and b.context.closed
+    assert len(pool) == 0 and pool.stats()["recycled"] == 1
+
+
+async def test_checkout_fails_when_detached() -> None:
+    pool = BrowserContextPool()
+    with pytest.raises(RuntimeError):
+        await pool.checkout("a")
+
+
+def test_session_binding() -> None:
+    assert current_session_key() == "default"
+    with browser_session("s1"):
+        assert current_session_key() == "s1"
+        with browser_session(""):
+            assert current_session_key() == "default"
+    assert current_session_key() == "default"
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    # pylint: disable=protected-access
+    monkeypatch.setattr(browser_control, "_USE_SYNC_PLAYWRIGHT", False)
+    monkeypatch.setattr(browser_control, "_start_idle_watchdog", lambda: None)
+    monkeypatch.setattr(browser_control, "BROWSER_MAX_PAGES_PER_CONTEXT", 3)
+    monkeypatch.setattr(
+        browser_control,
+        "_pool",
+        BrowserContextPool(max_contexts=8, warm_spares=0),
+    )
+    browser = _FakeBrowser()
+    browser_control._state["browser"] = browser
+    yield browser
+    browser_control._reset_browser_state()
+
+
+async def _use(session: str, action: str, **kwargs) -> dict:
+    with browser_session(session):
+        response = await browser_control.browser_use(action, **kwargs)
+    return json.loads(response.content[0]["text"])
+
+
+async def test_browser_use_isolates_sessions(fake_browser) -> None:
+    assert (await _use("s1", "open", url="http://a/"))["ok"]
+    assert (await _use("s2", "open", url="http://b/"))["ok"]
+    await _use("s1", "tabs", tab_action="new")
+
+    s1 = await _use("s1", "tabs", tab_action="list")
+    s2 = await _use("s2", "tabs", tab_action="list")
+
+    assert s1["tabs"] == ["default", "page_1"]
+    assert s2["tabs"] == ["default"]
+    assert len(fake_browser.contexts) == 2
+    # Reopening a page_id replaces the page instead of leaking it.
+    first = fake_browser.contexts[1].pages[0]
+    await _use("s2", "open", url="http://c/")
+    assert first.closed
+    assert (await _use("s2", "tabs", tab_action="list"))["tabs"] == [
+        "default",
+    ]
+
+
+async def test_browser_use_limits_pages(fake_browser) -> None:
+    await _use("s1", "open", url="http://a/", page_id="one")
+    await _use("s1", "open", url="http://b/", page_id="two")
+    await _use("s1", "open", url="http://c/", page_id="three")
+    await _use("s1", "snapshot", page_id="one")  # "two" is now oldest
+    fake_browser.contexts[0].open_popup()  # a tab opened by the page
+
+    # Popups are registered as they come; the limit applies on open.
+    assert (await _use("s1", "open", url="http://d/", page_id="four"))["ok"]
+
+    tabs = (await _use("s1", "tabs", tab_action="list"))["tabs"]
+    assert tabs == ["one", "page_1", "four"]
+
+
+async def test_stop_keeps_browser_for_other_sessions(fake_browser) -> None:
+    await _use("s1", "open", url="http://a/")
+    await _use("s2", "open", url="http://b/")
+
+    stopped = await _use("s1", "stop")
+
+    assert "1 other session" in stopped["message"]
+    assert fake_browser.contexts[0].closed
+    assert not fake_browser.contexts[1].closed
+    assert (await _use("s2", "tabs", tab_action="list"))["count"] == 1
+
+
+class _FakePlaywright:
+    def __init__(self) -> None:
+        self.chromium = self.webkit = self
+        self.browsers: list[_FakeBrowser] = []
+
+    async def start(self) -> "_FakePlaywright":
+        return self
+
+    async def launch(self, **_kwargs) -> _FakeBrowser:
+        await asyncio.sleep(0.01)
+        browser = _FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+    async def stop(self) -> None:
+        pass
+
+
+async def test_concurrent_sessions_launch_one_browser(
+    fake_browser,
+    monkeypatch,
+) -> None:
+    # pylint: disable=protected-access
+    playwright = _FakePlaywright()
+    monkeypatch.setattr(
+        browser_control,
+        "_ensure_playwright_async",
+        lambda: lambda: playwright,
+    )
+    monkeypatch.setattr(browser_control, "_chromium_executable_path", str)
+    monkeypatch.setenv("COPAW_BROWSER_USE_DEFAULT", "0")
+    browser_control._state["browser"] = None
+
+    results = await asyncio.gather(
+        _use("s1", "open", url="http://a/"),
+        _use("s2", "open", url="http://b/"),
+    )
+
+    assert all(result["ok"] for result in results)
+    [browser] = playwright.browsers
+    assert len(browser.contexts) == 2
+    assert not any(context.closed for context in browser.contexts)
+    assert not fake_browser.contexts
+
+
+async def test_headed_restart_keeps_other_sessions(fake_browser) -> None:
+    await _use("s1", "open", url="http://a/")
+
+    started = await _use("s2", "start", headed=True)
+
+    assert not started["ok"]
+    assert "1 other session" in started["error"]
+    assert not fake_browser.contexts[0].closed
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from copaw.agents.tools import browser_control
+from copaw.agents.tools.browser_pool import (
+    BrowserContextPool,
+    browser_session,
+)
+from copaw.agents.tools.browser_snapshot import (
+    build_role_snapshot_from_aria,
+    diff_role_snapshot,
+)
+
+_FORM = """- heading "Sign in" [level=1]
+- navigation:
+  - link "Home":
+    - /url: /
+  - link "Help":
+    - /url: /help
+- textbox "Email"
+- textbox "Password"
+- checkbox "Remember me"
+- button "Sign in"
+- button "Sign in"
+- list:
+  - listitem: First
+  - listitem: Second"""
+
+
+def _snapshot(aria: str, previous: str | None = None):
+    snapshot, refs = build_role_snapshot_from_aria(aria)
+    if previous is None:
+        return snapshot, refs, None
+    return diff_role_snapshot(previous, snapshot, refs)
+
+
+def test_unchanged_snapshot_has_empty_diff() -> None:
+    first, refs, _ = _snapshot(_FORM)
+
+    again, again_refs, diff = _snapshot(_FORM, first)
+
+    assert again == first and again_refs == refs
+    assert diff == {"added": [], "changed": [], "removed": [], "ratio": 0.0}
+
+
+def test_refs_stay_stable_when_nodes_are_inserted() -> None:
+    first, refs, _ = _snapshot(_FORM)
+    aria = _FORM.replace(
+        '- textbox "Email"',
+        '- alert: Wrong password\n- button "Retry"\n- textbox "Email"',
+    )
+
+    second, second_refs, diff = _snapshot(aria, first)
+
+    # Refs of existing nodes carry over; the new button gets a fresh one.
+    assert '- textbox "Email" [ref=e4]' in second
+    assert second_refs["e4"] == refs["e4"]
+    new_ref = f"e{len(refs) + 1}"
+    assert diff["added"] == [
+        "- alert: Wrong password",
+        f'- button "Retry" [ref={new_ref}]',
+    ]
+    assert second_refs[new_ref] == {"role": "button", "name": "Retry"}
+    assert diff["changed"] == [] and diff["removed"] == []
+    assert set(second_refs) == set(refs) | {new_ref}
+
+
+def test_in_place_changes_and_removals() -> None:
+    first, _, _ = _snapshot(_FORM)
+    aria = (
+        _FORM.replace('- textbox "Email"', '- textbox "Email": a@b.c')
+        .replace('"Remember me"', '"Remember me" [checked]')
+        .replace('  - link "Help":\n    - /url: /help\n', "")
+        .replace('- button "Sign in"\n', "", 1)
+    )
+
+    second, second_refs, diff = _snapshot(aria, first)
+
+    assert diff["changed"] == [
+        '- textbox "Email" [ref=e4]: a@b.c',
+        '- checkbox "Remember me" [ref=e6] [checked]',
+    ]
+    assert diff["removed"] == [
+        '  - link "Help" [ref=e3]:',
+        "    - /url: /help",
+        '- button "Sign in" [ref=e7]',
+    ]
+    # Twin nodes are interchangeable; the one left is no longer a
+    # duplicate, so its ref resolves without nth.
+    assert second_refs["e8"] == {"role": "button", "name": "Sign in"}
+    assert "e3" not in second_refs and "e7" not in second_refs
+    assert diff["ratio"] == pytest.approx(5 / 14)
+    assert second.count("[ref=") == len(second_refs)
+
+
+class _FakeLocator:
+    def __init__(self, page: "_FakePage") -> None:
+        self._page = page
+
+    async def aria_snapshot(self) -> str:
+        return self._page.aria
+
+
+class _FakePage:
+    def __init__(self) -> None:
+        self.url = "http://site/login"
+        self.aria = _FORM
+
+    def locator(self, _selector: str) -> _FakeLocator:
+        return _FakeLocator(self)
+
+
+@pytest.fixture
+def page(monkeypatch):
+    # pylint: disable=protected-access
+    pool = BrowserContextPool(warm_spares=0)
+
+    async def new_context():
+        return object()
+
+    async def close_context(_context):
+        pass
+
+    pool.attach(new_context, close_context)
+    monkeypatch.setattr(browser_control, "_pool", pool)
+    monkeypatch.setattr(browser_control, "_USE_SYNC_PLAYWRIGHT", False)
+    fake = _FakePage()
+    yield fake
+    pool.clear()
+
+
+async def _snapshot_action(page: _FakePage, **kwargs) -> dict:
+    # pylint: disable=protected-access
+    with browser_session("s1"):
+        session = await browser_control._pool.checkout("s1")
+        session.state["pages"]["default"] = page
+        response = await browser_control.browser_use("snapshot", **kwargs)
+    return json.loads(response.content[0]["text"])
+
+
+async def test_snapshot_action_returns_diffs(page) -> None:
+    full = await _snapshot_action(page)
+    assert "snapshot" in full and "mode" not in full
+
+    page.aria = _FORM.replace('- textbox "Email"', '- textbox "Email": x')
+    diff = await _snapshot_action(page, snapshot_mode="diff")
+
+    assert diff["mode"] == "diff" and diff["base_digest"] == full["digest"]
+    assert diff["changed"] == ['- textbox "Email" [ref=e4]: x']
+    assert "snapshot" not in diff and "added" not in diff
+
+    forced = await _snapshot_action(page, snapshot_mode="full")
+    assert forced["digest"] == diff["digest"] and "e4" in forced["refs"]
+
+    page.aria = _FORM
+    default = await _snapshot_action(page)
+    assert "snapshot" in default and "mode" not in default
+
+
+async def test_snapshot_action_falls_back_to_full(page) -> None:
+    await _snapshot_action(page)
+
+    page.aria = "\n".join(f'- button "B{i}"' for i in range(20))
+    rebuilt = await _snapshot_action(page, snapshot_mode="diff")
+    assert "snapshot" in rebuilt  # too much changed
+
+    page.url = "http://site/home"
+    moved = await _snapshot_action(page, snapshot_mode="diff")
+    assert "snapshot" in moved and moved["refs"][0] == "e1"
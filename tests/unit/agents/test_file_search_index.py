@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name
+from __future__ import annotations
+
+import os
+import re
+import time
+from pathlib import Path
+
+import pytest
+
+from copaw.agents.tools import file_search, search_index
+from copaw.agents.tools.search_index import (
+    SearchIndex,
+    compile_recursive_glob,
+    content_signature,
+    get_search_index,
+    required_trigrams,
+)
+
+
+@pytest.fixture(autouse=True)
+def working_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_index, "WORKING_DIR", tmp_path / "wd")
+    (tmp_path / "wd").mkdir()
+    search_index.reset_search_indexes()
+    yield
+    search_index.reset_search_indexes()
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "ws"
+    files = {
+        "a.py": "import os\ndef handler():\n    return os.getcwd()\n",
+        "pkg/b.py": "class Handler:\n    pass\n",
+        "pkg/sub/c.txt": "nothing here\nHANDLER upper\n",
+        "pkg/sub/d.md": "# Notes\n\nsee handler() in a.py\n",
+        "img.png": "handler",
+        "empty.txt": "",
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return root
+
+
+def _text(response) -> str:
+    return response.content[0]["text"]
+
+
+def _reference_grep(root: Path, regex: re.Pattern) -> list[str]:
+    out = []
+    for path in sorted(root.rglob("*")):
+        if not path.is_file() or path.suffix == ".png":
+            continue
+        lines = path.read_text(encoding="utf-8").splitlines()
+        for no, line in enumerate(lines, start=1):
+            if regex.search(line):
+                out.append(f"{path.relative_to(root)}:{no}:> {line}")
+    return out
+
+
+@pytest.mark.parametrize(
+    ("pattern", "is_regex", "case_sensitive"),
+    [
+        ("handler", False, True),
+        ("handler", False, False),
+        (r"def \w+\(", True, True),
+        ("(?i)handler", True, True),
+        ("xyz-not-there", False, True),
+    ],
+)
+async def test_grep_matches_full_scan(
+    tree,
+    pattern,
+    is_regex,
+    case_sensitive,
+) -> None:
+    flags = 0 if case_sensitive else re.IGNORECASE
+    regex = re.compile(pattern if is_regex else re.escape(pattern), flags)
+    expected = _reference_grep(tree, regex)
+
+    # Twice: the second run filters with the signatures built after
+    # the first.
+    for _ in range(2):
+        get_search_index(tree)[0].wait_signed(timeout=10)
+        response = await file_search.grep_search(
+            pattern,
+            str(tree),
+            is_regex=is_regex,
+            case_sensitive=case_sensitive,
+        )
+        if expected:
+            assert _text(response).splitlines() == expected
+        else:
+            assert _text(response).startswith("No matches found")
+
+
+async def test_grep_sees_changes_and_context(tree) -> None:
+    await file_search.grep_search("handler", str(tree))
+    (tree / "pkg/b.py").write_text("x = 1\nhandler = None\ny = 2\n")
+    (tree / "a.py").unlink()
+    # Make sure the rewrite is visible even on coarse mtime clocks.
+    os.utime(tree / "pkg/b.py", ns=(time.time_ns(), time.time_ns() + 10**9))
+
+    response = await file_search.grep_search(
+        "handler",
+        str(tree / "pkg"),
+        context_lines=1,
+    )
+
+    assert _text(response).splitlines() == [
+        os.path.join("b.py") + ":1:  x = 1",
+        os.path.join("b.py") + ":2:> handler = None",
+        os.path.join("b.py") + ":3:  y = 2",
+        "---",
+        os.path.join("sub", "d.md") + ":2:  ",
+        os.path.join("sub", "d.md") + ":3:> see handler() in a.py",
+        "---",
+    ]
+
+
+async def test_grep_truncates(tree) -> None:
+    (tree / "many.txt").write_text("hit\n" * 300)
+
+    response = await file_search.grep_search("hit", str(tree))
+
+    lines = _text(response).splitlines()
+    assert lines[-1] == "(Results truncated at 200 matches.)"
+    assert len(lines) == 202
+
+
+async def test_candidates_skip_files_without_trigrams(tree) -> None:
+    await file_search.grep_search("handler", str(tree))
+    index, subdir = get_search_index(tree)
+    assert index.wait_signed(timeout=10)
+
+    found = index.candidates(
+        subdir,
+        required_trigrams("getcwd", False, False),
+    )
+
+    assert found == ["a.py"]
+    # Subdirectories reuse the parent index.
+    sub_index, sub = get_search_index(tree / "pkg")
+    assert sub_index is index and sub == "pkg"
+
+
+async def test_index_persists(tree) -> None:
+    await file_search.grep_search("handler", str(tree))
+    get_search_index(tree)[0].wait_signed(timeout=10)
+    search_index.save_search_indexes()
+    search_index.reset_search_indexes()
+
+    index, _ = get_search_index(tree)
+
+    assert len(index) == 6
+    assert index.refresh() == 0
+
+
+def test_serialization_round_trip(tree) -> None:
+    # pylint: disable=protected-access
+    index = SearchIndex(tree)
+    (tree / "x.txt").write_text("some text")
+    index.refresh()
+    index.wait_signed()
+    index.set_signature(
+        "x.txt",
+        tuple(index._files["x.txt"][:2]),
+        content_signature(b"some text"),
+    )
+
+    loaded = SearchIndex.from_bytes(tree, index.to_bytes())
+
+    assert loaded._files == index._files
+    assert loaded._dirs == index._dirs
+
+
+def test_regex_trigrams() -> None:
+    assert required_trigrams("foo(bar|baz)qu+x", True, False) == (
+        required_trigrams("foo", False, False)
+    )
+    assert not required_trigrams("a|bcdef", True, False)
+    assert not required_trigrams("é€", False, True)
+    # IGNORECASE matches i, k and s to non-ASCII letters too.
+    assert required_trigrams("class", False, True) == (
+        required_trigrams("cla", False, False)
+    )
+
+
+async def test_ignore_case_finds_unicode_case_variants(tree) -> None:
+    (tree / "folded.txt").write_text("clas\u017f file\n", encoding="utf-8")
+    await file_search.grep_search("handler", str(tree))
+    assert get_search_index(tree)[0].wait_signed(timeout=10)
+
+    response = await file_search.grep_search(
+        "class",
+        str(tree),
+        case_sensitive=False,
+    )
+
+    assert "folded.txt:1:" in _text(response)
+
+
+async def test_glob_recursive_matches_pathlib(tree) -> None:
+    for pattern in ("**/*.py", "pkg/**/*", "**/sub", "*.py", "pkg/*"):
+        expected = [
+            str(p.relative_to(tree)) + ("/" if p.is_dir() else "")
+            for p in sorted(tree.glob(pattern))
+        ]
+        response = await file_search.glob_search(pattern, str(tree))
+        assert _text(response).splitlines() == expected, pattern
+
+    assert compile_recursive_glob("*.py") is None
+    assert compile_recursive_glob("**") is None
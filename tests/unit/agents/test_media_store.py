@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name
+from __future__ import annotations
+
+import asyncio
+import base64
+import http.server
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from copaw.agents.utils.file_handling import download_file_from_url
+from copaw.agents.utils.media_store import MediaStore, MediaTooLargeError
+
+_PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 40
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits: Counter = Counter()
+    bodies: Counter = Counter()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, body: bytes, **headers) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(body)
+        type(self).bodies[self.path] += 1
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        type(self).hits[self.path] += 1
+        if self.path.startswith("/etag"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send(_PNG, Content_Type="image/png", ETag='"v1"')
+        elif self.path.startswith("/fresh"):
+            self._send(_PNG, Cache_Control="max-age=60")
+        elif self.path.startswith("/plain"):
+            self._send(_PNG, Content_Type="application/octet-stream")
+        elif self.path.startswith("/slow"):
+            self.send_response(200)
+            self.send_header("Content-Length", "40")
+            self.end_headers()
+            for _ in range(4):
+                time.sleep(0.1)
+                self.wfile.write(b"x" * 10)
+                self.wfile.flush()
+        elif self.path == "/huge-declared":
+            self.send_response(200)
+            self.send_header("Content-Length", str(1 << 30))
+            self.end_headers()
+        elif self.path == "/huge-chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            chunk = b"y" * 65536
+            try:
+                for _ in range(1 << 14):  # up to 1 GiB
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.write(b"0\r\n\r\n")
+            except OSError:
+                pass
+        else:
+            self.send_error(404)
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> MediaStore:
+    _Handler.hits.clear()
+    _Handler.bodies.clear()
+    return MediaStore(tmp_path / "store", max_file_bytes=1 << 20)
+
+
+def _stored_files(store: MediaStore) -> list[str]:
+    return sorted(
+        str(p.relative_to(store.root))
+        for p in store.root.glob("*/*")
+        if p.is_file()
+    )
+
+
+async def test_revalidates_with_etag_instead_of_downloading(
+    server,
+    store,
+) -> None:
+    first = await store.ingest_url(f"{server}/etag/photo")
+    again = await store.ingest_url(f"{server}/etag/photo")
+
+    assert first == again and first.endswith("photo.png")
+    assert Path(first).read_bytes() == _PNG
+    assert _Handler.hits["/etag/photo"] == 2
+    assert _Handler.bodies["/etag/photo"] == 1
+
+    # The URL cache survives a restart.
+    restarted = MediaStore(store.root)
+    assert await restarted.ingest_url(f"{server}/etag/photo") == first
+    assert _Handler.bodies["/etag/photo"] == 1
+
+
+async def test_fresh_response_is_reused_without_request(
+    server,
+    store,
+) -> None:
+    first = await store.ingest_url(f"{server}/fresh/a.png")
+    renamed = await store.ingest_url(f"{server}/fresh/a.png", "forward.png")
+
+    assert _Handler.hits["/fresh/a.png"] == 1
+    assert Path(renamed).parent == Path(first).parent
+    assert os.path.samefile(first, renamed)
+
+
+async def test_identical_content_is_stored_once(server, store) -> None:
+    paths = await asyncio.gather(
+        *(store.ingest_url(f"{server}/plain/{i}.file") for i in range(3)),
+        store.ingest_bytes(_PNG, "pasted.png"),
+        store.ingest_base64(base64.b64encode(_PNG).decode()),
+    )
+
+    assert len({Path(p).parent for p in paths}) == 1
+    assert _stored_files(store) == sorted(
+        f"{Path(paths[0]).parent.name}/{name}"
+        for name in ("0.png", "1.png", "2.png", "pasted.png", "file.png")
+    )
+    assert store.stats()["files"] == 1
+    assert store.stats()["bytes"] == len(_PNG)
+
+
+async def test_concurrent_requests_share_one_download(server, store) -> None:
+    paths = await asyncio.gather(
+        *(store.ingest_url(f"{server}/plain/same") for _ in range(5)),
+    )
+
+    assert len(set(paths)) == 1 and paths[0].endswith("same.png")
+    assert _Handler.hits["/plain/same"] == 1
+
+
+async def test_downloads_are_bounded_and_timed(
+    server,
+    tmp_path: Path,
+) -> None:
+    store = MediaStore(tmp_path / "store", concurrency=2)
+    urls = [f"{server}/slow?{i}" for i in range(4)]
+    _Handler.hits.clear()
+
+    started = time.monotonic()
+    await asyncio.gather(*(store.ingest_url(url) for url in urls[:1]))
+    single = time.monotonic() - started
+    started = time.monotonic()
+    paths = await asyncio.gather(*(store.ingest_url(url) for url in urls))
+    elapsed = time.monotonic() - started
+
+    assert len(set(paths)) == 1  # same bytes from every URL
+    assert elapsed >= 1.5 * single
+
+    slow = MediaStore(tmp_path / "other", timeout=0.15)
+    with pytest.raises(TimeoutError):
+        await slow.ingest_url(f"{server}/slow")
+    assert not list((tmp_path / "other" / ".tmp").iterdir())
+
+
+@pytest.mark.parametrize("path", ["/huge-declared", "/huge-chunked"])
+async def test_size_cap_applies_while_streaming(
+    server,
+    store,
+    path: str,
+) -> None:
+    started = time.monotonic()
+    with pytest.raises(MediaTooLargeError):
+        await store.ingest_url(f"{server}{path}")
+
+    assert time.monotonic() - started < 5
+    assert not list((store.root / ".tmp").iterdir())
+    assert store.stats()["files"] == 0
+    with pytest.raises(MediaTooLargeError):
+        await store.ingest_base64("A" * (2 << 20))
+
+
+async def test_keeps_files_without_limits(tmp_path: Path) -> None:
+    store = MediaStore(tmp_path / "store")
+    a = await store.ingest_bytes(b"a" * 1000, "a.txt")
+    past = time.time() - 30 * 24 * 3600
+    os.utime(Path(a).parent, (past, past))
+
+    await MediaStore(tmp_path / "store").ingest_bytes(b"b" * 10, "b.txt")
+
+    assert Path(a).is_file()
+
+
+async def test_evicts_least_recently_used_and_expired(tmp_path: Path) -> None:
+    store = MediaStore(tmp_path / "store", max_bytes=2500)
+    a = await store.ingest_bytes(b"a" * 1000, "a.txt")
+    b = await store.ingest_bytes(b"b" * 1000, "b.txt")
+    await store.ingest_bytes(b"a" * 1000, "a.txt")  # "b" is now oldest
+    c = await store.ingest_bytes(b"c" * 1000, "c.txt")
+
+    assert Path(a).is_file() and Path(c).is_file()
+    assert not Path(b).exists()
+    assert store.stats()["bytes"] == 2000
+
+    expiring = MediaStore(tmp_path / "store", ttl=60)
+    past = time.time() - 120
+    os.utime(Path(a).parent, (past, past))
+    await expiring.ingest_bytes(b"d" * 10, "d.txt")
+
+    assert not Path(a).exists() and Path(c).is_file()
+
+
+async def test_download_file_from_url_places_file(
+    server,
+    store,
+    tmp_path: Path,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(
+        "copaw.agents.utils.file_handling.get_media_store",
+        lambda: store,
+    )
+    target = tmp_path / "imessage"
+
+    path = await download_file_from_url(
+        f"{server}/etag/x",
+        filename="report_1.file",
+        download_dir=str(target),
+    )
+
+    assert path == str(target / "report_1.png")
+    assert Path(path).read_bytes() == _PNG
+    # A private, writable copy: editing it leaves the stored file intact.
+    stored = await store.ingest_url(f"{server}/etag/x")
+    assert not os.path.samefile(path, stored)
+    assert not os.stat(stored).st_mode & 0o222
+    Path(path).write_bytes(b"edited")
+    assert Path(stored).read_bytes() == _PNG
+    assert await download_file_from_url(path) == str(Path(path).resolve())
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""MemoryCompactionHook with a fake slow summarizer.
+
+Each message "costs" 10 tokens. With max_input_length=1000, the default
+compact ratio (0.75) and reserve ratio (0.1), compaction starts in the
+background at 0.8 * 750 = 600 tokens and a reply only blocks at
+1000 - 100 = 900 tokens.
+"""
+# pylint: disable=protected-access,unused-argument
+from __future__ import annotations
+
+import asyncio
+import itertools
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from copaw.agents.hooks import memory_compaction
+from copaw.agents.hooks.memory_compaction import MemoryCompactionHook
+from copaw.config.config import AgentsRunningConfig
+
+_TOKENS_PER_MSG = 10
+_ids = itertools.count()
+
+
+class FakeMemory:
+    def __init__(self) -> None:
+        self.messages: list[SimpleNamespace] = []
+        self.compressed: set[str] = set()
+        self.summary = ""
+
+    def add(self, count: int) -> None:
+        for _ in range(count):
+            self.messages.append(
+                SimpleNamespace(id=f"m{next(_ids)}", content="x"),
+            )
+
+    def get_compressed_summary(self) -> str:
+        return self.summary
+
+    async def get_memory(self, prepend_summary: bool = True):
+        return [m for m in self.messages if m.id not in self.compressed]
+
+    async def update_compressed_summary(self, summary: str) -> None:
+        self.summary = summary
+
+    async def update_messages_mark(self, new_mark, msg_ids) -> int:
+        self.compressed.update(msg_ids)
+        return len(msg_ids)
+
+
+class SlowSummarizer:
+    """Memory manager whose compact_memory is a slow LLM call."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.token_counter = None
+
+    async def check_context(
+        self,
+        messages,
+        memory_compact_threshold,
+        memory_compact_reserve,
+        token_counter,
+    ):
+        if len(messages) * _TOKENS_PER_MSG < memory_compact_threshold:
+            return [], messages, True
+        keep = memory_compact_reserve // _TOKENS_PER_MSG
+        return messages[:-keep], messages[-keep:], True
+
+    async def compact_memory(self, messages, previous_summary=""):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"{previous_summary}+{len(messages)}"
+
+    def add_async_summary_task(self, messages) -> None:
+        pass
+
+
+class FakeTokenCache:
+    def total(self, messages) -> int:
+        return len(messages) * _TOKENS_PER_MSG
+
+
+@pytest.fixture(autouse=True)
+def _setup(monkeypatch):
+    config = SimpleNamespace(
+        agents=SimpleNamespace(
+            running=AgentsRunningConfig(max_input_length=1000),
+        ),
+    )
+    monkeypatch.setattr(
+        memory_compaction,
+        "get_config_snapshot",
+        lambda: config,
+    )
+    monkeypatch.setattr(
+        memory_compaction,
+        "get_message_token_cache",
+        FakeTokenCache,
+    )
+    monkeypatch.setattr(memory_compaction, "safe_count_str_tokens", len)
+    monkeypatch.setattr(memory_compaction, "MEMORY_COMPACT_BACKGROUND", True)
+    monkeypatch.setattr(memory_compaction, "MEMORY_COMPACT_WATERMARK", 0.8)
+    monkeypatch.setattr(memory_compaction, "_pending", OrderedDict())
+    memory_compaction._stats.reset()
+
+
+def _agent(memory: FakeMemory, session_id: str = "s1") -> SimpleNamespace:
+    return SimpleNamespace(
+        memory=memory,
+        sys_prompt_token_count=0,
+        _request_context={"session_id": session_id, "user_id": "u"},
+    )
+
+
+async def test_background_summary_is_swapped_in_without_blocking() -> None:
+    summarizer = SlowSummarizer(delay=0.2)
+    hook = MemoryCompactionHook(summarizer)
+    memory = FakeMemory()
+    agent = _agent(memory)
+
+    memory.add(65)  # 650 tokens: above the watermark, far from overflow
+    await asyncio.wait_for(hook(agent, {}), timeout=0.1)
+    assert summarizer.calls == 1
+    assert not memory.compressed
+
+    memory.add(2)
+    await asyncio.wait_for(hook(agent, {}), timeout=0.1)  # still running
+    await asyncio.sleep(0.25)
+    memory.add(2)
+    await asyncio.wait_for(hook(agent, {}), timeout=0.1)
+
+    assert memory.summary == "+55"
+    assert len(memory.compressed) == 55
+    stats = memory_compaction.get_compaction_stats()
+    assert stats["background_applied"] == 1
+    assert stats["blocking_count"] == 0
+
+
+async def test_overflow_waits_for_the_pending_summary() -> None:
+    summarizer = SlowSummarizer(delay=0.1)
+    hook = MemoryCompactionHook(summarizer)
+    memory = FakeMemory()
+    agent = _agent(memory)
+
+    memory.add(65)
+    await hook(agent, {})
+    memory.add(30)  # 950 tokens: would overflow
+    await hook(agent, {})
+
+    assert summarizer.calls == 1
+    assert memory.summary == "+55"
+    stats = memory_compaction.get_compaction_stats()
+    assert stats["blocking_count"] == 1
+    assert 0 < stats["blocking_seconds"] <= 0.2
+
+
+async def test_stale_summary_is_discarded_and_overflow_compacts() -> None:
+    summarizer = SlowSummarizer(delay=0.01)
+    hook = MemoryCompactionHook(summarizer)
+    memory = FakeMemory()
+    agent = _agent(memory)
+
+    memory.add(65)
+    await hook(agent, {})
+    await asyncio.sleep(0.05)
+    memory.summary = "cleared"  # e.g. /compact ran meanwhile
+    memory.add(30)
+    await hook(agent, {})
+
+    stats = memory_compaction.get_compaction_stats()
+    assert stats["background_discarded"] == 1
+    assert stats["blocking_count"] == 1
+    assert memory.summary == "cleared+85"
+
+
+async def test_summary_carries_over_to_the_next_request() -> None:
+    summarizer = SlowSummarizer(delay=0.05)
+    hook = MemoryCompactionHook(summarizer)
+    first = FakeMemory()
+    first.add(65)
+    await hook(_agent(first), {})
+
+    # Next request of the same session: memory reloaded from the store
+    await asyncio.sleep(0.1)
+    second = FakeMemory()
+    second.messages = list(first.messages)
+    second.add(1)
+    await hook(_agent(second), {})
+
+    assert summarizer.calls == 1
+    assert len(second.compressed) == 55
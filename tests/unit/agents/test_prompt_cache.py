@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from copaw.agents import prompt as prompt_module
+from copaw.agents.prompt import PromptBuilder, clear_prompt_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_prompt_cache()
+    yield
+    clear_prompt_cache()
+
+
+def _bump_mtime(path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_unchanged_files_are_read_once(tmp_path, monkeypatch) -> None:
+    (tmp_path / "AGENTS.md").write_text("---\nk: v\n---\n\nrules")
+    (tmp_path / "SOUL.md").write_text("soul")
+    reads = []
+    original = prompt_module.Path.read_text
+
+    def read_text(self, *args, **kwargs):
+        reads.append(self.name)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(prompt_module.Path, "read_text", read_text)
+
+    first = PromptBuilder(tmp_path).build()
+    second = PromptBuilder(tmp_path).build()
+
+    assert first == "# AGENTS.md\n\n\n\nrules\n\n\n\n# SOUL.md\n\n\n\nsoul"
+    assert second is first
+    assert sorted(reads) == ["AGENTS.md", "SOUL.md"]
+
+
+def test_changed_or_new_file_invalidates_prompt(tmp_path) -> None:
+    soul = tmp_path / "SOUL.md"
+    soul.write_text("old")
+    assert PromptBuilder(tmp_path).build().endswith("old")
+
+    soul.write_text("new")
+    _bump_mtime(soul)
+    assert PromptBuilder(tmp_path).build().endswith("new")
+
+    (tmp_path / "PROFILE.md").write_text("me")
+    built = PromptBuilder(tmp_path).build()
+    assert built.endswith("# PROFILE.md\n\n\n\nme")
+
+    (tmp_path / "PROFILE.md").unlink()
+    assert PromptBuilder(tmp_path).build().endswith("new")
+
+
+def test_enabled_files_are_cached_separately(tmp_path) -> None:
+    (tmp_path / "AGENTS.md").write_text("a")
+    (tmp_path / "SOUL.md").write_text("s")
+
+    assert PromptBuilder(tmp_path, ["SOUL.md"]).build() == (
+        "# SOUL.md\n\n\n\ns"
+    )
+    assert "AGENTS.md" in PromptBuilder(tmp_path).build()
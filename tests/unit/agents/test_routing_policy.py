@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+from agentscope.formatter import FormatterBase
+from agentscope.model import ChatModelBase
+
+from copaw.agents import routing_chat_model as routing
+from copaw.agents.routing_chat_model import (
+    EndpointStats,
+    RoutingChatModel,
+    RoutingEndpoint,
+    RoutingPolicy,
+)
+from copaw.config.config import AgentsLLMRoutingConfig
+
+
+def _stats(seconds: float, count: int = 10, tokens: int = 1000):
+    stats = EndpointStats()
+    for _ in range(count):
+        stats.begin()
+        stats.end(seconds, tokens)
+    return stats
+
+
+def _policy(local: float, cloud: float, **cfg: Any) -> RoutingPolicy:
+    return RoutingPolicy(
+        AgentsLLMRoutingConfig(mode="adaptive", **cfg),
+        local_stats=_stats(local),
+        cloud_stats=_stats(cloud),
+        clock=lambda: 0.0,
+    )
+
+
+def test_fixed_modes_ignore_load() -> None:
+    local_first = RoutingPolicy(AgentsLLMRoutingConfig())
+    cloud_first = RoutingPolicy(AgentsLLMRoutingConfig(mode="cloud_first"))
+    local_first.local_stats.begin()
+
+    assert local_first.decide(prompt_tokens=10**6).route == "local"
+    assert cloud_first.decide().route == "cloud"
+
+
+def test_adaptive_picks_faster_side() -> None:
+    assert _policy(local=1.0, cloud=2.0).decide(prompt_tokens=1000).route == (
+        "local"
+    )
+    decision = _policy(local=3.0, cloud=2.0).decide(prompt_tokens=1000)
+    assert decision.route == "cloud"
+    assert decision.estimates == {"local": 3.0, "cloud": 2.0}
+
+
+def test_local_queue_depth_shifts_to_cloud() -> None:
+    policy = _policy(local=1.0, cloud=2.5)
+    assert policy.decide(prompt_tokens=1000).route == "local"
+
+    policy.local_stats.begin()
+    policy.local_stats.begin()
+    decision = policy.decide(prompt_tokens=1000)
+
+    assert decision.route == "cloud"
+    assert "local_queue:2" in decision.reasons
+
+
+def test_estimate_scales_with_prompt_size() -> None:
+    stats = _stats(1.0, tokens=1000)
+    assert stats.p95_latency(4000) == 4.0
+    # Prompts below the floor cost the same as the floor.
+    assert stats.p95_latency(10) == stats.p95_latency(256)
+
+
+def test_hard_constraints() -> None:
+    private = _policy(local=5.0, cloud=1.0, cloud_allowed=False)
+    assert private.decide(prompt_tokens=1000).reasons == [
+        "privacy:local_only",
+    ]
+
+    no_tools = _policy(local=1.0, cloud=5.0, local_tools=False)
+    assert no_tools.decide(tools_available=True).route == "cloud"
+    assert no_tools.decide(tools_available=False).route == "local"
+
+    small_ctx = _policy(local=1.0, cloud=5.0, local_max_prompt_tokens=2000)
+    assert small_ctx.decide(prompt_tokens=3000).route == "cloud"
+
+
+def test_cold_start_explores_both_sides() -> None:
+    policy = RoutingPolicy(
+        AgentsLLMRoutingConfig(mode="adaptive"),
+        clock=lambda: 0.0,
+    )
+    assert policy.decide().reasons == ["explore:local"]
+    policy.local_stats = _stats(1.0)
+    assert policy.decide().reasons == ["explore:cloud"]
+
+
+def test_stale_side_is_probed() -> None:
+    now = [1000.0]
+    policy = _policy(local=1.0, cloud=2.0)
+    policy._clock = lambda: now[0]  # pylint: disable=protected-access
+
+    decision = policy.decide(prompt_tokens=1000)
+    assert decision.route == "cloud"
+    assert "probe:stale" in decision.reasons
+    assert policy.decide(prompt_tokens=1000).route == "local"
+
+
+class FakeModel(ChatModelBase):
+    def __init__(self, name: str, delay: float = 0.0) -> None:
+        super().__init__(model_name=name, stream=False)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.model_name
+
+
+def _endpoint(model: FakeModel) -> RoutingEndpoint:
+    return RoutingEndpoint(
+        provider_id=f"{model.model_name}-provider",
+        model_name=model.model_name,
+        model=model,
+        formatter=None,
+        formatter_family=FormatterBase,
+    )
+
+
+async def test_routing_model_tracks_load_and_traces(
+    tmp_path,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(routing, "WORKING_DIR", tmp_path)
+    monkeypatch.setattr(routing, "LLM_ROUTING_TRACE_FILE", "trace.jsonl")
+    monkeypatch.setattr(routing, "_endpoint_stats", {})
+    local, cloud = FakeModel("local", delay=0.05), FakeModel("cloud")
+    model = RoutingChatModel(
+        local_endpoint=_endpoint(local),
+        cloud_endpoint=_endpoint(cloud),
+        routing_cfg=AgentsLLMRoutingConfig(mode="adaptive"),
+    )
+    messages = [{"role": "user", "content": "hi"}]
+
+    results = await asyncio.gather(model(messages), model(messages))
+
+    # First call explores local; while it is busy the second goes cloud.
+    assert sorted(results) == ["cloud", "local"]
+    assert model.policy.local_stats.in_flight == 0
+    assert model.policy.local_stats.sample_count == 1
+    routing._write_trace()  # pylint: disable=protected-access
+    records = [
+        json.loads(line)
+        for line in (tmp_path / "trace.jsonl").read_text().splitlines()
+    ]
+    assert {r["route"] for r in records} == {"local", "cloud"}
+    assert all(r["ok"] and r["latency"] >= 0 for r in records)
+
+
+async def test_routing_log_level_follows_mode(caplog) -> None:
+    local, cloud = FakeModel("local"), FakeModel("cloud")
+    messages = [{"role": "user", "content": "hi"}]
+    for mode, level in (("local_first", "DEBUG"), ("adaptive", "INFO")):
+        model = RoutingChatModel(
+            local_endpoint=_endpoint(local),
+            cloud_endpoint=_endpoint(cloud),
+            routing_cfg=AgentsLLMRoutingConfig(mode=mode),
+        )
+        caplog.clear()
+        with caplog.at_level("DEBUG", logger=routing.__name__):
+            await model(messages)
+        [entry] = [
+            r for r in caplog.records if "routing decision" in r.message
+        ]
+        assert entry.levelname == level
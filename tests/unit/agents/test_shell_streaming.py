@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import shutil
+import sys
+
+import pytest
+
+from copaw.agents.tools import shell
+from copaw.agents.tools.utils import HeadTailBuffer
+
+posix_only = pytest.mark.skipif(
+    sys.platform == "win32",
+    reason="uses POSIX shell utilities",
+)
+
+
+async def _run(command: str, **kwargs) -> list:
+    return [
+        chunk async for chunk in shell.execute_shell_command(command, **kwargs)
+    ]
+
+
+def _text(chunk) -> str:
+    return chunk.content[0]["text"]
+
+
+def test_head_tail_buffer_keeps_both_ends() -> None:
+    buffer = HeadTailBuffer(head_bytes=32, tail_bytes=64)
+    for i in range(1, 10001):
+        buffer.feed(f"line {i}\n".encode())
+
+    text = buffer.render(lambda data: data.decode().strip("\n"))
+
+    assert text.startswith("line 1\nline 2\n")
+    assert text.endswith("line 9999\nline 10000")
+    assert "of 10000 total (" in text
+    assert buffer.total_bytes == sum(
+        len(f"line {i}\n") for i in range(1, 10001)
+    )
+    # pylint: disable=protected-access
+    assert len(buffer._head) == 32 and len(buffer._tail) <= 128
+
+
+def test_head_tail_buffer_limits_lines() -> None:
+    buffer = HeadTailBuffer()
+    buffer.feed(b"y\n" * 3000)
+
+    lines = buffer.render(lambda data: data.decode().strip("\n")).split("\n")
+
+    assert lines[250:253] == [
+        "",
+        "[Output truncated: showing lines 1-250 and 2251-3000 of 3000 "
+        "total (6000 bytes)]",
+        "",
+    ]
+    assert len(lines) == 1000 + 3
+
+
+@posix_only
+async def test_final_response_format() -> None:
+    ok = await _run("echo hello")
+    failed = await _run("echo out; echo err >&2; exit 3")
+
+    assert _text(ok[-1]) == "hello" and ok[-1].is_last
+    assert _text(failed[-1]) == (
+        "Command failed with exit code 3.\n[stdout]\nout\n[stderr]\nerr"
+    )
+
+
+@posix_only
+async def test_progress_is_streamed(monkeypatch) -> None:
+    monkeypatch.setattr(shell, "SHELL_PROGRESS_INTERVAL", 0.05)
+
+    chunks = await _run("echo started; sleep 0.5; echo done")
+
+    progress = [c for c in chunks if not c.is_last]
+    assert progress and "started" in _text(progress[0])
+    assert "done" not in _text(progress[0])
+    assert _text(chunks[-1]) == "started\ndone"
+
+
+@posix_only
+async def test_timeout_keeps_partial_output() -> None:
+    chunks = await _run("echo partial; sleep 5", timeout=1)
+
+    text = _text(chunks[-1])
+    assert text.startswith("Command failed with exit code -1.")
+    assert "partial" in text and "TimeoutError" in text
+
+
+@pytest.mark.skipif(
+    sys.platform == "win32"
+    or not (shutil.which("yes") and shutil.which("head")),
+    reason="needs yes and head",
+)
+async def test_huge_output_keeps_memory_bounded() -> None:
+    resource = pytest.importorskip("resource")
+    peak_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    chunks = await _run("yes | head -c 1G", timeout=300)
+
+    peak_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    assert (peak_after - peak_before) * scale < 64 * 1024 * 1024
+    text = _text(chunks[-1])
+    assert "of 536870912 total (1073741824 bytes)" in text
+    assert len(text) < 64 * 1024
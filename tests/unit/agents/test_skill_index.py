@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=protected-access
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from copaw.agents import skill_index as skill_index_module
+from copaw.agents.skill_index import SkillIndex, get_skill_index
+
+
+@pytest.fixture(autouse=True)
+def _isolated_indexes(tmp_path, monkeypatch):
+    monkeypatch.setattr(skill_index_module, "_indexes", {})
+    monkeypatch.setattr(skill_index_module, "_loaded_from_disk", False)
+    monkeypatch.setattr(
+        skill_index_module,
+        "_index_path",
+        lambda: tmp_path / "skill_index.json",
+    )
+
+
+def _write_skill(root, name, description="does things", extra=None):
+    skill_dir = root / name
+    skill_dir.mkdir(parents=True, exist_ok=True)
+    (skill_dir / "SKILL.md").write_text(
+        f"---\nname: {name}\ndescription: {description}\n---\n\nBody",
+    )
+    for rel, content in (extra or {}).items():
+        path = skill_dir / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return skill_dir
+
+
+def _bump_mtime(path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def _count_parses(monkeypatch) -> list[str]:
+    parsed = []
+    original = skill_index_module._parse_skill_md
+
+    def parse(skill_md):
+        parsed.append(skill_md.parent.name)
+        return original(skill_md)
+
+    monkeypatch.setattr(skill_index_module, "_parse_skill_md", parse)
+    return parsed
+
+
+def test_unchanged_skills_are_parsed_once(tmp_path, monkeypatch) -> None:
+    root = tmp_path / "active_skills"
+    _write_skill(root, "alpha")
+    _write_skill(root, "beta", "second")
+    (root / "notes").mkdir()
+    parsed = _count_parses(monkeypatch)
+
+    index = get_skill_index(root)
+    entries = index.entries()
+    assert sorted(entries) == ["alpha", "beta"]
+    assert entries["beta"].description == "second"
+    assert not index.refresh()
+    assert sorted(parsed) == ["alpha", "beta"]
+
+
+def test_changes_are_picked_up(tmp_path, monkeypatch) -> None:
+    root = tmp_path / "active_skills"
+    alpha = _write_skill(root, "alpha")
+    index = get_skill_index(root)
+    index.entries()
+    parsed = _count_parses(monkeypatch)
+
+    (alpha / "SKILL.md").write_text(
+        "---\nname: alpha\ndescription: changed text\n---\n",
+    )
+    _bump_mtime(alpha / "SKILL.md")
+    assert index.entries()["alpha"].description == "changed text"
+
+    # A directory gains its SKILL.md after it was first seen
+    (root / "gamma").mkdir()
+    assert sorted(index.names()) == ["alpha"]
+    _write_skill(root, "gamma")
+    _bump_mtime(root / "gamma")
+    assert sorted(index.names()) == ["alpha", "gamma"]
+
+    (alpha / "SKILL.md").unlink()
+    _bump_mtime(alpha)
+    assert index.names() == ["gamma"]
+    assert parsed == ["alpha", "gamma"]
+
+
+def test_index_is_restored_from_disk(tmp_path, monkeypatch) -> None:
+    root = tmp_path / "active_skills"
+    _write_skill(root, "alpha")
+    get_skill_index(root).entries()
+    saved = json.loads((tmp_path / "skill_index.json").read_text())
+    assert str(root) in saved["roots"]
+
+    monkeypatch.setattr(skill_index_module, "_indexes", {})
+    monkeypatch.setattr(skill_index_module, "_loaded_from_disk", False)
+    parsed = _count_parses(monkeypatch)
+    assert get_skill_index(root).names() == ["alpha"]
+    assert not parsed
+
+
+def test_tree_digest_tracks_content(tmp_path) -> None:
+    left = tmp_path / "builtin"
+    right = tmp_path / "active"
+    _write_skill(left, "alpha", extra={"scripts/run.sh": "echo 1"})
+    copy = _write_skill(right, "alpha", extra={"scripts/run.sh": "echo 1"})
+
+    left_index, right_index = SkillIndex(left), SkillIndex(right)
+    assert left_index.tree_digest("alpha") == right_index.tree_digest(
+        "alpha",
+    )
+
+    (copy / "scripts" / "run.sh").write_text("echo 2")
+    _bump_mtime(copy / "scripts" / "run.sh")
+    assert left_index.tree_digest("alpha") != right_index.tree_digest(
+        "alpha",
+    )
+    assert right_index.tree_digest("missing") is None
+
+
+def test_indexed_registration_matches_toolkit(tmp_path) -> None:
+    # Pins the ``toolkit.skills`` record written by
+    # _register_indexed_skill to the installed agentscope's own.
+    from agentscope.tool import Toolkit
+
+    from copaw.agents.react_agent import _register_indexed_skill
+
+    root = tmp_path / "active_skills"
+    _write_skill(root, "alpha")
+    _write_skill(root, "beta", "second")
+    indexed, reference = Toolkit(), Toolkit()
+
+    for entry in get_skill_index(root).entries().values():
+        _register_indexed_skill(indexed, entry)
+        reference.register_agent_skill(entry.path)
+
+    assert indexed.skills == reference.skills
+    assert indexed.get_agent_skill_prompt() == (
+        reference.get_agent_skill_prompt()
+    )
+    entry = get_skill_index(root).entries()["alpha"]
+    with pytest.raises(ValueError):
+        _register_indexed_skill(indexed, entry)
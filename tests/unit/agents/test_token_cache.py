@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""MessageTokenCache with a whitespace tokenizer (one token per word)."""
+# pylint: disable=protected-access
+from __future__ import annotations
+
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+from agentscope.message import Msg
+from reme.memory.file_based.utils import AsMsgHandler
+
+from copaw.agents.hooks import memory_compaction
+from copaw.agents.hooks.memory_compaction import MemoryCompactionHook
+from copaw.agents.utils.token_counting import MessageTokenCache
+
+_COUNTER = SimpleNamespace(tokenizer=SimpleNamespace(encode=str.split))
+
+
+def _uncached(messages: list[Msg]) -> int:
+    handler = AsMsgHandler(token_counter=_COUNTER)
+    return sum(handler.stat_message(msg).total_tokens for msg in messages)
+
+
+def _msg(text: str) -> Msg:
+    return Msg("user", text, "user")
+
+
+def test_edited_message_is_recounted() -> None:
+    cache = MessageTokenCache(token_counter=_COUNTER)
+    msg = _msg("one two three")
+    first = cache.count(msg)
+    assert cache.count(msg) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # e.g. tool-result compaction truncating the content in place
+    msg.content = "one two three four five six"
+    edited = cache.count(msg)
+
+    assert cache.misses == 2
+    assert edited == _uncached([msg]) == first + 3
+
+
+def test_entries_are_bounded() -> None:
+    cache = MessageTokenCache(token_counter=_COUNTER, max_entries=2)
+    a, b, c = _msg("a"), _msg("b"), _msg("c")
+    cache.total([a, b])
+    cache.count(a)  # b is now the least recently used
+    cache.count(c)
+
+    assert list(cache._entries) == [a.id, c.id]
+    cache.count(b)
+    assert list(cache._entries) == [c.id, b.id]
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+class RecordingManager:
+    token_counter = None
+
+    def __init__(self) -> None:
+        self.checks = 0
+
+    async def check_context(self, messages, **_kwargs):
+        self.checks += 1
+        return [], messages, True
+
+
+@pytest.mark.parametrize("margin, compacts", [(1, False), (0, True)])
+async def test_hook_threshold_matches_uncached_count(
+    monkeypatch,
+    margin: int,
+    compacts: bool,
+) -> None:
+    messages = [_msg(f"message number {i} " * (i + 1)) for i in range(5)]
+    exact = _uncached(messages)
+    running = SimpleNamespace(
+        memory_compact_threshold=exact + margin,
+        memory_compact_reserve=0,
+        max_input_length=exact * 2,
+        enable_tool_result_compact=False,
+    )
+    cache = MessageTokenCache(token_counter=_COUNTER)
+    cache.total(messages)  # warm: the hook only sums cached counts
+    monkeypatch.setattr(
+        memory_compaction,
+        "get_config_snapshot",
+        lambda: SimpleNamespace(agents=SimpleNamespace(running=running)),
+    )
+    monkeypatch.setattr(
+        memory_compaction,
+        "get_message_token_cache",
+        lambda: cache,
+    )
+    monkeypatch.setattr(memory_compaction, "MEMORY_COMPACT_BACKGROUND", False)
+    monkeypatch.setattr(memory_compaction, "_pending", OrderedDict())
+    memory = SimpleNamespace(
+        get_compressed_summary=lambda: "",
+        get_memory=lambda prepend_summary: _async(messages),
+    )
+    agent = SimpleNamespace(
+        memory=memory,
+        sys_prompt_token_count=0,
+        _request_context={"session_id": "s1", "user_id": "u"},
+    )
+    manager = RecordingManager()
+
+    await MemoryCompactionHook(manager)(agent, {})
+
+    assert (cache.hits, cache.misses) == (5, 5)
+    assert manager.checks == int(compacts)
+
+
+async def _async(value):
+    return value
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name,protected-access
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from agentscope.memory import InMemoryMemory
+
+from copaw.agents.react_agent import CoPawAgent
+from copaw.app.runner import agent_pool as pool_module
+from copaw.app.runner.agent_pool import AgentPool, agent_fingerprint
+from copaw.config.config import Config
+
+
+class FakeAgent:
+    built = 0
+
+    def __init__(self, **kwargs: Any) -> None:
+        FakeAgent.built += 1
+        self.kwargs = kwargs
+        self.rebinds: list[dict] = []
+
+    async def register_mcp_clients(self) -> None:
+        pass
+
+    def set_console_output_enabled(self, enabled: bool) -> None:
+        pass
+
+    def rebind_request(self, **kwargs: Any) -> None:
+        self.rebinds.append(kwargs)
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    state = SimpleNamespace(
+        model={"active": {"provider_id": "p", "model": "m1"}},
+        skills=[("alpha", 1, 10)],
+    )
+    monkeypatch.setattr(pool_module, "_model_signature", lambda: state.model)
+    monkeypatch.setattr(
+        pool_module,
+        "_skills_signature",
+        lambda: list(state.skills),
+    )
+    monkeypatch.setattr(pool_module, "CoPawAgent", FakeAgent)
+    FakeAgent.built = 0
+    return state
+
+
+async def _acquire(pool: AgentPool, config: Config, clients=None, sid="s1"):
+    return await pool.acquire(
+        config=config,
+        env_context=f"env {sid}",
+        mcp_clients=clients,
+        memory_manager=None,
+        request_context={"session_id": sid, "user_id": "u1"},
+    )
+
+
+def test_fingerprint_tracks_build_inputs(setup) -> None:
+    config = Config()
+    client = object()
+    base = agent_fingerprint(config, [client])
+    assert agent_fingerprint(config, [client]) == base
+
+    setup.model = {"active": {"provider_id": "p", "model": "m2"}}
+    changed_model = agent_fingerprint(config, [client])
+    setup.skills = [("alpha", 2, 10)]
+    changed_skills = agent_fingerprint(config, [client])
+    # A reconnected MCP client is a new object with the same config.
+    changed_client = agent_fingerprint(config, [object()])
+    config.agents.language = "en"
+    changed_language = agent_fingerprint(config, [object()])
+
+    keys = {
+        base,
+        changed_model,
+        changed_skills,
+        changed_client,
+        changed_language,
+    }
+    assert len(keys) == 5
+
+
+async def test_changed_fingerprint_forces_rebuild(setup) -> None:
+    pool = AgentPool(enabled=True, max_idle_per_key=4)
+    config = Config()
+
+    first = await _acquire(pool, config)
+    pool.release(first)
+    assert await _acquire(pool, config, sid="s2") is first
+    assert first.rebinds[-1]["request_context"]["session_id"] == "s2"
+    pool.release(first)
+
+    setup.skills = [("alpha", 1, 10), ("beta", 1, 5)]
+    rebuilt = await _acquire(pool, config, sid="s3")
+
+    assert rebuilt is not first
+    assert FakeAgent.built == 2
+    assert (pool.hits, pool.misses) == (1, 2)
+    # The agent built under the old fingerprint is not pooled again.
+    pool.release(first)
+    pool.release(rebuilt)
+    assert await _acquire(pool, config) is rebuilt
+
+
+@pytest.mark.usefixtures("setup")
+async def test_failed_request_discards_agent() -> None:
+    pool = AgentPool(enabled=True, max_idle_per_key=4)
+    config = Config()
+
+    agent = await _acquire(pool, config)
+    pool.release(agent, reusable=False)
+
+    assert await _acquire(pool, config) is not agent
+    assert FakeAgent.built == 2
+
+
+@pytest.mark.usefixtures("setup")
+async def test_idle_agents_are_bounded() -> None:
+    pool = AgentPool(enabled=True, max_idle_per_key=2)
+    config = Config()
+
+    agents = [await _acquire(pool, config, sid=f"s{i}") for i in range(3)]
+    for agent in agents:
+        pool.release(agent)
+    again = [await _acquire(pool, config, sid=f"t{i}") for i in range(3)]
+
+    assert again[0] is agents[1] and again[1] is agents[0]
+    assert again[2] not in agents
+    assert FakeAgent.built == 4
+
+
+@pytest.mark.usefixtures("setup")
+async def test_disabled_pool_always_builds() -> None:
+    pool = AgentPool(enabled=False)
+    config = Config()
+
+    agent = await _acquire(pool, config)
+    pool.release(agent)
+
+    assert await _acquire(pool, config) is not agent
+    assert FakeAgent.built == 2
+
+
+def test_rebind_request_resets_per_request_state() -> None:
+    old_memory = InMemoryMemory()
+    agent = SimpleNamespace(
+        _env_context="old env",
+        _request_context={"session_id": "old"},
+        max_iters=10,
+        _enable_memory_manager=False,
+        memory_manager=None,
+        memory=old_memory,
+        command_handler=SimpleNamespace(memory=old_memory),
+        _tool_guard_pending_info={"tool": "execute_shell_command"},
+        _sys_prompt="old prompt",
+    )
+    agent._build_sys_prompt = lambda: f"prompt for {agent._env_context}"
+    agent._set_sys_prompt = lambda text: setattr(agent, "_sys_prompt", text)
+    context = {"session_id": "new", "user_id": "u2"}
+
+    CoPawAgent.rebind_request(
+        agent,
+        env_context="new env",
+        request_context=context,
+        max_iters=20,
+    )
+
+    assert agent._env_context == "new env"
+    assert agent._request_context == context
+    assert agent._request_context is not context
+    assert agent.max_iters == 20
+    assert agent.memory is not old_memory
+    assert agent.command_handler.memory is agent.memory
+    assert agent._tool_guard_pending_info is None
+    assert agent._sys_prompt == "prompt for new env"
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name,protected-access
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from copaw.app.runner.manager import ChatManager
+from copaw.app.runner.models import ChatSpec
+from copaw.app.runner.repo import indexed_repo
+from copaw.app.runner.repo.indexed_repo import IndexedChatRepository
+
+
+def _chat(chat_id: str, name: str = "New Chat") -> ChatSpec:
+    return ChatSpec(
+        id=chat_id,
+        name=name,
+        session_id=f"console:{chat_id}",
+        user_id="u1",
+    )
+
+
+async def _ids(repo: IndexedChatRepository) -> list[str]:
+    return sorted(spec.id for spec in await repo.list_chats())
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "chats.json"
+
+
+async def test_log_is_replayed_and_folded_on_open(path) -> None:
+    repo = IndexedChatRepository(path)
+    await repo.upsert_chat(_chat("c0"))
+    await repo.upsert_chat(_chat("c1"))
+    await repo.upsert_chat(_chat("c0", name="renamed"))
+    await repo.delete_chats(["c1"])
+    assert not path.exists()
+    log = repo._log_path.read_text(encoding="utf-8")
+    assert len(log.splitlines()) == 4
+
+    # A torn final line from a crash mid-append is skipped.
+    with open(repo._log_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "upsert", "chat": {')
+
+    reopened = IndexedChatRepository(path)
+    assert await _ids(reopened) == ["c0"]
+    assert (await reopened.get_chat("c0")).name == "renamed"
+    found = await reopened.get_chat_by_id("console:c0", "u1")
+    assert found is not None and found.id == "c0"
+    # Replaying compacts: the snapshot holds everything, the log is gone.
+    assert not reopened._log_path.exists()
+    snapshot = json.loads(path.read_text(encoding="utf-8"))
+    assert [chat["id"] for chat in snapshot["chats"]] == ["c0"]
+
+
+async def test_upsert_that_triggers_compaction_survives(
+    path,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(indexed_repo, "_COMPACT_MIN_RECORDS", 3)
+    repo = IndexedChatRepository(path)
+    for i in range(3):
+        await repo.upsert_chat(_chat(f"c{i}"))
+
+    assert not repo._log_path.exists()
+    assert await _ids(repo) == ["c0", "c1", "c2"]
+    assert await _ids(IndexedChatRepository(path)) == ["c0", "c1", "c2"]
+
+
+async def test_delete_that_triggers_compaction_survives(
+    path,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(indexed_repo, "_COMPACT_MIN_RECORDS", 3)
+    repo = IndexedChatRepository(path)
+    await repo.upsert_chat(_chat("c0"))
+    await repo.upsert_chat(_chat("c1"))
+    assert await repo.delete_chats(["c1", "missing"])
+    assert not await repo.delete_chats(["missing"])
+
+    assert not repo._log_path.exists()
+    assert await _ids(IndexedChatRepository(path)) == ["c0"]
+
+
+async def test_appends_during_compaction_are_kept(path, monkeypatch) -> None:
+    monkeypatch.setattr(indexed_repo, "_COMPACT_MIN_RECORDS", 3)
+    repo = IndexedChatRepository(path)
+
+    await asyncio.gather(*(repo.upsert_chat(_chat(f"c{i}")) for i in range(8)))
+
+    expected = [f"c{i}" for i in range(8)]
+    assert await _ids(repo) == expected
+    assert await _ids(IndexedChatRepository(path)) == expected
+
+
+async def test_appends_are_fsynced_off_the_event_loop(
+    path,
+    monkeypatch,
+) -> None:
+    synced: list[int] = []
+    fsync = indexed_repo.os.fsync
+
+    def tracked_fsync(fd: int) -> None:
+        synced.append(threading.get_ident())
+        fsync(fd)
+
+    monkeypatch.setattr(indexed_repo.os, "fsync", tracked_fsync)
+    repo = IndexedChatRepository(path)
+
+    await asyncio.gather(*(repo.upsert_chat(_chat(f"c{i}")) for i in range(8)))
+
+    # Every change is durable once acknowledged; changes made while a
+    # write runs share the next one.
+    assert 0 < len(synced) < 8
+    assert threading.get_ident() not in synced
+    assert len(repo._log_path.read_text(encoding="utf-8").splitlines()) == 8
+    assert await _ids(IndexedChatRepository(path)) == [
+        f"c{i}" for i in range(8)
+    ]
+
+
+async def test_manager_serializes_update_and_delete_of_one_chat(
+    path,
+    monkeypatch,
+) -> None:
+    repo = IndexedChatRepository(path)
+    manager = ChatManager(repo=repo)
+    spec = await manager.create_chat(_chat("c0"))
+    events: list[str] = []
+    delete = repo.delete_chats
+    upsert = repo.upsert_chat
+
+    async def slow_delete(chat_ids):
+        events.append("delete:start")
+        await asyncio.sleep(0.05)
+        result = await delete(chat_ids)
+        events.append("delete:end")
+        return result
+
+    async def tracked_upsert(chat):
+        events.append("upsert")
+        await upsert(chat)
+
+    monkeypatch.setattr(repo, "delete_chats", slow_delete)
+    monkeypatch.setattr(repo, "upsert_chat", tracked_upsert)
+
+    deleting = asyncio.create_task(manager.delete_chats(["c0", "c1"]))
+    await asyncio.sleep(0)
+    await manager.update_chat(spec)
+    await deleting
+
+    assert events == ["delete:start", "delete:end", "upsert"]
+
+
+async def test_manager_auto_registers_a_session_once(path) -> None:
+    manager = ChatManager(repo=IndexedChatRepository(path))
+
+    specs = await asyncio.gather(
+        *(manager.get_or_create_chat("console:s", "u1") for _ in range(5)),
+    )
+
+    assert len({spec.id for spec in specs}) == 1
+    assert len(await manager.list_chats()) == 1
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=protected-access
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from copaw.app.channels.keyed_queue import KeyedQueue
+from copaw.app.channels.manager import ChannelManager
+
+
+class FakeChannel:
+    """Duck-typed channel: payloads are (session, text) tuples."""
+
+    channel = "fake"
+    uses_manager_queue = True
+
+    def __init__(self) -> None:
+        self.consumed: list[tuple[str, str]] = []
+        self.blocked: set[str] = set()
+        self.release = asyncio.Event()
+        self.enqueue = None
+        self.stopped = False
+
+    def set_enqueue(self, cb) -> None:
+        self.enqueue = cb
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        self.stopped = True
+
+    def get_debounce_key(self, payload) -> str:
+        return payload[0]
+
+    def _is_native_payload(self, _payload) -> bool:
+        return False
+
+    def merge_requests(self, requests):
+        return requests[0][0], "+".join(text for _, text in requests)
+
+    async def consume_one(self, payload) -> None:
+        self.consumed.append(payload)
+        if payload[0] in self.blocked:
+            await self.release.wait()
+
+
+async def _settle(condition) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition not reached")
+
+
+def test_batches_are_fifo_per_key_and_round_robin() -> None:
+    q = KeyedQueue(maxsize=4)
+    for key, item in [("a", 1), ("b", 1), ("a", 2), ("a", 3)]:
+        q.put_nowait(key, item)
+    with pytest.raises(asyncio.QueueFull):
+        q.put_nowait("c", 1)
+
+    assert q.get_batch_nowait() == ("a", [1, 2, 3])
+    q.put_nowait("a", 4)  # behind b, which was waiting already
+    assert q.get_batch_nowait() == ("b", [1])
+    assert q.get_batch_nowait() == ("a", [4])
+    assert q.empty() and not q._items
+    with pytest.raises(asyncio.QueueEmpty):
+        q.get_batch_nowait()
+
+
+async def test_payloads_for_a_busy_session_are_merged() -> None:
+    ch = FakeChannel()
+    ch.blocked.add("a")
+    manager = ChannelManager([ch])
+    await manager.start_all()
+
+    ch.enqueue(("a", "1"))
+    await _settle(lambda: ch.consumed == [("a", "1")])
+    ch.enqueue(("a", "2"))
+    ch.enqueue(("b", "x"))
+    ch.enqueue(("a", "3"))
+    # "a" is in progress: its payloads wait, "b" is not held up.
+    await _settle(lambda: ("b", "x") in ch.consumed)
+    assert manager._pending[("fake", "a")] == [("a", "2"), ("a", "3")]
+
+    ch.blocked.clear()
+    ch.release.set()
+    await _settle(lambda: len(ch.consumed) == 3)
+
+    assert ch.consumed[-1] == ("a", "2+3")
+    assert not manager._pending and not manager._in_progress
+    await manager.stop_all()
+
+
+async def test_stop_all_cancels_workers_and_detaches_channels() -> None:
+    ch = FakeChannel()
+    ch.blocked.add("a")
+    manager = ChannelManager([ch])
+    await manager.start_all()
+    tasks = list(manager._consumer_tasks)
+    ch.enqueue(("a", "1"))
+    await _settle(lambda: ch.consumed)
+    ch.enqueue(("a", "2"))
+    await _settle(lambda: manager._pending)
+
+    await manager.stop_all()
+
+    assert all(task.done() for task in tasks)
+    assert not manager._consumer_tasks and not manager._queues
+    assert not manager._pending and not manager._in_progress
+    assert ch.enqueue is None and ch.stopped
+    # Late enqueues after shutdown are dropped, not raised.
+    manager.enqueue("fake", ("a", "3"))
+    assert ch.consumed == [("a", "1")]
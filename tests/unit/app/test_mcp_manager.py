@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=protected-access
+from __future__ import annotations
+
+import asyncio
+import time
+
+from copaw.app.mcp.manager import MCPClientManager
+from copaw.config.config import MCPClientConfig, MCPConfig
+
+
+class FakeClient:
+    """Stand-in for a stateful MCP client.
+
+    ``name`` selects the behaviour: ``<delay>`` connects after that many
+    seconds, ``fail`` raises, ``hang`` never connects.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.stack = None
+        self.connect_task = None
+        self.close_task = None
+        self.closed = False
+
+    async def connect(self) -> None:
+        self.connect_task = asyncio.current_task()
+        if self.name == "fail":
+            raise ConnectionError("boom")
+        if self.name == "hang":
+            await asyncio.Event().wait()
+        await asyncio.sleep(float(self.name))
+
+    async def close(self) -> None:
+        self.close_task = asyncio.current_task()
+        self.closed = True
+
+
+def _manager(monkeypatch, **kwargs) -> MCPClientManager:
+    built = {}
+
+    def build(client_config):
+        client = FakeClient(client_config.name)
+        built[client_config.name] = client
+        return client
+
+    monkeypatch.setattr(MCPClientManager, "_build_client", staticmethod(build))
+    manager = MCPClientManager(**kwargs)
+    manager.built = built
+    return manager
+
+
+def _client(name: str) -> MCPClientConfig:
+    return MCPClientConfig(name=name, command="fake")
+
+
+def _config(*names: str) -> MCPConfig:
+    return MCPConfig(
+        clients={name: _client(name) for name in names},
+    )
+
+
+async def test_clients_connect_concurrently_with_bounded_fanout(
+    monkeypatch,
+) -> None:
+    manager = _manager(monkeypatch, max_concurrency=2)
+    start = time.monotonic()
+    await manager.init_from_config(_config("0.1", "0.11", "0.12", "fail"))
+    elapsed = time.monotonic() - start
+
+    # Two waves of ~0.1s rather than ~0.33s sequentially.
+    assert 0.2 <= elapsed < 0.3
+    status = manager.get_status()
+    assert status["fail"]["status"] == "failed"
+    assert [s["status"] for k, s in status.items() if k != "fail"] == [
+        "ready",
+    ] * 3
+    assert len(await manager.get_clients()) == 3
+    await manager.close_all()
+
+
+async def test_background_start_exposes_only_ready_clients(
+    monkeypatch,
+) -> None:
+    manager = _manager(monkeypatch, connect_timeout=0.3)
+    manager.start_from_config(_config("0", "0.1", "hang"))
+
+    await asyncio.sleep(0.05)
+    assert [c.name for c in await manager.get_clients()] == ["0"]
+    assert manager.get_status()["hang"]["status"] == "connecting"
+
+    assert await manager.wait_ready(timeout=1.0)
+    assert [c.name for c in await manager.get_clients()] == ["0", "0.1"]
+    assert manager.get_status()["hang"]["status"] == "failed"
+    await manager.close_all()
+
+
+async def test_clients_are_closed_by_the_task_that_connected_them(
+    monkeypatch,
+) -> None:
+    manager = _manager(monkeypatch)
+    await manager.init_from_config(_config("0"))
+    first = manager.built["0"]
+    await manager.replace_client("0", _client("0"))
+    second = manager.built["0"]
+
+    assert first.closed and first.close_task is first.connect_task
+    await manager.close_all()
+    assert second.closed and second.close_task is second.connect_task
+
+
+async def test_close_all_cancels_pending_connects(monkeypatch) -> None:
+    manager = _manager(monkeypatch)
+    manager.start_from_config(_config("0", "hang"))
+    await asyncio.sleep(0.05)
+
+    await asyncio.wait_for(manager.close_all(), timeout=1.0)
+    assert manager.built["0"].closed
+    assert not manager.built["hang"].closed  # never connected
+    assert manager.get_status() == {}
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name,protected-access
+from __future__ import annotations
+
+import json
+
+import pytest
+from agentscope.message import Msg
+
+from copaw.app.runner import sqlite_session as sqlite_module
+from copaw.app.runner.runner import AgentRunner
+from copaw.app.runner.session import session_file_stem
+from copaw.app.runner.sqlite_session import (
+    SQLiteSession,
+    migrate_json_sessions,
+)
+from copaw.security.tool_guard.models import TOOL_GUARD_DENIED_MARK
+
+
+def _entry(i: int, text: str = "", marks=None) -> list:
+    return [
+        {"id": f"m{i}", "role": "user", "content": text or f"msg {i}"},
+        marks or [],
+    ]
+
+
+def _states(content: list) -> dict:
+    return {
+        "agent": {"memory": {"content": content, "_compressed_summary": ""}},
+        "toolkit": {"active_groups": []},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    session = SQLiteSession(str(tmp_path / "sessions.db"))
+    yield session
+    session.close()
+
+
+def _rows(store: SQLiteSession, key: str) -> list[tuple[int, str]]:
+    return list(
+        store._connect().execute(
+            "SELECT seq, entry FROM session_messages "
+            "WHERE session_key = ? ORDER BY seq",
+            (key,),
+        ),
+    )
+
+
+def _count_inserts(store: SQLiteSession) -> list[int]:
+    """Record how many message rows each write_state inserts."""
+    inserted: list[int] = []
+    conn = store._connect()
+
+    def trace(statement: str) -> None:
+        if statement.startswith("INSERT INTO session_messages"):
+            inserted[-1] += 1
+
+    conn.set_trace_callback(trace)
+    original = store.write_state
+
+    def write_state(key, states):
+        inserted.append(0)
+        original(key, states)
+
+    store.write_state = write_state
+    return inserted
+
+
+def test_write_state_only_rewrites_from_first_change(store) -> None:
+    inserted = _count_inserts(store)
+    content = [_entry(i) for i in range(5)]
+
+    store.write_state("k", _states(content))
+    store.write_state("k", _states(content + [_entry(5), _entry(6)]))
+    assert inserted == [5, 2]  # append only
+
+    edited = content + [_entry(5), _entry(6)]
+    edited[3] = _entry(3, "edited")
+    store.write_state("k", _states(edited))
+    assert inserted[-1] == 4  # rows 3..6
+
+    store.write_state("k", _states(edited[:2]))
+    assert inserted[-1] == 0  # shrinking only deletes
+    assert [seq for seq, _ in _rows(store, "k")] == [0, 1]
+    assert store.read_state("k") == _states(edited[:2])
+
+    # A fresh store (no digest cache) diffs against the stored rows.
+    reopened = SQLiteSession(store.db_path)
+    inserted = _count_inserts(reopened)
+    reopened.write_state("k", _states(edited[:2] + [_entry(9)]))
+    assert inserted == [1]
+    reopened.close()
+
+
+def test_read_state_last_n(store) -> None:
+    content = [_entry(i) for i in range(10)]
+    store.write_state("k", _states(content))
+
+    assert store.read_state("k", last_n=3) == _states(content[-3:])
+    assert store.read_state("k", last_n=0) == _states([])
+    assert store.read_state("k", last_n=50) == _states(content)
+    assert store.read_state("missing") is None
+
+    # States without memory content come back unchanged.
+    store.write_state("plain", {"toolkit": {"active_groups": ["a"]}})
+    assert store.read_state("plain", last_n=1) == {
+        "toolkit": {"active_groups": ["a"]},
+    }
+
+
+async def test_recent_messages_match_last_n(store) -> None:
+    content = [_entry(i) for i in range(6)]
+    store.write_state(session_file_stem("s1", "u1"), _states(content))
+
+    recent = await store.get_recent_messages("s1", user_id="u1", last_n=2)
+
+    assert recent == content[-2:]
+
+
+def test_lone_surrogate_round_trip(store) -> None:
+    text = "broken \ud83d emoji"
+    store.write_state("k", _states([_entry(0, text)]))
+
+    reopened = SQLiteSession(store.db_path)
+    content = reopened.read_state("k")["agent"]["memory"]["content"]
+    reopened.close()
+
+    assert content[0][0]["content"] == text
+
+
+def test_json_sessions_are_migrated_once(tmp_path, monkeypatch) -> None:
+    json_dir = tmp_path / "sessions"
+    json_dir.mkdir()
+    (json_dir / "u1_s1.json").write_text(
+        json.dumps(_states([_entry(0, "café")])),
+        encoding="utf-8",
+    )
+    (json_dir / "broken.json").write_text("{", encoding="utf-8")
+    db_path = str(tmp_path / "sessions.db")
+    calls = []
+    original = sqlite_module.migrate_json_sessions
+
+    def migrate(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite_module, "migrate_json_sessions", migrate)
+
+    first = SQLiteSession(db_path, legacy_json_dir=str(json_dir))
+    assert first.read_state("u1_s1") == _states([_entry(0, "café")])
+    assert first.read_state("broken") is None
+    first.close()
+
+    # A session added to the JSON dir later is not picked up: the meta
+    # flag marks the migration as done.
+    (json_dir / "u2_s2.json").write_text(
+        json.dumps(_states([])),
+        encoding="utf-8",
+    )
+    second = SQLiteSession(db_path, legacy_json_dir=str(json_dir))
+    assert second.read_state("u2_s2") is None
+    second.close()
+    assert len(calls) == 1
+
+    # Explicit re-runs skip sessions already in the database.
+    third = SQLiteSession(db_path)
+    assert migrate_json_sessions(json_dir, third) == 1
+    assert migrate_json_sessions(json_dir, third) == 0
+    third.close()
+
+
+async def test_cleanup_denied_session_memory(store) -> None:
+    runner = AgentRunner()
+    runner.session = store
+    content = [
+        _entry(0, "clean up the logs"),
+        _entry(1, "tool call", marks=[TOOL_GUARD_DENIED_MARK]),
+        [{"id": "m2", "role": "assistant", "content": "denied, because"}, []],
+    ]
+    store.write_state(session_file_stem("s1", "u1"), _states(content))
+
+    await runner._cleanup_denied_session_memory(
+        "s1",
+        "u1",
+        denial_response=Msg("Friday", "Tool denied", "assistant"),
+    )
+
+    states = await store.get_session_state_dict("s1", user_id="u1")
+    memory = states["agent"]["memory"]
+    assert [entry[0]["content"] for entry in memory["content"]] == [
+        "clean up the logs",
+        "tool call",
+        "Tool denied",
+    ]
+    assert all(not entry[1] for entry in memory["content"])
+    assert memory["_compressed_summary"] == ""
+    assert states["toolkit"] == {"active_groups": []}
+
+
+async def test_update_session_state_creates_missing(store) -> None:
+    await store.update_session_state("s9", "agent.memory", {"content": []})
+    assert await store.get_session_state_dict("s9") == {
+        "agent": {"memory": {"content": []}},
+    }
+    with pytest.raises(ValueError):
+        await store.update_session_state(
+            "missing",
+            "agent.memory",
+            {},
+            create_if_not_exist=False,
+        )
+    assert await store.get_session_state_dict("missing") == {}
+    with pytest.raises(ValueError):
+        await store.get_session_state_dict("missing", allow_not_exist=False)
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name,protected-access
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from copaw.app.channels.base import BaseChannel, ContentType, TextContent
+from copaw.app.channels.keyed_queue import KeyedQueue
+from copaw.app.channels.manager import ChannelManager
+from copaw.app.routers.metrics import metrics_router
+from copaw.utils import tracing
+from copaw.utils.tracing import Tracer
+
+_REQUEST_ID: contextvars.ContextVar = contextvars.ContextVar(
+    "request_id",
+    default=None,
+)
+
+
+@pytest.fixture
+def tracer(monkeypatch) -> Tracer:
+    fresh = Tracer(enabled=True, otlp_file="")
+    monkeypatch.setattr(tracing, "_tracer", fresh)
+    return fresh
+
+
+def _histogram(tracer: Tracer, stage: str):
+    return tracer._histograms[stage]
+
+
+def test_spans_fill_stage_histograms(tracer) -> None:
+    with tracing.span("outer"):
+        with tracing.span("inner"):
+            pass
+        with pytest.raises(KeyError):
+            with tracing.span("inner"):
+                raise KeyError("boom")
+    tracing.observe("queue", 0.002)
+    tracing.observe("queue", 42.0)
+
+    assert _histogram(tracer, "inner").count == 2
+    assert _histogram(tracer, "inner").errors == 1
+    text = tracing.render_prometheus()
+    assert "# TYPE copaw_stage_seconds histogram" in text
+    assert 'copaw_stage_seconds_bucket{stage="queue",le="0.0025"} 1' in text
+    assert 'copaw_stage_seconds_bucket{stage="queue",le="30"} 1' in text
+    assert 'copaw_stage_seconds_bucket{stage="queue",le="60"} 2' in text
+    assert 'copaw_stage_seconds_bucket{stage="queue",le="+Inf"} 2' in text
+    assert 'copaw_stage_seconds_count{stage="outer"} 1' in text
+    assert 'copaw_stage_errors_total{stage="inner"} 1' in text
+
+
+def test_disabled_tracer_records_nothing(monkeypatch) -> None:
+    monkeypatch.setattr(tracing, "_tracer", Tracer(enabled=False))
+
+    with tracing.span("stage") as span:
+        assert span is None
+    tracing.observe("stage", 1.0)
+
+    assert "copaw_stage_seconds_count" not in tracing.render_prometheus()
+
+
+async def test_otlp_file_holds_one_line_per_trace(tmp_path: Path) -> None:
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracer = Tracer(enabled=True, otlp_file=str(path))
+
+    async def reply(i: int) -> None:
+        with tracer.span("channel.message", channel="bench", batch=i):
+            await asyncio.sleep(0)
+            with tracer.span("tool.execute", tool="echo"):
+                await asyncio.sleep(0)
+
+    await asyncio.gather(reply(1), reply(2))
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    trace_ids = set()
+    for line in lines:
+        [resource] = json.loads(line)["resourceSpans"]
+        child, root = resource["scopeSpans"][0]["spans"]
+        assert child["name"] == "tool.execute"
+        assert child["parentSpanId"] == root["spanId"]
+        assert child["traceId"] == root["traceId"]
+        assert root["parentSpanId"] == ""
+        assert int(root["endTimeUnixNano"]) >= int(root["startTimeUnixNano"])
+        assert {"key": "tool", "value": {"stringValue": "echo"}} in (
+            child["attributes"]
+        )
+        trace_ids.add(root["traceId"])
+    assert len(trace_ids) == 2
+
+
+class _Channel(BaseChannel):
+    channel = "trace-test"
+
+    def __init__(self) -> None:
+        super().__init__(self._reply)
+        self.done = asyncio.Event()
+
+    async def _reply(self, _request):
+        self.reply_span = tracing._current.get()
+        self.request_id = _REQUEST_ID.get()
+        await asyncio.sleep(0.01)
+        self.done.set()
+        for event in ():
+            yield event
+
+    def build_agent_request_from_native(self, native_payload):
+        return self.build_agent_request_from_user_content(
+            channel_id=self.channel,
+            sender_id=native_payload["sender_id"],
+            session_id=f"{self.channel}:{native_payload['sender_id']}",
+            content_parts=native_payload["content_parts"],
+        )
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+async def test_channel_manager_records_queue_wait(tracer) -> None:
+    channel = _Channel()
+    manager = ChannelManager([channel])
+    await manager.start_all()
+    try:
+        request = channel.build_agent_request_from_user_content(
+            channel_id=channel.channel,
+            sender_id="u1",
+            session_id="trace-test:u1",
+            content_parts=[TextContent(type=ContentType.TEXT, text="hi")],
+        )
+        manager.enqueue(channel.channel, request)
+        await asyncio.wait_for(channel.done.wait(), 5)
+        await asyncio.sleep(0.05)
+    finally:
+        await manager.stop_all()
+
+    assert _histogram(tracer, "channel.queue_wait").count == 1
+    message = _histogram(tracer, "channel.message")
+    assert message.count == 1 and message.total >= 0.01
+
+
+async def test_debounced_reply_is_one_channel_message(tracer) -> None:
+    channel = _Channel()
+    channel._debounce_seconds = 0.02
+    for text in ("hello", "world"):
+        payload = {
+            "sender_id": "u1",
+            "content_parts": [TextContent(type=ContentType.TEXT, text=text)],
+        }
+        # What a consumer worker does around consume_one.
+        with tracing.span("channel.message", channel=channel.channel):
+            _REQUEST_ID.set(text)
+            await channel.consume_one(payload)
+    assert "channel.message" not in tracer._histograms
+
+    await asyncio.wait_for(channel.done.wait(), 5)
+    await asyncio.sleep(0.05)
+
+    assert _histogram(tracer, "channel.debounce").count == 1
+    message = _histogram(tracer, "channel.message")
+    assert message.count == 1 and message.total >= 0.01
+    # The reply is its own trace but keeps the caller's other context.
+    assert channel.reply_span.name == "channel.message"
+    assert channel.reply_span.parent is None
+    assert channel.request_id == "world"
+
+
+def test_full_queue_leaves_no_queue_wait_timestamp(tracer) -> None:
+    channel = _Channel()
+    manager = ChannelManager([channel])
+    queue = KeyedQueue(maxsize=1)
+    manager._queues[channel.channel] = queue
+    request = channel.build_agent_request_from_user_content(
+        channel_id=channel.channel,
+        sender_id="u1",
+        session_id="trace-test:u1",
+        content_parts=[TextContent(type=ContentType.TEXT, text="hi")],
+    )
+    queue.put_nowait("other", request)
+
+    with pytest.raises(asyncio.QueueFull):
+        manager._enqueue_one(channel.channel, request, queued_at=1.0)
+
+    assert not manager._queued_at
+    assert "channel.queue_wait" not in tracer._histograms
+
+
+@pytest.mark.usefixtures("tracer")
+def test_metrics_endpoint_serves_text_format() -> None:
+    tracing.observe("session.load", 0.003)
+    app = FastAPI()
+    app.include_router(metrics_router)
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'copaw_stage_seconds_count{stage="session.load"} 1' in (
+        response.text
+    )
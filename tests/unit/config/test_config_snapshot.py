@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name,protected-access
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from copaw.config import utils as config_utils
+from copaw.config.utils import get_config_snapshot, load_config, save_config
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_utils, "_config_cache", {})
+    path = tmp_path / "config.json"
+    _write(path, "zh")
+    return path
+
+
+@pytest.fixture
+def reads(monkeypatch) -> list:
+    parsed = []
+    original = config_utils._read_config_file
+
+    def read(path):
+        parsed.append(path)
+        return original(path)
+
+    monkeypatch.setattr(config_utils, "_read_config_file", read)
+    return parsed
+
+
+def _write(path, language: str) -> None:
+    path.write_text(
+        json.dumps({"agents": {"language": language}}),
+        encoding="utf-8",
+    )
+
+
+def test_snapshot_is_cached_until_the_file_changes(
+    config_path,
+    reads,
+) -> None:
+    first = get_config_snapshot(config_path)
+    assert get_config_snapshot(config_path) is first
+    assert len(reads) == 1
+
+    # Same size, newer mtime.
+    _write(config_path, "en")
+    st = config_path.stat()
+    os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    edited = get_config_snapshot(config_path)
+    assert edited is not first and edited.agents.language == "en"
+
+    # Replaced by another file with the same size and mtime: new inode.
+    st = config_path.stat()
+    other = config_path.with_name("other.json")
+    _write(other, "ru")
+    os.utime(other, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(other, config_path)
+    assert get_config_snapshot(config_path).agents.language == "ru"
+
+    config_path.unlink()
+    assert get_config_snapshot(config_path).agents.language == "zh"
+    assert len(reads) == 4
+
+
+def test_save_config_refreshes_snapshot(config_path, reads) -> None:
+    get_config_snapshot(config_path)
+    config = load_config(config_path)
+    config.agents.language = "en"
+
+    save_config(config, config_path)
+    snapshot = get_config_snapshot(config_path)
+
+    assert snapshot.agents.language == "en"
+    assert len(reads) == 2  # the snapshot read and load_config only
+    # The snapshot is a copy of what was saved, not the caller's object.
+    assert snapshot is not config
+    config.agents.language = "ru"
+    assert get_config_snapshot(config_path).agents.language == "en"
+    assert load_config(config_path).agents.language == "en"
+
+
+def test_load_config_returns_independent_copies(config_path) -> None:
+    snapshot = get_config_snapshot(config_path)
+
+    first = load_config(config_path)
+    second = load_config(config_path)
+    first.agents.language = "en"
+
+    assert first is not snapshot and second is not first
+    assert second.agents.language == "zh"
+    assert snapshot.agents.language == "zh"
+    assert get_config_snapshot(config_path) is snapshot
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import pytest
+
+from copaw.local_models.backends.prefix_cache import SessionPrefixCache
+
+
+@dataclass
+class FakeState:
+    tokens: tuple
+    llama_state_size: int = 100
+
+
+def _messages(system: str, first: str, *rest: str) -> list[dict]:
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": first},
+    ]
+    messages += [{"role": "user", "content": text} for text in rest]
+    return messages
+
+
+def _store(cache: SessionPrefixCache, tokens: list[int], size=100) -> None:
+    cache[tokens] = FakeState(tuple(tokens), size)
+
+
+def test_longest_prefix_within_session() -> None:
+    cache = SessionPrefixCache(capacity_bytes=10_000, states_per_session=3)
+    cache.begin(_messages("sys", "hello"))
+    _store(cache, [1, 2, 3])
+    _store(cache, [1, 2, 4, 5])
+
+    assert cache[[1, 2, 4, 5, 6, 7]].tokens == (1, 2, 4, 5)
+    assert cache[[1, 2, 3, 9]].tokens == (1, 2, 3)
+    with pytest.raises(KeyError):
+        cache[[7, 8]]  # pylint: disable=pointless-statement
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_interleaved_sessions_keep_their_states() -> None:
+    cache = SessionPrefixCache(capacity_bytes=10_000)
+    cache.begin(_messages("sys", "a"))
+    _store(cache, [1, 2, 10, 11])
+    cache.begin(_messages("sys", "b"))
+    _store(cache, [1, 2, 20, 21])
+
+    cache.begin(_messages("sys", "a", "more"))
+    assert cache[[1, 2, 10, 11, 12]].tokens == (1, 2, 10, 11)
+
+
+def test_new_session_reuses_shared_system_prefix() -> None:
+    cache = SessionPrefixCache(capacity_bytes=10_000)
+    cache.begin(_messages("sys", "a"))
+    _store(cache, [1, 2, 10])
+
+    cache.begin(_messages("sys", "new conversation"))
+    assert cache[[1, 2, 30]].tokens == (1, 2, 10)
+
+    cache.begin(_messages("other agent", "x"))
+    with pytest.raises(KeyError):
+        cache[[1, 2, 30]]  # pylint: disable=pointless-statement
+
+
+def test_system_prompt_change_invalidates_session() -> None:
+    cache = SessionPrefixCache(capacity_bytes=10_000)
+    cache.begin(_messages("sys v1", "a"))
+    _store(cache, [1, 2, 3])
+
+    cache.begin(_messages("sys v2", "a"))
+
+    assert cache.invalidations == 1
+    assert cache.cache_size == 0
+
+
+def test_bounded_per_session_and_globally() -> None:
+    cache = SessionPrefixCache(capacity_bytes=250, states_per_session=2)
+    cache.begin(_messages("sys", "a"))
+    _store(cache, [1])
+    _store(cache, [2])
+    _store(cache, [3])
+    assert cache.cache_size == 200
+    assert cache[[2, 9]].tokens == (2,)
+
+    cache.begin(_messages("sys", "b"))
+    _store(cache, [5])
+    # Over capacity: the least recently used state ([3]) is evicted.
+    assert cache.cache_size == 200
+    assert [3] not in cache
+    assert cache[[2]].tokens == (2,)
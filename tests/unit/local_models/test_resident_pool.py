@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name,unused-argument,protected-access
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Iterator
+
+import pytest
+
+from copaw.local_models import factory
+from copaw.local_models.backends.base import LocalBackend
+from copaw.local_models.schema import BackendType, LocalModelInfo
+
+MiB = 1024 * 1024
+
+
+class FakeBackend(LocalBackend):
+    active = 0
+    max_active = 0
+    guard = threading.Lock()
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, model_path: str, delay: float = 0.0) -> None:
+        self.model_path = model_path
+        self.delay = delay
+        self.loaded = True
+
+    def chat_completion(self, messages, **kwargs: Any) -> dict:
+        with FakeBackend.guard:
+            FakeBackend.active += 1
+            FakeBackend.max_active = max(
+                FakeBackend.max_active,
+                FakeBackend.active,
+            )
+        time.sleep(self.delay)
+        with FakeBackend.guard:
+            FakeBackend.active -= 1
+        return {"model": self.model_path}
+
+    def chat_completion_stream(self, messages, **kwargs: Any) -> Iterator:
+        yield {"model": self.model_path}
+
+    def unload(self) -> None:
+        self.loaded = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    infos = {
+        name: LocalModelInfo(
+            id=name,
+            repo_id="r",
+            filename=name,
+            backend=BackendType.LLAMACPP,
+            file_size=size * MiB,
+            local_path=f"/nonexistent/{name}",
+        )
+        for name, size in (("small", 2), ("coder", 4), ("big", 6))
+    }
+    created: list[str] = []
+
+    def _create(info, kwargs):
+        created.append(info.id)
+        return FakeBackend(info.id, **kwargs)
+
+    monkeypatch.setattr(factory, "get_local_model", infos.get)
+    monkeypatch.setattr(factory, "_create_backend", _create)
+    monkeypatch.setattr(factory, "LLAMACPP_PREFIX_CACHE_MB", 0)
+    budget = {"bytes": 8 * MiB}
+    resident_pool = factory.ResidentModelPool(lambda: budget["bytes"])
+    resident_pool.created = created
+    resident_pool.budget = budget
+    return resident_pool
+
+
+def _use(pool, model_id: str, **kwargs: Any) -> None:
+    with pool.lease(model_id, kwargs):
+        pass
+
+
+def _resident(pool) -> set[str]:
+    return {s["model_id"] for s in pool.stats() if s["resident"]}
+
+
+def test_models_stay_resident_within_budget(pool) -> None:
+    for model_id in ("small", "coder", "small", "coder"):
+        _use(pool, model_id)
+
+    assert pool.created == ["small", "coder"]
+    assert _resident(pool) == {"small", "coder"}
+    stats = {s["model_id"]: s for s in pool.stats()}
+    assert stats["small"]["hits"] == 1
+    assert stats["small"]["misses"] == 1
+    assert stats["coder"]["resident_bytes"] == 4 * MiB
+
+
+def test_lru_eviction(pool) -> None:
+    _use(pool, "small")
+    _use(pool, "coder")
+    _use(pool, "small")  # coder is now least recently used
+
+    _use(pool, "big")
+
+    assert _resident(pool) == {"small", "big"}
+    stats = {s["model_id"]: s for s in pool.stats()}
+    assert stats["coder"]["evictions"] == 1
+
+
+def test_prefix_cache_counts_against_budget(pool, monkeypatch) -> None:
+    monkeypatch.setattr(factory, "LLAMACPP_PREFIX_CACHE_MB", 2)
+    _use(pool, "small")
+    _use(pool, "coder")  # 2 + 2 and 4 + 2 MiB exceed the 8 MiB budget
+
+    assert _resident(pool) == {"coder"}
+    stats = {s["model_id"]: s for s in pool.stats()}
+    assert stats["coder"]["resident_bytes"] == 6 * MiB
+
+
+def test_zero_budget_keeps_one_model(pool) -> None:
+    pool.budget["bytes"] = 0
+    _use(pool, "small")
+    _use(pool, "coder")
+
+    assert _resident(pool) == {"coder"}
+
+
+def test_leased_model_is_not_evicted(pool) -> None:
+    pool.budget["bytes"] = 0
+    with pool.lease("small") as backend:
+        _use(pool, "coder")
+        assert backend.is_loaded
+    assert _resident(pool) == {"small", "coder"}
+
+
+def test_loading_model_counts_against_budget(pool, monkeypatch) -> None:
+    pool.budget["bytes"] = 10 * MiB
+    _use(pool, "small")
+    loading = threading.Event()
+    release = threading.Event()
+    create = factory._create_backend
+
+    def _slow_create(info, kwargs):
+        if info.id == "big":
+            loading.set()
+            release.wait(5)
+        return create(info, kwargs)
+
+    monkeypatch.setattr(factory, "_create_backend", _slow_create)
+    thread = threading.Thread(target=_use, args=(pool, "big"))
+    thread.start()
+    assert loading.wait(5)
+    # big's 6 MiB are reserved while it loads: coder must evict small.
+    _use(pool, "coder")
+    release.set()
+    thread.join()
+
+    assert _resident(pool) == {"big", "coder"}
+    stats = {s["model_id"]: s for s in pool.stats()}
+    assert sum(s["resident_bytes"] for s in stats.values()) <= 10 * MiB
+    assert stats["small"]["evictions"] == 1
+
+
+def test_different_models_run_concurrently(pool) -> None:
+    FakeBackend.max_active = 0
+    _use(pool, "small", delay=0.1)
+    _use(pool, "coder", delay=0.1)
+
+    def _call(model_id: str) -> None:
+        with pool.lease(model_id) as backend:
+            backend.chat_completion([])
+
+    threads = [
+        threading.Thread(target=_call, args=(m,))
+        for m in ("small", "coder", "small")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Two models in parallel; the second "small" call waits its turn.
+    assert FakeBackend.max_active == 2
+
+
+def test_pooled_backend_reloads_after_eviction(pool) -> None:
+    backend = factory._PooledBackend("", pool=pool, model_id="small")
+    backend.chat_completion([])
+    pool.unload("small")
+    assert not backend.is_loaded
+
+    assert backend.chat_completion([]) == {"model": "small"}
+    assert pool.created == ["small", "small"]
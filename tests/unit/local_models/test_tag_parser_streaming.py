@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""StreamingTagParser must match the whole-text regex parser chunk by chunk.
+
+Property-style: random texts built from tag fragments, split at random
+points, are fed incrementally and compared against re-running
+``extract_thinking_from_text`` / ``parse_tool_calls_from_text`` on the
+accumulated text after every chunk (the pre-streaming behaviour of
+``LocalChatModel._stream_response``).
+"""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from copaw.local_models.chat_model import LocalChatModel
+from copaw.local_models.tag_parser import (
+    StreamingTagParser,
+    extract_thinking_from_text,
+    parse_tool_calls_from_text,
+    text_contains_think_tag,
+    text_contains_tool_call_tag,
+)
+
+_FRAGMENTS = [
+    "<think>",
+    "</think>",
+    "<tool_call>",
+    "</tool_call>",
+    "<think",
+    "</tool_",
+    "call>",
+    "<",
+    ">",
+    "/",
+    " ",
+    "  ",
+    "\n",
+    "\t",
+    "hello",
+    "world.",
+    "思考",
+    '{"name": "get_weather", "arguments": {"city": "Paris"}}',
+    '{"name": "run", "arguments": "{\\"cmd\\": \\"ls\\"}"}',
+    '{"name": "", "arguments": {}}',
+    '{"name": "noargs"}',
+    "{not json",
+    "[1, 2]",
+]
+
+
+def _random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(_FRAGMENTS) for _ in range(rng.randint(0, 30)))
+
+
+def _random_chunks(rng: random.Random, text: str) -> list[str]:
+    cuts = sorted(
+        rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(0, 12)))
+        if len(text) > 1
+        else [],
+    )
+    bounds = [0, *cuts, len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def _calls(calls) -> list[tuple]:
+    # Ids are random per parse; compare everything else.
+    return [(c.name, c.arguments, c.raw_arguments) for c in calls]
+
+
+def _reference(text: str, extract_thinking: bool) -> tuple:
+    """The original per-chunk logic over the whole accumulated text."""
+    thinking, effective = "", text
+    if extract_thinking and text and text_contains_think_tag(text):
+        parsed_thinking = extract_thinking_from_text(text)
+        thinking = parsed_thinking.thinking
+        effective = parsed_thinking.remaining_text
+        if parsed_thinking.has_open_tag:
+            effective = ""
+    if not (effective and text_contains_tool_call_tag(effective)):
+        return thinking, effective, False, None, None
+    parsed = parse_tool_calls_from_text(effective)
+    display = parsed.text_before
+    if parsed.text_after:
+        display = (
+            f"{display}\n{parsed.text_after}".strip()
+            if display
+            else parsed.text_after
+        )
+    return thinking, effective, True, display, _calls(parsed.tool_calls)
+
+
+def _streaming(parser: StreamingTagParser) -> tuple:
+    text = parser.text
+    if not (text and parser.has_tool_call_tag):
+        return parser.thinking, text, False, None, None
+    display, calls = parser.split_tool_calls()
+    return parser.thinking, text, True, display, _calls(calls)
+
+
+def _outcome(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:  # pylint: disable=broad-except
+        return type(e)
+
+
+@pytest.mark.parametrize("seed", range(400))
+def test_streaming_matches_regex_parser(seed: int) -> None:
+    rng = random.Random(seed)
+    text = _random_text(rng)
+    # Sometimes the backend starts sending reasoning_content mid-stream.
+    disable_at = rng.choice([None, None, rng.randint(0, 12)])
+
+    parser = StreamingTagParser()
+    accumulated = ""
+    for i, chunk in enumerate(_random_chunks(rng, text)):
+        accumulated += chunk
+        parser.feed(chunk)
+        extract = disable_at is None or i < disable_at
+        if not extract:
+            parser.disable_thinking()
+        assert _outcome(_streaming, parser) == _outcome(
+            _reference,
+            accumulated,
+            extract,
+        ), f"chunk {i} of {text!r}"
+
+
+def test_tool_call_ids_are_stable_across_chunks() -> None:
+    parser = StreamingTagParser()
+    parser.feed('<tool_call>{"name": "a", "arguments": {}}</tool_call>')
+    _, first = parser.split_tool_calls()
+    parser.feed(' trailing <tool_call>{"name": "b"')
+    parser.feed(', "arguments": {}}</tool_call>')
+    _, second = parser.split_tool_calls()
+    assert [c.name for c in second] == ["a", "b"]
+    assert second[0].id == first[0].id
+
+
+def test_think_block_split_across_chunks() -> None:
+    parser = StreamingTagParser()
+    for piece in ["<th", "ink>plan", " it</thi", "nk>\n answer "]:
+        parser.feed(piece)
+    assert parser.thinking == "plan it"
+    assert parser.text == "answer"
+
+
+class _FakeBackend:
+    def __init__(self, pieces: list[str]) -> None:
+        self._pieces = pieces
+
+    def chat_completion_stream(self, **_kwargs):
+        for piece in self._pieces:
+            yield {"choices": [{"delta": {"content": piece}}]}
+
+
+async def test_local_chat_model_stream_blocks() -> None:
+    pieces = [
+        "<think>check wea",
+        "ther</think>Let me look.<tool",
+        '_call>{"name": "get_weather", "arguments": {"city": "Paris"}}',
+        "</tool_call>",
+    ]
+    model = LocalChatModel("local", _FakeBackend(pieces), stream=True)
+    responses = [r async for r in await model([])]
+
+    final = responses[-1].content
+    assert final[0] == {"type": "thinking", "thinking": "check weather"}
+    assert final[1] == {"type": "text", "text": "Let me look."}
+    assert final[2]["type"] == "tool_use"
+    assert final[2]["name"] == "get_weather"
+    assert final[2]["input"] == {"city": "Paris"}
@@ -397,3 +397,30 @@ def test_provider_from_data_fallback_to_openai(isolated_secret_dir) -> None:
     )
 
     assert isinstance(provider, OpenAIProvider)
+
+
+async def test_chat_model_cache_reuses_until_config_changes(
+    isolated_secret_dir,
+    monkeypatch,
+) -> None:
+    manager = ProviderManager()
+    monkeypatch.setattr(provider_manager_module, "_CHAT_MODEL_CACHE_SIZE", 2)
+    manager.update_provider("openai", {"api_key": "sk-one"})
+    provider = manager.get_provider("openai")
+
+    first = manager._get_cached_chat_model(provider, "gpt-5")
+    assert manager._get_cached_chat_model(provider, "gpt-5") is first
+    other = manager._get_cached_chat_model(provider, "gpt-4.1")
+    assert other is not first
+
+    manager.update_provider("openai", {"api_key": "sk-two"})
+    rebuilt = manager._get_cached_chat_model(provider, "gpt-5")
+    assert rebuilt is not first
+    assert manager._get_cached_chat_model(provider, "gpt-5") is rebuilt
+
+    monkeypatch.setattr(
+        provider_manager_module,
+        "MODEL_CLIENT_CACHE_ENABLED",
+        False,
+    )
+    assert manager._get_cached_chat_model(provider, "gpt-5") is not rebuilt
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""Fault injection for RetryChatModel: 429s, 5xxs, slow first bytes and
+dropped streams from a scripted in-process provider."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncGenerator
+
+import pytest
+from agentscope.model import ChatModelBase
+
+from copaw.providers import resilience
+from copaw.providers import retry_chat_model as rcm
+from copaw.providers.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    TokenBucket,
+    get_provider_guard,
+)
+from copaw.providers.retry_chat_model import RetryChatModel
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeProvider(ChatModelBase):
+    """Plays one scripted fault per call, then answers normally.
+
+    Faults: an int status code, ("slow", seconds) before the first byte,
+    or ("drop", n) to break the stream after n chunks.
+    """
+
+    def __init__(self, script: list[Any], stream: bool = False) -> None:
+        super().__init__(model_name="fake", stream=stream)
+        self.script = list(script)
+        self.calls = 0
+        self.closed = 0
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        fault = self.script.pop(0) if self.script else None
+        if isinstance(fault, int):
+            raise StatusError(fault)
+        kind, arg = fault if isinstance(fault, tuple) else (None, None)
+        delay = arg if kind == "slow" else 0.0
+        drop_after = arg if kind == "drop" else None
+        if not self.stream:
+            await asyncio.sleep(delay)
+            return f"answer-{self.calls}"
+        return self._stream(self.calls, delay, drop_after)
+
+    async def _stream(
+        self,
+        call: int,
+        delay: float,
+        drop_after: int | None,
+    ) -> AsyncGenerator[str, None]:
+        try:
+            await asyncio.sleep(delay)
+            for i in range(3):
+                if drop_after is not None and i >= drop_after:
+                    raise StatusError(502)
+                yield f"chunk-{call}-{i}"
+        finally:
+            self.closed += 1
+
+
+@pytest.fixture(autouse=True)
+def _fast_retries(monkeypatch):
+    resilience.reset_provider_guards()
+    monkeypatch.setattr(rcm, "_compute_backoff", lambda attempt: 0.0)
+    monkeypatch.setattr(rcm, "LLM_MAX_RETRIES", 3)
+    monkeypatch.setattr(rcm, "LLM_FIRST_BYTE_TIMEOUT", 0.0)
+    monkeypatch.setattr(rcm, "LLM_HEDGE_DELAY", 0.0)
+    yield
+    resilience.reset_provider_guards()
+
+
+async def _collect(stream: AsyncGenerator) -> list[Any]:
+    return [chunk async for chunk in stream]
+
+
+async def test_retries_429_and_5xx() -> None:
+    provider = FakeProvider([429, 503])
+    model = RetryChatModel(provider, provider_id="p")
+
+    assert await model([]) == "answer-3"
+    assert provider.calls == 3
+    assert get_provider_guard("p").breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_non_retryable_error_is_raised_once() -> None:
+    provider = FakeProvider([400])
+    model = RetryChatModel(provider, provider_id="p")
+
+    with pytest.raises(StatusError):
+        await model([])
+    assert provider.calls == 1
+    assert get_provider_guard("p").breaker.failures == 0
+
+
+async def test_dropped_stream_is_replayed() -> None:
+    provider = FakeProvider([("drop", 2)], stream=True)
+    model = RetryChatModel(provider, provider_id="p")
+
+    chunks = await _collect(await model([]))
+
+    assert chunks == [
+        "chunk-1-0",
+        "chunk-1-1",
+        "chunk-2-0",
+        "chunk-2-1",
+        "chunk-2-2",
+    ]
+    assert provider.calls == 2
+    assert provider.closed == 2
+
+
+async def test_first_byte_timeout_retries_slow_stream(monkeypatch) -> None:
+    monkeypatch.setattr(rcm, "LLM_FIRST_BYTE_TIMEOUT", 0.05)
+    provider = FakeProvider([("slow", 5.0)], stream=True)
+    model = RetryChatModel(provider, provider_id="p")
+
+    chunks = await asyncio.wait_for(_collect(await model([])), 2.0)
+
+    assert chunks[0] == "chunk-2-0"
+    assert provider.calls == 2
+    assert provider.closed == 2
+
+
+async def test_hedged_request_wins_over_slow_one(monkeypatch) -> None:
+    monkeypatch.setattr(rcm, "LLM_HEDGE_DELAY", 0.05)
+    provider = FakeProvider([("slow", 5.0)])
+    model = RetryChatModel(provider, provider_id="p")
+
+    result = await asyncio.wait_for(model([]), 2.0)
+
+    assert result == "answer-2"
+    assert provider.calls == 2
+
+
+async def test_hedged_stream_closes_loser(monkeypatch) -> None:
+    monkeypatch.setattr(rcm, "LLM_HEDGE_DELAY", 0.05)
+    provider = FakeProvider([("slow", 5.0)], stream=True)
+    model = RetryChatModel(provider, provider_id="p")
+
+    chunks = await asyncio.wait_for(_collect(await model([])), 2.0)
+
+    assert chunks == ["chunk-2-0", "chunk-2-1", "chunk-2-2"]
+    assert provider.closed == 2
+
+
+async def test_circuit_opens_and_fails_fast() -> None:
+    guard = get_provider_guard("p")
+    guard.breaker.failure_threshold = 2
+    guard.breaker.reset_timeout = 60.0
+    provider = FakeProvider([500] * 10)
+    model = RetryChatModel(provider, provider_id="p")
+
+    with pytest.raises(CircuitOpenError):
+        await model([])
+    assert provider.calls == 2
+
+    with pytest.raises(CircuitOpenError):
+        await model([])
+    assert provider.calls == 2
+
+
+async def test_circuit_shared_across_models() -> None:
+    guard = get_provider_guard("p")
+    guard.breaker.failure_threshold = 1
+    first = RetryChatModel(FakeProvider([500] * 5), provider_id="p")
+    second_provider = FakeProvider([])
+    second = RetryChatModel(second_provider, provider_id="p")
+
+    with pytest.raises(CircuitOpenError):
+        await first([])
+    with pytest.raises(CircuitOpenError):
+        await second([])
+    assert second_provider.calls == 0
+
+
+async def test_half_open_probe() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(
+        "p",
+        failure_threshold=1,
+        reset_timeout=10.0,
+        clock=lambda: now[0],
+    )
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 10.0
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time.
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    now[0] = 20.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_token_bucket_refill_and_debt() -> None:
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0])
+
+    assert bucket.try_acquire(60) == 0.0
+    assert bucket.try_acquire(1) == pytest.approx(1.0)
+    now[0] = 1.0
+    assert bucket.try_acquire(1) == 0.0
+
+    bucket.consume(30)
+    assert bucket.try_acquire(1) == pytest.approx(31.0)
+
+
+async def test_request_limit_is_shared(monkeypatch) -> None:
+    monkeypatch.setattr(resilience, "LLM_RATE_LIMIT_RPM", 600.0)
+    guard = get_provider_guard("limited")
+    guard.requests.consume(guard.requests.capacity - 2)
+    models = [
+        RetryChatModel(FakeProvider([]), provider_id="limited")
+        for _ in range(3)
+    ]
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*(model([]) for model in models))
+
+    # Two requests were in budget; the third waits ~0.1s for a refill.
+    assert loop.time() - start >= 0.05
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from datetime import date, timedelta
+
+from copaw.token_usage.manager import TokenUsageManager
+
+_DAY = date(2026, 3, 1)
+
+
+def _make(tmp_path, **kwargs) -> TokenUsageManager:
+    kwargs.setdefault("flush_interval", 60.0)
+    return TokenUsageManager(path=tmp_path / "token_usage.json", **kwargs)
+
+
+async def _totals(manager: TokenUsageManager) -> tuple[int, int, int]:
+    summary = await manager.get_summary(
+        start_date=_DAY - timedelta(days=30),
+        end_date=_DAY + timedelta(days=30),
+    )
+    return (
+        summary.total_prompt_tokens,
+        summary.total_completion_tokens,
+        summary.total_calls,
+    )
+
+
+def _disk_calls(tmp_path) -> int:
+    """Calls visible to a fresh process reading the files right now."""
+    fresh = _make(tmp_path)
+    with fresh._state_lock:  # pylint: disable=protected-access
+        fresh._ensure_loaded()  # pylint: disable=protected-access
+        return sum(
+            entry["call_count"]
+            for by_key in fresh._days.values()  # pylint: disable=W0212
+            for entry in by_key.values()
+        )
+
+
+async def test_concurrent_recorders_lose_no_events(tmp_path) -> None:
+    manager = _make(tmp_path, flush_max_events=16, compact_batches=4)
+    recorders, per_recorder = 100, 50
+    done = asyncio.Event()
+
+    async def recorder(i: int) -> None:
+        rng = random.Random(i)
+        for j in range(per_recorder):
+            await manager.record(
+                provider_id=f"p{i % 3}",
+                model_name=f"m{i % 5}",
+                prompt_tokens=10,
+                completion_tokens=1,
+                at_date=_DAY + timedelta(days=j % 7),
+            )
+            await asyncio.sleep(rng.random() / 1000)
+
+    async def crash_checker() -> None:
+        # A crash at any moment must leave exactly the flushed events
+        # on disk: everything recorded minus what is still buffered.
+        # pylint: disable=protected-access
+        while not done.is_set():
+            with manager._file_lock, manager._state_lock:
+                recorded = sum(
+                    entry["call_count"]
+                    for by_key in manager._days.values()
+                    for entry in by_key.values()
+                )
+                expected = recorded - len(manager._pending)
+                assert _disk_calls(tmp_path) == expected
+            await asyncio.sleep(0.005)
+
+    checker = asyncio.create_task(crash_checker())
+    await asyncio.gather(*(recorder(i) for i in range(recorders)))
+    done.set()
+    await checker
+    await manager.close()
+
+    total_calls = recorders * per_recorder
+    expected = (10 * total_calls, total_calls, total_calls)
+    assert await _totals(manager) == expected
+    assert await _totals(_make(tmp_path)) == expected
+
+
+async def test_flushed_events_survive_crash(tmp_path) -> None:
+    manager = _make(tmp_path)
+    for _ in range(5):
+        await manager.record("p", "m", 3, 4, at_date=_DAY)
+    await manager.flush()
+    await manager.record("p", "m", 3, 4, at_date=_DAY)  # never flushed
+
+    # Simulated crash: the manager is dropped without close().
+    assert await _totals(_make(tmp_path)) == (15, 20, 5)
+
+
+async def test_crash_mid_compaction_does_not_double_count(
+    tmp_path,
+    monkeypatch,
+) -> None:
+    manager = _make(tmp_path, compact_batches=2)
+    await manager.record("p", "m", 1, 1, at_date=_DAY)
+    await manager.flush()
+
+    original = TokenUsageManager._write_snapshot  # pylint: disable=W0212
+
+    def write_then_crash(self, days, seq):
+        original(self, days, seq)
+        raise OSError("crash before the log is removed")
+
+    monkeypatch.setattr(TokenUsageManager, "_write_snapshot", write_then_crash)
+    await manager.record("p", "m", 1, 1, at_date=_DAY)
+    await manager.flush()
+
+    assert (tmp_path / "token_usage.json.log").exists()
+    assert await _totals(_make(tmp_path)) == (2, 2, 2)
+
+
+async def test_torn_log_line_is_ignored(tmp_path) -> None:
+    manager = _make(tmp_path)
+    await manager.record("p", "m", 5, 5, at_date=_DAY)
+    await manager.close()
+    with open(tmp_path / "token_usage.json.log", "a", encoding="utf-8") as f:
+        f.write('{"seq": 99, "events": [{"date"')
+
+    assert await _totals(_make(tmp_path)) == (5, 5, 1)
+
+
+async def test_reads_legacy_file_and_filters(tmp_path) -> None:
+    legacy = {
+        _DAY.isoformat(): {
+            "openai:gpt-4": {
+                "provider_id": "openai",
+                "model_name": "gpt-4",
+                "prompt_tokens": 100,
+                "completion_tokens": 10,
+                "call_count": 2,
+            },
+            "qwen-max": {"prompt_tokens": 7, "call_count": 1},
+        },
+    }
+    (tmp_path / "token_usage.json").write_text(
+        json.dumps(legacy),
+        encoding="utf-8",
+    )
+    manager = _make(tmp_path)
+    await manager.record("openai", "gpt-4", 1, 1, at_date=_DAY)
+
+    summary = await manager.get_summary(
+        start_date=_DAY,
+        end_date=_DAY,
+        provider_id="openai",
+    )
+    assert summary.total_prompt_tokens == 101
+    assert summary.total_calls == 3
+    assert list(summary.by_model) == ["openai:gpt-4"]
+
+    summary = await manager.get_summary(start_date=_DAY, end_date=_DAY)
+    assert summary.by_model["qwen-max"].prompt_tokens == 7
+
+    empty = await manager.get_summary(
+        start_date=_DAY + timedelta(days=1),
+        end_date=_DAY + timedelta(days=9),
+    )
+    assert empty.total_calls == 0